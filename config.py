@@ -160,6 +160,29 @@ PDF_SMART_RETRY_MAX_ATTEMPTS = 3  # Maximum retry attempts for temporary failure
 PDF_SMART_RETRY_BASE_DELAY_MINUTES = 60  # Base delay before first retry (uses exponential backoff)
 PDF_RATE_LIMIT_DELAY_SECONDS = 1  # Delay between API requests to respect rate limits
 PDF_CLEANUP_RETENTION_DAYS = 90  # Days to keep download attempt history before cleanup
+PDF_HTTP_POOL_MAXSIZE = 10  # Keep-alive connections per host shared by all download threads
+PDF_HTTP_MAX_RETRIES = 2  # Retries (with backoff) for connection errors and HTTP 502/503/504
+PDF_INSPECT_WORKERS = 2  # Processes that open downloaded/uploaded PDFs to validate them and read page count, title and text layer (0 = in-process)
+PDF_INSPECT_TIMEOUT_SECONDS = 60  # A PDF that takes longer to inspect is kept without metadata
+PDF_DOWNLOAD_RESUME_ATTEMPTS = 3  # Times an interrupted PDF download is resumed with a Range request before giving up
+PDF_ATTEMPT_LOG_FLUSH_SECONDS = 1.0  # Download attempts are buffered and written to pdf_downloads.db this often
+PDF_SOURCE_SETTINGS_REFRESH_SECONDS = 2  # How often download workers re-read per-source enabled/timeout/max_concurrency from pdf_downloads.db
+PDF_BULK_UPLOAD_MAX_FILES = 2000  # PDFs accepted in one bulk upload (ZIP contents included)
+PDF_BULK_UPLOAD_MAX_FILE_MB = 100  # Largest single PDF accepted by the bulk upload
+PDF_BULK_UPLOAD_MAX_ZIP_MB = 2048  # Largest ZIP archive accepted by the bulk upload
+PDF_BULK_UPLOAD_MAX_TOTAL_MB = 4096  # Most PDF data staged from one bulk upload, ZIP contents uncompressed
+PDF_DOI_TITLE_MATCH_THRESHOLD = 0.9  # Similarity (0-1) a PDF's title needs to a project DOI's CrossRef title to be attached to it automatically
+
+# PDF Download Queue
+# Download requests are queued in the database and run by pdf_download_worker.py.
+# Under gunicorn, run the worker as its own service: python pdf_download_worker.py
+PDF_DOWNLOAD_EMBEDDED_WORKER = True  # Also run a worker thread when starting harvest_be.py directly
+PDF_DOWNLOAD_WORKER_POLL_SECONDS = 5  # How often an idle worker checks the queue
+PDF_DOWNLOAD_LEASE_SECONDS = 300  # A job whose worker stops renewing its lease this long is resumed by another worker
+PDF_DOWNLOAD_SLICE_DOIS = 25  # DOIs a worker runs from one job before letting a job of another project have a turn
+PDF_PROGRESS_STREAM_POLL_SECONDS = 1.0  # How often the progress stream (SSE) checks harvest.db for a watched project
+PDF_PROGRESS_STREAM_KEEPALIVE_SECONDS = 15  # Keep-alive comment interval on idle progress streams
+PDF_RETRY_DRAIN_INTERVAL_SECONDS = 60  # How often an idle worker retries DOIs whose retry backoff has expired
 
 # User Agent Rotation
 # Rotate User-Agent headers to avoid being blocked by some sources
@@ -201,6 +224,17 @@ PARTNER_LOGOS = [
     }
 ]
 
+# Monitoring Configuration
+# Expose Prometheus metrics at /metrics on the backend (requires prometheus-client)
+# Under gunicorn with several workers, set PROMETHEUS_MULTIPROC_DIR (see harvest_metrics.py)
+ENABLE_METRICS = True  # Can be overridden with HARVEST_ENABLE_METRICS environment variable
+
+# On-demand request profiling: an admin sends their admin token in the X-Harvest-Profile
+# header (or ?_profile=<token>) and the request is profiled with cProfile.
+# Reports are listed at /api/admin/profiles
+ENABLE_REQUEST_PROFILING = True
+PROFILES_DIR = "profiles"  # Directory for stored profile reports
+
 # Debug Configuration
 # Enable verbose logging for troubleshooting (DO NOT enable in production - fills logs!)
 ENABLE_DEBUG_LOGGING = False  # Set to True only for debugging specific issues
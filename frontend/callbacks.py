@@ -85,6 +85,21 @@ NO_UPDATE_15 = tuple([no_update] * 15)
 # Helper Functions
 # -----------------------
 
+def _fetch_project(project_id) -> Dict:
+    """
+    Fetch a single project including its full DOI list.
+    /api/projects only returns summaries, so DOI lists come from here.
+    Returns None if the project could not be fetched.
+    """
+    try:
+        r = requests.get(f"{API_BASE}/api/projects/{project_id}", timeout=5)
+        if r.ok:
+            return r.json()
+    except Exception as e:
+        logger.error(f"Failed to fetch project {project_id}: {e}")
+    return None
+
+
 def _create_paper_card(paper: Dict, index: int) -> dbc.Card:
     """
     Create a paper card component with badges, metadata, and abstract displayed side-by-side.
@@ -1304,7 +1319,7 @@ def toggle_export_modal(export_clicks, cancel_clicks, confirm_clicks, is_open,
         
         # Get projects for dropdown
         try:
-            r = requests.get(API_PROJECTS, timeout=5)
+            r = requests.get(API_PROJECTS, params={"fields": "id,name"}, timeout=5)
             if r.ok:
                 projects = r.json()
                 project_options = [{"label": p["name"], "value": p["id"]} for p in projects]
@@ -1956,7 +1971,7 @@ def save_triples(n_clicks, sentence_text, literature_link, contributor_email, em
 )
 def populate_browse_project_filter(load_trigger, refresh_click, tab_value):
     try:
-        r = requests.get(API_PROJECTS, timeout=5)
+        r = requests.get(API_PROJECTS, params={"fields": "id,name"}, timeout=5)
         if r.ok:
             projects = r.json()
             options = [{"label": "All (no filter)", "value": None}] + [{"label": p["name"], "value": p["id"]} for p in projects]
@@ -2112,7 +2127,7 @@ def reset_form(_):
 )
 def load_projects(load_trigger, create_click, tab_value):
     try:
-        r = requests.get(API_PROJECTS, timeout=5)
+        r = requests.get(API_PROJECTS, params={"fields": "id,name,doi_count"}, timeout=5)
         if r.ok:
             projects = r.json()
             options = [{"label": p["name"], "value": p["id"]} for p in projects]
@@ -2141,7 +2156,7 @@ def show_project_info(project_id, projects):
     if not project:
         return "", [], True
     
-    doi_count = len(project.get("doi_list", []))
+    doi_count = project.get("doi_count", 0)
     info_text = f"Project: {project['name']} ({doi_count} DOIs available)"
     
     # Check if project has batches
@@ -2173,12 +2188,12 @@ def show_project_info(project_id, projects):
             ]
         else:
             # Fallback to simple list if API fails
-            doi_list = project.get("doi_list", [])
+            doi_list = (_fetch_project(project_id) or {}).get("doi_list", [])
             doi_options = [{"label": doi, "value": doi} for doi in doi_list]
     except Exception as e:
         logger.error(f"Failed to fetch DOI PDF indicators: {e}")
         # Fallback to simple list
-        doi_list = project.get("doi_list", [])
+        doi_list = (_fetch_project(project_id) or {}).get("doi_list", [])
         doi_options = [{"label": doi, "value": doi} for doi in doi_list]
     
     return info_text, doi_options, False
@@ -2455,13 +2470,17 @@ def update_pdf_viewer(selected_doi, project_id):
         
         # Construct PDF path
         pdf_filename = f"{doi_hash}.pdf"
-        # Use internal backend URL for server-side check
-        backend_pdf_url = f"{API_BASE}/api/projects/{project_id}/pdf/{pdf_filename}"
         
-        # Check if PDF exists by trying to fetch it from backend
+        # Check if PDF exists with a manifest lookup instead of fetching the file
         try:
-            r = requests.head(backend_pdf_url, timeout=5)
-            if r.ok:
+            r = requests.get(
+                f"{API_BASE}/api/projects/{project_id}/pdf-manifest",
+                params={"doi": clean_doi},
+                timeout=5
+            )
+            entries = r.json().get("entries", []) if r.ok else []
+            if entries:
+                pdf_filename = entries[0]["filename"]
                 # PDF exists - check if highlighting is enabled
                 if ENABLE_PDF_HIGHLIGHTING:
                     # Show custom viewer with highlighting capability
@@ -2695,32 +2714,26 @@ def display_projects_list(refresh_clicks, project_message, delete_clicks, auth_d
         return dbc.Alert("Please login to view projects", color="info")
     
     try:
-        r = requests.get(API_PROJECTS, timeout=5)
+        # One request for every project's summary, download status and staleness
+        r = requests.post(
+            f"{API_BASE}/api/admin/projects/overview",
+            json={"email": auth_data.get("email"), "password": auth_data.get("password")},
+            timeout=10
+        )
         if r.ok:
-            projects = r.json()
+            projects = r.json().get("projects", [])
             if not projects:
                 return dbc.Alert("No projects found", color="info")
             
             # Create a table of projects
             project_items = []
             for p in projects:
-                doi_count = len(p.get("doi_list", []))
+                doi_count = p.get("doi_count", 0)
                 project_id = p["id"]
                 
-                # Check if download is stale for this project
-                is_stale = False
-                try:
-                    progress_url = f"{API_BASE}/api/projects/{project_id}/pdf-download-progress"
-                    progress_resp = requests.get(progress_url, timeout=2)
-                    if progress_resp.ok:
-                        progress_data = progress_resp.json()
-                        # Only show force restart button if download is running and stale
-                        if progress_data.get("status") == "running":
-                            is_stale = progress_data.get("is_stale", False)
-                except Exception as e:
-                    # Log error but continue - download status check is not critical for listing projects
-                    if ENABLE_DEBUG_LOGGING:
-                        logger.debug(f"Could not check download status for project {project_id}: {e}")
+                # Only show force restart button if download is running and stale
+                download = p.get("download") or {}
+                is_stale = download.get("status") == "running" and download.get("is_stale", False)
                 
                 # Build button list for this project
                 button_list = [
@@ -2764,6 +2777,8 @@ def display_projects_list(refresh_clicks, project_message, delete_clicks, auth_d
                                 html.P(p.get("description", "No description"), className="card-text small"),
                                 html.P([
                                     html.Strong("DOIs: "), f"{doi_count}",
+                                    html.Strong(" | PDFs: "), f"{p.get('pdf_count', 0)}",
+                                    html.Strong(" | Completed: "), f"{p.get('status_counts', {}).get('completed', 0)}",
                                     html.Br(),
                                     html.Strong("Created by: "), p.get("created_by", "Unknown"),
                                     html.Br(),
@@ -2820,7 +2835,7 @@ def view_project_dois(n_clicks_list, projects):
         return no_update
     
     project_id = trigger["index"]
-    project = next((p for p in projects if p["id"] == project_id), None)
+    project = _fetch_project(project_id)
     
     if not project:
         return dbc.Alert("Project not found", color="danger")
@@ -2947,7 +2962,7 @@ def handle_edit_dois_modal(edit_clicks_list, close_clicks, add_clicks, remove_cl
             return no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update
         
         project_id = trigger["index"]
-        project = next((p for p in projects if p["id"] == project_id), None)
+        project = _fetch_project(project_id)
         
         if not project:
             return no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update
@@ -3012,23 +3027,20 @@ def handle_edit_dois_modal(edit_clicks_list, close_clicks, add_clicks, remove_cl
                 message_text = "\n".join(message_parts)
                 alert_color = "warning" if result.get("invalid_dois") else "success"
                 
-                # Refresh project list
-                projects_r = requests.get(API_PROJECTS, timeout=5)
-                if projects_r.ok:
-                    updated_projects = projects_r.json()
-                    updated_project = next((p for p in updated_projects if p["id"] == current_project_id), None)
-                    if updated_project:
-                        doi_list = updated_project.get("doi_list", [])
-                        doi_items = [html.Div(f"• {doi}", className="small") for doi in doi_list]
-                        
-                        project_info = dbc.Alert([
-                            html.Strong(f"Project: {updated_project['name']}"),
-                            html.Br(),
-                            html.Small(f"ID: {updated_project['id']} | Total DOIs: {len(doi_list)}")
-                        ], color="info")
-                        
-                        return True, current_project_id, project_info, doi_items, "", no_update, no_update, \
-                               dbc.Alert(message_text, color=alert_color, dismissable=True, style={"whiteSpace": "pre-wrap"})
+                # Refresh project DOI list
+                updated_project = _fetch_project(current_project_id)
+                if updated_project:
+                    doi_list = updated_project.get("doi_list", [])
+                    doi_items = [html.Div(f"• {doi}", className="small") for doi in doi_list]
+                    
+                    project_info = dbc.Alert([
+                        html.Strong(f"Project: {updated_project['name']}"),
+                        html.Br(),
+                        html.Small(f"ID: {updated_project['id']} | Total DOIs: {len(doi_list)}")
+                    ], color="info")
+                    
+                    return True, current_project_id, project_info, doi_items, "", no_update, no_update, \
+                           dbc.Alert(message_text, color=alert_color, dismissable=True, style={"whiteSpace": "pre-wrap"})
                 
                 return True, current_project_id, no_update, no_update, "", no_update, no_update, \
                        dbc.Alert(message_text, color=alert_color, dismissable=True, style={"whiteSpace": "pre-wrap"})
@@ -3073,27 +3085,24 @@ def handle_edit_dois_modal(edit_clicks_list, close_clicks, add_clicks, remove_cl
             
             if r.ok:
                 result = r.json()
-                # Refresh project list
-                projects_r = requests.get(API_PROJECTS, timeout=5)
-                if projects_r.ok:
-                    updated_projects = projects_r.json()
-                    updated_project = next((p for p in updated_projects if p["id"] == current_project_id), None)
-                    if updated_project:
-                        doi_list = updated_project.get("doi_list", [])
-                        doi_items = [html.Div(f"• {doi}", className="small") for doi in doi_list]
-                        
-                        project_info = dbc.Alert([
-                            html.Strong(f"Project: {updated_project['name']}"),
-                            html.Br(),
-                            html.Small(f"ID: {updated_project['id']} | Total DOIs: {len(doi_list)}")
-                        ], color="info")
-                        
-                        message = result.get("message", "DOIs removed successfully")
-                        if result.get("deleted_pdfs", 0) > 0:
-                            message += f" | {result['deleted_pdfs']} PDF(s) deleted"
-                        
-                        return True, current_project_id, project_info, doi_items, no_update, "", False, \
-                               dbc.Alert(message, color="success", dismissable=True)
+                # Refresh project DOI list
+                updated_project = _fetch_project(current_project_id)
+                if updated_project:
+                    doi_list = updated_project.get("doi_list", [])
+                    doi_items = [html.Div(f"• {doi}", className="small") for doi in doi_list]
+                    
+                    project_info = dbc.Alert([
+                        html.Strong(f"Project: {updated_project['name']}"),
+                        html.Br(),
+                        html.Small(f"ID: {updated_project['id']} | Total DOIs: {len(doi_list)}")
+                    ], color="info")
+                    
+                    message = result.get("message", "DOIs removed successfully")
+                    if result.get("deleted_pdfs", 0) > 0:
+                        message += f" | {result['deleted_pdfs']} PDF(s) deleted"
+                    
+                    return True, current_project_id, project_info, doi_items, no_update, "", False, \
+                           dbc.Alert(message, color="success", dismissable=True)
                 
                 return True, current_project_id, no_update, no_update, no_update, "", False, \
                        dbc.Alert(result.get("message", "DOIs removed successfully"), color="success", dismissable=True)
@@ -3114,17 +3123,17 @@ def handle_edit_dois_modal(edit_clicks_list, close_clicks, add_clicks, remove_cl
     
     return no_update, no_update, no_update, no_update, no_update, no_update, no_update, no_update
 
-# Handle Download PDFs button click - Start download and enable progress polling
+# Handle Download PDFs button click - Start download and listen to its progress stream
 @app.callback(
     Output("pdf-download-project-id", "data"),
-    Output("pdf-download-progress-interval", "disabled"),
+    Output("pdf-download-stream-disabled", "data"),
     Output("pdf-download-state-store", "data"),
     Input({"type": "download-project-pdfs", "index": ALL}, "n_clicks"),
     State("admin-auth-store", "data"),
     prevent_initial_call=True,
 )
 def start_download_project_pdfs(n_clicks_list, auth_data):
-    """Start PDF download and enable progress polling"""
+    """Start PDF download and listen to its progress stream"""
     if not any(n_clicks_list):
         return no_update, no_update, no_update
     
@@ -3172,7 +3181,7 @@ def start_download_project_pdfs(n_clicks_list, auth_data):
             }
             
             # Return: project_id (to track), enable interval, initial state
-            # The polling callback will update the progress div
+            # The progress stream will update the progress div
             return project_id, False, initial_download_state
         else:
             error_msg = r.json().get("error", "Unknown error") if r.headers.get("content-type") == "application/json" else f"HTTP {r.status_code}"
@@ -3183,22 +3192,22 @@ def start_download_project_pdfs(n_clicks_list, auth_data):
         print(f"[Frontend] PDF Download: Error starting download - {str(e)}")
         return None, True, None
 
-# Restore PDF download polling on page load if there's an active download
+# Reconnect to the PDF download progress stream on page load if there's an active download
 @app.callback(
-    Output("pdf-download-progress-interval", "disabled", allow_duplicate=True),
+    Output("pdf-download-stream-disabled", "data", allow_duplicate=True),
     Output("pdf-download-project-id", "data", allow_duplicate=True),
     Input("pdf-download-state-store", "data"),
     prevent_initial_call='initial_duplicate',
 )
-def restore_pdf_download_polling(download_state):
-    """Restore polling on page load if there's an active download in progress"""
+def restore_pdf_download_stream(download_state):
+    """Reconnect to the progress stream on page load if there's an active download in progress"""
     if download_state and download_state.get("active") and download_state.get("project_id"):
         project_id = download_state.get("project_id")
-        print(f"[Frontend] PDF Download: Restoring polling for project {project_id} after refresh")
-        # Enable polling and set project_id
+        print(f"[Frontend] PDF Download: Reconnecting progress stream for project {project_id} after refresh")
+        # Enable the stream and set project_id
         return False, project_id
     
-    # No active download, keep polling disabled
+    # No active download, keep the stream closed
     return no_update, no_update
 
 def _build_progress_outputs(progress_div_ids, active_project_id, content):
@@ -3222,54 +3231,78 @@ def _build_progress_outputs(progress_div_ids, active_project_id, content):
             outputs.append(html.Div())  # Empty div for non-active projects
     return outputs
 
-# Poll for PDF download progress
+# Listen to the PDF download progress stream in the browser. The backend pushes
+# Server-Sent Events (through the /proxy/pdf-download-events route); each
+# progress snapshot is written to pdf-download-stream-store, together with the
+# most recently finished DOIs.
+app.clientside_callback(
+    """
+    function(disabled, projectId) {
+        var current = window.harvestPdfDownloadStream;
+        if (current && (disabled || current.projectId !== projectId)) {
+            current.source.close();
+            window.harvestPdfDownloadStream = current = null;
+        }
+        if (disabled || !projectId || current) {
+            return window.dash_clientside.no_update;
+        }
+        var stream = {projectId: projectId, recent: [],
+                      source: new EventSource(STREAM_URL + projectId)};
+        var publish = function(progress) {
+            window.dash_clientside.set_props("pdf-download-stream-store", {
+                data: {project_id: projectId, progress: progress, recent: stream.recent.slice()}
+            });
+        };
+        stream.source.addEventListener("doi", function(e) {
+            stream.recent = [JSON.parse(e.data)].concat(stream.recent).slice(0, 5);
+        });
+        stream.source.addEventListener("progress", function(e) {
+            publish(JSON.parse(e.data));
+        });
+        stream.source.addEventListener("done", function(e) {
+            stream.source.close();
+            if (window.harvestPdfDownloadStream === stream) {
+                window.harvestPdfDownloadStream = null;
+            }
+            publish(JSON.parse(e.data));
+        });
+        window.harvestPdfDownloadStream = stream;
+        return window.dash_clientside.no_update;
+    }
+    """.replace("STREAM_URL", json.dumps(f"{DASH_REQUESTS_PATHNAME_PREFIX.rstrip('/')}/proxy/pdf-download-events/")),
+    Output("pdf-download-stream-store", "data"),
+    Input("pdf-download-stream-disabled", "data"),
+    Input("pdf-download-project-id", "data"),
+)
+
+# Render PDF download progress pushed by the stream
 @app.callback(
     Output({"type": "project-pdf-progress", "index": ALL}, "children", allow_duplicate=True),
-    Output("pdf-download-progress-interval", "disabled", allow_duplicate=True),
+    Output("pdf-download-stream-disabled", "data", allow_duplicate=True),
     Output("pdf-download-project-id", "data", allow_duplicate=True),
     Output("pdf-download-state-store", "data", allow_duplicate=True),
-    Input("pdf-download-progress-interval", "n_intervals"),
+    Input("pdf-download-stream-store", "data"),
     State({"type": "project-pdf-progress", "index": ALL}, "id"),
-    State("pdf-download-project-id", "data"),
-    State("admin-auth-store", "data"),
     State("pdf-download-state-store", "data"),
     prevent_initial_call=True,
 )
-def poll_pdf_download_progress(n_intervals, progress_div_ids, project_id, auth_data, download_state):
-    """Poll the backend for PDF download progress - persists across refresh"""
-    # Use stored project_id if current one is None (after refresh)
-    if not project_id and download_state and download_state.get("project_id"):
-        project_id = download_state.get("project_id")
-    
-    if not project_id:
+def render_pdf_download_progress(stream_data, progress_div_ids, download_state):
+    """Show the latest PDF download progress pushed by the backend - persists across refresh"""
+    if not stream_data or not stream_data.get("project_id"):
         return [no_update] * len(progress_div_ids), no_update, no_update, no_update
     
-    # Continue polling even without auth if we have a stored download state
-    # (download was started before logout/refresh)
-    if not auth_data and not (download_state and download_state.get("active")):
-        return [no_update] * len(progress_div_ids), True, None, None  # Disable polling if not authenticated and no active download
-    
-    print(f"[Frontend] PDF Download: Polling progress for project {project_id} (interval {n_intervals})")
+    project_id = stream_data["project_id"]
+    data = stream_data.get("progress") or {}
     
     try:
-        # Get progress from backend
-        r = requests.get(
-            f"{API_BASE}/api/admin/projects/{project_id}/download-pdfs/status",
-            timeout=5
-        )
+        status = data.get("status")
         
-        if r.status_code == 404:
-            # Not started or no progress info
+        if status == "not_started":
+            # No progress info for this project
             print(f"[Frontend] PDF Download: No progress info for project {project_id}")
             # Clear all progress divs
             return [html.Div()] * len(progress_div_ids), True, None, None
         
-        if not r.ok:
-            print(f"[Frontend] PDF Download: Error fetching progress - {r.status_code}")
-            return [no_update] * len(progress_div_ids), no_update, no_update, no_update  # Keep polling
-        
-        data = r.json()
-        status = data.get("status")
         total = data.get("total", 0)
         current = data.get("current", 0)
         current_doi = data.get("current_doi", "")
@@ -3320,7 +3353,24 @@ def poll_pdf_download_progress(n_intervals, progress_div_ids, project_id, auth_d
                     html.Strong("Last source used: "),
                     source_display
                 ])
-            
+
+            # Downloads of several projects share the workers; show this one's turn
+            queue_position = data.get("queue_position")
+            if queue_position:
+                progress_content.extend([
+                    html.Br(),
+                    html.Strong("Waiting for its turn: "),
+                    f"position {queue_position} in the download queue",
+                ])
+            eta_seconds = data.get("eta_seconds")
+            if eta_seconds is not None:
+                eta_minutes = max(1, round(eta_seconds / 60))
+                progress_content.extend([
+                    html.Br(),
+                    html.Strong("Estimated time remaining: "),
+                    f"about {eta_minutes} minute{'s' if eta_minutes != 1 else ''}",
+                ])
+
             # Add stale warning if applicable
             if is_stale:
                 progress_content.extend([
@@ -3337,28 +3387,35 @@ def poll_pdf_download_progress(n_intervals, progress_div_ids, project_id, auth_d
                     ),
                 ])
             
-            # Fetch and display download configuration
-            try:
-                config_resp = requests.get(f"{API_BASE}/api/pdf-download-config", timeout=3)
-                if config_resp.ok:
-                    config_data = config_resp.json()
-                    sources = config_data.get("sources", [])
-                    enabled_sources = [s for s in sources if s.get("enabled") and s.get("available")]
-                    
-                    if enabled_sources:
-                        progress_content.extend([
-                            html.Br(),
-                            html.Br(),
-                            html.Strong("Active download mechanisms: "),
-                            html.Br(),
-                        ])
-                        for src in enabled_sources:
-                            progress_content.extend([
-                                f"  • {src['name']}: {src['description']}",
-                                html.Br(),
-                            ])
-            except Exception as e:
-                print(f"[Frontend] Could not fetch PDF config: {e}")
+            # DOIs finished since the page started listening
+            recent = stream_data.get("recent") or []
+            if recent:
+                progress_content.extend([
+                    html.Br(),
+                    html.Br(),
+                    html.Strong("Recently finished: "),
+                    html.Br(),
+                ])
+                for event in recent:
+                    progress_content.extend([
+                        f"  • {event.get('doi')}: {event.get('outcome', '').replace('_', ' ')}",
+                        html.Br(),
+                    ])
+            
+            # Download sources, sent once when the stream starts
+            enabled_sources = data.get("active_mechanisms") or []
+            if enabled_sources:
+                progress_content.extend([
+                    html.Br(),
+                    html.Br(),
+                    html.Strong("Active download mechanisms: "),
+                    html.Br(),
+                ])
+                for src in enabled_sources:
+                    progress_content.extend([
+                        f"  • {src['name']}: {src['description']}",
+                        html.Br(),
+                    ])
             
             # Build the alert components
             alert_children = [
@@ -3386,7 +3443,7 @@ def poll_pdf_download_progress(n_intervals, progress_div_ids, project_id, auth_d
             
             # Build outputs for ALL progress divs (only active project gets content)
             progress_outputs = _build_progress_outputs(progress_div_ids, project_id, progress_message)
-            return progress_outputs, False, project_id, new_download_state  # Keep polling
+            return progress_outputs, False, project_id, new_download_state  # Keep listening
         
         elif status == "completed":
             print(f"[Frontend] PDF Download: Completed!")
@@ -3444,28 +3501,28 @@ def poll_pdf_download_progress(n_intervals, progress_div_ids, project_id, auth_d
             
             completed_alert = dbc.Alert(report_items, color="success", dismissable=True)
             progress_outputs = _build_progress_outputs(progress_div_ids, project_id, completed_alert)
-            return progress_outputs, True, None, None  # Disable polling, clear state
+            return progress_outputs, True, None, None  # Close the stream, clear state
         
         elif status == "error":
             error_message = data.get("error_message", "Unknown error")
             print(f"[Frontend] PDF Download: Error - {error_message}")
             error_alert = dbc.Alert(f"Download error: {error_message}", color="danger", dismissable=True)
             progress_outputs = _build_progress_outputs(progress_div_ids, project_id, error_alert)
-            return progress_outputs, True, None, None  # Disable polling, clear state
+            return progress_outputs, True, None, None  # Close the stream, clear state
         
         else:
             # Unknown status
             return [no_update] * len(progress_div_ids), no_update, no_update, no_update
             
     except Exception as e:
-        print(f"[Frontend] PDF Download: Error polling - {str(e)}")
-        # Don't disable polling on error, might be temporary
+        print(f"[Frontend] PDF Download: Error rendering progress - {str(e)}")
+        # Keep the stream open, the next update may render
         return [no_update] * len(progress_div_ids), no_update, no_update, no_update
 
 
 # Handle Force Restart Download button click
 @app.callback(
-    Output("pdf-download-progress-interval", "disabled", allow_duplicate=True),
+    Output("pdf-download-stream-disabled", "data", allow_duplicate=True),
     Output("pdf-download-project-id", "data", allow_duplicate=True),
     Output("pdf-download-state-store", "data", allow_duplicate=True),
     Input({"type": "force-restart-download", "index": ALL}, "n_clicks"),
@@ -3515,7 +3572,7 @@ def force_restart_download(n_clicks_list, auth_data):
                 "total": data.get('total_dois', 0)
             }
             
-            # Enable polling and return state - the polling callback will update the progress div
+            # Enable the stream and return state - the progress stream will update the progress div
             return False, project_id, initial_download_state
         else:
             error_msg = r.json().get("error", "Unknown error") if r.headers.get("content-type") == "application/json" else f"HTTP {r.status_code}"
@@ -3627,7 +3684,7 @@ def confirm_delete_project(n_clicks, project_id, option, target_project_id, auth
             if result.get("ok"):
                 # Refresh the projects list
                 try:
-                    projects_r = requests.get(API_PROJECTS, timeout=5)
+                    projects_r = requests.get(API_PROJECTS, params={"fields": "id,name,description,created_by,doi_count"}, timeout=5)
                     if projects_r.ok:
                         projects = projects_r.json()
                         if not projects:
@@ -3635,7 +3692,7 @@ def confirm_delete_project(n_clicks, project_id, option, target_project_id, auth
                         
                         project_items = []
                         for p in projects:
-                            doi_count = len(p.get("doi_list", []))
+                            doi_count = p.get("doi_count", 0)
                             card = dbc.Card(
                                 [
                                     dbc.CardBody(
@@ -3680,6 +3737,117 @@ def confirm_delete_project(n_clicks, project_id, option, target_project_id, auth
     except Exception as e:
         return dbc.Alert(f"Error: {str(e)}", color="danger"), no_update, False
 
+_BULK_UPLOAD_STATUS_LABELS = {
+    "attached": "✓ Attached",
+    "duplicate": "• Already attached",
+    "unmatched": "❌ No matching DOI",
+    "unknown_doi": "❌ DOI not in project",
+    "invalid": "❌ Not a valid PDF",
+    "not_pdf": "❌ Not a PDF",
+    "too_large": "❌ Too large",
+    "skipped": "❌ Skipped",
+}
+
+_BULK_UPLOAD_DETECTED_LABELS = {
+    "pdf_doi": "DOI found in PDF",
+    "pdf_title": "matched by title",
+}
+
+def _render_bulk_upload_report(result):
+    """Render the per-file report returned by the bulk upload endpoint."""
+    summary = result.get("summary", {})
+    lines = []
+    for entry in result.get("files", []):
+        label = _BULK_UPLOAD_STATUS_LABELS.get(entry["status"], entry["status"])
+        detail = entry.get("doi") or ""
+        if entry.get("matched_by") in _BULK_UPLOAD_DETECTED_LABELS:
+            detail = f"{detail} [{_BULK_UPLOAD_DETECTED_LABELS[entry['matched_by']]}]"
+        if entry.get("message"):
+            detail = f"{detail} ({entry['message']})" if detail else entry["message"]
+        lines.append(html.Li(f"{label}: {entry['filename']}" + (f" → {detail}" if detail else "")))
+
+    return dbc.Alert([
+        html.P(html.Strong(f"{summary.get('attached', 0)} of {len(result.get('files', []))} files attached")),
+        html.Ul(lines, style={"maxHeight": "300px", "overflowY": "auto"}),
+    ], color="success" if summary.get("attached") else "warning")
+
+# Bulk upload: the browser posts the selected files straight to the
+# /proxy/upload-pdfs route, which streams them to the backend, so the files
+# never pass through a Dash callback. The backend's report (or an error) is
+# written to bulk-upload-result-store.
+app.clientside_callback(
+    """
+    function(n_clicks, projectId, auth) {
+        var noUpdate = window.dash_clientside.no_update;
+        var publish = function(result) {
+            result.received_at = Date.now();
+            window.dash_clientside.set_props("bulk-upload-result-store", {data: result});
+        };
+        if (!n_clicks || !projectId) {
+            return noUpdate;
+        }
+        if (!auth || !auth.email) {
+            publish({error: "Please login first"});
+            return noUpdate;
+        }
+        var input = document.createElement("input");
+        input.type = "file";
+        input.multiple = true;
+        input.accept = ".pdf,.zip,.csv";
+        input.addEventListener("change", function() {
+            var files = Array.prototype.slice.call(input.files);
+            if (!files.length) {
+                return;
+            }
+            var form = new FormData();
+            form.append("email", auth.email);
+            form.append("password", auth.password || "");
+            files.forEach(function(file) {
+                form.append(/\.csv$/i.test(file.name) ? "manifest" : "files", file, file.name);
+            });
+            window.dash_clientside.set_props("bulk-upload-pdf-status", {
+                children: "Uploading " + files.length + " file(s)..."
+            });
+            fetch(UPLOAD_URL + projectId, {method: "POST", body: form})
+                .then(function(r) {
+                    return r.json().catch(function() { return {error: "Failed: " + r.status}; });
+                })
+                .then(publish)
+                .catch(function(e) { publish({error: "Error: " + e}); });
+        });
+        input.click();
+        return noUpdate;
+    }
+    """.replace("UPLOAD_URL", json.dumps(f"{DASH_REQUESTS_PATHNAME_PREFIX.rstrip('/')}/proxy/upload-pdfs/")),
+    Output("bulk-upload-result-store", "data"),
+    Input("bulk-upload-pdf-button", "n_clicks"),
+    State("upload-project-id-store", "data"),
+    State("admin-auth-store", "data"),
+    prevent_initial_call=True,
+)
+
+# Show the report of a bulk upload
+@app.callback(
+    Output("bulk-upload-pdf-status", "children"),
+    Input("bulk-upload-result-store", "data"),
+    prevent_initial_call=True,
+)
+def render_bulk_upload_result(result):
+    if not result:
+        return no_update
+    if result.get("error") or "files" not in result:
+        return dbc.Alert(result.get("error") or "Bulk upload failed", color="danger")
+    return _render_bulk_upload_report(result)
+
+# Clear the last bulk upload report when the upload modal is opened or closed
+@app.callback(
+    Output("bulk-upload-pdf-status", "children", allow_duplicate=True),
+    Input("upload-pdf-modal", "is_open"),
+    prevent_initial_call=True,
+)
+def clear_bulk_upload_result(is_open):
+    return None
+
 # Handle Upload PDFs button click - Open modal
 @app.callback(
     Output("upload-pdf-modal", "is_open"),
@@ -3747,11 +3915,13 @@ def handle_upload_pdf_modal(upload_clicks_list, cancel_click, confirm_click,
         if single_doi and single_doi.strip():
             # Use single DOI for all files
             dois_to_use = [single_doi.strip()] * len(filenames)
-        elif file_dois:
+        elif any((doi or "").strip() for doi in file_dois or []):
             # Use individual DOIs from file inputs
             dois_to_use = file_dois
         else:
-            return True, stored_project_id, single_doi, None, dbc.Alert("Please provide either a single DOI or DOI for each file", color="warning")
+            return True, stored_project_id, single_doi, no_update, dbc.Alert(
+                "Enter a DOI for each file, or use the bulk upload (option 3) to match files to DOIs automatically",
+                color="warning")
         
         # Validate we have DOI for each file
         if len(dois_to_use) != len(filenames):
@@ -3846,7 +4016,10 @@ def display_upload_file_doi_inputs(filenames):
         )
     
     return html.Div([
-        html.P(html.Strong("Enter DOI for each file:"), className="mb-2"),
+        html.P([
+            html.Strong("Enter DOI for each file:"),
+            " (to match files to DOIs by manifest CSV, file name or content, use the bulk upload below)",
+        ], className="mb-2"),
         html.Div(inputs)
     ])
 
@@ -3860,7 +4033,7 @@ def display_upload_file_doi_inputs(filenames):
 )
 def populate_triple_editor_project_filter(load_trigger, refresh_click, tab_value):
     try:
-        r = requests.get(API_PROJECTS, timeout=5)
+        r = requests.get(API_PROJECTS, params={"fields": "id,name"}, timeout=5)
         if r.ok:
             projects = r.json()
             options = [{"label": "All triples (no filter)", "value": "all"}] + \
@@ -4021,10 +4194,10 @@ def populate_batch_mgmt_projects(auth_data, _):
         return []
     
     try:
-        r = requests.get(API_PROJECTS, timeout=5)
+        r = requests.get(API_PROJECTS, params={"fields": "id,name,doi_count"}, timeout=5)
         if r.ok:
             projects = r.json()
-            return [{"label": f"{p['name']} ({len(p.get('doi_list', []))} DOIs)", "value": p["id"]} for p in projects]
+            return [{"label": f"{p['name']} ({p.get('doi_count', 0)} DOIs)", "value": p["id"]} for p in projects]
         else:
             return []
     except Exception as e:
@@ -4456,7 +4629,7 @@ def update_dashboard_stats(n):
             recent_count = 0
         
         # Get total projects count
-        r_projects = requests.get(f"{API_BASE}/api/projects", timeout=5)
+        r_projects = requests.get(f"{API_BASE}/api/projects", params={"fields": "id"}, timeout=5)
         if r_projects.ok:
             projects_data = r_projects.json()
             total_projects = len(projects_data)
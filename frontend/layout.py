@@ -434,13 +434,15 @@ def get_layout():
             dcc.Store(id="projects-store"),
             dcc.Store(id="delete-project-id-store"),  # Store project ID to delete
             dcc.Store(id="upload-project-id-store"),  # Store project ID for upload
+            dcc.Store(id="bulk-upload-result-store"),  # Report of the last bulk PDF upload
             dcc.Store(id="edit-dois-project-id-store"),  # Store project ID for editing DOIs
             dcc.Store(id="pdf-download-project-id", data=None),  # Store project ID for PDF download tracking
             dcc.Store(id="lit-search-selected-papers", data=[]),  # Store selected papers
             dcc.Store(id="lit-search-session-papers", data=[], storage_type="session"),  # Store all papers from session
             dcc.Store(id="browse-field-config", data=["project_id", "sentence_id", "sentence", "source_entity_name", "source_entity_attr", "relation_type", "sink_entity_name", "sink_entity_attr", "triple_id"], storage_type="local"),  # Store browse field configuration
             dcc.Interval(id="load-trigger", n_intervals=0, interval=200, max_intervals=1),
-            dcc.Interval(id="pdf-download-progress-interval", interval=2000, disabled=True),  # Poll every 2 seconds
+            dcc.Store(id="pdf-download-stream-disabled", data=True),  # False while the browser listens to the download progress stream
+            dcc.Store(id="pdf-download-stream-store", data=None),  # Latest progress pushed by the stream
         
             # Modal for Privacy Policy
             dbc.Modal(
@@ -631,9 +633,15 @@ def get_layout():
                         [
                             html.P([
                                 "Upload PDF files manually for this project. ",
-                                html.Strong("For each file selected, you must provide the corresponding DOI."),
+                                html.Strong("Provide the DOI for each file, or use the bulk upload to match files to DOIs automatically."),
                                 " Files will be named according to their DOI using the generate_doi_hash function."
-                            ], className="mb-3"),
+                            ], className="mb-2"),
+                            html.P([
+                                "Bulk upload (option 3): select PDFs and/or ZIP archives of PDFs. Each file is matched to a project DOI "
+                                "by a manifest CSV (columns filename,doi; select it with the files or put manifest.csv in the ZIP) "
+                                "or by its file name (the DOI with / written as _, e.g. 10.1234_abc.pdf). "
+                                "Other files are matched by the DOI or title found in the PDF.",
+                            ], className="text-muted small mb-3"),
                         
                             html.Div([
                                 dbc.Label("Option 1: Single DOI for all files (use when uploading multiple files for the same paper)"),
@@ -654,7 +662,7 @@ def get_layout():
                                     id="upload-pdf-files",
                                     children=html.Div([
                                         'Drag and Drop or ',
-                                        html.A('Select PDF Files')
+                                        html.A('Select PDF, ZIP or manifest CSV files')
                                     ]),
                                     style={
                                         'width': '100%',
@@ -671,6 +679,18 @@ def get_layout():
                             ], className="mb-3"),
                         
                             html.Div(id="upload-file-doi-inputs", className="mb-3"),
+
+                            html.Hr(),
+
+                            html.Div([
+                                dbc.Label("Option 3: Bulk upload without DOIs"),
+                                html.Div(dbc.Button("Select files and upload", id="bulk-upload-pdf-button",
+                                                    color="warning", outline=True, size="sm")),
+                                html.Small("Selected files are sent to the server straight away, in one streamed upload.",
+                                           className="text-muted"),
+                                html.Div(id="bulk-upload-pdf-status", className="mt-2"),
+                            ], className="mb-3"),
+
                             html.Div(id="upload-status-message"),
                         ]
                     ),
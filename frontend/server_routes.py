@@ -149,6 +149,86 @@ def proxy_pdf(project_id: int, filename: str):
             mimetype='application/json'
         )
 
+@server.route('/proxy/pdf-download-events/<int:project_id>')
+def proxy_pdf_download_events(project_id: int):
+    """
+    Proxy the backend's Server-Sent Events stream of a project's PDF download
+    progress to the browser (EventSource), so the admin page is pushed updates
+    instead of polling. Forwards Last-Event-ID so reconnects resume where they left off.
+    """
+    backend_url = f"{API_BASE}/api/admin/projects/{project_id}/download-pdfs/events"
+    headers = {}
+    if flask_request.headers.get("Last-Event-ID"):
+        headers["Last-Event-ID"] = flask_request.headers["Last-Event-ID"]
+
+    try:
+        # The backend sends a keep-alive at least every 15 seconds
+        response = requests.get(backend_url, headers=headers, stream=True, timeout=(5, 60))
+        if not response.ok:
+            return Response(
+                json.dumps({"error": f"Backend returned status {response.status_code}"}),
+                status=502,
+                mimetype='application/json'
+            )
+    except requests.exceptions.RequestException:
+        return Response(
+            json.dumps({"error": "Cannot connect to backend"}),
+            status=502,
+            mimetype='application/json'
+        )
+
+    def generate():
+        try:
+            for chunk in response.iter_content(chunk_size=None):
+                if chunk:
+                    yield chunk
+        except requests.exceptions.RequestException:
+            # Backend went away; the browser's EventSource reconnects
+            pass
+        finally:
+            response.close()
+
+    return Response(
+        generate(),
+        status=200,
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@server.route('/proxy/upload-pdfs/<int:project_id>', methods=['POST'])
+def proxy_bulk_upload_pdfs(project_id: int):
+    """
+    Stream a bulk PDF upload (multipart form from the browser) to the backend's
+    /api/admin/projects/<id>/upload-pdfs endpoint. The body is forwarded in
+    chunks as it arrives, so large uploads never sit in the frontend's memory.
+    """
+    content_type = flask_request.headers.get("Content-Type", "")
+    if not content_type.startswith("multipart/form-data"):
+        return Response(
+            json.dumps({"error": "Expected multipart/form-data"}),
+            status=400,
+            mimetype='application/json'
+        )
+
+    backend_url = f"{API_BASE}/api/admin/projects/{project_id}/upload-pdfs"
+    body = iter(lambda: flask_request.stream.read(1024 * 1024), b"")
+    try:
+        # Ingesting validates every PDF, which can take a while for large uploads
+        response = requests.post(backend_url, data=body, headers={"Content-Type": content_type},
+                                 timeout=(5, 1800))
+    except requests.exceptions.RequestException:
+        return Response(
+            json.dumps({"error": "Cannot connect to backend"}),
+            status=502,
+            mimetype='application/json'
+        )
+
+    return Response(
+        response.content,
+        status=response.status_code,
+        mimetype=response.headers.get("Content-Type", "application/json")
+    )
+
 @server.route('/pdf-viewer')
 def pdf_viewer():
     """
@@ -14,9 +14,11 @@ import secrets
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import lru_cache
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 
+from harvest_metrics import init_metrics
+from request_profiling import init_request_profiling
 from harvest_store import (
     init_db,
     fetch_entity_dropdown_options,
@@ -32,6 +34,8 @@ from harvest_store import (
     create_admin_user,
     create_project,
     get_all_projects,
+    get_project_summaries,
+    PROJECT_SUMMARY_FIELDS,
     get_project_by_id,
     update_project,
     delete_project,
@@ -43,6 +47,18 @@ from harvest_store import (
     cleanup_old_pdf_download_progress,
     is_download_stale,
     reset_stale_download,
+    enqueue_pdf_download_job,
+    get_active_pdf_download_job,
+    cancel_pdf_download_jobs,
+    get_pdf_download_queue,
+    set_pdf_download_priority,
+    PDF_JOB_MAX_PRIORITY,
+    get_pdf_download_events,
+    get_pdf_download_results,
+    get_projects_overview,
+    get_pdf_manifest,
+    get_project_pdf_dois,
+    delete_pdf_manifest_entries,
     create_batches,
     get_project_batches,
     get_batch_dois,
@@ -70,6 +86,11 @@ except ImportError:
     BACKEND_PUBLIC_URL = os.environ.get("HARVEST_BACKEND_PUBLIC_URL", "")
     NCBI_API_KEY = ""
 
+try:
+    from config import PDF_DOWNLOAD_EMBEDDED_WORKER
+except ImportError:
+    PDF_DOWNLOAD_EMBEDDED_WORKER = True
+
 # Setup logging first
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -137,6 +158,10 @@ else:
     CORS(app, origins=["http://localhost:*", "http://127.0.0.1:*", "http://0.0.0.0:*"])
     logger.info(f"CORS enabled for internal mode (localhost only)")
 
+# Prometheus instrumentation and /metrics endpoint (no-op without prometheus_client)
+if init_metrics(app):
+    logger.info("Metrics enabled at /metrics")
+
 # Token storage for admin sessions (in-memory)
 # Format: {token: {"email": email, "expires_at": timestamp}}
 _admin_tokens = {}
@@ -213,6 +238,10 @@ def verify_admin_auth(payload: dict) -> tuple[bool, str | None]:
     
     return False, None
 
+# Admin opt-in request profiling (X-Harvest-Profile header) and report endpoints
+if init_request_profiling(app, verify_admin_auth, verify_admin_token):
+    logger.info("Request profiling available (X-Harvest-Profile header)")
+
 # DOI Validation Cache - stores validation results to avoid redundant API calls
 # Format: {doi: {"valid": bool, "reason": str, "timestamp": float}}
 _doi_validation_cache = {}
@@ -809,13 +838,90 @@ def create_new_project():
     else:
         return jsonify({"error": "Failed to create project"}), 500
 
+# Projects whose pdf_manifest has been reconciled with the files on disk by this
+# process. Downloads, uploads and deletes keep the manifest current afterwards;
+# the first reconcile picks up changes made while the backend was not running.
+_manifest_reconciled = set()
+_manifest_reconcile_lock = threading.Lock()
+_all_manifests_thread = None
+_all_manifests_thread_lock = threading.Lock()
+
+def _ensure_pdf_manifest(project_id: int, doi_list: List[str] = None) -> None:
+    """Reconcile a project's pdf_manifest once per process before it is read."""
+    if project_id in _manifest_reconciled:
+        return
+    with _manifest_reconcile_lock:
+        if project_id in _manifest_reconciled:
+            return
+        if doi_list is None:
+            project = get_project_by_id(DB_PATH, project_id)
+            doi_list = project.get("doi_list", []) if project else []
+        from pdf_manager import reconcile_pdf_manifest
+        stats = reconcile_pdf_manifest(DB_PATH, project_id, doi_list)
+        if stats["added"] or stats["updated"] or stats["removed"]:
+            logger.info(f"[PDF Manifest] Reconciled project {project_id}: {stats}")
+        _manifest_reconciled.add(project_id)
+
+def _reconcile_all_pdf_manifests() -> None:
+    start = time.time()
+    for project in get_all_projects(DB_PATH):
+        try:
+            _ensure_pdf_manifest(project["id"], project.get("doi_list", []))
+        except Exception as e:
+            logger.error(f"[PDF Manifest] Failed to reconcile project {project['id']}: {e}", exc_info=True)
+    logger.info(f"[PDF Manifest] Reconciled all projects in {time.time() - start:.1f}s")
+
+def _ensure_all_pdf_manifests() -> None:
+    """
+    Start reconciling every project's pdf_manifest in a background thread, once
+    per process. Callers don't wait: until a project is reconciled its PDF count
+    is the one last recorded in the manifest.
+    """
+    global _all_manifests_thread
+    if _all_manifests_thread is not None:
+        return
+    with _all_manifests_thread_lock:
+        if _all_manifests_thread is not None:
+            return
+        _all_manifests_thread = threading.Thread(
+            target=_reconcile_all_pdf_manifests,
+            daemon=True,
+            name="PdfManifestReconcile"
+        )
+        _all_manifests_thread.start()
+
 @app.get("/api/projects")
 def list_projects():
     """
     List all projects (public endpoint).
     Returns: [{ "id": 1, "name": "...", "description": "...", "doi_list": [...] }]
+
+    Summary mode: /api/projects?view=summary
+    Returns: [{ "id": 1, "name": "...", "doi_count": 120, "pdf_count": 87,
+                "status_counts": {"unstarted": .., "in_progress": .., "completed": ..}, ... }]
+    Field selection: /api/projects?fields=id,name (implies summary mode)
+    Full DOI lists are only available from /api/projects/<id>.
     """
+    view = request.args.get("view", "full")
+    fields_param = request.args.get("fields", "")
+    fields = [f.strip() for f in fields_param.split(",") if f.strip()]
+
+    if view not in ("full", "summary"):
+        return jsonify({"error": "view must be 'full' or 'summary'"}), 400
+
+    unknown_fields = [f for f in fields if f not in PROJECT_SUMMARY_FIELDS]
+    if unknown_fields:
+        return jsonify({
+            "error": f"Unknown field(s): {', '.join(unknown_fields)}",
+            "allowed_fields": list(PROJECT_SUMMARY_FIELDS)
+        }), 400
+
     try:
+        if view == "summary" or fields:
+            if not fields or "pdf_count" in fields:
+                _ensure_all_pdf_manifests()
+            return jsonify(get_project_summaries(DB_PATH, fields or None))
+
         projects = get_all_projects(DB_PATH)
         return jsonify(projects)
     except Exception as e:
@@ -823,6 +929,31 @@ def list_projects():
         print(f"Error fetching projects: {e}")
         return jsonify({"error": "Failed to fetch projects"}), 500
 
+@app.post("/api/admin/projects/overview")
+def admin_projects_overview():
+    """
+    Overview of all projects for the admin panel (admin only).
+    Returns each project's summary, PDF count, download status (including
+    staleness) and batch/annotation status counts in a single response.
+    Expected JSON: { "token": "...", OR "email": "admin@example.com", "password": "secret" }
+    """
+    try:
+        payload = request.get_json(force=True, silent=False)
+    except Exception:
+        return jsonify({"error": "Invalid JSON"}), 400
+
+    is_authenticated, email = verify_admin_auth(payload)
+    if not is_authenticated:
+        return jsonify({"error": "Invalid admin credentials"}), 403
+
+    try:
+        _ensure_all_pdf_manifests()
+        projects = get_projects_overview(DB_PATH, stale_threshold_seconds=300)
+        return jsonify({"ok": True, "projects": projects})
+    except Exception as e:
+        print(f"Error fetching projects overview: {e}")
+        return jsonify({"error": "Failed to fetch projects overview"}), 500
+
 @app.get("/api/projects/<int:project_id>")
 def get_project(project_id: int):
     """
@@ -1112,12 +1243,16 @@ def remove_dois_from_project(project_id: int):
                     failed_deletions.append(f"{doi}: invalid path")
                     continue
                 
+                # Only the project's link and manifest reference are removed; the
+                # file stays in the shared PDF store for other projects
                 if os.path.exists(pdf_path):
                     try:
                         os.remove(pdf_path)
                         deleted_pdfs.append(doi)
                     except OSError as e:
                         failed_deletions.append(f"{doi}: {str(e)}")
+            
+            delete_pdf_manifest_entries(DB_PATH, project_id, [generate_doi_hash(doi) for doi in deleted_pdfs])
         except Exception as e:
             logger.error(f"Error during PDF deletion for project {project_id}: {e}")
             failed_deletions.append(f"General error: {str(e)}")
@@ -1243,112 +1378,18 @@ def delete_existing_project(project_id: int):
         return jsonify({"error": "Failed to delete project"}), 500
 
 # PDF Management Endpoints
-def _run_pdf_download_task(project_id: int, doi_list: List[str], project_dir: str):
-    """Background task to download PDFs and update progress in database"""
-    import json
-    
-    # Use the unified smart PDF manager
-    try:
-        from pdf_manager import process_dois_smart as process_function
-        from pdf_manager import get_project_pdf_dir, generate_doi_hash
-        print(f"[PDF Download Task] Using smart PDF download system")
-    except ImportError as e:
-        # Fallback to standard if smart version not available
-        print(f"[PDF Download Task] Warning: Smart PDF manager not available, falling back to standard: {e}")
-        from pdf_manager import process_project_dois_with_progress as process_function
-        from pdf_manager import get_project_pdf_dir, generate_doi_hash
-    
-    print(f"[PDF Download Task] Starting background download for project {project_id}")
-    
-    # Note: Progress is already initialized in the main thread before this task starts
-    # This avoids race condition where frontend polls before initialization
-    
-    # Track progress locally during processing
-    downloaded = []
-    needs_upload = []
-    errors = []
-    
-    try:
-        # Process DOIs with progress callback
-        def progress_callback(current_idx: int, doi: str, success: bool, message: str, source: str = ""):
-            print(f"[PDF Download Task] Progress: {current_idx + 1}/{len(doi_list)} - {doi}: {message}")
-            
-            doi_hash = ""
-            try:
-                from pdf_manager import generate_doi_hash
-                doi_hash = generate_doi_hash(doi)
-                filename = f"{doi_hash}.pdf"
-            except (ImportError, ValueError, Exception) as e:
-                print(f"[PDF Download Task] Warning: Could not generate doi_hash for {doi}: {e}")
-                filename = "unknown.pdf"
-            
-            if success:
-                downloaded.append((doi, filename, message, source))
-            else:
-                # Categorize failures: needs_upload (not available) vs errors (technical issues)
-                # Patterns indicating the resource simply isn't available vs actual errors
-                needs_upload_patterns = ["failed", "not found", "not open access", "not available", 
-                                        "no accessible", "not a pdf", "too small"]
-                is_needs_upload = any(pattern in message.lower() for pattern in needs_upload_patterns)
-                
-                if is_needs_upload:
-                    needs_upload.append((doi, filename, message))
-                else:
-                    errors.append((doi, message))
-            
-            # Update database with current progress, including the last source used
-            update_pdf_download_progress(DB_PATH, project_id, {
-                "current": current_idx + 1,
-                "current_doi": doi,
-                "current_source": source if source else "none",
-                "downloaded": downloaded,
-                "needs_upload": needs_upload,
-                "errors": errors
-            })
-        
-        # Initialize the PDF download database (always use smart mode now)
-        try:
-            from pdf_download_db import init_pdf_download_db
-            init_pdf_download_db()
-            # Smart version needs project_id parameter
-            results = process_function(doi_list, project_id, project_dir, progress_callback)
-        except Exception as e:
-            print(f"[PDF Download Task] Error: {e}")
-            # Try fallback without project_id if using old function
-            try:
-                results = process_function(doi_list, project_dir, progress_callback)
-            except TypeError:
-                # Must be the smart function, re-raise original error
-                raise e
-        
-        # Update final status in database
-        update_pdf_download_progress(DB_PATH, project_id, {
-            "status": "completed",
-            "downloaded": results["downloaded"],
-            "needs_upload": results["needs_upload"],
-            "errors": results["errors"],
-            "end_time": time.time()
-        })
-        
-        print(f"[PDF Download Task] Completed - Downloaded: {len(results['downloaded'])}, "
-              f"Needs upload: {len(results['needs_upload'])}, Errors: {len(results['errors'])}")
-        
-    except Exception as e:
-        import traceback
-        print(f"[PDF Download Task] Error: {e}")
-        print(traceback.format_exc())
-        update_pdf_download_progress(DB_PATH, project_id, {
-            "status": "error",
-            "end_time": time.time()
-        })
-
 @app.post("/api/admin/projects/<int:project_id>/download-pdfs")
 def download_project_pdfs(project_id: int):
     """
     Start PDF download for all DOIs in a project (admin only).
-    Expected JSON: { "email": "admin@example.com", "password": "secret", "force_restart": false }
+    Expected JSON: { "email": "admin@example.com", "password": "secret", "force_restart": false,
+                     "priority": 1 }
     
-    If force_restart is true, will reset any stale downloads and start fresh.
+    The download is queued as a job and run by a PDF download worker. If a job is
+    already running and has stalled, it is resumed from the first unfinished DOI;
+    if force_restart is true, the running job is cancelled and a new one started.
+    Jobs of different projects share the workers in proportion to their priority
+    (1-10, default 1).
     
     Returns: Immediate response, use /download-pdfs/status to check progress
     """
@@ -1361,33 +1402,45 @@ def download_project_pdfs(project_id: int):
     email = (payload.get("email") or "").strip()
     password = payload.get("password") or ""
     force_restart = payload.get("force_restart", False)
+    priority = payload.get("priority", 1)
 
     if not email or not password:
         print(f"[PDF Download] Missing authentication for project {project_id}")
         return jsonify({"error": "Admin authentication required"}), 401
 
+    if not isinstance(priority, int) or isinstance(priority, bool) or not 1 <= priority <= PDF_JOB_MAX_PRIORITY:
+        return jsonify({"error": f"priority must be an integer between 1 and {PDF_JOB_MAX_PRIORITY}"}), 400
+
     # Verify admin credentials
     if not (verify_admin_password(DB_PATH, email, password) or is_admin_user(email)):
         print(f"[PDF Download] Invalid credentials for {email}")
         return jsonify({"error": "Invalid admin credentials"}), 403
     
-    # Check if download is already running for this project (check database)
-    progress = get_pdf_download_progress(DB_PATH, project_id)
-    if progress and progress.get("status") == "running":
-        # Check if the download is stale (not updated recently)
-        if is_download_stale(DB_PATH, project_id, stale_threshold_seconds=300):
-            print(f"[PDF Download] Detected stale download for project {project_id}, resetting...")
-            reset_stale_download(DB_PATH, project_id)
-            # Re-fetch progress after reset
-            progress = get_pdf_download_progress(DB_PATH, project_id)
-        elif force_restart:
+    # Check if a download job is already queued or running for this project
+    active_job = get_active_pdf_download_job(DB_PATH, project_id)
+    if active_job:
+        if force_restart:
             print(f"[PDF Download] Force restart requested for project {project_id}")
+            cancel_pdf_download_jobs(DB_PATH, project_id)
             reset_stale_download(DB_PATH, project_id)
-            progress = get_pdf_download_progress(DB_PATH, project_id)
+        elif is_download_stale(DB_PATH, project_id, stale_threshold_seconds=300):
+            # Jobs are checkpointed per DOI: once the stalled worker's lease expires,
+            # the next worker picks the job up from the first unfinished DOI
+            print(f"[PDF Download] Stale download for project {project_id}, job {active_job['id']} will be resumed")
+            return jsonify({
+                "ok": True,
+                "message": "PDF download will resume from the first unfinished DOI",
+                "project_id": project_id,
+                "job_id": active_job["id"],
+                "resumed": True,
+                "total_dois": active_job["total"],
+                "status_url": f"/api/admin/projects/{project_id}/download-pdfs/status"
+            })
         else:
             print(f"[PDF Download] Download already in progress for project {project_id}")
             return jsonify({
                 "error": "Download already in progress for this project",
+                "job_id": active_job["id"],
                 "hint": "If the download appears stuck, you can force restart it by setting 'force_restart': true"
             }), 409
     
@@ -1402,6 +1455,7 @@ def download_project_pdfs(project_id: int):
         from pdf_manager import get_project_pdf_dir
         
         doi_list = json.loads(project["doi_list"]) if isinstance(project["doi_list"], str) else project["doi_list"]
+        doi_list = [doi for doi in doi_list if doi and doi.strip()]
         project_dir = get_project_pdf_dir(project_id)
         
         print(f"[PDF Download] Starting download for project {project_id} ({project.get('name', 'Unknown')}) "
@@ -1409,24 +1463,25 @@ def download_project_pdfs(project_id: int):
         print(f"[PDF Download] Target directory: {project_dir}")
         print(f"[PDF Download] Requested by: {email}")
         
-        # Initialize progress in database before starting thread to avoid race condition
+        # Initialize progress in database before queueing so status polls never see a gap
         if not init_pdf_download_progress(DB_PATH, project_id, len(doi_list), project_dir):
             print(f"[PDF Download] Failed to initialize download progress for project {project_id}")
             return jsonify({"error": "Failed to initialize download progress. See server logs."}), 500
         
-        # Start background thread
-        thread = threading.Thread(
-            target=_run_pdf_download_task,
-            args=(project_id, doi_list, project_dir),
-            daemon=True
-        )
-        thread.start()
+        # Queue the job; a PDF download worker (pdf_download_worker.py) runs it
+        job_id = enqueue_pdf_download_job(DB_PATH, project_id, doi_list, project_dir, email, priority)
+        if job_id is None:
+            update_pdf_download_progress(DB_PATH, project_id, {"status": "error", "end_time": time.time()})
+            return jsonify({"error": "Failed to queue download. See server logs."}), 500
+        update_pdf_download_progress(DB_PATH, project_id, {"job_id": job_id})
         
         return jsonify({
             "ok": True,
             "message": "PDF download started",
             "project_id": project_id,
+            "job_id": job_id,
             "total_dois": len(doi_list),
+            "priority": priority,
             "status_url": f"/api/admin/projects/{project_id}/download-pdfs/status"
         })
         
@@ -1441,8 +1496,13 @@ def download_project_pdfs(project_id: int):
 def get_pdf_download_status(project_id: int):
     """
     Get the current status of PDF download for a project from database.
-    Returns progress information if download is in progress or completed.
+    Returns progress counts if download is in progress or completed.
     Also includes information about whether the download is stale.
+    
+    Query params:
+        - cursor: Event id from a previous response's "cursor". When given, "events"
+          lists the DOIs finished since then (at most 500 per poll; poll again while
+          "has_more" is true). Full results are only included once completed.
     """
     print(f"[PDF Download Status] Checking status for project {project_id}")
     
@@ -1475,6 +1535,8 @@ def get_pdf_download_status(project_id: int):
         print(f"[PDF Download Status] Could not get active mechanisms: {e}")
         mechanisms_info = []
     
+    job_id = progress.get("job_id")
+    
     # Return current progress
     response = {
         "ok": True,
@@ -1483,22 +1545,36 @@ def get_pdf_download_status(project_id: int):
         "current": progress.get("current", 0),
         "current_doi": progress.get("current_doi", ""),
         "current_source": progress.get("current_source", ""),
-        "downloaded_count": len(progress.get("downloaded", [])),
-        "needs_upload_count": len(progress.get("needs_upload", [])),
-        "errors_count": len(progress.get("errors", [])),
-        "downloaded": progress.get("downloaded", [])[:10],  # Return first 10 for preview
-        "needs_upload": progress.get("needs_upload", [])[:10],
-        "errors": progress.get("errors", [])[:5],
+        "downloaded_count": progress.get("downloaded_count", 0),
+        "needs_upload_count": progress.get("needs_upload_count", 0),
+        "errors_count": progress.get("errors_count", 0),
         "project_dir": progress.get("project_dir", ""),
         "active_mechanisms": mechanisms_info,  # List of active download sources
+        "job_id": job_id,
         # Include full results when completed
-        "full_results": {
-            "downloaded": progress.get("downloaded", []),
-            "needs_upload": progress.get("needs_upload", []),
-            "errors": progress.get("errors", [])
-        } if progress.get("status") == "completed" else None
+        "full_results": get_pdf_download_results(DB_PATH, job_id)
+        if progress.get("status") == "completed" and job_id else None
     }
     
+    # Events since the client's cursor
+    cursor = request.args.get("cursor", type=int)
+    if cursor is not None and job_id:
+        limit = 500
+        events = get_pdf_download_events(DB_PATH, job_id, after_id=cursor, limit=limit)
+        response["events"] = events
+        response["cursor"] = events[-1]["id"] if events else cursor
+        response["has_more"] = len(events) == limit
+    
+    # Queue state of the project's active job: "queued" while it waits for a worker
+    # or for its fair share turn, with its place in line and estimated time left
+    for queued_job in get_pdf_download_queue(DB_PATH):
+        if queued_job["project_id"] == project_id:
+            response["job_status"] = queued_job["status"]
+            response["queue_position"] = queued_job["queue_position"]
+            response["priority"] = queued_job["priority"]
+            response["eta_seconds"] = queued_job["eta_seconds"]
+            break
+    
     # Add stale detection info for running downloads
     if progress.get("status") == "running":
         response["is_stale"] = is_stale
@@ -1508,6 +1584,58 @@ def get_pdf_download_status(project_id: int):
     
     return jsonify(response)
 
+@app.get("/api/admin/projects/<int:project_id>/download-pdfs/events")
+def stream_pdf_download_events(project_id: int):
+    """
+    Server-Sent Events stream of a project's PDF download progress.
+    Pushes "progress" (counters, stale warning, queue position), "doi" (one per
+    finished DOI) and a final "done" event, instead of clients polling /status.
+    Watchers of the same project share one database poller (see pdf_progress_stream.py).
+    
+    Query params:
+        - cursor: Event id to resume after (the Last-Event-ID header works too)
+    """
+    from pdf_progress_stream import stream_pdf_download_progress
+
+    cursor = request.args.get("cursor", type=int)
+    last_event_id = request.headers.get("Last-Event-ID", "")
+    if cursor is None and last_event_id.isdigit():
+        cursor = int(last_event_id)
+
+    return Response(
+        stream_pdf_download_progress(DB_PATH, project_id, cursor),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/admin/projects/<int:project_id>/download-pdfs/priority")
+def set_pdf_download_priority_endpoint(project_id: int):
+    """
+    Change the priority of a project's queued or running PDF download (admin only).
+    Expected JSON: { "email": "admin@example.com", "password": "secret", "priority": 5 }
+    """
+    try:
+        payload = request.get_json(force=True, silent=False)
+    except Exception:
+        return jsonify({"error": "Invalid JSON"}), 400
+
+    email = (payload.get("email") or "").strip()
+    password = payload.get("password") or ""
+    if not email or not password:
+        return jsonify({"error": "Admin authentication required"}), 401
+    if not (verify_admin_password(DB_PATH, email, password) or is_admin_user(email)):
+        return jsonify({"error": "Invalid admin credentials"}), 403
+
+    priority = payload.get("priority")
+    if not isinstance(priority, int) or isinstance(priority, bool) or not 1 <= priority <= PDF_JOB_MAX_PRIORITY:
+        return jsonify({"error": f"priority must be an integer between 1 and {PDF_JOB_MAX_PRIORITY}"}), 400
+
+    if not set_pdf_download_priority(DB_PATH, project_id, priority):
+        return jsonify({"error": "No PDF download queued or running for this project"}), 404
+
+    print(f"[PDF Download] {email} set priority of project {project_id} download to {priority}")
+    return jsonify({"ok": True, "project_id": project_id, "priority": priority})
+
 @app.get("/api/pdf-download-config")
 def get_pdf_download_config():
     """Get PDF download configuration and available sources (public endpoint)"""
@@ -1688,12 +1816,24 @@ def get_doi_status_summary_endpoint(project_id: int):
 
 @app.get("/api/projects/<int:project_id>/pdfs")
 def list_project_pdfs_endpoint(project_id: int):
-    """List all PDFs available for a project (public)"""
+    """List all PDFs available for a project (public), read from the pdf_manifest"""
     try:
-        from pdf_manager import get_project_pdf_dir, list_project_pdfs
+        from pdf_manager import get_project_pdf_dir
         
-        project_dir = get_project_pdf_dir(project_id)
-        pdfs = list_project_pdfs(project_dir)
+        _ensure_pdf_manifest(project_id)
+        project_dir = os.path.abspath(get_project_pdf_dir(project_id))
+        pdfs = [
+            {
+                "filename": entry["filename"],
+                "size": entry["size"],
+                "path": os.path.join(project_dir, entry["filename"]),
+                "doi": entry["doi"],
+                "pages": entry["pages"],
+                "title": entry["title"],
+                "source": entry["source"]
+            }
+            for entry in get_pdf_manifest(DB_PATH, project_id)
+        ]
         
         return jsonify({
             "ok": True,
@@ -1705,6 +1845,27 @@ def list_project_pdfs_endpoint(project_id: int):
         logger.error(f"Failed to list PDFs: {e}", exc_info=True)
         return jsonify({"error": "Failed to list PDFs"}), 500
 
+@app.get("/api/projects/<int:project_id>/pdf-manifest")
+def get_project_pdf_manifest(project_id: int):
+    """
+    Get pdf_manifest entries for a project (public).
+    Optional query param: ?doi=10.1234/example to look up a single DOI.
+    Returns: {"ok": True, "entries": [{"doi": ..., "filename": ..., "size": ..., "sha256": ...,
+              "pages": ..., "title": ..., "has_text": ..., "source": ..., "mtime": ...}, ...]}
+    """
+    try:
+        doi = request.args.get("doi", "").strip() or None
+        _ensure_pdf_manifest(project_id)
+        entries = get_pdf_manifest(DB_PATH, project_id, doi=doi)
+        return jsonify({
+            "ok": True,
+            "project_id": project_id,
+            "entries": entries
+        })
+    except Exception as e:
+        logger.error(f"Failed to get PDF manifest: {e}", exc_info=True)
+        return jsonify({"error": "Failed to get PDF manifest"}), 500
+
 @app.get("/api/projects/<int:project_id>/dois-with-pdfs")
 def get_dois_with_pdf_indicators(project_id: int):
     """
@@ -1719,20 +1880,13 @@ def get_dois_with_pdf_indicators(project_id: int):
         
         doi_list = project.get("doi_list", [])
         
-        # Get list of available PDFs
-        from pdf_manager import get_project_pdf_dir
-        project_dir = get_project_pdf_dir(project_id)
-        
-        # Check which DOIs have PDFs
-        dois_with_indicators = []
-        for doi in doi_list:
-            doi_hash = generate_doi_hash(doi)
-            pdf_path = os.path.join(project_dir, f"{doi_hash}.pdf")
-            has_pdf = os.path.exists(pdf_path)
-            dois_with_indicators.append({
-                "doi": doi,
-                "has_pdf": has_pdf
-            })
+        # Check which DOIs have PDFs with a single manifest query
+        _ensure_pdf_manifest(project_id, doi_list)
+        pdf_dois = get_project_pdf_dois(DB_PATH, project_id)
+        dois_with_indicators = [
+            {"doi": doi, "has_pdf": doi in pdf_dois}
+            for doi in doi_list
+        ]
         
         return jsonify({
             "ok": True,
@@ -1790,9 +1944,16 @@ def upload_project_pdf(project_id: int):
         filename = f"{doi_hash}.pdf"
         filepath = os.path.join(project_dir, filename)
         
+        # The existing file may be a hardlink into the shared PDF store;
+        # unlink it so the upload doesn't overwrite the stored blob in place
+        if os.path.exists(filepath):
+            os.remove(filepath)
         file.save(filepath)
         file_size = os.path.getsize(filepath)
         
+        from pdf_manager import record_project_pdf
+        record_project_pdf(DB_PATH, project_id, doi, filepath, source="manual_upload")
+        
         return jsonify({
             "ok": True,
             "message": "PDF uploaded successfully",
@@ -1804,6 +1965,49 @@ def upload_project_pdf(project_id: int):
         logger.error(f"PDF upload failed: {e}", exc_info=True)
         return jsonify({"error": "PDF upload failed"}), 500
 
+@app.post("/api/admin/projects/<int:project_id>/upload-pdfs")
+def bulk_upload_project_pdfs(project_id: int):
+    """
+    Upload many PDFs for a project at once (admin only).
+    Expects multipart/form-data with:
+    - email: admin email
+    - password: admin password
+    - files: PDF files and/or ZIP archives of PDFs (repeatable)
+    - manifest: optional CSV with filename,doi columns
+    Files without a manifest row are matched to DOIs by file name.
+    Returns a per-file report (see pdf_bulk_ingest).
+    """
+    email = request.form.get("email", "").strip()
+    password = request.form.get("password", "")
+
+    if not email or not password:
+        return jsonify({"error": "Admin authentication required"}), 401
+
+    if not (verify_admin_password(DB_PATH, email, password) or is_admin_user(email)):
+        return jsonify({"error": "Invalid admin credentials"}), 403
+
+    files = [f for f in request.files.getlist('files') if f.filename]
+    if not files:
+        return jsonify({"error": "No files provided"}), 400
+
+    manifest = request.files.get('manifest')
+
+    try:
+        from pdf_bulk_ingest import ingest_pdf_uploads
+
+        result = ingest_pdf_uploads(
+            DB_PATH, project_id,
+            [(f.filename, f.stream) for f in files],
+            manifest=manifest.read() if manifest and manifest.filename else None
+        )
+        if result is None:
+            return jsonify({"error": "Project not found"}), 404
+
+        return jsonify({"ok": True, "project_id": project_id, **result})
+    except Exception as e:
+        logger.error(f"Bulk PDF upload failed: {e}", exc_info=True)
+        return jsonify({"error": "Bulk PDF upload failed"}), 500
+
 @app.get("/api/projects/<int:project_id>/pdf/<filename>")
 def serve_project_pdf(project_id: int, filename: str):
     """Serve a PDF file from a project directory"""
@@ -1875,8 +2079,10 @@ def add_pdf_highlights(project_id: int, filename: str):
         if not os.path.exists(filepath):
             return jsonify({"error": "PDF not found"}), 404
         
-        # Add highlights
-        success, message = add_highlights_to_pdf(filepath, highlights)
+        # Add highlights (to this project's own copy if the file is shared)
+        from pdf_manager import modify_project_pdf
+        success, message = modify_project_pdf(
+            DB_PATH, project_id, filepath, lambda path: add_highlights_to_pdf(path, highlights))
         
         if success:
             # Count highlights for response (message is safe but use sanitized version)
@@ -1953,8 +2159,9 @@ def delete_pdf_highlights(project_id: int, filename: str):
         if not os.path.exists(filepath):
             return jsonify({"error": "PDF not found"}), 404
         
-        # Clear highlights
-        success, message = clear_all_highlights(filepath)
+        # Clear highlights (in this project's own copy if the file is shared)
+        from pdf_manager import modify_project_pdf
+        success, message = modify_project_pdf(DB_PATH, project_id, filepath, clear_all_highlights)
         
         if success:
             # Use generic success message (actual count is logged but not exposed)
@@ -2871,6 +3078,15 @@ if __name__ == "__main__":
     if deleted > 0:
         print(f"[PDF Download] Cleaned up {deleted} old progress entries")
     
+    # Pick up PDFs added or removed while the backend was not running
+    _ensure_all_pdf_manifests()
+
+    # Run queued PDF downloads in this process (production runs pdf_download_worker.py instead)
+    if PDF_DOWNLOAD_EMBEDDED_WORKER:
+        from pdf_download_worker import start_embedded_worker
+        start_embedded_worker(DB_PATH)
+        print("[PDF Download] Embedded download worker started")
+    
     # Start background cleanup task for email verification if enabled
     try:
         from config import ENABLE_OTP_VALIDATION
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prometheus metrics for the HARVEST backend.
+
+Records per-route request counts/latency, SQLite query counts/durations,
+outbound HTTP latency by host and background task gauges, exposed at /metrics.
+
+Multi-process (gunicorn) support: set PROMETHEUS_MULTIPROC_DIR to an empty,
+writable directory before starting gunicorn, and mark dead workers in
+gunicorn.conf.py:
+
+    def child_exit(server, worker):
+        from harvest_metrics import mark_process_dead
+        mark_process_dead(worker.pid)
+
+Everything here is a no-op when prometheus_client is not installed or
+ENABLE_METRICS is False, so callers never need to check.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+try:
+    from config import ENABLE_METRICS
+except ImportError:
+    ENABLE_METRICS = True
+ENABLE_METRICS = os.environ.get("HARVEST_ENABLE_METRICS", str(ENABLE_METRICS)).lower() in ("1", "true", "yes")
+
+try:
+    from prometheus_client import (
+        Counter, Histogram, Gauge, CollectorRegistry, REGISTRY,
+        generate_latest, CONTENT_TYPE_LATEST, multiprocess
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    if ENABLE_METRICS:
+        print("[Metrics] Warning: prometheus_client not installed. /metrics endpoint disabled.")
+
+METRICS_ENABLED = ENABLE_METRICS and PROMETHEUS_AVAILABLE
+
+# Outbound hosts reported by name; everything else is grouped as "other"
+# to keep label cardinality bounded (publisher-direct URLs hit arbitrary hosts)
+KNOWN_HTTP_HOSTS = {
+    "api.crossref.org",
+    "doi.org",
+    "api.unpaywall.org",
+    "www.ebi.ac.uk",
+    "api.semanticscholar.org",
+    "api.openalex.org",
+    "api.core.ac.uk",
+    "core.ac.uk",
+    "export.arxiv.org",
+    "arxiv.org",
+    "eutils.ncbi.nlm.nih.gov",
+    "www.ncbi.nlm.nih.gov",
+    "api.biorxiv.org",
+    "zenodo.org",
+    "doaj.org",
+}
+
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "PRAGMA", "BEGIN", "WITH"}
+
+if METRICS_ENABLED:
+    HTTP_REQUESTS = Counter(
+        "harvest_http_requests_total",
+        "HTTP requests handled by the backend",
+        ["method", "route", "status"]
+    )
+    HTTP_REQUEST_DURATION = Histogram(
+        "harvest_http_request_duration_seconds",
+        "Backend request latency",
+        ["method", "route"],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    )
+    SQLITE_QUERIES = Counter(
+        "harvest_sqlite_queries_total",
+        "SQLite statements executed",
+        ["db", "operation"]
+    )
+    SQLITE_QUERY_DURATION = Histogram(
+        "harvest_sqlite_query_duration_seconds",
+        "SQLite statement execution time",
+        ["db", "operation"],
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+    )
+    OUTBOUND_REQUEST_DURATION = Histogram(
+        "harvest_outbound_request_duration_seconds",
+        "Outbound HTTP latency (time to response headers)",
+        ["host", "outcome"],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+    )
+    PDF_SOURCE_LOOKUP_DURATION = Histogram(
+        "harvest_pdf_source_lookup_duration_seconds",
+        "Time for a PDF source to resolve (or fail to resolve) a DOI to a PDF URL",
+        ["source", "outcome"],
+        buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+    )
+    BACKGROUND_TASKS = Gauge(
+        "harvest_background_tasks",
+        "Background tasks currently running",
+        ["task"],
+        multiprocess_mode="livesum"
+    )
+    PROCESS_THREADS = Gauge(
+        "harvest_process_threads",
+        "Live threads in the backend process",
+        multiprocess_mode="liveall"
+    )
+
+
+def init_metrics(app) -> bool:
+    """
+    Register request instrumentation and the /metrics endpoint on a Flask app.
+    Returns True if metrics are enabled.
+    """
+    if not METRICS_ENABLED:
+        return False
+
+    from flask import request, g, Response
+
+    @app.before_request
+    def _metrics_start_timer():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _metrics_record_request(response):
+        start = getattr(g, "_metrics_start", None)
+        if start is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        if route == "/metrics":
+            return response
+        HTTP_REQUESTS.labels(request.method, route, str(response.status_code)).inc()
+        HTTP_REQUEST_DURATION.labels(request.method, route).observe(time.perf_counter() - start)
+        return response
+
+    @app.get("/metrics")
+    def metrics_endpoint():
+        """Prometheus metrics in text exposition format."""
+        PROCESS_THREADS.set(threading.active_count())
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+    instrument_requests()
+    return True
+
+
+def mark_process_dead(pid: int) -> None:
+    """Clean up a dead gunicorn worker's live gauges (call from child_exit)."""
+    if PROMETHEUS_AVAILABLE and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+# -----------------------------
+# SQLite instrumentation
+# -----------------------------
+
+def _sql_operation(sql: str) -> str:
+    parts = sql.lstrip().split(None, 1)
+    op = parts[0].upper() if parts else ""
+    return op if op in SQL_OPERATIONS else "OTHER"
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """sqlite3 cursor that records statement counts and durations."""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _observe_sql(self.connection, sql, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _observe_sql(self.connection, sql, time.perf_counter() - start)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors (and execute shortcuts) are instrumented."""
+
+    def __init__(self, database, *args, **kwargs):
+        super().__init__(database, *args, **kwargs)
+        self.metrics_db_label = os.path.basename(str(database)) or "memory"
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# Per-thread statement log used by request profiling (None when not capturing)
+_sql_capture = threading.local()
+
+
+def start_sql_capture() -> list:
+    """Start recording (db, sql, duration) for SQLite statements run by this thread."""
+    _sql_capture.statements = []
+    return _sql_capture.statements
+
+
+def stop_sql_capture() -> list:
+    """Stop recording and return the statements captured by this thread."""
+    statements = getattr(_sql_capture, "statements", None) or []
+    _sql_capture.statements = None
+    return statements
+
+
+def _observe_sql(connection, sql: str, duration: float) -> None:
+    db = getattr(connection, "metrics_db_label", "unknown")
+    if METRICS_ENABLED:
+        op = _sql_operation(sql)
+        SQLITE_QUERIES.labels(db, op).inc()
+        SQLITE_QUERY_DURATION.labels(db, op).observe(duration)
+    statements = getattr(_sql_capture, "statements", None)
+    if statements is not None:
+        statements.append((db, sql, duration))
+
+
+def _sqlite_connection(database, *args, **kwargs) -> sqlite3.Connection:
+    """
+    Instrumented connection when metrics are on or this thread is capturing SQL
+    for a profiled request; otherwise a plain connection, so statements run
+    without any per-statement overhead.
+    """
+    if METRICS_ENABLED or getattr(_sql_capture, "statements", None) is not None:
+        return InstrumentedConnection(database, *args, **kwargs)
+    return sqlite3.Connection(database, *args, **kwargs)
+
+
+# Connection factory for sqlite3.connect(..., factory=SQLITE_CONNECTION_FACTORY)
+SQLITE_CONNECTION_FACTORY = _sqlite_connection
+
+
+# -----------------------------
+# Outbound HTTP instrumentation
+# -----------------------------
+
+_requests_instrumented = False
+_requests_instrument_lock = threading.Lock()
+
+
+def host_label(url: str) -> str:
+    """Map a URL to a bounded host label for outbound metrics."""
+    host = (urlparse(url).hostname or "").lower()
+    return host if host in KNOWN_HTTP_HOSTS else "other"
+
+
+def observe_outbound_request(url: str, duration: float, outcome: str) -> None:
+    """Record one outbound HTTP call. outcome is an HTTP status class ("2xx") or "error"."""
+    if METRICS_ENABLED:
+        OUTBOUND_REQUEST_DURATION.labels(host_label(url), outcome).observe(duration)
+
+
+def observe_source_lookup(source: str, duration: float, success: bool) -> None:
+    """Record one PDF source lookup (pdf_manager.try_source)."""
+    if METRICS_ENABLED:
+        PDF_SOURCE_LOOKUP_DURATION.labels(source, "found" if success else "not_found").observe(duration)
+
+
+def instrument_requests() -> None:
+    """
+    Time every outbound call made through the requests library.
+    Most of the code base uses bare requests.get/head, which each create a
+    Session, so the hook is placed on Session.send. Sessions that set
+    harvest_timed (pdf_http_client) record their own timings and are skipped.
+    """
+    global _requests_instrumented
+    if not METRICS_ENABLED:
+        return
+    with _requests_instrument_lock:
+        if _requests_instrumented:
+            return
+        try:
+            import requests
+        except ImportError:
+            return
+
+        original_send = requests.Session.send
+
+        def send(self, request, **kwargs):
+            if getattr(self, "harvest_timed", False):
+                return original_send(self, request, **kwargs)
+            start = time.perf_counter()
+            try:
+                response = original_send(self, request, **kwargs)
+            except Exception:
+                observe_outbound_request(request.url, time.perf_counter() - start, "error")
+                raise
+            observe_outbound_request(request.url, time.perf_counter() - start,
+                                     f"{response.status_code // 100}xx")
+            return response
+
+        requests.Session.send = send
+        _requests_instrumented = True
+
+
+# -----------------------------
+# Background task gauges
+# -----------------------------
+
+@contextmanager
+def track_background_task(task: str):
+    """Count a running background task (e.g. a PDF download thread) while the block runs."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    BACKGROUND_TASKS.labels(task).inc()
+    try:
+        yield
+    finally:
+        BACKGROUND_TASKS.labels(task).dec()
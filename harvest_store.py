@@ -8,6 +8,8 @@ import json
 import hashlib
 import traceback
 
+from harvest_metrics import SQLITE_CONNECTION_FACTORY
+
 # -----------------------------
 # Seed schema from your JSON
 # -----------------------------
@@ -90,7 +92,8 @@ def check_admin_status(db_path: str, email: str, password: str = None) -> bool:
 
 def get_conn(db_path: str) -> sqlite3.Connection:
     # New connection per call; autocommit; FK on
-    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False,
+                           factory=SQLITE_CONNECTION_FACTORY)
     conn.execute("PRAGMA foreign_keys = ON;")
     return conn
 
@@ -208,15 +211,28 @@ def init_db(db_path: str) -> None:
             total INTEGER NOT NULL,
             current INTEGER NOT NULL,
             current_doi TEXT,
-            downloaded TEXT,  -- JSON array of [doi, filename, msg, source]
-            needs_upload TEXT,  -- JSON array of [doi, filename, reason]
-            errors TEXT,  -- JSON array of [doi, error]
+            current_source TEXT,
+            job_id INTEGER,  -- pdf_download_jobs.id; per-DOI results live in pdf_download_tasks
+            downloaded_count INTEGER NOT NULL DEFAULT 0,
+            needs_upload_count INTEGER NOT NULL DEFAULT 0,
+            errors_count INTEGER NOT NULL DEFAULT 0,
             project_dir TEXT,
             start_time REAL,
             end_time REAL,
             updated_at REAL NOT NULL
         );
     """)
+
+    # Older databases stored the results as JSON arrays in this table (columns
+    # downloaded/needs_upload/errors, now unused); add the counter columns
+    cur.execute("PRAGMA table_info(pdf_download_progress);")
+    progress_columns = [row[1] for row in cur.fetchall()]
+    for column, definition in [("current_source", "TEXT"), ("job_id", "INTEGER"),
+                               ("downloaded_count", "INTEGER NOT NULL DEFAULT 0"),
+                               ("needs_upload_count", "INTEGER NOT NULL DEFAULT 0"),
+                               ("errors_count", "INTEGER NOT NULL DEFAULT 0")]:
+        if column not in progress_columns:
+            cur.execute(f"ALTER TABLE pdf_download_progress ADD COLUMN {column} {definition};")
     
     # Email verification tables for OTP authentication
     # These tables support the email verification feature (ENABLE_OTP_VALIDATION)
@@ -323,6 +339,155 @@ def init_db(db_path: str) -> None:
         ON doi_annotation_status(project_id, doi);
     """)
 
+    # Per-project PDF manifest: one row per PDF file on disk, maintained by
+    # download/upload/delete so existence and listing checks are a single SELECT
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_manifest (
+            project_id INTEGER NOT NULL,
+            doi_hash TEXT NOT NULL,
+            doi TEXT,  -- NULL for files that do not match any project DOI
+            filename TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            sha256 TEXT,
+            pages INTEGER,
+            title TEXT,  -- from the PDF's metadata
+            has_text INTEGER,  -- 1 if the first pages have a text layer, 0 for scans
+            source TEXT,
+            mtime REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (project_id, doi_hash)
+        );
+    """)
+
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_pdf_manifest_project_doi
+        ON pdf_manifest(project_id, doi);
+    """)
+
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_pdf_manifest_sha256
+        ON pdf_manifest(sha256);
+    """)
+
+    # Content-addressed PDF store shared by all projects: one blob per distinct
+    # file (project_pdfs/store/<sha256[:2]>/<sha256>.pdf), hardlinked into the
+    # project directories. refcount is the number of manifest entries using the
+    # blob; pdf_blob_dois maps a DOI to the blob last stored for it.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_blobs (
+            sha256 TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            pages INTEGER,
+            title TEXT,
+            has_text INTEGER,
+            refcount INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL
+        );
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_blob_dois (
+            doi_hash TEXT PRIMARY KEY,
+            sha256 TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+    """)
+
+    # Article titles from CrossRef, used to match uploaded PDFs to DOIs by
+    # title. title is '' for DOIs CrossRef doesn't know, so they aren't re-fetched.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS crossref_titles (
+            doi TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+    """)
+
+    # Older databases lack the metadata columns filled in by pdf_inspect
+    for table in ("pdf_manifest", "pdf_blobs"):
+        cur.execute(f"PRAGMA table_info({table});")
+        columns = [row[1] for row in cur.fetchall()]
+        for column, definition in [("title", "TEXT"), ("has_text", "INTEGER")]:
+            if column not in columns:
+                cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition};")
+
+    # Durable PDF download queue: one job per download request and one task row
+    # per DOI. Workers hold a lease on a job while running it; finished tasks are
+    # the checkpoint, so a job whose lease expires is resumed by the next worker.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_download_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER NOT NULL,
+            status TEXT NOT NULL,  -- queued, running, completed, error, cancelled
+            project_dir TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            requested_by TEXT,
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            priority INTEGER NOT NULL DEFAULT 1,  -- share of the workers relative to other jobs
+            virtual_time REAL NOT NULL DEFAULT 0,  -- DOIs served / priority, for fair-share ordering
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            updated_at REAL NOT NULL
+        );
+    """)
+
+    # Older queues lack the fair-share columns
+    cur.execute("PRAGMA table_info(pdf_download_jobs);")
+    job_columns = [row[1] for row in cur.fetchall()]
+    for column, definition in [("priority", "INTEGER NOT NULL DEFAULT 1"),
+                               ("virtual_time", "REAL NOT NULL DEFAULT 0")]:
+        if column not in job_columns:
+            cur.execute(f"ALTER TABLE pdf_download_jobs ADD COLUMN {column} {definition};")
+
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_pdf_download_jobs_status
+        ON pdf_download_jobs(status, created_at);
+    """)
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_download_tasks (
+            job_id INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            doi TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',  -- pending, done
+            outcome TEXT,  -- downloaded, needs_upload, error
+            filename TEXT,
+            message TEXT,
+            source TEXT,
+            finished_at REAL,
+            PRIMARY KEY (job_id, seq)
+        );
+    """)
+
+    # Append-only log of finished DOIs; the id is the cursor status polls resume from
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS pdf_download_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER NOT NULL,
+            job_id INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            doi TEXT NOT NULL,
+            outcome TEXT NOT NULL,
+            filename TEXT,
+            message TEXT,
+            source TEXT,
+            created_at REAL NOT NULL
+        );
+    """)
+
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_pdf_download_events_job
+        ON pdf_download_events(job_id, id);
+    """)
+    # Recent throughput for the queue ETAs (get_pdf_download_queue)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_pdf_download_events_created
+        ON pdf_download_events(created_at);
+    """)
+
     for name, value in SCHEMA_JSON["span-attribute"].items():
         cur.execute("INSERT OR IGNORE INTO entity_types(name, value) VALUES (?, ?);", (name, value))
 
@@ -530,6 +695,82 @@ def get_all_projects(db_path: str) -> list:
         conn.close()
         return []
 
+# Fields that can be requested from get_project_summaries (and /api/projects?fields=)
+PROJECT_SUMMARY_FIELDS = (
+    "id", "name", "description", "created_by", "created_at",
+    "doi_count", "pdf_count", "status_counts"
+)
+
+def get_project_summaries(db_path: str, fields: list = None) -> list:
+    """
+    Get lightweight project summaries without the full DOI list.
+
+    doi_count, pdf_count (from pdf_manifest) and per-status annotation counts
+    are computed in SQL so the doi_list JSON never has to be decoded in Python.
+
+    Args:
+        db_path: Path to database
+        fields: Optional list of field names (see PROJECT_SUMMARY_FIELDS).
+                "id" is always included. Defaults to all fields.
+
+    Returns:
+        List of project summary dicts, newest first
+    """
+    if fields:
+        wanted = {"id"} | {f for f in fields if f in PROJECT_SUMMARY_FIELDS}
+    else:
+        wanted = set(PROJECT_SUMMARY_FIELDS)
+
+    need_status = "status_counts" in wanted
+    columns = ["p.id", "p.name", "p.description", "p.created_by", "p.created_at",
+               "json_array_length(p.doi_list) AS doi_count",
+               "(SELECT COUNT(*) FROM pdf_manifest m WHERE m.project_id = p.id) AS pdf_count"]
+    if need_status:
+        columns += ["COALESCE(s.in_progress, 0)", "COALESCE(s.completed, 0)"]
+
+    query = f"SELECT {', '.join(columns)} FROM projects p"
+    if need_status:
+        query += """
+            LEFT JOIN (
+                SELECT project_id,
+                       SUM(CASE WHEN status = 'in_progress' THEN 1 ELSE 0 END) AS in_progress,
+                       SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS completed
+                FROM doi_annotation_status
+                GROUP BY project_id
+            ) s ON s.project_id = p.id"""
+    query += " ORDER BY p.created_at DESC;"
+
+    conn = get_conn(db_path); cur = conn.cursor()
+    try:
+        cur.execute(query)
+        rows = cur.fetchall()
+        conn.close()
+
+        summaries = []
+        for row in rows:
+            summary = {
+                "id": row[0],
+                "name": row[1],
+                "description": row[2],
+                "created_by": row[3],
+                "created_at": row[4],
+                "doi_count": row[5] or 0,
+                "pdf_count": row[6],
+            }
+            if need_status:
+                in_progress, completed = row[7], row[8]
+                summary["status_counts"] = {
+                    "unstarted": max(summary["doi_count"] - in_progress - completed, 0),
+                    "in_progress": in_progress,
+                    "completed": completed
+                }
+            summaries.append({k: v for k, v in summary.items() if k in wanted})
+        return summaries
+    except Exception as e:
+        print(f"Failed to get project summaries: {e}")
+        conn.close()
+        return []
+
 def get_project_by_id(db_path: str, project_id: int) -> dict:
     """Get a specific project by ID."""
     conn = get_conn(db_path); cur = conn.cursor()
@@ -586,7 +827,7 @@ def update_project(db_path: str, project_id: int, name: str = None, description:
 def delete_project(db_path: str, project_id: int) -> bool:
     """Delete a project and all its child records in dependency order."""
     # Create connection with standard isolation mode for transaction support
-    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn = sqlite3.connect(db_path, check_same_thread=False, factory=SQLITE_CONNECTION_FACTORY)
     conn.execute("PRAGMA foreign_keys = ON;")
     cur = conn.cursor()
     
@@ -607,7 +848,23 @@ def delete_project(db_path: str, project_id: int) -> bool:
         # 4. Delete pdf_download_progress (has project_id as primary key, no FK but should be cleaned)
         cur.execute("DELETE FROM pdf_download_progress WHERE project_id = ?;", (project_id,))
         
-        # 5. Finally delete the project itself
+        # 5. Delete pdf_manifest entries (no FK, files are left on disk) and drop
+        #    their references to the shared PDF store
+        cur.execute("SELECT DISTINCT sha256 FROM pdf_manifest WHERE project_id = ? AND sha256 IS NOT NULL;",
+                    (project_id,))
+        blob_hashes = [row[0] for row in cur.fetchall()]
+        cur.execute("DELETE FROM pdf_manifest WHERE project_id = ?;", (project_id,))
+        _refresh_pdf_blob_refcounts(cur, blob_hashes)
+        
+        # 6. Delete PDF download jobs and their per-DOI tasks and events
+        cur.execute("""
+            DELETE FROM pdf_download_tasks
+            WHERE job_id IN (SELECT id FROM pdf_download_jobs WHERE project_id = ?);
+        """, (project_id,))
+        cur.execute("DELETE FROM pdf_download_events WHERE project_id = ?;", (project_id,))
+        cur.execute("DELETE FROM pdf_download_jobs WHERE project_id = ?;", (project_id,))
+        
+        # 7. Finally delete the project itself
         cur.execute("DELETE FROM projects WHERE id = ?;", (project_id,))
         
         # Commit transaction
@@ -661,7 +918,8 @@ def update_triple(db_path: str, triple_id: int, source_entity_name: str = None,
 # PDF Download Progress Management
 # -----------------------------
 
-def init_pdf_download_progress(db_path: str, project_id: int, total: int, project_dir: str) -> bool:
+def init_pdf_download_progress(db_path: str, project_id: int, total: int, project_dir: str,
+                               job_id: int = None) -> bool:
     """Initialize progress tracking for a PDF download job."""
     try:
         import time
@@ -670,10 +928,10 @@ def init_pdf_download_progress(db_path: str, project_id: int, total: int, projec
         
         cur.execute("""
             INSERT OR REPLACE INTO pdf_download_progress 
-            (project_id, status, total, current, current_doi, downloaded, needs_upload, 
-             errors, project_dir, start_time, updated_at)
-            VALUES (?, 'running', ?, 0, '', '[]', '[]', '[]', ?, ?, ?)
-        """, (project_id, total, project_dir, time.time(), time.time()))
+            (project_id, status, total, current, current_doi, current_source, job_id,
+             downloaded_count, needs_upload_count, errors_count, project_dir, start_time, updated_at)
+            VALUES (?, 'running', ?, 0, '', '', ?, 0, 0, 0, ?, ?, ?)
+        """, (project_id, total, job_id, project_dir, time.time(), time.time()))
         
         conn.close()
         return True
@@ -682,7 +940,10 @@ def init_pdf_download_progress(db_path: str, project_id: int, total: int, projec
         return False
 
 def update_pdf_download_progress(db_path: str, project_id: int, updates: dict) -> bool:
-    """Update progress for a PDF download job."""
+    """
+    Update progress for a PDF download job.
+    Per-DOI results are not stored here; see complete_pdf_download_task.
+    """
     try:
         import time
         conn = get_conn(db_path)
@@ -693,13 +954,10 @@ def update_pdf_download_progress(db_path: str, project_id: int, updates: dict) -
         values = []
         
         for key, value in updates.items():
-            if key in ['status', 'total', 'current', 'current_doi', 'project_dir', 'end_time']:
+            if key in ['status', 'total', 'current', 'current_doi', 'current_source', 'job_id',
+                       'downloaded_count', 'needs_upload_count', 'errors_count', 'project_dir', 'end_time']:
                 set_clauses.append(f"{key} = ?")
                 values.append(value)
-            elif key in ['downloaded', 'needs_upload', 'errors']:
-                # Convert lists to JSON strings
-                set_clauses.append(f"{key} = ?")
-                values.append(json.dumps(value))
         
         # Always update updated_at
         set_clauses.append("updated_at = ?")
@@ -718,14 +976,15 @@ def update_pdf_download_progress(db_path: str, project_id: int, updates: dict) -
         return False
 
 def get_pdf_download_progress(db_path: str, project_id: int) -> dict:
-    """Get current progress for a PDF download job."""
+    """Get current progress (counts, no per-DOI results) for a PDF download job."""
     try:
         conn = get_conn(db_path)
         cur = conn.cursor()
         
         cur.execute("""
-            SELECT status, total, current, current_doi, downloaded, needs_upload, 
-                   errors, project_dir, start_time, end_time, updated_at
+            SELECT status, total, current, current_doi, current_source, job_id,
+                   downloaded_count, needs_upload_count, errors_count,
+                   project_dir, start_time, end_time, updated_at
             FROM pdf_download_progress
             WHERE project_id = ?
         """, (project_id,))
@@ -741,20 +1000,25 @@ def get_pdf_download_progress(db_path: str, project_id: int) -> dict:
             "total": row[1],
             "current": row[2],
             "current_doi": row[3],
-            "downloaded": json.loads(row[4]) if row[4] else [],
-            "needs_upload": json.loads(row[5]) if row[5] else [],
-            "errors": json.loads(row[6]) if row[6] else [],
-            "project_dir": row[7],
-            "start_time": row[8],
-            "end_time": row[9],
-            "updated_at": row[10]
+            "current_source": row[4],
+            "job_id": row[5],
+            "downloaded_count": row[6],
+            "needs_upload_count": row[7],
+            "errors_count": row[8],
+            "project_dir": row[9],
+            "start_time": row[10],
+            "end_time": row[11],
+            "updated_at": row[12]
         }
     except Exception as e:
         print(f"Failed to get PDF download progress: {e}")
         return None
 
 def cleanup_old_pdf_download_progress(db_path: str, max_age_seconds: int = 3600) -> int:
-    """Clean up old completed/error progress entries. Returns number of entries deleted."""
+    """
+    Clean up old completed/error progress entries, and the tasks and events of
+    download jobs that finished before the cutoff. Returns number of progress entries deleted.
+    """
     try:
         import time
         conn = get_conn(db_path)
@@ -769,6 +1033,15 @@ def cleanup_old_pdf_download_progress(db_path: str, max_age_seconds: int = 3600)
         """, (cutoff_time,))
         
         deleted = cur.rowcount
+
+        finished_jobs = """
+            SELECT id FROM pdf_download_jobs
+            WHERE status IN ('completed', 'error', 'cancelled') AND finished_at < ?
+        """
+        cur.execute(f"DELETE FROM pdf_download_events WHERE job_id IN ({finished_jobs})", (cutoff_time,))
+        cur.execute(f"DELETE FROM pdf_download_tasks WHERE job_id IN ({finished_jobs})", (cutoff_time,))
+        cur.execute(f"DELETE FROM pdf_download_jobs WHERE id IN ({finished_jobs})", (cutoff_time,))
+
         conn.close()
         return deleted
     except Exception as e:
@@ -779,7 +1052,8 @@ def cleanup_old_pdf_download_progress(db_path: str, max_age_seconds: int = 3600)
 def is_download_stale(db_path: str, project_id: int, stale_threshold_seconds: int = 300) -> bool:
     """
     Check if a download is stale (not updated recently despite being 'running').
-    A download is considered stale if status is 'running' but updated_at is older than threshold.
+    A download is considered stale if status is 'running' but updated_at is older than threshold,
+    unless its job is queued waiting for a turn while a worker runs another project's job.
     
     Args:
         db_path: Path to database
@@ -803,8 +1077,23 @@ def is_download_stale(db_path: str, project_id: int, stale_threshold_seconds: in
         updated_at = progress.get("updated_at", 0)
         current_time = time.time()
         time_since_update = current_time - updated_at
+        if time_since_update <= stale_threshold_seconds:
+            return False
         
-        return time_since_update > stale_threshold_seconds
+        # Fair-share scheduling hands jobs back to the queue between slices
+        if progress.get("job_id") is None:
+            return True
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT 1 FROM pdf_download_jobs waiting, pdf_download_jobs other
+            WHERE waiting.id = ? AND waiting.status = 'queued'
+              AND other.status = 'running' AND other.lease_expires_at >= ?
+            LIMIT 1
+        """, (progress["job_id"], current_time))
+        waiting_turn = cur.fetchone() is not None
+        conn.close()
+        return not waiting_turn
     except Exception as e:
         print(f"Failed to check if download is stale: {e}")
         return False
@@ -845,6 +1134,944 @@ def reset_stale_download(db_path: str, project_id: int) -> bool:
         return False
 
 
+# -----------------------------
+# PDF Download Job Queue
+# -----------------------------
+
+PDF_JOB_ACTIVE_STATUSES = ("queued", "running")
+
+_PDF_JOB_COLUMNS = ("id", "project_id", "status", "project_dir", "total", "requested_by",
+                    "lease_owner", "lease_expires_at", "attempts", "created_at",
+                    "started_at", "finished_at", "updated_at", "priority", "virtual_time")
+
+PDF_JOB_MAX_PRIORITY = 10
+
+
+def _pdf_job_row_to_dict(row) -> dict:
+    return dict(zip(_PDF_JOB_COLUMNS, row))
+
+
+def enqueue_pdf_download_job(db_path: str, project_id: int, doi_list: list, project_dir: str,
+                             requested_by: str = "", priority: int = 1) -> int:
+    """
+    Queue a PDF download job with one task per DOI.
+
+    Jobs share the workers in proportion to their priority (1 to
+    PDF_JOB_MAX_PRIORITY). A new job starts level with the furthest-behind
+    active job, so it neither waits for older jobs to finish nor gets to
+    catch up on the DOIs they were served before it arrived.
+
+    Returns:
+        The new job id, or None on error
+    """
+    conn = None
+    try:
+        import time
+        now = time.time()
+        priority = min(max(int(priority), 1), PDF_JOB_MAX_PRIORITY)
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE;")
+        cur.execute("""
+            INSERT INTO pdf_download_jobs
+                (project_id, status, project_dir, total, requested_by, priority, virtual_time,
+                 created_at, updated_at)
+            VALUES (?, 'queued', ?, ?, ?, ?,
+                    (SELECT COALESCE(MIN(virtual_time), 0) FROM pdf_download_jobs
+                     WHERE status IN ('queued', 'running')),
+                    ?, ?)
+        """, (project_id, project_dir, len(doi_list), requested_by, priority, now, now))
+        job_id = cur.lastrowid
+        cur.executemany(
+            "INSERT INTO pdf_download_tasks (job_id, seq, doi) VALUES (?, ?, ?)",
+            [(job_id, seq, doi) for seq, doi in enumerate(doi_list)]
+        )
+        conn.commit()
+        conn.close()
+        return job_id
+    except Exception as e:
+        print(f"Failed to enqueue PDF download job: {e}")
+        if conn is not None:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+        return None
+
+
+def get_pdf_download_job(db_path: str, job_id: int) -> dict:
+    """Get a PDF download job by id (None if not found)."""
+    try:
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute(f"SELECT {', '.join(_PDF_JOB_COLUMNS)} FROM pdf_download_jobs WHERE id = ?", (job_id,))
+        row = cur.fetchone()
+        conn.close()
+        return _pdf_job_row_to_dict(row) if row else None
+    except Exception as e:
+        print(f"Failed to get PDF download job: {e}")
+        return None
+
+
+def get_active_pdf_download_job(db_path: str, project_id: int) -> dict:
+    """Get the queued or running PDF download job for a project (None if there is none)."""
+    try:
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT {', '.join(_PDF_JOB_COLUMNS)} FROM pdf_download_jobs
+            WHERE project_id = ? AND status IN ('queued', 'running')
+            ORDER BY id DESC LIMIT 1
+        """, (project_id,))
+        row = cur.fetchone()
+        conn.close()
+        return _pdf_job_row_to_dict(row) if row else None
+    except Exception as e:
+        print(f"Failed to get active PDF download job: {e}")
+        return None
+
+
+def cancel_pdf_download_jobs(db_path: str, project_id: int) -> int:
+    """
+    Cancel a project's queued and running jobs. A worker running one notices
+    at its next lease renewal and stops.
+
+    Returns:
+        Number of jobs cancelled
+    """
+    try:
+        import time
+        now = time.time()
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("""
+            UPDATE pdf_download_jobs
+            SET status = 'cancelled', finished_at = ?, updated_at = ?, lease_owner = NULL, lease_expires_at = NULL
+            WHERE project_id = ? AND status IN ('queued', 'running')
+        """, (now, now, project_id))
+        cancelled = cur.rowcount
+        conn.close()
+        return cancelled
+    except Exception as e:
+        print(f"Failed to cancel PDF download jobs: {e}")
+        return 0
+
+
+def claim_pdf_download_job(db_path: str, worker_id: str, lease_seconds: int = 300) -> dict:
+    """
+    Lease the next runnable job: a queued job, or a running job whose lease has
+    expired (its worker died). The job that has been served the fewest DOIs
+    relative to its priority goes first, then the oldest. Safe to call from
+    several processes.
+
+    Returns:
+        The claimed job dict, or None if nothing is runnable
+    """
+    conn = None
+    try:
+        import time
+        now = time.time()
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        # IMMEDIATE takes the write lock up front so two workers can't claim the same job
+        cur.execute("BEGIN IMMEDIATE;")
+        cur.execute("""
+            SELECT id FROM pdf_download_jobs
+            WHERE status = 'queued' OR (status = 'running' AND lease_expires_at < ?)
+            ORDER BY virtual_time, created_at, id
+            LIMIT 1
+        """, (now,))
+        row = cur.fetchone()
+        if not row:
+            conn.commit()
+            conn.close()
+            return None
+        job_id = row[0]
+        cur.execute("""
+            UPDATE pdf_download_jobs
+            SET status = 'running', lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1,
+                started_at = COALESCE(started_at, ?), updated_at = ?
+            WHERE id = ?
+        """, (worker_id, now + lease_seconds, now, now, job_id))
+        cur.execute(f"SELECT {', '.join(_PDF_JOB_COLUMNS)} FROM pdf_download_jobs WHERE id = ?", (job_id,))
+        job = _pdf_job_row_to_dict(cur.fetchone())
+        conn.commit()
+        conn.close()
+        return job
+    except Exception as e:
+        print(f"Failed to claim PDF download job: {e}")
+        if conn is not None:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+        return None
+
+
+def renew_pdf_download_lease(db_path: str, job_id: int, worker_id: str, lease_seconds: int = 300) -> bool:
+    """
+    Extend a worker's lease on a running job.
+
+    Returns:
+        False if the worker no longer holds the job (cancelled or reclaimed)
+    """
+    try:
+        import time
+        now = time.time()
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("""
+            UPDATE pdf_download_jobs SET lease_expires_at = ?, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+        """, (now + lease_seconds, now, job_id, worker_id))
+        renewed = cur.rowcount > 0
+        conn.close()
+        return renewed
+    except Exception as e:
+        print(f"Failed to renew PDF download lease: {e}")
+        # Keep going on transient errors; the lease check runs again next interval
+        return True
+
+
+def finish_pdf_download_job(db_path: str, job_id: int, worker_id: str, status: str) -> bool:
+    """
+    Mark a job completed/error, or 'queued' to hand it back (e.g. on worker shutdown).
+    Only the lease holder can finish a job.
+    """
+    try:
+        import time
+        now = time.time()
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("""
+            UPDATE pdf_download_jobs
+            SET status = ?, finished_at = ?, updated_at = ?, lease_owner = NULL, lease_expires_at = NULL
+            WHERE id = ? AND lease_owner = ? AND status = 'running'
+        """, (status, None if status == "queued" else now, now, job_id, worker_id))
+        updated = cur.rowcount > 0
+        conn.close()
+        return updated
+    except Exception as e:
+        print(f"Failed to finish PDF download job: {e}")
+        return False
+
+
+def charge_pdf_download_job(db_path: str, job_id: int, served: int) -> bool:
+    """Advance a job's fair-share clock by the number of DOIs it was just served."""
+    try:
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("""
+            UPDATE pdf_download_jobs SET virtual_time = virtual_time + CAST(? AS REAL) / priority
+            WHERE id = ?
+        """, (served, job_id))
+        charged = cur.rowcount > 0
+        conn.close()
+        return charged
+    except Exception as e:
+        print(f"Failed to charge PDF download job: {e}")
+        return False
+
+
+def is_pdf_download_job_behind(db_path: str, job_id: int) -> bool:
+    """
+    True if another runnable job has been served no more than this one (relative
+    to priority), i.e. the worker running this job should hand it back to the queue.
+    """
+    try:
+        import time
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT 1 FROM pdf_download_jobs
+            WHERE id != ?
+              AND (status = 'queued' OR (status = 'running' AND lease_expires_at < ?))
+              AND virtual_time <= (SELECT virtual_time FROM pdf_download_jobs WHERE id = ?)
+            LIMIT 1
+        """, (job_id, time.time(), job_id))
+        behind = cur.fetchone() is not None
+        conn.close()
+        return behind
+    except Exception as e:
+        print(f"Failed to check PDF download queue: {e}")
+        return False
+
+
+def set_pdf_download_priority(db_path: str, project_id: int, priority: int) -> bool:
+    """
+    Change the priority (1 to PDF_JOB_MAX_PRIORITY) of a project's queued or
+    running job. Takes effect at the job's next slice.
+
+    Returns:
+        False if the project has no active job
+    """
+    try:
+        import time
+        priority = min(max(int(priority), 1), PDF_JOB_MAX_PRIORITY)
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("""
+            UPDATE pdf_download_jobs SET priority = ?, updated_at = ?
+            WHERE project_id = ? AND status IN ('queued', 'running')
+        """, (priority, time.time(), project_id))
+        updated = cur.rowcount > 0
+        conn.close()
+        return updated
+    except Exception as e:
+        print(f"Failed to set PDF download priority: {e}")
+        return False
+
+
+def _fair_share_etas(remaining: dict, priorities: dict, rate: float) -> dict:
+    """
+    Seconds until each job finishes if rate DOIs/second are shared between the
+    unfinished jobs in proportion to their priority.
+    """
+    remaining = {job_id: float(count) for job_id, count in remaining.items()}
+    etas = {job_id: 0.0 for job_id, count in remaining.items() if count <= 0}
+    active = {job_id for job_id, count in remaining.items() if count > 0}
+    elapsed = 0.0
+    while active:
+        total_priority = sum(priorities[job_id] for job_id in active)
+        shares = {job_id: rate * priorities[job_id] / total_priority for job_id in active}
+        # Run until the next job finishes, then share its throughput out
+        step = min(remaining[job_id] / shares[job_id] for job_id in active)
+        elapsed += step
+        for job_id in list(active):
+            remaining[job_id] -= shares[job_id] * step
+            if remaining[job_id] <= 1e-9:
+                etas[job_id] = elapsed
+                active.discard(job_id)
+    return etas
+
+
+def get_pdf_download_queue(db_path: str, rate_window_seconds: int = 600) -> list:
+    """
+    Get the queued and running jobs in the order workers take them, with their
+    unfinished DOI count, queue_position (0 while a worker holds the job, else
+    1 for the next job to be claimed) and eta_seconds.
+
+    The ETA assumes the DOIs/second finished over the last rate_window_seconds
+    keeps being shared between the jobs in proportion to their priority; it is
+    None until there is enough recent history to measure that rate.
+    """
+    try:
+        import time
+        now = time.time()
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute(f"""
+            SELECT {', '.join('j.' + c for c in _PDF_JOB_COLUMNS)},
+                   (SELECT COUNT(*) FROM pdf_download_tasks t
+                    WHERE t.job_id = j.id AND t.status != 'done')
+            FROM pdf_download_jobs j
+            WHERE j.status IN ('queued', 'running')
+            ORDER BY j.virtual_time, j.created_at, j.id
+        """)
+        rows = cur.fetchall()
+        cur.execute("""
+            SELECT COUNT(*), MIN(created_at) FROM pdf_download_events WHERE created_at >= ?
+        """, (now - rate_window_seconds,))
+        finished, first_finished_at = cur.fetchone()
+        conn.close()
+    except Exception as e:
+        print(f"Failed to get PDF download queue: {e}")
+        return []
+
+    jobs = []
+    position = 0
+    for row in rows:
+        job = _pdf_job_row_to_dict(row[:-1])
+        job["remaining"] = row[-1]
+        leased = job["status"] == "running" and (job["lease_expires_at"] or 0) >= now
+        if not leased:
+            position += 1
+        job["queue_position"] = 0 if leased else position
+        jobs.append(job)
+
+    rate = None
+    if finished and finished >= 5:
+        rate = finished / max(now - first_finished_at, 1.0)
+    etas = _fair_share_etas({j["id"]: j["remaining"] for j in jobs},
+                            {j["id"]: j["priority"] for j in jobs}, rate) if rate else {}
+    for job in jobs:
+        job["eta_seconds"] = int(etas[job["id"]]) if job["id"] in etas else None
+    return jobs
+
+
+def get_pdf_download_tasks(db_path: str, job_id: int, status: str = None) -> list:
+    """Get a job's per-DOI tasks in DOI order, optionally filtered by status ('pending' or 'done')."""
+    try:
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        query = """
+            SELECT seq, doi, status, outcome, filename, message, source, finished_at
+            FROM pdf_download_tasks WHERE job_id = ?
+        """
+        params = [job_id]
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        cur.execute(query + " ORDER BY seq", params)
+        rows = cur.fetchall()
+        conn.close()
+        return [
+            {"seq": r[0], "doi": r[1], "status": r[2], "outcome": r[3], "filename": r[4],
+             "message": r[5], "source": r[6], "finished_at": r[7]}
+            for r in rows
+        ]
+    except Exception as e:
+        print(f"Failed to get PDF download tasks: {e}")
+        return []
+
+
+def complete_pdf_download_task(db_path: str, job_id: int, seq: int, outcome: str,
+                               filename: str = "", message: str = "", source: str = "") -> int:
+    """
+    Checkpoint one DOI of a job with its outcome ('downloaded', 'needs_upload' or 'error').
+
+    In one transaction this marks the task done, appends an event and bumps the
+    counters in pdf_download_progress, so a DOI costs a constant number of small writes.
+
+    Returns:
+        The event id (cursor), or None on error / if the task was already done
+    """
+    if outcome not in ("downloaded", "needs_upload", "error"):
+        print(f"Invalid PDF download outcome: {outcome}")
+        return None
+    conn = None
+    try:
+        import time
+        now = time.time()
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE;")
+        cur.execute("""
+            UPDATE pdf_download_tasks
+            SET status = 'done', outcome = ?, filename = ?, message = ?, source = ?, finished_at = ?
+            WHERE job_id = ? AND seq = ? AND status != 'done'
+        """, (outcome, filename, message, source, now, job_id, seq))
+        if cur.rowcount == 0:
+            conn.commit()
+            conn.close()
+            return None
+
+        cur.execute("""
+            INSERT INTO pdf_download_events
+                (project_id, job_id, seq, doi, outcome, filename, message, source, created_at)
+            SELECT j.project_id, t.job_id, t.seq, t.doi, ?, ?, ?, ?, ?
+            FROM pdf_download_tasks t JOIN pdf_download_jobs j ON j.id = t.job_id
+            WHERE t.job_id = ? AND t.seq = ?
+        """, (outcome, filename, message, source, now, job_id, seq))
+        event_id = cur.lastrowid
+
+        counter = {"downloaded": "downloaded_count", "needs_upload": "needs_upload_count",
+                   "error": "errors_count"}[outcome]
+        cur.execute(f"""
+            UPDATE pdf_download_progress
+            SET current = current + 1, {counter} = {counter} + 1,
+                current_doi = (SELECT doi FROM pdf_download_tasks WHERE job_id = ? AND seq = ?),
+                current_source = ?, updated_at = ?
+            WHERE job_id = ?
+        """, (job_id, seq, source or "none", now, job_id))
+        conn.commit()
+        conn.close()
+        return event_id
+    except Exception as e:
+        print(f"Failed to complete PDF download task: {e}")
+        if conn is not None:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+        return None
+
+
+def record_pdf_download_retry(db_path: str, project_id: int, doi: str, outcome: str,
+                              filename: str = "", message: str = "", source: str = "") -> int:
+    """
+    Record the result of a background retry of a DOI that a finished job
+    reported as 'error' or 'needs_upload'.
+
+    In one transaction this updates the DOI's task in the project's latest job,
+    appends an event and moves the DOI between the job's progress counters.
+
+    Returns:
+        The event id, or None on error / if no finished task matches the DOI
+    """
+    if outcome not in ("downloaded", "needs_upload", "error"):
+        print(f"Invalid PDF download outcome: {outcome}")
+        return None
+    conn = None
+    try:
+        import time
+        now = time.time()
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE;")
+        cur.execute("""
+            SELECT t.job_id, t.seq, t.outcome
+            FROM pdf_download_tasks t JOIN pdf_download_jobs j ON j.id = t.job_id
+            WHERE j.project_id = ? AND t.doi = ? AND t.status = 'done'
+            ORDER BY t.job_id DESC
+            LIMIT 1
+        """, (project_id, doi))
+        row = cur.fetchone()
+        if not row:
+            conn.commit()
+            conn.close()
+            return None
+        job_id, seq, old_outcome = row
+
+        cur.execute("""
+            UPDATE pdf_download_tasks
+            SET outcome = ?, filename = ?, message = ?, source = ?, finished_at = ?
+            WHERE job_id = ? AND seq = ?
+        """, (outcome, filename, message, source, now, job_id, seq))
+        cur.execute("""
+            INSERT INTO pdf_download_events
+                (project_id, job_id, seq, doi, outcome, filename, message, source, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (project_id, job_id, seq, doi, outcome, filename, message, source, now))
+        event_id = cur.lastrowid
+
+        counters = {"downloaded": "downloaded_count", "needs_upload": "needs_upload_count",
+                    "error": "errors_count"}
+        if old_outcome != outcome and old_outcome in counters:
+            cur.execute(f"""
+                UPDATE pdf_download_progress
+                SET {counters[old_outcome]} = MAX({counters[old_outcome]} - 1, 0),
+                    {counters[outcome]} = {counters[outcome]} + 1, updated_at = ?
+                WHERE job_id = ?
+            """, (now, job_id))
+        conn.commit()
+        conn.close()
+        return event_id
+    except Exception as e:
+        print(f"Failed to record PDF download retry: {e}")
+        if conn is not None:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+        return None
+
+
+def get_pdf_download_events(db_path: str, job_id: int, after_id: int = 0, limit: int = 500) -> list:
+    """Get a job's finished-DOI events with id > after_id, oldest first."""
+    try:
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT id, seq, doi, outcome, filename, message, source, created_at
+            FROM pdf_download_events
+            WHERE job_id = ? AND id > ?
+            ORDER BY id
+            LIMIT ?
+        """, (job_id, after_id, limit))
+        rows = cur.fetchall()
+        conn.close()
+        return [
+            {"id": r[0], "seq": r[1], "doi": r[2], "outcome": r[3], "filename": r[4],
+             "message": r[5], "source": r[6], "created_at": r[7]}
+            for r in rows
+        ]
+    except Exception as e:
+        print(f"Failed to get PDF download events: {e}")
+        return []
+
+
+def get_latest_pdf_download_event_id(db_path: str, job_id: int) -> int:
+    """Get the id of a job's newest event (0 if it has none), for reading only later events."""
+    try:
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM pdf_download_events WHERE job_id = ?", (job_id,))
+        latest = cur.fetchone()[0]
+        conn.close()
+        return latest
+    except Exception as e:
+        print(f"Failed to get latest PDF download event: {e}")
+        return 0
+
+
+def get_pdf_download_results(db_path: str, job_id: int) -> dict:
+    """
+    Get a job's finished DOIs grouped by outcome, in the list format of process_dois_smart:
+    {"downloaded": [(doi, filename, message, source)], "needs_upload": [(doi, filename, reason)],
+     "errors": [(doi, error)]}
+    """
+    results = {"downloaded": [], "needs_upload": [], "errors": []}
+    for task in get_pdf_download_tasks(db_path, job_id, status="done"):
+        if task["outcome"] == "downloaded":
+            results["downloaded"].append((task["doi"], task["filename"], task["message"], task["source"]))
+        elif task["outcome"] == "needs_upload":
+            results["needs_upload"].append((task["doi"], task["filename"], task["message"]))
+        else:
+            results["errors"].append((task["doi"], task["message"]))
+    return results
+
+
+def get_projects_overview(db_path: str, stale_threshold_seconds: int = 300) -> list:
+    """
+    Get an admin overview of all projects in a single query.
+
+    Combines the project summary and PDF count with PDF download progress,
+    staleness and batch/annotation status counts, so the admin project list does not need
+    one request per project.
+
+    Args:
+        db_path: Path to database
+        stale_threshold_seconds: Same meaning as in is_download_stale
+
+    Returns:
+        List of overview dicts, newest project first
+    """
+    import time
+    conn = get_conn(db_path); cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT p.id, p.name, p.description, p.created_by, p.created_at,
+                   json_array_length(p.doi_list),
+                   d.status, d.total, d.current, d.current_doi,
+                   d.downloaded_count, d.needs_upload_count, d.errors_count,
+                   d.start_time, d.end_time, d.updated_at,
+                   COALESCE(b.batch_count, 0),
+                   COALESCE(s.in_progress, 0), COALESCE(s.completed, 0),
+                   (SELECT COUNT(*) FROM pdf_manifest m WHERE m.project_id = p.id)
+            FROM projects p
+            LEFT JOIN pdf_download_progress d ON d.project_id = p.id
+            LEFT JOIN (
+                SELECT project_id, COUNT(*) AS batch_count
+                FROM doi_batches
+                GROUP BY project_id
+            ) b ON b.project_id = p.id
+            LEFT JOIN (
+                SELECT project_id,
+                       SUM(CASE WHEN status = 'in_progress' THEN 1 ELSE 0 END) AS in_progress,
+                       SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) AS completed
+                FROM doi_annotation_status
+                GROUP BY project_id
+            ) s ON s.project_id = p.id
+            ORDER BY p.created_at DESC;
+        """)
+        rows = cur.fetchall()
+        conn.close()
+
+        now = time.time()
+        overview = []
+        for row in rows:
+            doi_count = row[5] or 0
+            in_progress, completed = row[17], row[18]
+
+            download = None
+            if row[6] is not None:
+                status, updated_at = row[6], row[15]
+                is_stale = status == "running" and (now - updated_at) > stale_threshold_seconds
+                download = {
+                    "status": status,
+                    "total": row[7],
+                    "current": row[8],
+                    "current_doi": row[9],
+                    "downloaded_count": row[10],
+                    "needs_upload_count": row[11],
+                    "errors_count": row[12],
+                    "start_time": row[13],
+                    "end_time": row[14],
+                    "updated_at": updated_at,
+                    "is_stale": is_stale,
+                    "time_since_update": int(now - updated_at) if status == "running" else None
+                }
+
+            overview.append({
+                "id": row[0],
+                "name": row[1],
+                "description": row[2],
+                "created_by": row[3],
+                "created_at": row[4],
+                "doi_count": doi_count,
+                "pdf_count": row[19],
+                "batch_count": row[16],
+                "status_counts": {
+                    "unstarted": max(doi_count - in_progress - completed, 0),
+                    "in_progress": in_progress,
+                    "completed": completed
+                },
+                "download": download
+            })
+        return overview
+    except Exception as e:
+        print(f"Failed to get projects overview: {e}")
+        conn.close()
+        return []
+
+
+# ============================================================================
+# PDF Manifest Functions
+# ============================================================================
+
+def upsert_pdf_manifest_entry(db_path: str, project_id: int, doi_hash: str, filename: str,
+                              size: int, mtime: float, doi: str = None, sha256: str = None,
+                              pages: int = None, source: str = None, title: str = None,
+                              has_text: bool = None) -> bool:
+    """
+    Insert or update the manifest entry for a project PDF.
+    An existing source is kept if the new one is empty (e.g. on reconcile).
+    """
+    conn = None
+    try:
+        import time
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE;")
+        cur.execute("SELECT sha256 FROM pdf_manifest WHERE project_id = ? AND doi_hash = ?;",
+                    (project_id, doi_hash))
+        row = cur.fetchone()
+        cur.execute("""
+            INSERT INTO pdf_manifest
+                (project_id, doi_hash, doi, filename, size, sha256, pages, title, has_text,
+                 source, mtime, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(project_id, doi_hash) DO UPDATE SET
+                doi = COALESCE(excluded.doi, pdf_manifest.doi),
+                filename = excluded.filename,
+                size = excluded.size,
+                sha256 = excluded.sha256,
+                pages = excluded.pages,
+                title = excluded.title,
+                has_text = excluded.has_text,
+                source = COALESCE(NULLIF(excluded.source, ''), pdf_manifest.source),
+                mtime = excluded.mtime,
+                updated_at = excluded.updated_at
+        """, (project_id, doi_hash, doi, filename, size, sha256, pages, title,
+              None if has_text is None else int(bool(has_text)), source, mtime, time.time()))
+        _refresh_pdf_blob_refcounts(cur, [row[0] if row else None, sha256])
+        cur.execute("COMMIT;")
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Failed to update PDF manifest: {e}")
+        if conn is not None:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+        return False
+
+
+def delete_pdf_manifest_entries(db_path: str, project_id: int, doi_hashes: list) -> int:
+    """
+    Remove manifest entries for the given DOI hashes.
+
+    Returns:
+        Number of entries removed
+    """
+    if not doi_hashes:
+        return 0
+    conn = None
+    try:
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE;")
+        placeholders = ",".join("?" * len(doi_hashes))
+        cur.execute(
+            f"SELECT DISTINCT sha256 FROM pdf_manifest WHERE project_id = ? AND doi_hash IN ({placeholders});",
+            [project_id] + list(doi_hashes)
+        )
+        blob_hashes = [row[0] for row in cur.fetchall()]
+        cur.executemany(
+            "DELETE FROM pdf_manifest WHERE project_id = ? AND doi_hash = ?;",
+            [(project_id, h) for h in doi_hashes]
+        )
+        removed = cur.rowcount
+        _refresh_pdf_blob_refcounts(cur, blob_hashes)
+        cur.execute("COMMIT;")
+        conn.close()
+        return removed
+    except Exception as e:
+        print(f"Failed to delete PDF manifest entries: {e}")
+        if conn is not None:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+        return 0
+
+
+def get_pdf_manifest(db_path: str, project_id: int, doi: str = None) -> list:
+    """
+    Get manifest entries for a project, optionally for a single DOI.
+
+    Returns:
+        List of entry dicts ordered by filename
+    """
+    query = """
+        SELECT doi_hash, doi, filename, size, sha256, pages, source, mtime, title, has_text
+        FROM pdf_manifest WHERE project_id = ?
+    """
+    params = [project_id]
+    if doi is not None:
+        query += " AND doi = ?"
+        params.append(doi)
+    query += " ORDER BY filename;"
+
+    conn = get_conn(db_path); cur = conn.cursor()
+    try:
+        cur.execute(query, params)
+        rows = cur.fetchall()
+        conn.close()
+        return [
+            {
+                "doi_hash": r[0], "doi": r[1], "filename": r[2], "size": r[3],
+                "sha256": r[4], "pages": r[5], "source": r[6], "mtime": r[7],
+                "title": r[8], "has_text": None if r[9] is None else bool(r[9])
+            }
+            for r in rows
+        ]
+    except Exception as e:
+        print(f"Failed to get PDF manifest: {e}")
+        conn.close()
+        return []
+
+
+def get_project_pdf_dois(db_path: str, project_id: int) -> set:
+    """Get the set of DOIs in a project that have a PDF in the manifest."""
+    conn = get_conn(db_path); cur = conn.cursor()
+    try:
+        cur.execute("SELECT doi FROM pdf_manifest WHERE project_id = ? AND doi IS NOT NULL;", (project_id,))
+        dois = {row[0] for row in cur.fetchall()}
+        conn.close()
+        return dois
+    except Exception as e:
+        print(f"Failed to get project PDF DOIs: {e}")
+        conn.close()
+        return set()
+
+
+# ============================================================================
+# PDF Store Functions
+# ============================================================================
+
+def _refresh_pdf_blob_refcounts(cur, sha256_list: list) -> None:
+    """Recount the manifest entries that reference each blob (within the caller's transaction)."""
+    hashes = {h for h in sha256_list if h}
+    if hashes:
+        cur.executemany("""
+            UPDATE pdf_blobs
+            SET refcount = (SELECT COUNT(*) FROM pdf_manifest WHERE pdf_manifest.sha256 = pdf_blobs.sha256)
+            WHERE sha256 = ?;
+        """, [(h,) for h in hashes])
+
+
+def register_pdf_blob(db_path: str, sha256: str, size: int, pages: int = None,
+                      doi_hash: str = None, title: str = None, has_text: bool = None) -> bool:
+    """
+    Record a file added to the PDF store and, if given, point the DOI at it.
+    Registering an existing blob only updates the DOI index.
+    """
+    conn = None
+    try:
+        import time
+        now = time.time()
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE;")
+        cur.execute("""
+            INSERT INTO pdf_blobs (sha256, size, pages, title, has_text, refcount, created_at)
+            VALUES (?, ?, ?, ?, ?, 0, ?)
+            ON CONFLICT(sha256) DO UPDATE SET
+                pages = COALESCE(pdf_blobs.pages, excluded.pages),
+                title = COALESCE(pdf_blobs.title, excluded.title),
+                has_text = COALESCE(pdf_blobs.has_text, excluded.has_text)
+        """, (sha256, size, pages, title, None if has_text is None else int(bool(has_text)), now))
+        _refresh_pdf_blob_refcounts(cur, [sha256])
+        if doi_hash:
+            cur.execute("""
+                INSERT INTO pdf_blob_dois (doi_hash, sha256, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(doi_hash) DO UPDATE SET sha256 = excluded.sha256, updated_at = excluded.updated_at
+            """, (doi_hash, sha256, now))
+        cur.execute("COMMIT;")
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Failed to register PDF blob: {e}")
+        if conn is not None:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+        return False
+
+
+def get_pdf_blob_for_doi(db_path: str, doi_hash: str) -> dict:
+    """
+    Get the stored PDF for a DOI, if any project has one.
+
+    Returns:
+        {"sha256", "size", "pages", "title", "has_text", "refcount"} or None
+    """
+    conn = get_conn(db_path); cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT b.sha256, b.size, b.pages, b.refcount, b.title, b.has_text
+            FROM pdf_blob_dois d JOIN pdf_blobs b ON b.sha256 = d.sha256
+            WHERE d.doi_hash = ?;
+        """, (doi_hash,))
+        row = cur.fetchone()
+        conn.close()
+        if not row:
+            return None
+        return {"sha256": row[0], "size": row[1], "pages": row[2], "refcount": row[3],
+                "title": row[4], "has_text": None if row[5] is None else bool(row[5])}
+    except Exception as e:
+        print(f"Failed to get PDF blob: {e}")
+        conn.close()
+        return None
+
+
+def get_cached_crossref_titles(db_path: str, dois: list) -> dict:
+    """
+    Get cached CrossRef titles for DOIs (matched case-insensitively).
+
+    Returns:
+        {doi as given: title} for the cached DOIs; '' if CrossRef has no title
+    """
+    by_lower = {doi.lower(): doi for doi in dois}
+    titles = {}
+    conn = get_conn(db_path); cur = conn.cursor()
+    try:
+        keys = list(by_lower)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            cur.execute(f"SELECT doi, title FROM crossref_titles WHERE doi IN ({','.join('?' * len(chunk))});", chunk)
+            for doi, title in cur.fetchall():
+                titles[by_lower[doi]] = title
+        conn.close()
+        return titles
+    except Exception as e:
+        print(f"Failed to get cached CrossRef titles: {e}")
+        conn.close()
+        return {}
+
+
+def cache_crossref_titles(db_path: str, titles: dict) -> bool:
+    """Store CrossRef titles ({doi: title or ''})."""
+    conn = None
+    try:
+        import time
+        now = time.time()
+        conn = get_conn(db_path)
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE;")
+        cur.executemany("""
+            INSERT INTO crossref_titles (doi, title, fetched_at) VALUES (?, ?, ?)
+            ON CONFLICT(doi) DO UPDATE SET title = excluded.title, fetched_at = excluded.fetched_at
+        """, [(doi.lower(), title or "", now) for doi, title in titles.items()])
+        cur.execute("COMMIT;")
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"Failed to cache CrossRef titles: {e}")
+        if conn is not None:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+        return False
+
+
 # ============================================================================
 # DOI Batch Management Functions
 # ============================================================================
@@ -13,8 +13,9 @@ from pdf_download_db import (
     get_download_statistics, get_source_rankings,
     get_config_value, set_config_value, cleanup_old_attempts,
     get_retry_queue_ready, init_pdf_download_db,
-    get_pdf_db_connection
+    get_pdf_db_connection, flush_download_attempts, get_circuit_breaker_states
 )
+from pdf_source_registry import notify_sources_changed
 
 
 def init_pdf_analytics_routes(app, verify_admin_func, is_admin_func):
@@ -85,6 +86,7 @@ def init_pdf_analytics_routes(app, verify_admin_func, is_admin_func):
             return error_response
 
         try:
+            flush_download_attempts()
             sources = get_source_rankings()
 
             return jsonify({
@@ -133,6 +135,7 @@ def init_pdf_analytics_routes(app, verify_admin_func, is_admin_func):
 
             conn.commit()
             conn.close()
+            notify_sources_changed()
 
             print(f"[PDF Analytics] {email} {'enabled' if enabled else 'disabled'} source: {source_name}")
 
@@ -187,6 +190,7 @@ def init_pdf_analytics_routes(app, verify_admin_func, is_admin_func):
 
             conn.commit()
             conn.close()
+            notify_sources_changed()
 
             print(f"[PDF Analytics] {email} updated priority for {source_name} to {priority}")
 
@@ -201,6 +205,73 @@ def init_pdf_analytics_routes(app, verify_admin_func, is_admin_func):
             print(f"[PDF Analytics] Error updating priority: {e}")
             return jsonify({"error": "Failed to update priority"}), 500
 
+    @app.post("/api/admin/pdf-analytics/sources/<source_name>/settings")
+    def update_source_settings(source_name: str):
+        """
+        Update the request timeout and/or concurrency limit of a PDF source.
+        Download workers pick the change up within PDF_SOURCE_SETTINGS_REFRESH_SECONDS.
+        Expected JSON: {
+            "email": "admin@example.com",
+            "password": "secret",
+            "timeout": 10,             # seconds, optional
+            "max_concurrency": 2       # lookups at once per worker process, 0 = no limit, optional
+        }
+        """
+        email, error_response = require_admin()
+        if error_response:
+            return error_response
+
+        try:
+            payload = request.get_json(force=True, silent=False)
+            updates = {}
+
+            timeout = payload.get("timeout")
+            if timeout is not None:
+                if not isinstance(timeout, int) or isinstance(timeout, bool) or not 1 <= timeout <= 300:
+                    return jsonify({"error": "Timeout must be an integer between 1 and 300 seconds"}), 400
+                updates["timeout"] = timeout
+
+            max_concurrency = payload.get("max_concurrency")
+            if max_concurrency is not None:
+                if not isinstance(max_concurrency, int) or isinstance(max_concurrency, bool) or max_concurrency < 0:
+                    return jsonify({"error": "max_concurrency must be a non-negative integer"}), 400
+                updates["max_concurrency"] = max_concurrency
+
+            if not updates:
+                return jsonify({"error": "Provide 'timeout' and/or 'max_concurrency'"}), 400
+
+            conn = get_pdf_db_connection()
+            cursor = conn.cursor()
+
+            # Column names come from the fixed keys above
+            assignments = ", ".join(f"{column} = ?" for column in updates)
+            cursor.execute(f"""
+                UPDATE sources
+                SET {assignments}, updated_at = CURRENT_TIMESTAMP
+                WHERE name = ?
+            """, (*updates.values(), source_name))
+
+            if cursor.rowcount == 0:
+                conn.close()
+                return jsonify({"error": "Source not found"}), 404
+
+            conn.commit()
+            conn.close()
+            notify_sources_changed()
+
+            print(f"[PDF Analytics] {email} updated settings for {source_name}: {updates}")
+
+            return jsonify({
+                "ok": True,
+                "message": f"Settings updated for {source_name}",
+                "source": source_name,
+                **updates
+            })
+
+        except Exception as e:
+            print(f"[PDF Analytics] Error updating source settings: {e}")
+            return jsonify({"error": "Failed to update source settings"}), 500
+
     @app.get("/api/admin/pdf-analytics/retry-queue")
     def get_pdf_retry_queue():
         """
@@ -223,6 +294,31 @@ def init_pdf_analytics_routes(app, verify_admin_func, is_admin_func):
             print(f"[PDF Analytics] Error getting retry queue: {e}")
             return jsonify({"error": "Failed to retrieve retry queue"}), 500
 
+    @app.get("/api/admin/pdf-analytics/circuit-breakers")
+    def get_pdf_circuit_breakers():
+        """
+        Get the circuit breaker state of each source, as last reported by the
+        download workers. Sources that never tripped are not listed (closed).
+        """
+        email, error_response = require_admin()
+        if error_response:
+            return error_response
+
+        try:
+            breakers = get_circuit_breaker_states()
+
+            return jsonify({
+                "ok": True,
+                "circuit_breakers": breakers,
+                "open_count": sum(1 for b in breakers if b["state"] != "closed"),
+                "failure_threshold": int(get_config_value("circuit_breaker_failures", "5")),
+                "cooldown_seconds": float(get_config_value("circuit_breaker_cooldown_seconds", "300"))
+            })
+
+        except Exception as e:
+            print(f"[PDF Analytics] Error getting circuit breakers: {e}")
+            return jsonify({"error": "Failed to retrieve circuit breakers"}), 500
+
     @app.get("/api/admin/pdf-analytics/config")
     def get_pdf_config():
         """
@@ -363,6 +459,7 @@ def init_pdf_analytics_routes(app, verify_admin_func, is_admin_func):
             limit = min(request.args.get('limit', default=100, type=int), 1000)
             offset = request.args.get('offset', default=0, type=int)
 
+            flush_download_attempts()
             conn = get_pdf_db_connection()
             cursor = conn.cursor()
 
@@ -457,6 +554,7 @@ def init_pdf_analytics_routes(app, verify_admin_func, is_admin_func):
             project_id = request.args.get('project_id', type=int)
             days = request.args.get('days', default=30, type=int)
 
+            flush_download_attempts()
             conn = get_pdf_db_connection()
             cursor = conn.cursor()
 
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF Bulk Ingest
+Attach many uploaded PDFs to a project's DOIs in one request.
+
+Uploads may be PDFs or ZIP archives of PDFs. Each file is written to a staging
+directory inside the project directory in fixed-size chunks, so a large upload
+is never held in memory, and matched to a DOI by:
+
+    1. a manifest CSV with "filename" and "doi" columns (sent alongside the
+       files, or as manifest.csv inside a ZIP)
+    2. its file name: the DOI itself ("10.1234/abc.pdf" is not a valid file
+       name, so "/" may be written as "_"), or the hash name HARVEST gives
+       downloaded PDFs
+    3. the DOIs and title found in the PDF itself (see pdf_doi_matcher)
+
+All staged files are validated together in the PDF inspection process pool,
+which also reads the identifiers for step 3, and the valid ones are moved into
+place and recorded in the manifest and the shared PDF store.
+ingest_pdf_uploads() returns a report with one entry per file, with how it was
+matched (matched_by: manifest, filename, pdf_doi or pdf_title) and its status:
+
+    attached      the PDF is now the project's PDF for that DOI
+    duplicate     the same DOI appeared earlier in the upload, or the project
+                  already has this exact file for it
+    unmatched     no DOI found for the file
+    unknown_doi   the manifest names a DOI that is not in the project
+    invalid       not a readable PDF
+    not_pdf       not a .pdf or .zip file
+    too_large     above PDF_BULK_UPLOAD_MAX_FILE_MB
+    skipped       beyond PDF_BULK_UPLOAD_MAX_FILES, or PDF_BULK_UPLOAD_MAX_TOTAL_MB
+                  were already staged (ZIP contents count uncompressed)
+"""
+
+import csv
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from harvest_store import get_project_by_id, get_pdf_manifest
+from pdf_inspect import inspect_pdfs
+from pdf_doi_matcher import match_pdfs_to_dois
+from pdf_manager import attach_project_pdf, generate_doi_hash, get_project_pdf_dir
+
+try:
+    from config import (PDF_BULK_UPLOAD_MAX_FILE_MB, PDF_BULK_UPLOAD_MAX_FILES,
+                        PDF_BULK_UPLOAD_MAX_ZIP_MB, PDF_BULK_UPLOAD_MAX_TOTAL_MB)
+except ImportError:
+    PDF_BULK_UPLOAD_MAX_FILE_MB = 100
+    PDF_BULK_UPLOAD_MAX_FILES = 2000
+    PDF_BULK_UPLOAD_MAX_ZIP_MB = 2048
+    PDF_BULK_UPLOAD_MAX_TOTAL_MB = 4096
+
+CHUNK_SIZE = 1024 * 1024
+MANIFEST_NAME = "manifest.csv"
+
+
+class _TooLarge(Exception):
+    pass
+
+
+def _copy_limited(src: BinaryIO, dst_path: str, max_bytes: int) -> int:
+    """Copy a stream to a file in chunks; raise _TooLarge past max_bytes."""
+    written = 0
+    with open(dst_path, "wb") as dst:
+        while True:
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > max_bytes:
+                raise _TooLarge()
+            dst.write(chunk)
+    return written
+
+
+def _ignored_entry(name: str) -> bool:
+    """Directories and the metadata files archivers add (__MACOSX, .DS_Store)."""
+    base = os.path.basename(name)
+    return name.endswith("/") or not base or base.startswith(".") or "__MACOSX/" in name
+
+
+def parse_manifest(data: bytes) -> Dict[str, str]:
+    """
+    Read a manifest CSV with "filename" and "doi" columns.
+    Returns: {lowercased file name: DOI}
+    """
+    mapping = {}
+    try:
+        reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig")))
+        fields = {(name or "").strip().lower(): name for name in reader.fieldnames or []}
+        if "filename" not in fields or "doi" not in fields:
+            print("[PDF Bulk Ingest] Manifest needs 'filename' and 'doi' columns")
+            return {}
+        for row in reader:
+            filename = (row.get(fields["filename"]) or "").strip()
+            doi = (row.get(fields["doi"]) or "").strip()
+            if filename and doi:
+                mapping[os.path.basename(filename).lower()] = doi
+    except (UnicodeDecodeError, csv.Error) as e:
+        print(f"[PDF Bulk Ingest] Could not read manifest: {e}")
+        return {}
+    return mapping
+
+
+def _filename_index(doi_list: List[str]) -> Dict[str, str]:
+    """File name stems (lowercased) that identify each DOI."""
+    index = {}
+    for doi in doi_list:
+        for key in (doi.lower(), doi.lower().replace("/", "_"), generate_doi_hash(doi)):
+            index.setdefault(key, doi)
+    return index
+
+
+def match_filename(filename: str, index: Dict[str, str]) -> Optional[str]:
+    """DOI a file name refers to, or None."""
+    stem = unquote(os.path.basename(filename)).strip().lower()
+    if stem.endswith(".pdf"):
+        stem = stem[:-4]
+    return index.get(stem)
+
+
+class _Staging:
+    """Files of one bulk upload written to a staging directory, with their report entries."""
+
+    def __init__(self, staging_dir: str, max_files: int, max_file_bytes: int, max_total_bytes: int):
+        self.dir = staging_dir
+        self.max_files = max_files
+        self.max_file_bytes = max_file_bytes
+        # A small ZIP can expand to far more than its size (zip bomb)
+        self.max_total_bytes = max_total_bytes
+        self.total_bytes = 0
+        self.files: List[Tuple[Dict, str]] = []   # (report entry, staged path)
+        self.report: List[Dict] = []
+        self.manifest: Dict[str, str] = {}
+        self.count = 0
+
+    def _entry(self, filename: str, status: str = None, message: str = "") -> Dict:
+        entry = {"filename": filename, "doi": None, "status": status, "message": message}
+        self.report.append(entry)
+        return entry
+
+    def add(self, filename: str, stream: BinaryIO, size: int = None) -> None:
+        """Stage one PDF from a stream."""
+        if not filename.lower().endswith(".pdf"):
+            self._entry(filename, "not_pdf", "Not a PDF or ZIP file")
+            return
+        if self.count >= self.max_files:
+            self._entry(filename, "skipped", f"More than {self.max_files} files in one upload")
+            return
+        too_large = f"Larger than {self.max_file_bytes // (1024 * 1024)} MB"
+        over_total = f"Upload larger than {self.max_total_bytes // (1024 * 1024)} MB in total"
+        if size is not None and size > self.max_file_bytes:
+            self._entry(filename, "too_large", too_large)
+            return
+        remaining = self.max_total_bytes - self.total_bytes
+        if size is not None and size > remaining:
+            self._entry(filename, "skipped", over_total)
+            return
+        self.count += 1
+        path = os.path.join(self.dir, f"{self.count}.pdf")
+        try:
+            self.total_bytes += _copy_limited(stream, path, min(self.max_file_bytes, remaining))
+        except _TooLarge:
+            os.remove(path)
+            if self.max_file_bytes <= remaining:
+                self._entry(filename, "too_large", too_large)
+            else:
+                self._entry(filename, "skipped", over_total)
+            return
+        self.files.append((self._entry(filename), path))
+
+    def add_zip(self, filename: str, stream: BinaryIO, max_zip_bytes: int) -> None:
+        """Stage the PDFs (and manifest.csv) inside a ZIP archive."""
+        zip_path = os.path.join(self.dir, f"upload-{len(self.report)}.zip")
+        try:
+            _copy_limited(stream, zip_path, max_zip_bytes)
+            with zipfile.ZipFile(zip_path) as archive:
+                entries = [info for info in archive.infolist() if not _ignored_entry(info.filename)]
+                for info in entries:
+                    if os.path.basename(info.filename).lower() == MANIFEST_NAME:
+                        with archive.open(info) as f:
+                            self.manifest.update(parse_manifest(f.read(self.max_file_bytes)))
+                for info in entries:
+                    if os.path.basename(info.filename).lower() == MANIFEST_NAME:
+                        continue
+                    name = os.path.basename(info.filename)
+                    if not name.lower().endswith(".pdf"):
+                        self._entry(name, "not_pdf", f"Not a PDF (in {filename})")
+                        continue
+                    with archive.open(info) as f:
+                        # file_size comes from the archive; the chunked copy enforces the limit
+                        self.add(name, f, info.file_size)
+        except _TooLarge:
+            self._entry(filename, "too_large", f"ZIP larger than {max_zip_bytes // (1024 * 1024)} MB")
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, NotImplementedError, RuntimeError) as e:
+            self._entry(filename, "invalid", f"Could not read ZIP: {e}")
+        finally:
+            if os.path.exists(zip_path):
+                os.remove(zip_path)
+
+
+def ingest_pdf_uploads(db_path: str, project_id: int, uploads: List[Tuple[str, BinaryIO]],
+                       manifest: Optional[bytes] = None,
+                       max_files: int = PDF_BULK_UPLOAD_MAX_FILES,
+                       max_file_mb: float = PDF_BULK_UPLOAD_MAX_FILE_MB,
+                       max_zip_mb: float = PDF_BULK_UPLOAD_MAX_ZIP_MB,
+                       max_total_mb: float = PDF_BULK_UPLOAD_MAX_TOTAL_MB,
+                       source: str = "bulk_upload", detect_dois: bool = True) -> Optional[Dict]:
+    """
+    Stage, match, validate and attach a batch of uploaded PDFs and ZIP archives.
+
+    Args:
+        uploads: (file name, readable binary stream) pairs
+        manifest: Contents of a manifest CSV (filename, doi), if one was sent
+        detect_dois: Match files the manifest and file names don't cover by
+            the DOIs and title inside the PDF (pdf_doi_matcher)
+
+    Returns:
+        {"files": [report entry, ...], "summary": {status: count}},
+        or None if the project does not exist
+    """
+    project = get_project_by_id(db_path, project_id)
+    if not project:
+        print(f"[PDF Bulk Ingest] Project {project_id} not found")
+        return None
+
+    project_dir = get_project_pdf_dir(project_id)
+    Path(project_dir).mkdir(parents=True, exist_ok=True)
+    # Inside the project directory so attaching a file is a rename
+    staging = _Staging(tempfile.mkdtemp(prefix=".ingest-", dir=project_dir),
+                       max_files, int(max_file_mb * 1024 * 1024), int(max_total_mb * 1024 * 1024))
+    try:
+        for filename, stream in uploads:
+            filename = os.path.basename(filename or "")
+            if filename.lower().endswith(".zip"):
+                staging.add_zip(filename, stream, int(max_zip_mb * 1024 * 1024))
+            else:
+                staging.add(filename, stream)
+        if manifest:
+            staging.manifest.update(parse_manifest(manifest))
+
+        project_dois = {doi.lower(): doi for doi in project["doi_list"]}
+        index = _filename_index(project["doi_list"])
+        matched = []
+        for entry, path in staging.files:
+            manifest_doi = staging.manifest.get(entry["filename"].lower())
+            if manifest_doi:
+                doi = project_dois.get(manifest_doi.lower())
+                if not doi:
+                    entry.update(doi=manifest_doi, status="unknown_doi", message="DOI is not in this project")
+                    continue
+                entry.update(doi=doi, matched_by="manifest")
+            else:
+                doi = match_filename(entry["filename"], index)
+                if doi:
+                    entry.update(doi=doi, matched_by="filename")
+                elif not detect_dois:
+                    entry.update(status="unmatched", message="No DOI in the manifest or file name")
+                    continue
+            matched.append((entry, path))
+
+        # One pool pass validates every file and reads the identifiers of all of them
+        results = inspect_pdfs([path for _, path in matched], extract_identifiers=detect_dois)
+        undetected = [i for i, ((entry, _), info) in enumerate(zip(matched, results))
+                      if not entry["doi"] and not info.get("error")]
+        if undetected:
+            detected = match_pdfs_to_dois(db_path, project["doi_list"], [results[i] for i in undetected])
+            for i, match in zip(undetected, detected):
+                if match:
+                    matched[i][0].update(match)
+
+        existing = {e["doi"]: e for e in get_pdf_manifest(db_path, project_id) if e["doi"]}
+        attached = set()
+        # Files the uploader named a DOI for win over detected ones
+        order = sorted(range(len(matched)), key=lambda i: matched[i][0].get("matched_by", "").startswith("pdf_"))
+        for i in order:
+            (entry, path), info = matched[i], results[i]
+            if info.get("error"):
+                entry.update(status="invalid", message=info["error"])
+                continue
+            doi = entry["doi"]
+            if not doi:
+                entry.update(status="unmatched", message="No DOI in the manifest, file name or PDF")
+                continue
+            if doi in attached:
+                entry.update(status="duplicate", message="Another file in this upload has the same DOI")
+                continue
+            if info.get("sha256") and existing.get(doi, {}).get("sha256") == info["sha256"]:
+                entry.update(status="duplicate", message="Already attached")
+                continue
+            filepath = attach_project_pdf(db_path, project_id, doi, path, info, source, project_dir)
+            if not filepath:
+                entry.update(status="invalid", message="Could not attach file")
+                continue
+            attached.add(doi)
+            entry.update(status="attached", message="Replaced existing PDF" if doi in existing else "",
+                         stored_as=os.path.basename(filepath), pages=info.get("pages"))
+    finally:
+        shutil.rmtree(staging.dir, ignore_errors=True)
+
+    summary = {}
+    for entry in staging.report:
+        summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+    print(f"[PDF Bulk Ingest] Project {project_id}: {summary}")
+    return {"files": staging.report, "summary": summary}
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF DOI Matcher
+Find which of a project's DOIs an uploaded PDF belongs to, without the uploader
+naming it.
+
+The PDFs are read in the pdf_inspect process pool (inspect_pdfs with
+extract_identifiers), which returns the DOIs found in each file's XMP/Info
+metadata and first page, and the first page's heading. A file is then matched:
+
+    1. by DOI: the first candidate that is one of the project's DOIs. Metadata
+       candidates come first, since a first page may also cite other articles.
+    2. by title: its Info title or first-page heading compared with the CrossRef
+       titles of the project's DOIs. Titles are fetched in batches only for
+       files that get this far, and cached in harvest.db (crossref_titles).
+       The best title must reach PDF_DOI_TITLE_MATCH_THRESHOLD and clearly beat
+       the runner-up.
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+
+from harvest_store import get_cached_crossref_titles, cache_crossref_titles
+
+try:
+    from config import PDF_DOI_TITLE_MATCH_THRESHOLD
+except ImportError:
+    PDF_DOI_TITLE_MATCH_THRESHOLD = 0.9
+
+try:
+    from config import UNPAYWALL_EMAIL
+except ImportError:
+    UNPAYWALL_EMAIL = None
+
+# Shorter titles ("Introduction", "Untitled") match too many articles
+MIN_TITLE_WORDS = 3
+# How much better the best title must be than the next one
+TITLE_MATCH_MARGIN = 0.05
+# Characters a DOI candidate read from page text may have run on after
+_DOI_BREAKS = ".-_;:/)]"
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase ASCII words only, so punctuation, accents and line breaks don't count."""
+    text = unicodedata.normalize("NFKD", title or "").encode("ascii", "ignore").decode()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+
+def match_doi_candidates(candidates: List[str], project_dois: Dict[str, str]) -> Optional[str]:
+    """
+    First candidate that is a project DOI (project_dois: {lowercased DOI: DOI}).
+    A candidate that ran on into following text ("10.1234/abc.Received") also
+    matches the project DOI it starts with.
+    """
+    for candidate in candidates:
+        candidate = candidate.lower()
+        if candidate in project_dois:
+            return project_dois[candidate]
+        for end in range(len(candidate) - 1, candidate.find("/"), -1):
+            if candidate[end] in _DOI_BREAKS and candidate[:end] in project_dois:
+                return project_dois[candidate[:end]]
+    return None
+
+
+def get_project_titles(db_path: str, dois: List[str], fetch: bool = True) -> Dict[str, str]:
+    """
+    CrossRef titles of DOIs from the cache; missing ones are fetched and cached
+    if fetch is set. Returns: {doi: normalized title} for DOIs with a title
+    """
+    titles = get_cached_crossref_titles(db_path, dois)
+    missing = [doi for doi in dois if doi not in titles]
+    if missing and fetch:
+        from pdf_sources import fetch_crossref_titles
+        fetched, errors = fetch_crossref_titles(missing, UNPAYWALL_EMAIL)
+        for error in errors:
+            print(f"[PDF DOI Matcher] {error}")
+        if fetched:
+            cache_crossref_titles(db_path, fetched)
+            titles.update(fetched)
+        print(f"[PDF DOI Matcher] Fetched {len(fetched)} of {len(missing)} uncached CrossRef titles")
+    return {doi: normalize_title(title) for doi, title in titles.items() if title}
+
+
+def match_title(pdf_titles: List[str], titles: Dict[str, str],
+                threshold: float = PDF_DOI_TITLE_MATCH_THRESHOLD) -> Optional[Dict]:
+    """
+    Best fuzzy match of a PDF's possible titles among {doi: normalized title}.
+    Returns: {"doi", "score"} or None if no title is close enough or two are
+    about equally close
+    """
+    best = None
+    for pdf_title in pdf_titles:
+        pdf_title = normalize_title(pdf_title)
+        if len(pdf_title.split()) < MIN_TITLE_WORDS:
+            continue
+        matcher = SequenceMatcher(autojunk=False)
+        matcher.set_seq2(pdf_title)
+        scores = []
+        for doi, title in titles.items():
+            matcher.set_seq1(title)
+            # quick_ratio is an upper bound of ratio
+            if matcher.real_quick_ratio() < threshold - TITLE_MATCH_MARGIN or \
+                    matcher.quick_ratio() < threshold - TITLE_MATCH_MARGIN:
+                continue
+            scores.append((matcher.ratio(), doi))
+        scores.sort(reverse=True)
+        if not scores or scores[0][0] < threshold:
+            continue
+        if len(scores) > 1 and scores[0][0] - scores[1][0] < TITLE_MATCH_MARGIN:
+            continue
+        if best is None or scores[0][0] > best["score"]:
+            best = {"doi": scores[0][1], "score": round(scores[0][0], 3)}
+    return best
+
+
+def match_pdfs_to_dois(db_path: str, doi_list: List[str], inspections: List[Dict],
+                       fetch_titles: bool = True) -> List[Optional[Dict]]:
+    """
+    Match inspected PDFs (inspect_pdfs results with extract_identifiers) to a
+    project's DOIs.
+
+    Returns: one entry per inspection, in order: {"doi", "matched_by"} with
+    matched_by "pdf_doi" or "pdf_title" (plus "score"), or None if unmatched
+    """
+    project_dois = {doi.lower(): doi for doi in doi_list}
+    matches = []
+    for info in inspections:
+        doi = match_doi_candidates(info.get("doi_candidates") or [], project_dois)
+        matches.append({"doi": doi, "matched_by": "pdf_doi"} if doi else None)
+
+    pending = [i for i, info in enumerate(inspections)
+               if matches[i] is None and (info.get("title") or info.get("heading"))]
+    if pending:
+        titles = get_project_titles(db_path, doi_list, fetch=fetch_titles)
+        for i in pending:
+            info = inspections[i]
+            match = match_title([t for t in (info.get("title"), info.get("heading")) if t], titles)
+            if match:
+                matches[i] = dict(match, matched_by="pdf_title")
+
+    found = sum(1 for match in matches if match)
+    print(f"[PDF DOI Matcher] Matched {found} of {len(inspections)} PDFs to DOIs")
+    return matches
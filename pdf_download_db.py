@@ -7,12 +7,37 @@ Separate SQLite database for tracking PDF download attempts, source performance,
 
 import sqlite3
 import os
+import time
+import queue
+import atexit
+import threading
 from typing import List, Dict, Optional, Tuple
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 
+from harvest_metrics import SQLITE_CONNECTION_FACTORY
+
 PDF_DB_PATH = "pdf_downloads.db"
 
+try:
+    from config import PDF_ATTEMPT_LOG_FLUSH_SECONDS
+except ImportError:
+    PDF_ATTEMPT_LOG_FLUSH_SECONDS = 1.0
+
+# Download attempts are buffered and written in batches (see AttemptLogWriter)
+ATTEMPT_LOG_FLUSH_SECONDS = PDF_ATTEMPT_LOG_FLUSH_SECONDS
+ATTEMPT_LOG_BATCH_SIZE = 500
+ATTEMPT_LOG_MAX_PENDING = 50000
+
+_HOST_RATE_LIMITS_TABLE = """
+    CREATE TABLE IF NOT EXISTS host_rate_limits (
+        host TEXT PRIMARY KEY,
+        tokens REAL NOT NULL,
+        updated_at REAL NOT NULL
+    )
+"""
+_host_rate_limit_dbs = set()  # Databases whose host_rate_limits table this process has checked
+
 # Connection pool to reduce database locking
 _db_connection_pool = {}
 _db_pool_lock = None
@@ -26,7 +51,7 @@ def get_pdf_db_connection(db_path: str = PDF_DB_PATH) -> sqlite3.Connection:
     if not os.path.exists(db_path):
         init_pdf_download_db(db_path)
     
-    conn = sqlite3.connect(db_path, timeout=30.0, check_same_thread=False)
+    conn = sqlite3.connect(db_path, timeout=30.0, check_same_thread=False, factory=SQLITE_CONNECTION_FACTORY)
     
     # Enable WAL mode for better concurrent access
     conn.execute("PRAGMA journal_mode=WAL")
@@ -59,11 +84,18 @@ def init_pdf_download_db(db_path: str = PDF_DB_PATH) -> bool:
                 priority INTEGER DEFAULT 100,
                 description TEXT,
                 requires_library TEXT,
+                max_concurrency INTEGER DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
 
+        # Older databases lack the per-source concurrency limit
+        cursor.execute("PRAGMA table_info(sources)")
+        source_columns = {row[1] for row in cursor.fetchall()}
+        if "max_concurrency" not in source_columns:
+            cursor.execute("ALTER TABLE sources ADD COLUMN max_concurrency INTEGER DEFAULT 0")
+
         # Table 2: Download Attempts - Log every download attempt
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS download_attempts (
@@ -138,6 +170,39 @@ def init_pdf_download_db(db_path: str = PDF_DB_PATH) -> bool:
             )
         """)
 
+        # Table 7: Circuit Breakers - Last known breaker state per source, written by
+        # download workers on state changes so the admin API can show it
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS source_circuit_breakers (
+                source_name TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                consecutive_failures INTEGER DEFAULT 0,
+                opened_at REAL,
+                cooldown_seconds REAL,
+                last_failure TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Table 8: Source Prefix Stats - Per publisher (DOI prefix) lookup outcomes,
+        # maintained by the attempt writer for adaptive source ranking
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS source_prefix_stats (
+                doi_prefix TEXT NOT NULL,
+                source_name TEXT NOT NULL,
+                attempts INTEGER DEFAULT 0,
+                successes INTEGER DEFAULT 0,
+                total_time_ms REAL DEFAULT 0.0,
+                timed_attempts INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (doi_prefix, source_name)
+            )
+        """)
+
+        # Table 9: Host Rate Limits - Token bucket per upstream host, shared by every
+        # process that makes source requests (download workers and the backend)
+        cursor.execute(_HOST_RATE_LIMITS_TABLE)
+
         # Create indexes for performance
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_attempts_doi ON download_attempts(doi)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_attempts_project ON download_attempts(project_id)")
@@ -150,6 +215,7 @@ def init_pdf_download_db(db_path: str = PDF_DB_PATH) -> bool:
         default_sources = [
             ("unpaywall", 1, "https://api.unpaywall.org/v2/", 0, 10, 10, "Unpaywall REST API - free open access database", None),
             ("unpywall", 1, None, 0, 10, 20, "Unpywall library fallback for Unpaywall API", "unpywall"),
+            ("openalex", 1, "https://api.openalex.org/", 0, 15, 12, "OpenAlex - open access locations, looked up in batches of 50 DOIs per download job", None),
             ("biorxiv_medrxiv", 1, "https://api.biorxiv.org/", 0, 15, 25, "bioRxiv/medRxiv - preprint repositories for life sciences", None),
             ("europe_pmc", 1, "https://www.ebi.ac.uk/europepmc/webservices/rest/", 0, 15, 30, "Europe PMC REST API - biomedical literature", None),
             ("pmc_enhanced", 1, "https://www.ncbi.nlm.nih.gov/pmc/", 0, 15, 35, "Enhanced PubMed Central via E-utilities", None),
@@ -181,7 +247,14 @@ def init_pdf_download_db(db_path: str = PDF_DB_PATH) -> bool:
             ("retry_delay_minutes", "60", "Base delay in minutes before retrying failed downloads"),
             ("max_retry_attempts", "3", "Maximum number of retry attempts for temporary failures"),
             ("cleanup_retention_days", "90", "Number of days to keep download attempt history"),
-            ("rate_limit_delay_seconds", "1", "Delay between requests to respect API rate limits"),
+            ("rate_limit_delay_seconds", "1", "Minimum delay between requests to hosts without a specific rate limit"),
+            ("download_workers", "4", "Number of DOIs downloaded in parallel"),
+            ("openalex_prefetch", "1", "Look up OA PDF URLs for all DOIs of a job in batched OpenAlex requests before trying sources per DOI"),
+            ("hedged_source_count", "3", "Sources queried concurrently per DOI before falling back to one at a time (1 = sequential)"),
+            ("circuit_breaker_failures", "5", "Consecutive timeouts/server errors/rate limits before a source is skipped"),
+            ("circuit_breaker_cooldown_seconds", "300", "Seconds a source is skipped after its circuit opens before one probe request is allowed"),
+            ("adaptive_source_ranking", "1", "Order sources per publisher by Thompson sampling over success rate and lookup time (0 = global success rate order)"),
+            ("negative_cache_ttl_days", "14", "Days a source is skipped for a DOI after a permanent failure (not_found, paywall, authentication, invalid_pdf); 0 = never skip"),
             ("user_agent_rotation", "1", "Enable rotating User-Agent headers"),
         ]
 
@@ -201,6 +274,185 @@ def init_pdf_download_db(db_path: str = PDF_DB_PATH) -> bool:
         return False
 
 
+class AttemptLogWriter:
+    """
+    Background writer for download_attempts, source_performance and source_prefix_stats.
+
+    log_download_attempt() only appends to an in-memory queue, so download
+    threads never wait on the tracking database. A single thread per database
+    drains the queue and every ATTEMPT_LOG_FLUSH_SECONDS (or ATTEMPT_LOG_BATCH_SIZE
+    attempts) writes all buffered attempts plus the per-source and per-(DOI
+    prefix, source) deltas in one transaction, merging the deltas into
+    source_performance and source_prefix_stats with UPSERTs.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._queue = queue.Queue(maxsize=ATTEMPT_LOG_MAX_PENDING)
+        self._dropped = 0
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=f"pdf-attempt-writer-{os.path.basename(db_path)}")
+        self._thread.start()
+
+    def submit(self, row: tuple) -> bool:
+        """Queue one download_attempts row. Never blocks; drops the row if the buffer is full."""
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self._dropped += 1
+            if self._dropped % 1000 == 1:
+                print(f"[PDF DB] Attempt log buffer full, dropped {self._dropped} attempt(s)")
+            return False
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until everything queued so far has been written."""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _run(self):
+        while True:
+            batch, waiters = [], []
+            item = self._queue.get()
+            deadline = time.monotonic() + ATTEMPT_LOG_FLUSH_SECONDS
+            while True:
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                    break
+                batch.append(item)
+                if len(batch) >= ATTEMPT_LOG_BATCH_SIZE:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(batch)
+            for waiter in waiters:
+                waiter.set()
+
+    def _write_batch(self, batch: List[tuple]) -> None:
+        # Per-source deltas: attempts, successes, failures, summed and counted
+        # response times, and the latest success/failure timestamps
+        deltas = {}
+        for row in batch:
+            source_name, success, response_time_ms, timestamp = row[2], row[3], row[6], row[9]
+            d = deltas.setdefault(source_name, [0, 0, 0, 0.0, 0, None, None])
+            d[0] += 1
+            if success:
+                d[1] += 1
+                d[5] = timestamp
+            else:
+                d[2] += 1
+                d[6] = timestamp
+            if response_time_ms is not None:
+                d[3] += response_time_ms
+                d[4] += 1
+        prefix_deltas = _prefix_stat_deltas(batch)
+
+        try:
+            conn = get_pdf_db_connection(self.db_path)
+            try:
+                with conn:
+                    conn.executemany("""
+                        INSERT INTO download_attempts
+                        (project_id, doi, source_name, success, failure_reason, failure_category,
+                         response_time_ms, file_size_bytes, pdf_url, timestamp)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, batch)
+
+                    # ?9/?10 are the summed/counted response times of the batch; the
+                    # running average is weighted by total attempts, as before batching
+                    conn.executemany("""
+                        INSERT INTO source_performance
+                        (source_name, total_attempts, success_count, failure_count,
+                         avg_response_time_ms, success_rate, last_success_at, last_failure_at, last_updated)
+                        VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, CURRENT_TIMESTAMP)
+                        ON CONFLICT(source_name) DO UPDATE SET
+                            total_attempts = total_attempts + ?2,
+                            success_count = success_count + ?3,
+                            failure_count = failure_count + ?4,
+                            avg_response_time_ms = CASE WHEN ?10 > 0
+                                THEN (avg_response_time_ms * total_attempts + ?9) / (total_attempts + ?10)
+                                ELSE avg_response_time_ms END,
+                            success_rate = (success_count + ?3) * 100.0 / (total_attempts + ?2),
+                            last_success_at = COALESCE(?7, last_success_at),
+                            last_failure_at = COALESCE(?8, last_failure_at),
+                            last_updated = CURRENT_TIMESTAMP
+                    """, [
+                        (source_name, total, successes, failures,
+                         (time_sum / time_count) if time_count else 0.0,
+                         successes * 100.0 / total, last_success, last_failure, time_sum, time_count)
+                        for source_name, (total, successes, failures, time_sum, time_count,
+                                          last_success, last_failure) in deltas.items()
+                    ])
+                    _merge_prefix_stat_deltas(conn, prefix_deltas)
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"[PDF DB] Error writing {len(batch)} download attempts: {e}")
+
+
+def _prefix_stat_deltas(rows: List[tuple]) -> Dict[Tuple[str, str], List]:
+    """
+    Fold download_attempts rows into per-(DOI prefix, source) deltas:
+    [attempts, successes, summed response time, timed attempts].
+    A failed "<source>_download" takes back the success of the lookup that
+    returned the URL, since the source did not actually produce a PDF.
+    """
+    from pdf_sources import extract_doi_prefix
+
+    deltas = {}
+    for row in rows:
+        doi, source_name, success, response_time_ms = row[1], row[2], row[3], row[6]
+        prefix = extract_doi_prefix(doi or "")
+        if not prefix:
+            continue
+        if source_name.endswith("_download"):
+            if not success:
+                deltas.setdefault((prefix, source_name[:-len("_download")]), [0, 0, 0.0, 0])[1] -= 1
+            continue
+        d = deltas.setdefault((prefix, source_name), [0, 0, 0.0, 0])
+        d[0] += 1
+        d[1] += 1 if success else 0
+        if response_time_ms is not None:
+            d[2] += response_time_ms
+            d[3] += 1
+    return deltas
+
+
+def _merge_prefix_stat_deltas(conn: sqlite3.Connection, deltas: Dict[Tuple[str, str], List]) -> None:
+    conn.executemany("""
+        INSERT INTO source_prefix_stats
+        (doi_prefix, source_name, attempts, successes, total_time_ms, timed_attempts, updated_at)
+        VALUES (?1, ?2, ?3, MAX(?4, 0), ?5, ?6, CURRENT_TIMESTAMP)
+        ON CONFLICT(doi_prefix, source_name) DO UPDATE SET
+            attempts = attempts + ?3,
+            successes = MAX(successes + ?4, 0),
+            total_time_ms = total_time_ms + ?5,
+            timed_attempts = timed_attempts + ?6,
+            updated_at = CURRENT_TIMESTAMP
+    """, [(prefix, source_name, *d) for (prefix, source_name), d in deltas.items()])
+
+
+_attempt_writers: Dict[str, AttemptLogWriter] = {}
+_attempt_writers_lock = threading.Lock()
+
+
+def _get_attempt_writer(db_path: str) -> AttemptLogWriter:
+    with _attempt_writers_lock:
+        writer = _attempt_writers.get(db_path)
+        if writer is None:
+            writer = AttemptLogWriter(db_path)
+            _attempt_writers[db_path] = writer
+        return writer
+
+
 def log_download_attempt(
     project_id: int,
     doi: str,
@@ -212,116 +464,44 @@ def log_download_attempt(
     file_size_bytes: Optional[int] = None,
     pdf_url: Optional[str] = None,
     db_path: str = PDF_DB_PATH
-) -> int:
+) -> bool:
     """
-    Log a download attempt to the database.
-    Returns the attempt ID, or -1 on error.
+    Queue a download attempt for the background writer, which also updates the
+    aggregated source_performance metrics. Does not wait for the database.
+    Returns True if the attempt was queued, False on error.
     """
     try:
-        conn = get_pdf_db_connection(db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO download_attempts
-            (project_id, doi, source_name, success, failure_reason, failure_category,
-             response_time_ms, file_size_bytes, pdf_url)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (project_id, doi, source_name, success, failure_reason, failure_category,
-              response_time_ms, file_size_bytes, pdf_url))
-
-        attempt_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-
-        # Update aggregated performance metrics
-        update_source_performance(source_name, success, response_time_ms, db_path)
-
-        return attempt_id
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        return _get_attempt_writer(db_path).submit((
+            project_id, doi, source_name, 1 if success else 0, failure_reason, failure_category,
+            response_time_ms, file_size_bytes, pdf_url, timestamp
+        ))
 
     except Exception as e:
         print(f"[PDF DB] Error logging download attempt: {e}")
-        return -1
+        return False
 
 
-def update_source_performance(
-    source_name: str,
-    success: bool,
-    response_time_ms: Optional[int] = None,
-    db_path: str = PDF_DB_PATH
-) -> bool:
+def flush_download_attempts(db_path: Optional[str] = None, timeout: float = 10.0) -> bool:
     """
-    Update aggregated performance metrics for a source.
-    Returns True on success, False on failure.
+    Wait until queued download attempts are written (all databases if db_path is None).
+    Readers of download_attempts/source_performance call this first.
     """
-    try:
-        conn = get_pdf_db_connection(db_path)
-        cursor = conn.cursor()
-
-        # Get current metrics
-        cursor.execute("""
-            SELECT total_attempts, success_count, failure_count, avg_response_time_ms
-            FROM source_performance
-            WHERE source_name = ?
-        """, (source_name,))
-
-        row = cursor.fetchone()
-        if not row:
-            # Initialize if not exists
-            cursor.execute("""
-                INSERT INTO source_performance (source_name, total_attempts, success_count, failure_count)
-                VALUES (?, 0, 0, 0)
-            """, (source_name,))
-            row = (0, 0, 0, 0.0)
-
-        total, success_count, failure_count, avg_time = row
-
-        # Update counts
-        total += 1
-        if success:
-            success_count += 1
-        else:
-            failure_count += 1
-
-        # Update average response time
-        if response_time_ms is not None:
-            if avg_time == 0:
-                new_avg_time = float(response_time_ms)
-            else:
-                new_avg_time = ((avg_time * (total - 1)) + response_time_ms) / total
-        else:
-            new_avg_time = avg_time
-
-        # Calculate success rate
-        success_rate = (success_count / total * 100.0) if total > 0 else 0.0
-
-        # Update timestamp based on success/failure
-        timestamp_field = "last_success_at" if success else "last_failure_at"
+    with _attempt_writers_lock:
+        writers = [w for path, w in _attempt_writers.items() if db_path is None or path == db_path]
+    return all(writer.flush(timeout) for writer in writers)
 
-        cursor.execute(f"""
-            UPDATE source_performance
-            SET total_attempts = ?,
-                success_count = ?,
-                failure_count = ?,
-                avg_response_time_ms = ?,
-                success_rate = ?,
-                {timestamp_field} = CURRENT_TIMESTAMP,
-                last_updated = CURRENT_TIMESTAMP
-            WHERE source_name = ?
-        """, (total, success_count, failure_count, new_avg_time, success_rate, source_name))
-
-        conn.commit()
-        conn.close()
-        return True
 
-    except Exception as e:
-        print(f"[PDF DB] Error updating source performance: {e}")
-        return False
+atexit.register(flush_download_attempts)
 
 
 def get_source_rankings(db_path: str = PDF_DB_PATH) -> List[Dict]:
     """
     Get sources ranked by performance (success rate and speed).
     Returns list of source dicts with performance metrics.
+
+    Called for every DOI, so it does not wait for buffered attempts; metrics
+    lag by at most ATTEMPT_LOG_FLUSH_SECONDS.
     """
     try:
         conn = get_pdf_db_connection(db_path)
@@ -330,7 +510,8 @@ def get_source_rankings(db_path: str = PDF_DB_PATH) -> List[Dict]:
         cursor.execute("""
             SELECT s.name, s.enabled, s.priority, s.requires_library,
                    sp.success_rate, sp.avg_response_time_ms, sp.total_attempts,
-                   sp.success_count, sp.failure_count, s.description
+                   sp.success_count, sp.failure_count, s.description,
+                   s.timeout, s.max_concurrency
             FROM sources s
             LEFT JOIN source_performance sp ON s.name = sp.source_name
             WHERE s.enabled = 1
@@ -349,7 +530,9 @@ def get_source_rankings(db_path: str = PDF_DB_PATH) -> List[Dict]:
                 "total_attempts": row[6] or 0,
                 "success_count": row[7] or 0,
                 "failure_count": row[8] or 0,
-                "description": row[9] or ""
+                "description": row[9] or "",
+                "timeout": row[10],
+                "max_concurrency": row[11] or 0
             })
 
         conn.close()
@@ -398,41 +581,127 @@ def record_publisher_success(
     Record a successful download for a publisher to learn patterns.
     Returns True on success, False on failure.
     """
+    try:
+        conn = get_pdf_db_connection(db_path)
+        try:
+            with conn:
+                # One pattern per prefix (doi_prefix is UNIQUE): successes of the
+                # recorded source are counted, other sources leave it unchanged
+                conn.execute("""
+                    INSERT INTO publisher_patterns (doi_prefix, publisher_name, successful_source, url_pattern)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(doi_prefix) DO UPDATE SET
+                        success_count = success_count + 1,
+                        last_success_at = CURRENT_TIMESTAMP,
+                        url_pattern = COALESCE(excluded.url_pattern, url_pattern)
+                    WHERE successful_source = excluded.successful_source
+                """, (doi_prefix, publisher_name, source_name, url_pattern))
+        finally:
+            conn.close()
+        return True
+
+    except Exception as e:
+        print(f"[PDF DB] Error recording publisher success: {e}")
+        return False
+
+
+def get_prefix_source_stats(doi_prefix: str, db_path: str = PDF_DB_PATH) -> Dict[str, Dict]:
+    """
+    Lookup statistics of each source for one DOI prefix (publisher).
+    Returns {source_name: {"attempts", "successes", "total_time_ms", "timed_attempts"}}.
+
+    Called for every DOI, so like get_source_rankings it does not wait for
+    buffered attempts.
+    """
     try:
         conn = get_pdf_db_connection(db_path)
         cursor = conn.cursor()
 
-        # Check if pattern exists
         cursor.execute("""
-            SELECT id, success_count FROM publisher_patterns
-            WHERE doi_prefix = ? AND successful_source = ?
-        """, (doi_prefix, source_name))
+            SELECT source_name, attempts, successes, total_time_ms, timed_attempts
+            FROM source_prefix_stats
+            WHERE doi_prefix = ?
+        """, (doi_prefix,))
 
-        row = cursor.fetchone()
+        stats = {
+            row[0]: {"attempts": row[1], "successes": row[2], "total_time_ms": row[3], "timed_attempts": row[4]}
+            for row in cursor.fetchall()
+        }
+        conn.close()
+        return stats
 
-        if row:
-            # Update existing pattern
-            cursor.execute("""
-                UPDATE publisher_patterns
-                SET success_count = success_count + 1,
-                    last_success_at = CURRENT_TIMESTAMP,
-                    url_pattern = COALESCE(?, url_pattern)
-                WHERE id = ?
-            """, (url_pattern, row[0]))
-        else:
-            # Insert new pattern
-            cursor.execute("""
-                INSERT INTO publisher_patterns (doi_prefix, publisher_name, successful_source, url_pattern)
-                VALUES (?, ?, ?, ?)
-            """, (doi_prefix, publisher_name, source_name, url_pattern))
+    except Exception as e:
+        print(f"[PDF DB] Error getting prefix source stats: {e}")
+        return {}
+
+
+def rebuild_prefix_source_stats(db_path: str = PDF_DB_PATH) -> int:
+    """
+    Recompute source_prefix_stats from download_attempts (e.g. for history
+    logged before the table existed). Returns the number of rows written, -1 on error.
+    """
+    flush_download_attempts(db_path)
+    try:
+        conn = get_pdf_db_connection(db_path)
+        try:
+            rows = conn.execute("""
+                SELECT project_id, doi, source_name, success, failure_reason, failure_category,
+                       response_time_ms
+                FROM download_attempts
+                ORDER BY id
+            """).fetchall()
+            deltas = _prefix_stat_deltas(rows)
+            with conn:
+                conn.execute("DELETE FROM source_prefix_stats")
+                _merge_prefix_stat_deltas(conn, deltas)
+        finally:
+            conn.close()
+        print(f"[PDF DB] Rebuilt source_prefix_stats from {len(rows)} download attempts")
+        return len(deltas)
+
+    except Exception as e:
+        print(f"[PDF DB] Error rebuilding prefix source stats: {e}")
+        return -1
+
+
+def get_negative_cached_sources(doi: str, ttl_days: float, db_path: str = PDF_DB_PATH) -> Dict[str, str]:
+    """
+    Sources whose most recent attempt for this DOI, within the last ttl_days,
+    failed permanently (see pdf_sources.is_temporary_failure). A failed
+    download of a URL a source returned ("<source>_download") counts against
+    that source. A later success or temporary failure clears the entry.
+    Returns {source_name: failure_category}.
+    """
+    from pdf_sources import is_temporary_failure
+
+    if ttl_days <= 0:
+        return {}
+    try:
+        conn = get_pdf_db_connection(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT source_name, success, failure_category
+            FROM download_attempts
+            WHERE doi = ? AND timestamp >= datetime('now', ?)
+            ORDER BY id
+        """, (doi, f"-{ttl_days} days"))
+
+        cached = {}
+        for source_name, success, failure_category in cursor.fetchall():
+            if source_name.endswith("_download"):
+                source_name = source_name[:-len("_download")]
+            if success or not failure_category or is_temporary_failure(failure_category):
+                cached.pop(source_name, None)
+            else:
+                cached[source_name] = failure_category
 
-        conn.commit()
         conn.close()
-        return True
+        return cached
 
     except Exception as e:
-        print(f"[PDF DB] Error recording publisher success: {e}")
-        return False
+        print(f"[PDF DB] Error reading negative cache: {e}")
+        return {}
 
 
 def add_to_retry_queue(
@@ -440,11 +709,14 @@ def add_to_retry_queue(
     doi: str,
     failure_category: str,
     retry_delay_minutes: int = 60,
-    db_path: str = PDF_DB_PATH
+    db_path: str = PDF_DB_PATH,
+    max_retry_attempts: Optional[int] = None
 ) -> bool:
     """
     Add a failed DOI to the retry queue with scheduled retry time.
-    Returns True on success, False on failure.
+    With max_retry_attempts, a DOI that has used up its retries is removed
+    from the queue instead.
+    Returns True if the DOI was scheduled, False if it was dropped or on failure.
     """
     try:
         conn = get_pdf_db_connection(db_path)
@@ -459,15 +731,22 @@ def add_to_retry_queue(
         row = cursor.fetchone()
         retry_count = row[0] + 1 if row else 0
 
-        # Exponential backoff: base_delay * 2^retry_count
+        if max_retry_attempts is not None and retry_count >= max_retry_attempts:
+            cursor.execute("DELETE FROM retry_queue WHERE project_id = ? AND doi = ?", (project_id, doi))
+            conn.commit()
+            conn.close()
+            print(f"[PDF DB] Giving up on {doi} after {retry_count} retries")
+            return False
+
+        # Exponential backoff: base_delay * 2^retry_count. Times are stored as
+        # UTC text like CURRENT_TIMESTAMP so they compare correctly in SQL.
         delay_minutes = retry_delay_minutes * (2 ** retry_count)
-        next_retry = datetime.now() + timedelta(minutes=delay_minutes)
 
         cursor.execute("""
             INSERT OR REPLACE INTO retry_queue
             (project_id, doi, failure_category, retry_count, next_retry_at, last_attempted_at)
-            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        """, (project_id, doi, failure_category, retry_count, next_retry))
+            VALUES (?, ?, ?, ?, datetime('now', ?), CURRENT_TIMESTAMP)
+        """, (project_id, doi, failure_category, retry_count, f"+{delay_minutes} minutes"))
 
         conn.commit()
         conn.close()
@@ -478,6 +757,50 @@ def add_to_retry_queue(
         return False
 
 
+def claim_retry_queue_ready(limit: int = 50, lease_seconds: int = 600,
+                            db_path: str = PDF_DB_PATH) -> List[Dict]:
+    """
+    Claim up to `limit` ready retry queue entries for one drainer.
+    Claimed entries have next_retry_at pushed lease_seconds ahead, so other
+    drainers skip them and they become ready again if this one dies.
+    Returns list of retry dicts (same fields as get_retry_queue_ready).
+    """
+    try:
+        conn = get_pdf_db_connection(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT id, project_id, doi, failure_category, retry_count
+            FROM retry_queue
+            WHERE next_retry_at <= CURRENT_TIMESTAMP
+            ORDER BY next_retry_at ASC
+            LIMIT ?
+        """, (limit,))
+
+        claimed = []
+        for row in cursor.fetchall():
+            cursor.execute("""
+                UPDATE retry_queue SET next_retry_at = datetime('now', ?)
+                WHERE id = ? AND next_retry_at <= CURRENT_TIMESTAMP
+            """, (f"+{int(lease_seconds)} seconds", row[0]))
+            if cursor.rowcount == 1:
+                claimed.append({
+                    "id": row[0],
+                    "project_id": row[1],
+                    "doi": row[2],
+                    "failure_category": row[3],
+                    "retry_count": row[4]
+                })
+            conn.commit()
+
+        conn.close()
+        return claimed
+
+    except Exception as e:
+        print(f"[PDF DB] Error claiming retry queue entries: {e}")
+        return []
+
+
 def get_retry_queue_ready(db_path: str = PDF_DB_PATH) -> List[Dict]:
     """
     Get DOIs from retry queue that are ready to retry (next_retry_at <= now).
@@ -544,6 +867,7 @@ def get_download_statistics(
     Get download statistics for a project or overall.
     Returns dict with various metrics.
     """
+    flush_download_attempts(db_path)
     try:
         conn = get_pdf_db_connection(db_path)
         cursor = conn.cursor()
@@ -638,6 +962,7 @@ def cleanup_old_attempts(retention_days: int = 90, db_path: str = PDF_DB_PATH) -
     Clean up old download attempts to prevent database bloat.
     Returns number of records deleted.
     """
+    flush_download_attempts(db_path)
     try:
         conn = get_pdf_db_connection(db_path)
         cursor = conn.cursor()
@@ -659,6 +984,107 @@ def cleanup_old_attempts(retention_days: int = 90, db_path: str = PDF_DB_PATH) -
         return 0
 
 
+def reserve_host_tokens(host: str, rate: float, capacity: float, tokens: float = 1.0,
+                        db_path: str = PDF_DB_PATH) -> float:
+    """
+    Take tokens from a host's bucket in host_rate_limits (see
+    pdf_download_scheduler.SharedTokenBucket). The bucket may go into debt:
+    the tokens are always taken, and the caller must wait the returned number
+    of seconds before making its request, so each request costs one write.
+    Raises sqlite3.Error if the database cannot be written.
+    """
+    conn = get_pdf_db_connection(db_path)
+    try:
+        if db_path not in _host_rate_limit_dbs:
+            conn.execute(_HOST_RATE_LIMITS_TABLE)
+            _host_rate_limit_dbs.add(db_path)
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        cursor.execute("SELECT tokens, updated_at FROM host_rate_limits WHERE host = ?", (host,))
+        row = cursor.fetchone()
+        available = capacity if row is None else \
+            min(capacity, row[0] + max(now - row[1], 0.0) * rate)
+        available -= tokens
+        cursor.execute("""
+            INSERT INTO host_rate_limits (host, tokens, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(host) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at
+        """, (host, available, now))
+        conn.commit()
+        return max(-available / rate, 0.0)
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def save_circuit_breaker_state(state: Dict, db_path: str = PDF_DB_PATH) -> bool:
+    """
+    Persist a circuit breaker snapshot (see pdf_download_scheduler.CircuitBreaker).
+    Returns True on success, False on failure.
+    """
+    try:
+        conn = get_pdf_db_connection(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            INSERT OR REPLACE INTO source_circuit_breakers
+            (source_name, state, consecutive_failures, opened_at, cooldown_seconds, last_failure, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """, (state["source"], state["state"], state["consecutive_failures"], state["opened_at"],
+              state["cooldown_seconds"], state["last_failure"]))
+
+        conn.commit()
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"[PDF DB] Error saving circuit breaker state: {e}")
+        return False
+
+
+def get_circuit_breaker_states(db_path: str = PDF_DB_PATH) -> List[Dict]:
+    """
+    Get the last saved circuit breaker state of every source.
+    Open breakers include cooldown_remaining_seconds (0 once a probe is allowed).
+    """
+    try:
+        conn = get_pdf_db_connection(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT source_name, state, consecutive_failures, opened_at, cooldown_seconds,
+                   last_failure, updated_at
+            FROM source_circuit_breakers
+            ORDER BY source_name
+        """)
+
+        now = datetime.now().timestamp()
+        states = []
+        for row in cursor.fetchall():
+            state = {
+                "source": row[0],
+                "state": row[1],
+                "consecutive_failures": row[2] or 0,
+                "opened_at": row[3],
+                "cooldown_seconds": row[4],
+                "last_failure": row[5] or "",
+                "updated_at": row[6]
+            }
+            if state["state"] == "open" and row[3] is not None:
+                state["cooldown_remaining_seconds"] = max(0.0, row[3] + (row[4] or 0) - now)
+            states.append(state)
+
+        conn.close()
+        return states
+
+    except Exception as e:
+        print(f"[PDF DB] Error getting circuit breaker states: {e}")
+        return []
+
+
 def get_config_value(key: str, default: str = None, db_path: str = PDF_DB_PATH) -> Optional[str]:
     """Get a configuration value from the database"""
     try:
@@ -704,7 +1130,7 @@ if __name__ == "__main__":
         print("✓ Database initialized successfully")
 
         # Test logging an attempt
-        attempt_id = log_download_attempt(
+        queued = log_download_attempt(
             project_id=1,
             doi="10.1371/journal.pone.0000001",
             source_name="unpaywall",
@@ -712,7 +1138,7 @@ if __name__ == "__main__":
             response_time_ms=450,
             file_size_bytes=1024000
         )
-        print(f"✓ Logged download attempt: {attempt_id}")
+        print(f"✓ Logged download attempt: {queued}")
 
         # Test getting rankings
         rankings = get_source_rankings()
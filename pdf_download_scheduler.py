@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Concurrent PDF Download Scheduler
+Worker pool for downloading many DOIs in parallel, with per-host token buckets
+so each upstream API still sees a polite request rate, and per-source circuit
+breakers so a degraded source stops being tried for every DOI.
+
+The host buckets are kept in pdf_downloads.db (host_rate_limits), so the rates
+hold across all download workers and the backend together.
+"""
+
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_DOWNLOAD_WORKERS = 4
+
+# (requests per second, burst) per upstream host, based on each API's published
+# or commonly recommended limits. Hosts not listed use the default rate derived
+# from the rate_limit_delay_seconds configuration value.
+HOST_RATE_LIMITS = {
+    "api.unpaywall.org": (5.0, 5),
+    "www.ebi.ac.uk": (5.0, 5),           # Europe PMC REST API
+    "europepmc.org": (2.0, 2),           # Europe PMC PDF rendering
+    "api.core.ac.uk": (1.0, 1),
+    "api.semanticscholar.org": (0.3, 1),  # Unauthenticated: 100 requests / 5 minutes
+    "www.ncbi.nlm.nih.gov": (3.0, 3),    # NCBI: 3 requests/second without API key
+    "eutils.ncbi.nlm.nih.gov": (3.0, 3),
+    "export.arxiv.org": (0.33, 1),       # arXiv asks for one request every 3 seconds
+    "arxiv.org": (1.0, 2),
+    "api.biorxiv.org": (2.0, 2),
+    "zenodo.org": (2.0, 2),
+    "doaj.org": (2.0, 2),
+    "api.crossref.org": (5.0, 5),
+    "api.openalex.org": (10.0, 10),
+}
+
+# Lookup API host of sources implemented with third-party client libraries.
+# Everything else goes through pdf_http_client, whose session waits on the
+# bucket of each request's host, so those sources must not be listed here
+# (they would be throttled twice).
+SOURCE_HOSTS = {
+    "unpywall": "api.unpaywall.org",
+    "habanero": "api.crossref.org",
+    "metapub": "eutils.ncbi.nlm.nih.gov",
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity` banked."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available. Returns the number of seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class SharedTokenBucket:
+    """
+    Token bucket for one host whose state is kept in pdf_downloads.db, so every
+    process draws from the same budget. If the database cannot be written, the
+    process falls back to its own in-memory bucket for that request.
+    """
+
+    def __init__(self, host: str, rate: float, capacity: float, db_path: Optional[str] = None):
+        self.host = host
+        self.rate = rate
+        self.capacity = capacity
+        self.db_path = db_path
+        self._fallback = TokenBucket(rate, capacity)
+        self._warned = False
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available. Returns the number of seconds waited."""
+        from pdf_download_db import reserve_host_tokens, PDF_DB_PATH
+        try:
+            delay = reserve_host_tokens(self.host, self.rate, self.capacity, tokens,
+                                        self.db_path or PDF_DB_PATH)
+        except sqlite3.Error as e:
+            if not self._warned:
+                print(f"[PDF Scheduler] Shared rate limit for {self.host} unavailable, "
+                      f"limiting this process only: {e}")
+                self._warned = True
+            return self._fallback.acquire(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+_buckets: Dict[str, SharedTokenBucket] = {}
+_buckets_lock = threading.Lock()
+_default_rate: Tuple[float, float] = (1.0, 1)
+
+
+def set_default_host_rate(rate_limit_delay_seconds: float) -> None:
+    """Derive the default per-host rate from the rate_limit_delay_seconds setting."""
+    global _default_rate
+    delay = max(float(rate_limit_delay_seconds), 0.0)
+    _default_rate = (1.0 / delay, 1) if delay > 0 else (1000.0, 1000)
+
+
+def get_host_bucket(host: str) -> SharedTokenBucket:
+    """Get (or create) the token bucket for a host."""
+    host = (host or "").lower()
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            rate, burst = HOST_RATE_LIMITS.get(host, _default_rate)
+            bucket = SharedTokenBucket(host, rate, burst)
+            _buckets[host] = bucket
+        return bucket
+
+
+def wait_for_host(host: str) -> float:
+    """Wait for a request slot on a host. Returns seconds waited."""
+    if not host:
+        return 0.0
+    return get_host_bucket(host).acquire()
+
+
+def wait_for_url(url: str) -> float:
+    """Wait for a request slot on the host of a URL. Returns seconds waited."""
+    try:
+        host = urlparse(url).hostname
+    except (ValueError, AttributeError):
+        return 0.0
+    return wait_for_host(host)
+
+
+def wait_for_source(source_name: str) -> float:
+    """
+    Wait for a request slot on the lookup API host of a library-backed source.
+    Returns seconds waited (0 for sources that use the shared HTTP session).
+    """
+    return wait_for_host(SOURCE_HOSTS.get(source_name, ""))
+
+
+class CircuitBreaker:
+    """
+    Per-source circuit breaker.
+
+    closed:    requests flow; consecutive failures are counted
+    open:      after `failure_threshold` consecutive failures the source is
+               skipped for `cooldown_seconds`
+    half_open: after the cooldown one probe request is let through; success
+               closes the breaker, failure opens it for another cooldown
+
+    Only failures that say something about the source's health (timeouts,
+    5xx, rate limits, network errors) should be recorded as failures; a
+    "not found" answer is a healthy response.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, cooldown_seconds: float,
+                 on_change: Optional[Callable[[Dict], None]] = None):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown_seconds = float(cooldown_seconds)
+        self.on_change = on_change
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0       # time.time(), for reporting
+        self._opened_mono = 0.0     # time.monotonic(), for the cooldown
+        self._probe_in_flight = False
+        self._last_failure = ""
+        self._lock = threading.Lock()
+
+    def is_open(self) -> bool:
+        """True while the source should be skipped (open and still cooling down)."""
+        with self._lock:
+            return (self._state == self.OPEN
+                    and time.monotonic() - self._opened_mono < self.cooldown_seconds)
+
+    def allow_request(self) -> bool:
+        """Claim permission for one request (the probe slot when half-open)."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_mono < self.cooldown_seconds:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = True
+                snapshot = self._snapshot()
+            elif self._probe_in_flight:
+                return False
+            else:
+                self._probe_in_flight = True
+                return True
+        self._notify(snapshot)
+        return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            changed = self._state != self.CLOSED
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+            snapshot = self._snapshot() if changed else None
+        if snapshot:
+            self._notify(snapshot)
+
+    def record_failure(self, reason: str = "") -> None:
+        with self._lock:
+            self._failures += 1
+            self._last_failure = reason
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or (
+                    self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = time.time()
+                self._opened_mono = time.monotonic()
+                snapshot = self._snapshot()
+            else:
+                snapshot = None
+        if snapshot:
+            print(f"[PDF Scheduler] Circuit open for {self.name} after {snapshot['consecutive_failures']} "
+                  f"failure(s), skipping it for {self.cooldown_seconds:.0f}s: {reason}")
+            self._notify(snapshot)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> Dict:
+        return {
+            "source": self.name,
+            "state": self._state,
+            "consecutive_failures": self._failures,
+            "opened_at": self._opened_at or None,
+            "cooldown_seconds": self.cooldown_seconds,
+            "last_failure": self._last_failure
+        }
+
+    def _notify(self, snapshot: Dict) -> None:
+        if self.on_change is not None:
+            try:
+                self.on_change(snapshot)
+            except Exception as e:
+                print(f"[PDF Scheduler] Circuit breaker listener failed: {e}")
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_breaker_settings = {"failure_threshold": 5, "cooldown_seconds": 300.0, "on_change": None}
+
+
+def configure_circuit_breakers(failure_threshold: int, cooldown_seconds: float,
+                               on_change: Optional[Callable[[Dict], None]] = None) -> None:
+    """Set breaker thresholds (applied to existing breakers too) and the state-change listener."""
+    with _breakers_lock:
+        _breaker_settings.update(failure_threshold=max(1, int(failure_threshold)),
+                                 cooldown_seconds=float(cooldown_seconds), on_change=on_change)
+        for breaker in _breakers.values():
+            breaker.failure_threshold = _breaker_settings["failure_threshold"]
+            breaker.cooldown_seconds = _breaker_settings["cooldown_seconds"]
+            breaker.on_change = on_change
+
+
+def get_source_breaker(source_name: str) -> CircuitBreaker:
+    """Get (or create) the circuit breaker for a source."""
+    with _breakers_lock:
+        breaker = _breakers.get(source_name)
+        if breaker is None:
+            breaker = CircuitBreaker(source_name, _breaker_settings["failure_threshold"],
+                                     _breaker_settings["cooldown_seconds"], _breaker_settings["on_change"])
+            _breakers[source_name] = breaker
+        return breaker
+
+
+def get_circuit_breaker_states() -> List[Dict]:
+    """Snapshots of this process's breakers."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [breaker.snapshot() for breaker in breakers]
+
+
+def run_download_pool(
+    doi_list: List[str],
+    download_func: Callable[[str], Tuple[bool, str, str]],
+    on_result: Callable[[int, str, Optional[Tuple[bool, str, str]], Optional[Exception]], None],
+    max_workers: int = DEFAULT_DOWNLOAD_WORKERS
+) -> None:
+    """
+    Run download_func(doi) -> (success, message, source) for every DOI on a worker pool.
+
+    on_result(completed_idx, doi, result, error) is called from the calling thread
+    as each DOI finishes, so callers (and progress callbacks) never run concurrently.
+    completed_idx counts finished DOIs from 0, so completed_idx + 1 is the progress count.
+    If on_result raises, DOIs that have not started are cancelled and the exception
+    propagates once the in-flight downloads finish.
+    """
+    if not doi_list:
+        return
+
+    max_workers = max(1, min(int(max_workers), len(doi_list)))
+    print(f"[PDF Scheduler] Downloading {len(doi_list)} DOIs with {max_workers} workers")
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-download") as executor:
+        futures = {executor.submit(download_func, doi): doi for doi in doi_list}
+        try:
+            for completed_idx, future in enumerate(as_completed(futures)):
+                doi = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    on_result(completed_idx, doi, None, e)
+                else:
+                    on_result(completed_idx, doi, result, None)
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF download worker.
+
+Runs jobs from the durable PDF download queue (pdf_download_jobs /
+pdf_download_tasks in harvest.db). The backend only enqueues jobs; run one or
+more workers next to it:
+
+    python pdf_download_worker.py
+
+A worker leases one job at a time and renews the lease while it runs. Every
+finished DOI is checkpointed, so if a worker is killed the job's lease expires
+and the next worker resumes it from the first unfinished DOI. On SIGTERM/SIGINT
+the worker finishes the DOIs in flight and hands the job back to the queue.
+
+Jobs of different projects share the workers by weighted fair queuing: a job
+runs PDF_DOWNLOAD_SLICE_DOIS DOIs at a time, and after each slice it is handed
+back if another job has been served fewer DOIs relative to its priority. A
+small project started next to a large one therefore finishes in minutes.
+Per-host rate limits are kept in pdf_downloads.db, so they hold across all
+workers and the backend together: adding workers does not raise the request
+rate any upstream API sees.
+
+When there is no job to run, the worker also drains the retry queue in
+pdf_downloads.db: DOIs that failed for a temporary reason (timeouts, rate
+limits, server errors) are retried with exponential backoff until they
+succeed or use up max_retry_attempts.
+
+When the backend is started directly (python harvest_be.py) with
+PDF_DOWNLOAD_EMBEDDED_WORKER enabled, it runs this loop in a thread instead.
+"""
+
+import os
+import sys
+import time
+import socket
+import signal
+import threading
+from typing import Optional
+
+# Import configuration
+try:
+    from config import DB_PATH
+except ImportError:
+    # Fallback to environment variable if config.py doesn't exist
+    DB_PATH = os.environ.get("HARVEST_DB", "harvest.db")
+DB_PATH = os.environ.get("HARVEST_DB", DB_PATH)
+
+try:
+    from config import PDF_DOWNLOAD_WORKER_POLL_SECONDS, PDF_DOWNLOAD_LEASE_SECONDS
+except ImportError:
+    PDF_DOWNLOAD_WORKER_POLL_SECONDS = 5
+    PDF_DOWNLOAD_LEASE_SECONDS = 300
+
+try:
+    from config import PDF_DOWNLOAD_SLICE_DOIS
+except ImportError:
+    PDF_DOWNLOAD_SLICE_DOIS = 25
+
+try:
+    from config import PDF_SMART_RETRY_ENABLED, PDF_RETRY_DRAIN_INTERVAL_SECONDS
+except ImportError:
+    PDF_SMART_RETRY_ENABLED = True
+    PDF_RETRY_DRAIN_INTERVAL_SECONDS = 60
+
+# Retry queue entries claimed per drain, and how long a claim lasts before
+# another worker may take the entry (if this one dies mid-retry)
+RETRY_DRAIN_BATCH_SIZE = 50
+RETRY_CLAIM_SECONDS = 600
+
+from harvest_store import (
+    init_db, claim_pdf_download_job, renew_pdf_download_lease, finish_pdf_download_job,
+    get_pdf_download_tasks, complete_pdf_download_task, record_pdf_download_retry,
+    init_pdf_download_progress, update_pdf_download_progress, get_pdf_download_progress,
+    get_project_by_id, get_active_pdf_download_job, charge_pdf_download_job,
+    is_pdf_download_job_behind
+)
+from harvest_metrics import track_background_task
+
+# Failure messages that mean the PDF simply isn't available (the user can upload
+# it) rather than a technical error
+NEEDS_UPLOAD_PATTERNS = ["failed", "not found", "not open access", "not available",
+                         "no accessible", "not a pdf", "invalid pdf", "too small", "needs upload"]
+
+
+class JobInterrupted(Exception):
+    """Raised from the progress callback to stop a job (lease lost or worker stopping)."""
+
+
+def classify_download_result(success: bool, message: str) -> str:
+    """Map a per-DOI result to 'downloaded', 'needs_upload' or 'error'."""
+    if success:
+        return "downloaded"
+    if any(pattern in message.lower() for pattern in NEEDS_UPLOAD_PATTERNS):
+        return "needs_upload"
+    return "error"
+
+
+def _clean_doi(doi: str) -> str:
+    # Same cleaning as process_dois_smart, so callbacks can be matched to tasks
+    return doi.strip().replace("https://doi.org/", "").replace("http://doi.org/", "")
+
+
+def run_pdf_download_job(db_path: str, job: dict, worker_id: str,
+                         lease_seconds: int = PDF_DOWNLOAD_LEASE_SECONDS,
+                         stop_event: Optional[threading.Event] = None,
+                         slice_size: int = PDF_DOWNLOAD_SLICE_DOIS) -> str:
+    """
+    Download the unfinished DOIs of a leased job in slices of slice_size DOIs,
+    checkpointing each one.
+
+    Returns:
+        Final job status: 'completed', 'error', 'queued' (handed back because the
+        worker is stopping or another job's turn has come) or 'lost' (job
+        cancelled or lease taken over)
+    """
+    from pdf_manager import process_dois_smart, generate_doi_hash, record_project_pdf, link_pdf_from_store
+
+    job_id = job["id"]
+    project_id = job["project_id"]
+    project_dir = job["project_dir"]
+
+    tasks = get_pdf_download_tasks(db_path, job_id)
+    done = [t for t in tasks if t["status"] == "done"]
+    pending = [t for t in tasks if t["status"] != "done"]
+
+    print(f"[PDF Worker] Job {job_id} (project {project_id}): {len(pending)} of {len(tasks)} DOIs to go"
+          + (f", resuming (attempt {job['attempts']})" if done else ""))
+
+    # Rebuild the progress counters from the checkpointed tasks; from here on
+    # complete_pdf_download_task keeps them current
+    if get_pdf_download_progress(db_path, project_id) is None:
+        init_pdf_download_progress(db_path, project_id, job["total"], project_dir, job_id)
+    update_pdf_download_progress(db_path, project_id, {
+        "status": "running",
+        "job_id": job_id,
+        "total": job["total"],
+        "current": len(done),
+        "project_dir": project_dir,
+        "downloaded_count": sum(1 for t in done if t["outcome"] == "downloaded"),
+        "needs_upload_count": sum(1 for t in done if t["outcome"] == "needs_upload"),
+        "errors_count": sum(1 for t in done if t["outcome"] == "error")
+    })
+
+    # Renew the lease in the background: a single DOI can take longer than a
+    # lease interval when every source is tried
+    lease_lost = threading.Event()
+    job_done = threading.Event()
+
+    def heartbeat():
+        while not job_done.wait(lease_seconds / 3):
+            if not renew_pdf_download_lease(db_path, job_id, worker_id, lease_seconds):
+                lease_lost.set()
+                return
+
+    threading.Thread(target=heartbeat, daemon=True, name=f"pdf-job-{job_id}-lease").start()
+
+    seqs_by_doi = {}
+    finished = len(done)
+
+    def progress_callback(idx: int, doi: str, success: bool, message: str, source: str = ""):
+        nonlocal finished
+        finished += 1
+        print(f"[PDF Worker] Job {job_id}: {finished}/{job['total']} - {doi}: {message}")
+
+        filename = f"{generate_doi_hash(doi)}.pdf"
+        outcome = classify_download_result(success, message)
+        if outcome == "downloaded":
+            record_project_pdf(db_path, project_id, doi, os.path.join(project_dir, filename), source)
+
+        seqs = seqs_by_doi.get(doi)
+        if seqs:
+            complete_pdf_download_task(db_path, job_id, seqs.pop(0), outcome, filename, message, source)
+
+        if lease_lost.is_set():
+            raise JobInterrupted("lease lost")
+        if stop_event is not None and stop_event.is_set():
+            raise JobInterrupted("worker stopping")
+
+    try:
+        while pending:
+            batch, pending = pending[:slice_size], pending[slice_size:]
+            # DOIs that any project already holds are linked in from the PDF store
+            # without touching the network. Only the slice about to run is looked
+            # up, so a job that is handed back and resumed doesn't redo the rest.
+            to_download = []
+            for task in batch:
+                doi = _clean_doi(task["doi"])
+                if doi and link_pdf_from_store(db_path, project_id, doi, project_dir):
+                    complete_pdf_download_task(db_path, job_id, task["seq"], "downloaded",
+                                               f"{generate_doi_hash(doi)}.pdf", "Linked from PDF store", "pdf_store")
+                    finished += 1
+                else:
+                    to_download.append(task)
+                    seqs_by_doi.setdefault(doi, []).append(task["seq"])
+            if len(to_download) < len(batch):
+                print(f"[PDF Worker] Job {job_id}: linked {len(batch) - len(to_download)} PDF(s) from the PDF store")
+            if not to_download:
+                continue
+
+            finished_before = finished
+            try:
+                process_dois_smart([t["doi"] for t in to_download], project_id, project_dir, progress_callback)
+            finally:
+                charge_pdf_download_job(db_path, job_id, finished - finished_before)
+            if pending and is_pdf_download_job_behind(db_path, job_id):
+                print(f"[PDF Worker] Job {job_id}: handing back to the queue at {finished}/{job['total']} "
+                      f"for another project's turn")
+                if not finish_pdf_download_job(db_path, job_id, worker_id, "queued"):
+                    return "lost"
+                return "queued"
+    except JobInterrupted as e:
+        if lease_lost.is_set():
+            print(f"[PDF Worker] Job {job_id} stopped: cancelled or taken over by another worker")
+            return "lost"
+        print(f"[PDF Worker] Job {job_id} interrupted ({e}); returning it to the queue at {finished}/{job['total']}")
+        finish_pdf_download_job(db_path, job_id, worker_id, "queued")
+        return "queued"
+    except Exception as e:
+        import traceback
+        print(f"[PDF Worker] Job {job_id} failed: {e}")
+        print(traceback.format_exc())
+        if finish_pdf_download_job(db_path, job_id, worker_id, "error"):
+            update_pdf_download_progress(db_path, project_id, {"status": "error", "end_time": time.time()})
+        return "error"
+    finally:
+        job_done.set()
+
+    if not finish_pdf_download_job(db_path, job_id, worker_id, "completed"):
+        # Cancelled while the last DOIs were finishing
+        return "lost"
+    update_pdf_download_progress(db_path, project_id, {"status": "completed", "end_time": time.time()})
+    progress = get_pdf_download_progress(db_path, project_id) or {}
+    print(f"[PDF Worker] Job {job_id} completed - Downloaded: {progress.get('downloaded_count', 0)}, "
+          f"Needs upload: {progress.get('needs_upload_count', 0)}, Errors: {progress.get('errors_count', 0)}")
+    return "completed"
+
+
+def drain_retry_queue(db_path: str = DB_PATH, limit: int = RETRY_DRAIN_BATCH_SIZE,
+                      stop_event: Optional[threading.Event] = None) -> int:
+    """
+    Retry the DOIs in the PDF retry queue whose backoff has expired.
+
+    Successes are added to the project's manifest and the DOI's result in the
+    project's latest download job is updated (counters and event log).
+    download_pdf_smart reschedules DOIs that fail temporarily again, up to
+    max_retry_attempts; any other result removes them from the queue.
+
+    Returns:
+        Number of DOIs retried
+    """
+    from pdf_manager import (
+        process_dois_smart, generate_doi_hash, record_project_pdf, get_project_pdf_dir,
+        RETRY_SCHEDULED_MESSAGE
+    )
+    from pdf_download_db import (
+        claim_retry_queue_ready, remove_from_retry_queue, add_to_retry_queue, get_config_value
+    )
+
+    entries = claim_retry_queue_ready(limit, RETRY_CLAIM_SECONDS)
+    if not entries:
+        return 0
+
+    dois_by_project = {}
+    for entry in entries:
+        dois_by_project.setdefault(entry["project_id"], []).append(entry["doi"])
+
+    retried = 0
+    for project_id, dois in dois_by_project.items():
+        project = get_project_by_id(db_path, project_id)
+        project_dois = {d.lower() for d in (project or {}).get("doi_list", [])}
+        stale = [doi for doi in dois if doi.lower() not in project_dois]
+        for doi in stale:
+            # Project deleted or DOI removed from it
+            remove_from_retry_queue(project_id, doi)
+        dois = [doi for doi in dois if doi.lower() in project_dois]
+        if not dois:
+            continue
+        if get_active_pdf_download_job(db_path, project_id):
+            # The running job covers these DOIs; the claims expire and they come back later
+            continue
+
+        progress = get_pdf_download_progress(db_path, project_id) or {}
+        project_dir = progress.get("project_dir") or get_project_pdf_dir(project_id)
+        print(f"[PDF Worker] Retrying {len(dois)} DOI(s) of project {project_id} from the retry queue")
+
+        def progress_callback(idx: int, doi: str, success: bool, message: str, source: str = ""):
+            filename = f"{generate_doi_hash(doi)}.pdf"
+            outcome = classify_download_result(success, message)
+            if outcome == "downloaded":
+                record_project_pdf(db_path, project_id, doi, os.path.join(project_dir, filename), source)
+            if outcome == "error" and RETRY_SCHEDULED_MESSAGE not in message:
+                # Unexpected error: reschedule so the retry count still bounds it
+                add_to_retry_queue(project_id, doi, "network_error",
+                                   retry_delay_minutes=int(get_config_value('retry_delay_minutes', '60')),
+                                   max_retry_attempts=int(get_config_value('max_retry_attempts', '3')))
+            elif RETRY_SCHEDULED_MESSAGE not in message:
+                remove_from_retry_queue(project_id, doi)
+            record_pdf_download_retry(db_path, project_id, doi, outcome, filename, message, source)
+            print(f"[PDF Worker] Retry of {doi}: {message}")
+
+            if stop_event is not None and stop_event.is_set():
+                raise JobInterrupted("worker stopping")
+
+        try:
+            with track_background_task("pdf_retry"):
+                process_dois_smart(dois, project_id, project_dir, progress_callback)
+        except JobInterrupted:
+            # Unfinished entries become ready again when their claim expires
+            return retried
+        except Exception as e:
+            print(f"[PDF Worker] Retry batch for project {project_id} failed: {e}")
+        retried += len(dois)
+
+    return retried
+
+
+def run_worker(db_path: str = DB_PATH, worker_id: str = None,
+               poll_interval: float = PDF_DOWNLOAD_WORKER_POLL_SECONDS,
+               lease_seconds: int = PDF_DOWNLOAD_LEASE_SECONDS,
+               stop_event: Optional[threading.Event] = None, once: bool = False) -> int:
+    """
+    Claim and run jobs until stop_event is set (or, with once=True, until the
+    queue is empty). While idle, drains the retry queue every
+    PDF_RETRY_DRAIN_INTERVAL_SECONDS.
+
+    Returns:
+        Number of jobs run
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    stop_event = stop_event or threading.Event()
+    jobs_run = 0
+    last_retry_drain = None
+    print(f"[PDF Worker] {worker_id} polling {db_path} every {poll_interval}s")
+
+    while not stop_event.is_set():
+        job = claim_pdf_download_job(db_path, worker_id, lease_seconds)
+        if job is None:
+            if PDF_SMART_RETRY_ENABLED and (
+                    last_retry_drain is None
+                    or time.monotonic() - last_retry_drain >= PDF_RETRY_DRAIN_INTERVAL_SECONDS):
+                last_retry_drain = time.monotonic()
+                if drain_retry_queue(db_path, stop_event=stop_event):
+                    continue
+            if once:
+                break
+            stop_event.wait(poll_interval)
+            continue
+
+        with track_background_task("pdf_download"):
+            run_pdf_download_job(db_path, job, worker_id, lease_seconds, stop_event)
+        jobs_run += 1
+
+    return jobs_run
+
+
+def start_embedded_worker(db_path: str = DB_PATH) -> threading.Thread:
+    """Run the worker loop in a daemon thread of the current process."""
+    thread = threading.Thread(target=run_worker, args=(db_path,), daemon=True, name="PDFDownloadWorker")
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run queued HARVEST PDF download jobs")
+    parser.add_argument("--db", default=DB_PATH, help=f"Path to harvest database (default: {DB_PATH})")
+    parser.add_argument("--once", action="store_true", help="Exit when the queue is empty")
+    parser.add_argument("--poll-interval", type=float, default=PDF_DOWNLOAD_WORKER_POLL_SECONDS,
+                        help="Seconds between queue polls when idle")
+    args = parser.parse_args()
+
+    # Make sure the queue tables exist on older databases
+    init_db(args.db)
+
+    stop = threading.Event()
+
+    def handle_signal(signum, frame):
+        print(f"[PDF Worker] Received signal {signum}, finishing in-flight DOIs...")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    count = run_worker(args.db, poll_interval=args.poll_interval, stop_event=stop, once=args.once)
+    print(f"[PDF Worker] Exiting after {count} job(s)")
+    sys.exit(0)
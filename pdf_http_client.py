@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared HTTP client for PDF source lookups and downloads.
+
+All PDF sources and downloads go through one of two process-wide sessions
+(direct, and via HABANERO_PROXY_URL when configured) instead of bare
+requests.get, so connections are kept alive and reused across DOIs and
+worker threads. Each session:
+    - caps connections per host (PDF_HTTP_POOL_MAXSIZE, blocking when exhausted)
+    - retries connection errors and 502/503/504 with exponential backoff
+    - waits on the per-host token bucket from pdf_download_scheduler before
+      every request (including redirect hops), so callers don't rate limit
+    - records outbound latency in harvest_metrics
+"""
+
+import time
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pdf_download_scheduler import wait_for_url
+from harvest_metrics import observe_outbound_request
+
+try:
+    from config import HABANERO_PROXY_URL
+except ImportError:
+    HABANERO_PROXY_URL = ""
+
+try:
+    from config import PDF_HTTP_POOL_MAXSIZE, PDF_HTTP_MAX_RETRIES
+except ImportError:
+    PDF_HTTP_POOL_MAXSIZE = 10
+    PDF_HTTP_MAX_RETRIES = 2
+
+# Distinct hosts whose connection pools are kept open per session
+POOL_HOSTS = 32
+RETRY_BACKOFF_FACTOR = 0.5
+# 429 is not retried here: it is classified as rate_limit and goes to the retry queue
+RETRY_STATUS_CODES = (502, 503, 504)
+
+
+class PDFHTTPSession(requests.Session):
+    """requests.Session that rate limits per host and times every request."""
+
+    # Tells harvest_metrics.instrument_requests this session records its own timings
+    harvest_timed = True
+
+    def send(self, request, **kwargs):
+        wait_for_url(request.url)
+        start = time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            observe_outbound_request(request.url, time.perf_counter() - start, "error")
+            raise
+        observe_outbound_request(request.url, time.perf_counter() - start,
+                                 f"{response.status_code // 100}xx")
+        return response
+
+
+def _build_session(proxy_url: str = "") -> PDFHTTPSession:
+    retry = Retry(
+        total=PDF_HTTP_MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_HOSTS,
+        pool_maxsize=PDF_HTTP_POOL_MAXSIZE,
+        pool_block=True,
+        max_retries=retry
+    )
+    session = PDFHTTPSession()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if proxy_url:
+        session.proxies = {"http": proxy_url, "https": proxy_url}
+    return session
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_http_session(use_proxy: bool = False) -> PDFHTTPSession:
+    """
+    Get the shared session. With use_proxy=True the session routes through
+    HABANERO_PROXY_URL (falls back to the direct session if no proxy is configured).
+    """
+    key = "proxy" if use_proxy and HABANERO_PROXY_URL else "direct"
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _build_session(HABANERO_PROXY_URL if key == "proxy" else "")
+            _sessions[key] = session
+        return session
+
+
+def http_get(url: str, use_proxy: bool = False, **kwargs) -> requests.Response:
+    """GET through the shared session (same arguments as requests.get)."""
+    return get_http_session(use_proxy).get(url, **kwargs)
+
+
+def http_head(url: str, use_proxy: bool = False, **kwargs) -> requests.Response:
+    """HEAD through the shared session (same arguments as requests.head)."""
+    return get_http_session(use_proxy).head(url, **kwargs)
+
+
+def close_http_sessions() -> None:
+    """Close pooled connections (e.g. before forking worker processes)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF validation and metadata extraction in a process pool.
+
+Opening a PDF with PyMuPDF holds the GIL and can use a lot of memory for large
+or malformed files, so downloads, uploads and manifest reconciliation hand the
+work to a small pool of worker processes instead of doing it in the web or
+download threads. The workers only import this module.
+
+inspect_pdf() returns page count, SHA-256, title and whether the first pages
+have a text layer, or an error if the file is not a readable PDF; inspect_pdfs()
+does the same for a batch of files in parallel. With extract_identifiers they
+also return the DOIs found in the XMP/Info metadata and on the first page, and
+the first page's heading, for matching uploads to DOIs (see pdf_doi_matcher).
+"""
+
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+try:
+    from config import PDF_INSPECT_WORKERS, PDF_INSPECT_TIMEOUT_SECONDS
+except ImportError:
+    PDF_INSPECT_WORKERS = 2
+    PDF_INSPECT_TIMEOUT_SECONDS = 60
+
+PDF_MAGIC = b"%PDF-"
+# PDF readers accept the header anywhere in the first 1024 bytes
+PDF_HEADER_WINDOW = 1024
+# Pages checked for a text layer (scanned PDFs have none)
+TEXT_CHECK_PAGES = 3
+DOI_PATTERN = re.compile(r'10\.\d{4,9}/[^\s"<>]+', re.IGNORECASE)
+MAX_DOI_CANDIDATES = 20
+
+try:
+    import fitz  # PyMuPDF
+    FITZ_AVAILABLE = True
+except ImportError:
+    FITZ_AVAILABLE = False
+
+
+def has_pdf_header(data: bytes) -> bool:
+    """True if the first bytes of a file contain the %PDF- header."""
+    return PDF_MAGIC in data[:PDF_HEADER_WINDOW]
+
+
+def _doi_candidates(texts: List[str]) -> List[str]:
+    """DOIs in the given texts, in order of first appearance, without trailing punctuation."""
+    candidates = []
+    for text in texts:
+        for match in DOI_PATTERN.finditer(text or ""):
+            doi = match.group(0).rstrip(".,;:'")
+            # Keep brackets that are part of the DOI, drop the one around it
+            while doi[-1] in ")]" and doi.count(doi[-1]) > doi.count("(" if doi[-1] == ")" else "["):
+                doi = doi[:-1].rstrip(".,;:'")
+            if doi not in candidates:
+                candidates.append(doi)
+            if len(candidates) >= MAX_DOI_CANDIDATES:
+                return candidates
+    return candidates
+
+
+def _first_page_heading(page) -> Optional[str]:
+    """Text in the largest font on a page, usually the article title."""
+    lines = []
+    for block in page.get_text("dict").get("blocks", []):
+        for line in block.get("lines", []):
+            spans = line.get("spans", [])
+            text = "".join(span.get("text", "") for span in spans).strip()
+            if len(text) >= 3:
+                lines.append((max(span.get("size", 0) for span in spans), text))
+    if not lines:
+        return None
+    largest = max(size for size, _ in lines)
+    return " ".join(text for size, text in lines if size >= largest - 0.5)[:500]
+
+
+def _inspect(filepath: str, compute_sha256: bool = True, extract_identifiers: bool = False) -> Dict:
+    """
+    Runs in a pool process. Returns {"sha256", "pages", "title", "has_text", "error"};
+    error is None for a valid PDF. Without PyMuPDF only the header is checked.
+    With extract_identifiers, also "doi_candidates" (metadata first, then first
+    page text) and "heading".
+    """
+    info = {"sha256": None, "pages": None, "title": None, "has_text": None, "error": None}
+    if extract_identifiers:
+        info.update(doi_candidates=[], heading=None)
+
+    sha = hashlib.sha256()
+    try:
+        with open(filepath, "rb") as f:
+            head = f.read(PDF_HEADER_WINDOW)
+            sha.update(head)
+            if compute_sha256:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha.update(chunk)
+    except OSError as e:
+        info["error"] = f"unreadable file: {e}"
+        return info
+    if compute_sha256:
+        info["sha256"] = sha.hexdigest()
+
+    if not has_pdf_header(head):
+        info["error"] = "no %PDF header"
+        return info
+
+    if not FITZ_AVAILABLE:
+        return info
+
+    try:
+        with fitz.open(filepath, filetype="pdf") as doc:
+            if doc.needs_pass:
+                info["error"] = "password protected"
+                return info
+            info["pages"] = doc.page_count
+            if doc.page_count == 0:
+                info["error"] = "no pages"
+                return info
+            title = (doc.metadata or {}).get("title") or ""
+            info["title"] = title.strip()[:500] or None
+            info["has_text"] = any(
+                doc[i].get_text("text").strip() for i in range(min(doc.page_count, TEXT_CHECK_PAGES))
+            )
+            if extract_identifiers:
+                metadata = doc.metadata or {}
+                info["doi_candidates"] = _doi_candidates([
+                    doc.get_xml_metadata(), metadata.get("subject"), metadata.get("keywords"),
+                    metadata.get("title"), doc[0].get_text("text")
+                ])
+                info["heading"] = _first_page_heading(doc[0])
+    except Exception as e:
+        info["error"] = f"unreadable PDF: {e}"
+    return info
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    with _pool_lock:
+        if _pool is None and PDF_INSPECT_WORKERS > 0:
+            # spawn, not fork: the backend and download workers are multithreaded
+            _pool = ProcessPoolExecutor(max_workers=PDF_INSPECT_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool(pool: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def inspect_pdf(filepath: str, compute_sha256: bool = True,
+                timeout: float = PDF_INSPECT_TIMEOUT_SECONDS, extract_identifiers: bool = False) -> Dict:
+    """
+    Validate a PDF and extract its metadata in the inspection pool.
+    Returns {"sha256", "pages", "title", "has_text", "error"}.
+
+    Runs in-process if PDF_INSPECT_WORKERS is 0. If a pool process crashes (e.g.
+    PyMuPDF segfaults on a malformed file) the file is reported as unreadable
+    and a new pool is started for the next file. A file that takes longer than
+    `timeout` is not rejected; its metadata is just left empty.
+    """
+    pool = _get_pool()
+    if pool is None:
+        return _inspect(filepath, compute_sha256, extract_identifiers)
+
+    try:
+        # Pool processes keep the working directory they were started in
+        future = pool.submit(_inspect, os.path.abspath(filepath), compute_sha256, extract_identifiers)
+    except (BrokenProcessPool, RuntimeError):
+        _reset_pool(pool)
+        return _inspect(filepath, compute_sha256, extract_identifiers)
+
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        print(f"[PDF] Inspecting {filepath} timed out after {timeout:.0f}s; metadata left empty")
+        return {"sha256": None, "pages": None, "title": None, "has_text": None, "error": None}
+    except BrokenProcessPool:
+        _reset_pool(pool)
+        return {"sha256": None, "pages": None, "title": None, "has_text": None,
+                "error": "unreadable PDF: inspection process crashed"}
+
+
+def inspect_pdfs(filepaths: List[str], compute_sha256: bool = True,
+                 timeout: float = PDF_INSPECT_TIMEOUT_SECONDS, extract_identifiers: bool = False) -> List[Dict]:
+    """
+    Validate many PDFs at once, spread over all processes of the inspection pool.
+    Returns one result per file, in the order given (see inspect_pdf).
+
+    If a pool process crashes, the files not yet finished are inspected one at a
+    time, so only the file that crashed it is reported as unreadable.
+    """
+    pool = _get_pool()
+    if pool is None:
+        return [_inspect(filepath, compute_sha256, extract_identifiers) for filepath in filepaths]
+
+    try:
+        futures = [pool.submit(_inspect, os.path.abspath(filepath), compute_sha256, extract_identifiers)
+                   for filepath in filepaths]
+    except (BrokenProcessPool, RuntimeError):
+        _reset_pool(pool)
+        return [inspect_pdf(filepath, compute_sha256, timeout, extract_identifiers) for filepath in filepaths]
+
+    results = []
+    for index, (filepath, future) in enumerate(zip(filepaths, futures)):
+        try:
+            results.append(future.result(timeout=timeout))
+        except FutureTimeoutError:
+            print(f"[PDF] Inspecting {filepath} timed out after {timeout:.0f}s; metadata left empty")
+            results.append({"sha256": None, "pages": None, "title": None, "has_text": None, "error": None})
+        except BrokenProcessPool:
+            _reset_pool(pool)
+            results.extend(inspect_pdf(path, compute_sha256, timeout, extract_identifiers) for path in filepaths[index:])
+            break
+    return results
+
+
+def shutdown_inspect_pool() -> None:
+    """Stop the inspection processes (they are restarted on demand)."""
+    with _pool_lock:
+        pool = _pool
+    if pool is not None:
+        _reset_pool(pool)
@@ -7,15 +7,20 @@ Handles downloading and managing PDFs for project DOIs with multiple source fall
 
 import os
 import re
-import requests
+import json
 import hashlib
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Tuple, Optional
 import time
 from urllib.parse import urlparse
 import ipaddress
 import warnings
 
+import requests
+
+from pdf_http_client import http_get
+from pdf_inspect import inspect_pdf, has_pdf_header, PDF_HEADER_WINDOW
+
 # Suppress pkg_resources deprecation warning from eutils (dependency of metapub)
 # The eutils package uses deprecated pkg_resources API which will be removed in 2025
 # We use pmc_enhanced as the preferred alternative to metapub
@@ -29,6 +34,22 @@ except ImportError:
     ENABLE_HABANERO_DOWNLOAD = True
     HABANERO_PROXY_URL = ""
 
+try:
+    from config import PDF_SMART_RETRY_ENABLED
+except ImportError:
+    PDF_SMART_RETRY_ENABLED = True
+
+try:
+    from config import PDF_DOWNLOAD_RESUME_ATTEMPTS
+except ImportError:
+    PDF_DOWNLOAD_RESUME_ATTEMPTS = 3
+
+# Source name of the batched OpenAlex lookup (also usable per DOI)
+OPENALEX_SOURCE = "openalex"
+
+# Ends the message of a DOI that failed temporarily and is in the retry queue
+RETRY_SCHEDULED_MESSAGE = "retry scheduled"
+
 # Try importing optional libraries
 # Note: metapub depends on eutils which uses deprecated pkg_resources
 # The warning is suppressed at module level; prefer pmc_enhanced over metapub
@@ -63,6 +84,17 @@ except ImportError:
 # Security constants
 MAX_PDF_SIZE = 100 * 1024 * 1024  # 100 MB limit for PDF downloads
 ALLOWED_URL_SCHEMES = ['http', 'https']  # Only allow HTTP(S) downloads
+MIN_PDF_SIZE = 1000  # Smaller downloads are almost always error pages
+
+# Downloads are written to <name>.part next to the final file and renamed into
+# place once complete, so an interrupted download never looks like a cached PDF.
+# <name>.part.json holds the URL and validators needed to resume it with Range.
+PARTIAL_SUFFIX = ".part"
+
+# Metadata of files validated while downloading, keyed by (path, size, mtime_ns),
+# so recording the download in the manifest doesn't open the PDF a second time
+_INSPECTED_CACHE_SIZE = 256
+_inspected = {}
 
 def validate_doi(doi: str) -> bool:
     """
@@ -163,7 +195,7 @@ def generate_doi_hash(doi: str) -> str:
     """Generate a hash from DOI for file naming"""
     return hashlib.sha256(doi.encode('utf-8')).hexdigest()[:16]
 
-def check_open_access(doi: str, email: str = None) -> Tuple[bool, str]:
+def check_open_access(doi: str, email: str = None, timeout: float = 10) -> Tuple[bool, str]:
     """
     Check if a DOI is open access and get the download URL if available.
     Uses both REST API and unpywall library for better PDF link detection.
@@ -178,7 +210,7 @@ def check_open_access(doi: str, email: str = None) -> Tuple[bool, str]:
         if email is None:
             email = UNPAYWALL_EMAIL
         url = f"https://api.unpaywall.org/v2/{doi}?email={email}"
-        r = requests.get(url, timeout=10)
+        r = http_get(url, timeout=timeout)
         
         if r.ok:
             data = r.json()
@@ -296,9 +328,180 @@ def try_habanero_download(doi: str) -> Tuple[bool, str]:
     except Exception as e:
         return False, f"Habanero error: {str(e)}"
 
+def _read_partial_state(part_path: str, pdf_url: str) -> Dict:
+    """Resume state of an earlier partial download of pdf_url, or {} if it can't be resumed."""
+    try:
+        with open(part_path + '.json', 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if state.get('url') != pdf_url or not state.get('resumable') or not os.path.exists(part_path):
+        return {}
+    return state
+
+
+def _write_partial_state(part_path: str, state: Dict) -> None:
+    try:
+        with open(part_path + '.json', 'w') as f:
+            json.dump(state, f)
+    except OSError as e:
+        print(f"[PDF] Warning: could not save resume state for {part_path}: {e}")
+
+
+def discard_partial_download(filepath: str) -> None:
+    """Remove the partial download (and its resume state) of a final PDF path."""
+    part_path = filepath + PARTIAL_SUFFIX
+    for path in (part_path, part_path + '.json'):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _download_to_path(pdf_url: str, filepath: str, headers: Dict, use_proxy: bool = False) -> Tuple[bool, str]:
+    """
+    Download pdf_url to filepath through a .part file.
+
+    If the stream breaks and the server accepts byte ranges, the download is
+    resumed from the bytes already written (up to PDF_DOWNLOAD_RESUME_ATTEMPTS
+    times, and again on a later call with the same URL). If-Range with the
+    response's ETag/Last-Modified makes the server send the whole file again
+    if it changed in between. The complete file is checked against the
+    announced length and validated (%PDF header while streaming, then opened
+    by pdf_inspect) before it is renamed into place.
+    Returns: (success, message)
+    """
+    filename = os.path.basename(filepath)
+    part_path = filepath + PARTIAL_SUFFIX
+    state = _read_partial_state(part_path, pdf_url)
+    if not state:
+        discard_partial_download(filepath)
+
+    for attempt in range(PDF_DOWNLOAD_RESUME_ATTEMPTS + 1):
+        offset = os.path.getsize(part_path) if state and os.path.exists(part_path) else 0
+        request_headers = dict(headers)
+        if offset:
+            request_headers['Range'] = f'bytes={offset}-'
+            validator = state.get('etag') or state.get('last_modified')
+            if validator:
+                request_headers['If-Range'] = validator
+
+        try:
+            # Streamed responses hold a pooled connection until closed
+            with http_get(pdf_url, use_proxy=use_proxy, headers=request_headers, timeout=30,
+                          stream=True, allow_redirects=True) as response:
+                if response.status_code == 416 and offset:
+                    # Our partial file doesn't fit the remote file any more
+                    discard_partial_download(filepath)
+                    state = {}
+                    continue
+                if not response.ok:
+                    if response.status_code < 500 and response.status_code != 429:
+                        discard_partial_download(filepath)
+                    return False, f"Download failed: HTTP {response.status_code}"
+
+                # Check if response is actually a PDF
+                content_type = response.headers.get('content-type', '').lower()
+                if 'pdf' not in content_type and 'application/octet-stream' not in content_type:
+                    discard_partial_download(filepath)
+                    return False, f"Response is not a PDF (content-type: {content_type})"
+
+                expected_size = None
+                content_range = response.headers.get('content-range', '')
+                if response.status_code == 206 and offset:
+                    match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', content_range)
+                    if not match or int(match.group(1)) != offset:
+                        discard_partial_download(filepath)
+                        state = {}
+                        continue
+                    if match.group(2) != '*':
+                        expected_size = int(match.group(2))
+                    mode = 'ab'
+                    print(f"[PDF] Resuming {filename} at byte {offset}")
+                else:
+                    # Full response (first request, no range support, or the file changed)
+                    offset = 0
+                    mode = 'wb'
+                    content_length = response.headers.get('content-length')
+                    if content_length and content_length.isdigit():
+                        expected_size = int(content_length)
+                    state = {
+                        'url': pdf_url,
+                        'etag': response.headers.get('etag'),
+                        'last_modified': response.headers.get('last-modified'),
+                        'resumable': response.headers.get('accept-ranges', '').lower() == 'bytes',
+                    }
+                    _write_partial_state(part_path, state)
+
+                # Check content length to prevent DoS
+                if expected_size and expected_size > MAX_PDF_SIZE:
+                    discard_partial_download(filepath)
+                    return False, f"File too large ({expected_size} bytes exceeds {MAX_PDF_SIZE} bytes limit)"
+
+                # Save file with size limit. The first bytes of a new download
+                # must contain the %PDF header, so HTML pages served as PDFs are
+                # rejected without downloading them
+                total_size = offset
+                head = b'' if offset == 0 else None
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        if chunk:
+                            total_size += len(chunk)
+                            # Check size during download
+                            if total_size > MAX_PDF_SIZE:
+                                f.close()
+                                discard_partial_download(filepath)
+                                return False, f"Download aborted: file size exceeds {MAX_PDF_SIZE} bytes limit"
+                            f.write(chunk)
+                            if head is not None:
+                                head += chunk
+                                if len(head) >= PDF_HEADER_WINDOW:
+                                    if not has_pdf_header(head):
+                                        break
+                                    head = None
+                if head is not None and not has_pdf_header(head):
+                    discard_partial_download(filepath)
+                    return False, f"Response is not a PDF (no %PDF header, starts with {head[:32]!r})"
+
+            if expected_size is not None and total_size < expected_size:
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"connection closed after {total_size} of {expected_size} bytes")
+
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout) as e:
+            written = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if not (state.get('resumable') and written):
+                discard_partial_download(filepath)
+                return False, f"Download error: {str(e)}"
+            if attempt < PDF_DOWNLOAD_RESUME_ATTEMPTS:
+                print(f"[PDF] Download of {filename} interrupted at {written} bytes, resuming: {e}")
+                continue
+            # Keep the partial file so a later attempt can resume it
+            return False, f"Download error: {str(e)} ({written} bytes kept for resume)"
+
+        if total_size < MIN_PDF_SIZE:
+            discard_partial_download(filepath)
+            return False, f"Downloaded file too small ({total_size} bytes), likely an error page"
+
+        # Open the complete file in the inspection pool before it gets its final name
+        info = inspect_pdf(part_path)
+        if info["error"]:
+            discard_partial_download(filepath)
+            return False, f"Invalid PDF ({info['error']})"
+
+        os.replace(part_path, filepath)
+        discard_partial_download(filepath)
+        _remember_pdf_info(filepath, info)
+        return True, f"Downloaded: {filename} ({total_size} bytes)"
+
+    discard_partial_download(filepath)
+    return False, "Download error: could not resume partial download"
+
+
 def download_pdf(doi: str, pdf_url: str, save_dir: str, use_proxy: bool = False) -> Tuple[bool, str]:
     """
     Download PDF from URL and save with doi_hash filename.
+    The file only appears under its final name once it is complete (see _download_to_path).
     Returns: (success, message)
     """
     try:
@@ -326,48 +529,10 @@ def download_pdf(doi: str, pdf_url: str, save_dir: str, use_proxy: bool = False)
         }
         
         # Use proxy if enabled and URL provided
-        proxies = None
         if use_proxy and HABANERO_PROXY_URL:
-            proxies = {
-                'http': HABANERO_PROXY_URL,
-                'https': HABANERO_PROXY_URL,
-            }
             print(f"[PDF] Using proxy: {HABANERO_PROXY_URL}")
         
-        response = requests.get(pdf_url, headers=headers, proxies=proxies, timeout=30, stream=True, allow_redirects=True)
-        
-        if response.ok:
-            # Check if response is actually a PDF
-            content_type = response.headers.get('content-type', '').lower()
-            if 'pdf' not in content_type and 'application/octet-stream' not in content_type:
-                return False, f"Response is not a PDF (content-type: {content_type})"
-            
-            # Check content length to prevent DoS
-            content_length = response.headers.get('content-length')
-            if content_length and int(content_length) > MAX_PDF_SIZE:
-                return False, f"File too large ({int(content_length)} bytes exceeds {MAX_PDF_SIZE} bytes limit)"
-            
-            # Save file with size limit
-            total_size = 0
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        total_size += len(chunk)
-                        # Check size during download
-                        if total_size > MAX_PDF_SIZE:
-                            f.close()
-                            os.remove(filepath)
-                            return False, f"Download aborted: file size exceeds {MAX_PDF_SIZE} bytes limit"
-                        f.write(chunk)
-            
-            file_size = os.path.getsize(filepath)
-            if file_size < 1000:  # Likely an error page
-                os.remove(filepath)
-                return False, f"Downloaded file too small ({file_size} bytes), likely an error page"
-            
-            return True, f"Downloaded: {filename} ({file_size} bytes)"
-        else:
-            return False, f"Download failed: HTTP {response.status_code}"
+        return _download_to_path(pdf_url, filepath, headers, use_proxy=use_proxy)
             
     except Exception as e:
         return False, f"Download error: {str(e)}"
@@ -575,6 +740,279 @@ def list_project_pdfs(project_dir: str) -> List[Dict]:
     
     return pdfs
 
+def _remember_pdf_info(filepath: str, info: Dict) -> None:
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return
+    if len(_inspected) >= _INSPECTED_CACHE_SIZE:
+        _inspected.pop(next(iter(_inspected)), None)
+    _inspected[(os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns)] = info
+
+def get_pdf_file_info(filepath: str, compute_sha256: bool = True) -> Optional[Dict]:
+    """
+    Collect manifest metadata for a PDF file. The file is opened in the
+    pdf_inspect process pool; page count, title and text layer are only filled
+    in when PyMuPDF is installed.
+    Returns: {"size": ..., "mtime": ..., "sha256": ..., "pages": ..., "title": ...,
+              "has_text": ..., "error": ...} or None if unreadable
+    """
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+
+    inspected = _inspected.pop((os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns), None)
+    if inspected is None or (compute_sha256 and not inspected.get("sha256")):
+        inspected = inspect_pdf(filepath, compute_sha256)
+
+    info = {"size": stat.st_size, "mtime": stat.st_mtime}
+    for key in ("sha256", "pages", "title", "has_text", "error"):
+        info[key] = inspected.get(key)
+
+    if compute_sha256 and not info["sha256"]:
+        # Inspection timed out; the store still needs the checksum
+        sha = hashlib.sha256()
+        try:
+            with open(filepath, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    sha.update(chunk)
+            info["sha256"] = sha.hexdigest()
+        except OSError as e:
+            print(f"[PDF] Could not hash {filepath}: {e}")
+
+    return info
+
+def get_pdf_store_dir(project_dir: str) -> str:
+    """
+    The shared PDF store lives next to the project directories
+    (project_pdfs/store), so project files can be hardlinks to its blobs.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(project_dir)), "store")
+
+def get_pdf_store_path(store_dir: str, sha256: str) -> str:
+    """Path of a blob in the PDF store: <store>/<sha256[:2]>/<sha256>.pdf"""
+    return os.path.join(store_dir, sha256[:2], f"{sha256}.pdf")
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """
+    Atomically make dst a hardlink to src (a copy if hardlinks aren't supported).
+    Replacing dst rather than writing into it keeps other links to dst's old
+    file intact.
+    """
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    try:
+        os.link(src, tmp)
+    except OSError:
+        import shutil
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+def add_pdf_to_store(db_path: str, filepath: str, doi_hash: str, info: Dict) -> bool:
+    """
+    Add a project PDF to the shared store and hardlink the project file to the
+    blob. If the same content is already stored, the project file is replaced
+    by a link to the existing blob so it is only kept on disk once.
+    """
+    from harvest_store import register_pdf_blob
+
+    if not info or not info.get("sha256"):
+        return False
+
+    store_path = get_pdf_store_path(get_pdf_store_dir(os.path.dirname(filepath)), info["sha256"])
+    try:
+        if not os.path.exists(store_path):
+            os.makedirs(os.path.dirname(store_path), exist_ok=True)
+            _link_or_copy(filepath, store_path)
+        elif not os.path.samefile(filepath, store_path):
+            _link_or_copy(store_path, filepath)
+    except OSError as e:
+        print(f"[PDF] Could not add {filepath} to the PDF store: {e}")
+        return False
+
+    return register_pdf_blob(db_path, info["sha256"], info["size"], info["pages"], doi_hash,
+                             title=info.get("title"), has_text=info.get("has_text"))
+
+def link_pdf_from_store(db_path: str, project_id: int, doi: str, project_dir: str) -> Optional[str]:
+    """
+    Link a DOI's PDF into a project from the shared store, without any network
+    traffic, if any project already holds it.
+    Returns: path of the project file, or None if the store has no PDF for the DOI
+    """
+    from harvest_store import get_pdf_blob_for_doi, upsert_pdf_manifest_entry
+
+    doi_hash = generate_doi_hash(doi)
+    blob = get_pdf_blob_for_doi(db_path, doi_hash)
+    if not blob:
+        return None
+
+    store_path = get_pdf_store_path(get_pdf_store_dir(project_dir), blob["sha256"])
+    filepath = os.path.join(project_dir, f"{doi_hash}.pdf")
+    try:
+        os.makedirs(project_dir, exist_ok=True)
+        if not (os.path.exists(filepath) and os.path.samefile(filepath, store_path)):
+            _link_or_copy(store_path, filepath)
+        mtime = os.path.getmtime(filepath)
+    except OSError as e:
+        # Blob missing from disk; fall back to downloading
+        print(f"[PDF] Could not link {doi} from the PDF store: {e}")
+        return None
+
+    upsert_pdf_manifest_entry(
+        db_path, project_id, doi_hash, os.path.basename(filepath),
+        size=blob["size"], mtime=mtime, doi=doi,
+        sha256=blob["sha256"], pages=blob["pages"], source="pdf_store",
+        title=blob["title"], has_text=blob["has_text"]
+    )
+    return filepath
+
+def record_project_pdf(db_path: str, project_id: int, doi: str, filepath: str, source: str = "",
+                       store: bool = True) -> bool:
+    """
+    Add the PDF that was just written to the shared store and add or refresh
+    its pdf_manifest entry. Called after downloads and uploads.
+    With store=False (a project's own edited copy) only the manifest entry is
+    refreshed, so other projects keep getting the original from the store.
+    """
+    from harvest_store import upsert_pdf_manifest_entry
+
+    info = get_pdf_file_info(filepath)
+    if not info:
+        print(f"[PDF] Cannot record missing file in manifest: {filepath}")
+        return False
+
+    doi_hash = generate_doi_hash(doi)
+    if store and add_pdf_to_store(db_path, filepath, doi_hash, info):
+        # The project file may now be a link to an older blob with its own mtime
+        info["mtime"] = os.path.getmtime(filepath)
+
+    return upsert_pdf_manifest_entry(
+        db_path, project_id,
+        doi_hash=doi_hash,
+        filename=os.path.basename(filepath),
+        size=info["size"],
+        mtime=info["mtime"],
+        doi=doi,
+        sha256=info["sha256"],
+        pages=info["pages"],
+        source=source,
+        title=info["title"],
+        has_text=info["has_text"]
+    )
+
+def modify_project_pdf(db_path: str, project_id: int, filepath: str,
+                       modify: Callable[[str], Tuple[bool, str]]) -> Tuple[bool, str]:
+    """
+    Run modify(filepath) on a project PDF that is changed in place (e.g. adding
+    highlights). A file linked to the shared store is first replaced by its own
+    copy, so the blob and the other projects' links stay unchanged; afterwards
+    the manifest entry gets the new checksum and the blob's refcount drops.
+    Returns: what modify returned
+    """
+    from harvest_store import get_pdf_manifest
+
+    try:
+        if os.stat(filepath).st_nlink > 1:
+            import shutil
+            tmp = f"{filepath}.{os.getpid()}.tmp"
+            shutil.copy2(filepath, tmp)
+            os.replace(tmp, filepath)
+    except OSError as e:
+        print(f"[PDF] Could not copy {filepath} before modifying it: {e}")
+        return False, f"Could not copy PDF: {e}"
+
+    success, message = modify(filepath)
+    if success:
+        doi_hash = os.path.basename(filepath)[:-len('.pdf')]
+        entry = next((e for e in get_pdf_manifest(db_path, project_id) if e["doi_hash"] == doi_hash), None)
+        if entry and entry["doi"]:
+            record_project_pdf(db_path, project_id, entry["doi"], filepath, store=False)
+    return success, message
+
+def attach_project_pdf(db_path: str, project_id: int, doi: str, staged_path: str, info: Dict,
+                       source: str = "bulk_upload", project_dir: str = None) -> Optional[str]:
+    """
+    Move an already validated PDF (info from pdf_inspect) into the project
+    directory under the DOI's file name and record it in the manifest and store.
+    staged_path must be on the same filesystem as the project directory.
+    Returns: the new path, or None on error
+    """
+    if project_dir is None:
+        project_dir = get_project_pdf_dir(project_id)
+    filepath = os.path.join(project_dir, f"{generate_doi_hash(doi)}.pdf")
+    try:
+        # Replaces the directory entry only, so a previous file hardlinked into
+        # the PDF store is left intact
+        os.replace(staged_path, filepath)
+    except OSError as e:
+        print(f"[PDF] Could not move {staged_path} to {filepath}: {e}")
+        return None
+    _remember_pdf_info(filepath, info)
+    if not record_project_pdf(db_path, project_id, doi, filepath, source):
+        return None
+    return filepath
+
+def reconcile_pdf_manifest(db_path: str, project_id: int, doi_list: List[str],
+                           project_dir: str = None, dry_run: bool = False) -> Dict:
+    """
+    Bring the pdf_manifest for a project in line with the files on disk.
+    Picks up files added or replaced out-of-band and drops entries whose file is gone.
+    Files are only re-hashed when their size or mtime changed.
+    Returns: {"added": n, "updated": n, "removed": n, "unchanged": n}
+    """
+    from harvest_store import get_pdf_manifest, upsert_pdf_manifest_entry, delete_pdf_manifest_entries
+
+    if project_dir is None:
+        project_dir = get_project_pdf_dir(project_id)
+
+    doi_by_hash = {generate_doi_hash(doi): doi for doi in doi_list}
+    existing = {entry["doi_hash"]: entry for entry in get_pdf_manifest(db_path, project_id)}
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+    on_disk = set()
+    try:
+        with os.scandir(project_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.pdf') or not entry.is_file(follow_symlinks=False):
+                    continue
+                doi_hash = entry.name[:-len('.pdf')]
+                on_disk.add(doi_hash)
+
+                stat = entry.stat()
+                known = existing.get(doi_hash)
+                if known and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime:
+                    stats["unchanged"] += 1
+                    continue
+
+                stats["updated" if known else "added"] += 1
+                if dry_run:
+                    continue
+
+                info = get_pdf_file_info(entry.path)
+                if info:
+                    # Files added out-of-band (or before the store existed) are adopted
+                    # into it, if they are named after one of the project's DOIs
+                    if doi_hash in doi_by_hash and add_pdf_to_store(db_path, entry.path, doi_hash, info):
+                        info["mtime"] = os.path.getmtime(entry.path)
+                    upsert_pdf_manifest_entry(
+                        db_path, project_id, doi_hash, entry.name,
+                        size=info["size"], mtime=info["mtime"],
+                        doi=doi_by_hash.get(doi_hash),
+                        sha256=info["sha256"], pages=info["pages"],
+                        title=info["title"], has_text=info["has_text"]
+                    )
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"[PDF] Error scanning {project_dir}: {e}")
+
+    missing = [doi_hash for doi_hash in existing if doi_hash not in on_disk]
+    stats["removed"] = len(missing)
+    if missing and not dry_run:
+        delete_pdf_manifest_entries(db_path, project_id, missing)
+
+    return stats
+
 
 # ========================================================================
 # Enhanced Smart Download System
@@ -599,149 +1037,215 @@ def check_library_available(library_name: Optional[str]) -> bool:
     return True
 
 
-def try_source(source_name: str, doi: str, config: Dict) -> Tuple[bool, str, Optional[int]]:
+def try_source(source_name: str, doi: str, config: Optional[Dict] = None) -> Tuple[bool, str, Optional[int]]:
+    """
+    Try a single source to get PDF URL, with the source's timeout and
+    max_concurrency from pdf_downloads.db (see pdf_source_registry).
+    config: settings overriding the stored ones, e.g. {"timeout": 5}
+    Returns: (success, pdf_url_or_error, response_time_ms)
+    """
+    from pdf_source_registry import lookup_source
+    return lookup_source(source_name, doi, config)
+
+
+def _attempt_source(source_name: str, doi: str, project_id: int,
+                    failure_categories: Optional[List[str]] = None) -> Tuple[bool, str, Optional[int]]:
     """
-    Try a single source to get PDF URL.
+    Look up a PDF URL from one source and log the attempt.
+    The failure category of a failed lookup is appended to failure_categories if given.
     Returns: (success, pdf_url_or_error, response_time_ms)
     """
-    import time
-    from pdf_sources import (
-        try_europe_pmc, try_core, try_semantic_scholar, try_scihub,
-        try_publisher_direct, try_biorxiv_medrxiv, try_arxiv_enhanced,
-        try_pmc_enhanced, try_zenodo, try_doaj
+    from pdf_download_db import log_download_attempt
+    from pdf_sources import classify_failure
+    from pdf_sources import is_temporary_failure
+    from pdf_download_scheduler import wait_for_source, get_source_breaker
+    from harvest_metrics import observe_source_lookup
+
+    from pdf_source_registry import get_source_settings
+
+    if not get_source_settings(source_name)["enabled"]:
+        # Disabled by an admin while the DOI was in progress; not an attempt, so not logged
+        return False, f"Source {source_name} is disabled, skipped", None
+
+    breaker = get_source_breaker(source_name)
+    if not breaker.allow_request():
+        # Open circuit (or another thread is probing it); not an attempt, so not logged
+        return False, f"Circuit open for {source_name}, skipped", None
+
+    # REST sources are rate limited per host by the shared HTTP session;
+    # this only throttles sources that make requests through their own client library
+    wait_for_source(source_name)
+    success, result, response_time = try_source(source_name, doi)
+    observe_source_lookup(source_name, (response_time or 0) / 1000.0, success)
+
+    failure_category = None if success else classify_failure(result)
+    if failure_category and failure_categories is not None:
+        failure_categories.append(failure_category)
+    if failure_category and is_temporary_failure(failure_category):
+        breaker.record_failure(result)
+    else:
+        # Answering "not found" / "paywall" means the source itself is healthy
+        breaker.record_success()
+
+    log_download_attempt(
+        project_id=project_id,
+        doi=doi,
+        source_name=source_name,
+        success=success,
+        failure_reason=None if success else result,
+        failure_category=failure_category,
+        response_time_ms=response_time,
+        pdf_url=result if success else None
     )
-    
-    start_time = time.time()
+    return success, result, response_time
+
+
+def _download_resolved_url(doi: str, project_id: int, source_name: str, pdf_url: str, save_dir: str,
+                           failure_categories: Optional[List[str]] = None) -> Tuple[bool, str]:
+    """
+    Download a PDF URL returned by a source, logging a *_download attempt on failure.
+    The failure category is appended to failure_categories if given.
+    """
+    from pdf_download_db import log_download_attempt
+    from pdf_sources import classify_failure
+
+    dl_success, dl_message = download_pdf(doi, pdf_url, save_dir)
+    if not dl_success:
+        failure_category = classify_failure(dl_message)
+        if failure_categories is not None:
+            failure_categories.append(failure_category)
+        # Download failed even though we got a URL
+        log_download_attempt(
+            project_id=project_id,
+            doi=doi,
+            source_name=f"{source_name}_download",
+            success=False,
+            failure_reason=dl_message,
+            failure_category=failure_category,
+            response_time_ms=None,
+            pdf_url=pdf_url
+        )
+    return dl_success, dl_message
 
-    try:
-        if source_name == 'unpaywall':
-            is_oa, result = check_open_access(doi, UNPAYWALL_EMAIL)
-            response_time = int((time.time() - start_time) * 1000)
-            return is_oa, result, response_time
 
-        elif source_name == 'unpywall':
+def _resolve_hedged(doi: str, project_id: int, save_dir: str, source_names: List[str],
+                    failure_categories: Optional[List[str]] = None) -> Tuple[bool, str, str, Optional[str]]:
+    """
+    Query several sources concurrently and keep the first URL that downloads as a valid PDF.
+
+    Lookups run in parallel; resolved URLs are downloaded one at a time in the
+    order they arrive. Once a download succeeds, lookups that have not started
+    are cancelled and the ones in flight finish (and are logged) in the background.
+
+    Returns: (success, message, source_used, pdf_url)
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    print(f"[PDF Smart] Hedged lookup for {doi} across: {', '.join(source_names)}")
+    executor = ThreadPoolExecutor(max_workers=len(source_names), thread_name_prefix="pdf-hedge")
+    futures = {
+        executor.submit(_attempt_source, name, doi, project_id, failure_categories): name
+        for name in source_names
+    }
+    try:
+        for future in as_completed(futures):
+            source_name = futures[future]
             try:
-                from unpywall import Unpywall
-                pdf_link = Unpywall.get_pdf_link(doi=doi)
-                response_time = int((time.time() - start_time) * 1000)
-                if pdf_link:
-                    return True, pdf_link, response_time
-                return False, "Unpywall library returned no PDF link", response_time
+                success, result, _ = future.result()
             except Exception as e:
-                response_time = int((time.time() - start_time) * 1000)
-                return False, f"Unpywall library error: {str(e)}", response_time
-
-        elif source_name == 'biorxiv_medrxiv':
-            timeout = config.get('timeout', 15)
-            success, result = try_biorxiv_medrxiv(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'europe_pmc':
-            timeout = config.get('timeout', 15)
-            success, result = try_europe_pmc(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'pmc_enhanced':
-            timeout = config.get('timeout', 15)
-            success, result = try_pmc_enhanced(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'arxiv_enhanced':
-            timeout = config.get('timeout', 15)
-            success, result = try_arxiv_enhanced(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'core':
-            timeout = config.get('timeout', 15)
-            api_key = config.get('core_api_key')
-            success, result = try_core(doi, api_key, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'zenodo':
-            timeout = config.get('timeout', 15)
-            success, result = try_zenodo(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'semantic_scholar':
-            timeout = config.get('timeout', 15)
-            success, result = try_semantic_scholar(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'doaj':
-            timeout = config.get('timeout', 15)
-            success, result = try_doaj(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'scihub':
-            timeout = config.get('timeout', 20)
-            success, result = try_scihub(doi, timeout=timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'publisher_direct':
-            timeout = config.get('timeout', 15)
-            success, result = try_publisher_direct(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'metapub':
-            if METAPUB_AVAILABLE:
-                success, result = try_metapub_download(doi)
-                response_time = int((time.time() - start_time) * 1000)
-                return success, result, response_time
-            return False, "Metapub not available", 0
-
-        elif source_name == 'habanero':
-            if HABANERO_AVAILABLE:
-                success, result = try_habanero_download(doi)
-                response_time = int((time.time() - start_time) * 1000)
-                return success, result, response_time
-            return False, "Habanero not available", 0
+                print(f"[PDF Smart] {source_name} failed: {e}")
+                continue
 
-        else:
-            return False, f"Unknown source: {source_name}", 0
+            if not success:
+                print(f"[PDF Smart] {source_name} failed: {result}")
+                continue
+
+            dl_success, dl_message = _download_resolved_url(doi, project_id, source_name, result, save_dir,
+                                                            failure_categories)
+            if dl_success:
+                return True, dl_message, source_name, result
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return False, "All hedged sources failed", "none", None
 
-    except Exception as e:
-        response_time = int((time.time() - start_time) * 1000)
-        return False, f"Exception: {str(e)}", response_time
+
+def _candidate_sources(doi_prefix: str) -> List[str]:
+    """
+    Sources to try for a DOI, in order. With adaptive_source_ranking enabled
+    the usable sources are ordered by a Thompson sample of their success rate
+    and lookup time for this publisher (see pdf_source_ranker). Otherwise the
+    source that worked best for this publisher comes first, then the remaining
+    usable sources ranked by overall performance.
+    """
+    from pdf_download_db import (
+        get_source_rankings, get_best_source_for_publisher, get_prefix_source_stats, get_config_value
+    )
+
+    usable = []
+    for source_info in get_source_rankings():
+        source_name = source_info['name']
+
+        # Skip if requires unavailable library
+        requires_lib = source_info.get('requires_library')
+        if not check_library_available(requires_lib):
+            print(f"[PDF Smart] Skipping {source_name}: required library '{requires_lib}' not available")
+            continue
+
+        # Skip if disabled
+        if not source_info.get('enabled', True):
+            print(f"[PDF Smart] Skipping {source_name}: disabled")
+            continue
+
+        usable.append(source_info)
+
+    if get_config_value('adaptive_source_ranking', '1') == '1':
+        from pdf_source_ranker import rank_sources
+        return rank_sources([s['name'] for s in usable], get_prefix_source_stats(doi_prefix),
+                            {s['name']: s for s in usable})
+
+    candidates = []
+    best_for_publisher = get_best_source_for_publisher(doi_prefix)
+    if best_for_publisher:
+        candidates.append(best_for_publisher)
+    candidates.extend(s['name'] for s in usable if s['name'] != best_for_publisher)
+    return candidates
 
 
 def download_pdf_smart(
     doi: str,
     project_id: int,
     save_dir: str,
-    progress_callback=None
+    progress_callback=None,
+    prefetched_url: Optional[str] = None
 ) -> Tuple[bool, str, str]:
     """
     Smart PDF download using database-driven source selection.
 
     Strategy:
-    1. Check if file already exists
-    2. Check publisher-specific successful source from history
-    3. Get sources ranked by overall performance
-    4. Try sources in optimized order
+    1. Check if file already exists, then try prefetched_url (found by the
+       batched OpenAlex lookup in process_dois_smart) if given
+    2. Order sources by sampled success rate per lookup time for the publisher
+       (adaptive_source_ranking), or publisher-specific successful source
+       from history first, then sources ranked by overall performance
+       (minus sources that failed permanently for this DOI within
+       negative_cache_ttl_days)
+    3. Query the top hedged_source_count sources concurrently and keep the
+       first valid PDF (hedged_source_count <= 1 disables this)
+    4. Try the remaining sources one by one
     5. Log all attempts to database
     6. Record successful patterns for future use
-    7. Add to retry queue if temporary failure
+    7. Add to retry queue if temporary failure (timeouts, rate limits, server
+       errors, open circuits); a permanent failure removes the DOI from it
 
     Returns: (success, message, source_used)
     """
     from pdf_download_db import (
-        init_pdf_download_db, log_download_attempt, get_source_rankings,
-        get_best_source_for_publisher, record_publisher_success,
-        add_to_retry_queue, remove_from_retry_queue, get_config_value
-    )
-    from pdf_sources import (
-        classify_failure, is_temporary_failure, extract_doi_prefix, get_publisher_name
+        init_pdf_download_db, record_publisher_success, add_to_retry_queue,
+        remove_from_retry_queue, get_config_value, get_negative_cached_sources
     )
+    from pdf_sources import extract_doi_prefix, get_publisher_name, is_temporary_failure
+    from pdf_download_scheduler import get_source_breaker
     
     # Initialize database if needed
     init_pdf_download_db()
@@ -758,124 +1262,151 @@ def download_pdf_smart(
     if os.path.exists(filepath) and os.path.getsize(filepath) > 0:
         return True, f"File already exists: {filename}", "cached"
 
-    # Get configuration
-    rate_limit_delay = int(get_config_value('rate_limit_delay_seconds', '1'))
-
     # Extract publisher info
     doi_prefix = extract_doi_prefix(doi)
     publisher_name = get_publisher_name(doi)
 
     print(f"[PDF Smart] Processing {doi} (Publisher: {publisher_name})")
 
-    # Step 1: Try publisher-specific best source first
-    best_for_publisher = get_best_source_for_publisher(doi_prefix)
-    tried_sources = set()
-
-    if best_for_publisher:
-        print(f"[PDF Smart] Trying publisher-optimized source: {best_for_publisher}")
-        tried_sources.add(best_for_publisher)
-
-        success, result, response_time = try_source(best_for_publisher, doi, {})
-
-        # Log attempt
-        log_download_attempt(
-            project_id=project_id,
-            doi=doi,
-            source_name=best_for_publisher,
-            success=success,
-            failure_reason=None if success else result,
-            failure_category=None if success else classify_failure(result),
-            response_time_ms=response_time,
-            pdf_url=result if success else None
-        )
-
+    candidates = _candidate_sources(doi_prefix)
+    failure_categories = []
+
+    def on_success(source_name: str, pdf_url: str):
+        # Record this success for publisher pattern learning
+        record_publisher_success(doi_prefix, publisher_name, source_name, pdf_url)
+        # Remove from retry queue if it was there
+        remove_from_retry_queue(project_id, doi)
+        print(f"[PDF Smart] Success via {source_name}")
+
+    def on_failure(message: str) -> Tuple[bool, str, str]:
+        # Schedule a background retry if any source failed for a reason that may go away
+        temporary = [c for c in failure_categories if is_temporary_failure(c)]
+        if temporary and PDF_SMART_RETRY_ENABLED and add_to_retry_queue(
+                project_id, doi, temporary[0],
+                retry_delay_minutes=int(get_config_value('retry_delay_minutes', '60')),
+                max_retry_attempts=int(get_config_value('max_retry_attempts', '3'))):
+            print(f"[PDF Smart] Retry scheduled for {doi} ({temporary[0]})")
+            # Still reported as needing upload: the retry may never find a PDF
+            return False, f"{message} ({temporary[0]}), needs upload, {RETRY_SCHEDULED_MESSAGE}", "none"
+        if not temporary:
+            remove_from_retry_queue(project_id, doi)
+        return False, message, "none"
+
+    # The OpenAlex batch lookup already resolved a URL; its lookup was logged there
+    if prefetched_url:
+        dl_success, dl_message = _download_resolved_url(doi, project_id, OPENALEX_SOURCE, prefetched_url,
+                                                        save_dir, failure_categories)
+        if dl_success:
+            on_success(OPENALEX_SOURCE, prefetched_url)
+            return True, dl_message, OPENALEX_SOURCE
+        print(f"[PDF Smart] OpenAlex URL failed for {doi}: {dl_message}")
+        candidates = [name for name in candidates if name != OPENALEX_SOURCE]
+
+    # Skip sources that recently failed permanently for this DOI; temporary
+    # failures (timeouts, rate limits, server errors) are always retried
+    negative_cached = get_negative_cached_sources(doi, float(get_config_value('negative_cache_ttl_days', '14')))
+    skipped = [name for name in candidates if name in negative_cached]
+    if skipped:
+        candidates = [name for name in candidates if name not in negative_cached]
+        print(f"[PDF Smart] Skipping {len(skipped)} source(s) with recent permanent failures: "
+              + ", ".join(f"{name} ({negative_cached[name]})" for name in skipped))
+        if not candidates:
+            return False, "All download sources failed recently (cached)", "none"
+
+    # Skip sources whose circuit is open (degraded upstream); once the cooldown
+    # has passed they are tried again as a probe
+    open_circuits = [name for name in candidates if get_source_breaker(name).is_open()]
+    if open_circuits:
+        print(f"[PDF Smart] Skipping source(s) with open circuit: {', '.join(open_circuits)}")
+        candidates = [name for name in candidates if name not in open_circuits]
+        # A tripped circuit is a temporary condition for this DOI
+        failure_categories.append('server_error')
+        if not candidates:
+            return on_failure("All download sources unavailable (circuit open)")
+
+    # Step 1: Hedged lookup across the top sources
+    hedge_width = int(get_config_value('hedged_source_count', '3'))
+    if hedge_width > 1 and len(candidates) > 1:
+        hedged, candidates = candidates[:hedge_width], candidates[hedge_width:]
+        success, message, source_name, pdf_url = _resolve_hedged(doi, project_id, save_dir, hedged,
+                                                                 failure_categories)
         if success:
-            # Try to download the PDF
-            dl_success, dl_message = download_pdf(doi, result, save_dir)
-            if dl_success:
-                # Update publisher pattern
-                record_publisher_success(doi_prefix, publisher_name, best_for_publisher, result)
-                print(f"[PDF Smart] Success via publisher-optimized source: {best_for_publisher}")
-                return True, dl_message, best_for_publisher
+            on_success(source_name, pdf_url)
+            return True, message, source_name
 
-        time.sleep(rate_limit_delay)
+    # Step 2: Try the remaining sources in order
+    for source_name in candidates:
+        print(f"[PDF Smart] Trying {source_name}")
 
-    # Step 2: Try sources ranked by performance
-    source_rankings = get_source_rankings()
-
-    for source_info in source_rankings:
-        source_name = source_info['name']
-
-        # Skip if already tried
-        if source_name in tried_sources:
-            continue
-
-        # Skip if requires unavailable library
-        requires_lib = source_info.get('requires_library')
-        if not check_library_available(requires_lib):
-            print(f"[PDF Smart] Skipping {source_name}: required library '{requires_lib}' not available")
-            continue
-
-        # Skip if disabled
-        if not source_info.get('enabled', True):
-            print(f"[PDF Smart] Skipping {source_name}: disabled")
-            continue
-
-        print(f"[PDF Smart] Trying {source_name} (success rate: {source_info['success_rate']:.1f}%)")
-        tried_sources.add(source_name)
-
-        success, result, response_time = try_source(source_name, doi, {})
-
-        # Classify failure
-        failure_category = None if success else classify_failure(result)
-
-        # Log attempt
-        log_download_attempt(
-            project_id=project_id,
-            doi=doi,
-            source_name=source_name,
-            success=success,
-            failure_reason=None if success else result,
-            failure_category=failure_category,
-            response_time_ms=response_time,
-            pdf_url=result if success else None
-        )
+        success, result, _ = _attempt_source(source_name, doi, project_id, failure_categories)
 
         if success:
-            # Try to download the PDF
-            dl_success, dl_message = download_pdf(doi, result, save_dir)
-
+            dl_success, dl_message = _download_resolved_url(doi, project_id, source_name, result, save_dir,
+                                                            failure_categories)
             if dl_success:
-                # Record this success for publisher pattern learning
-                record_publisher_success(doi_prefix, publisher_name, source_name, result)
-                print(f"[PDF Smart] Success via {source_name}")
-
-                # Remove from retry queue if it was there
-                remove_from_retry_queue(project_id, doi)
-
+                on_success(source_name, result)
                 return True, dl_message, source_name
-            else:
-                # Download failed even though we got a URL
-                failure_cat = classify_failure(dl_message)
-                log_download_attempt(
-                    project_id=project_id,
-                    doi=doi,
-                    source_name=f"{source_name}_download",
-                    success=False,
-                    failure_reason=dl_message,
-                    failure_category=failure_cat,
-                    response_time_ms=None,
-                    pdf_url=result
-                )
         else:
             print(f"[PDF Smart] {source_name} failed: {result}")
 
-        # Rate limiting between sources
-        time.sleep(rate_limit_delay)
-
     # All sources failed
     print(f"[PDF Smart] All sources failed for {doi}")
-    return False, "All download sources failed", "none"
+    if 'invalid_pdf' in failure_categories:
+        return on_failure("All download sources failed (downloaded files were not valid PDFs)")
+    return on_failure("All download sources failed")
+
+
+def prefetch_openalex_urls(dois: List[str], project_id: int) -> Dict[str, str]:
+    """
+    Look up open access PDF URLs for all DOIs of a job in batched OpenAlex
+    requests (OPENALEX_BATCH_SIZE DOIs each) before walking sources per DOI.
+
+    Every DOI OpenAlex answered for is logged as an openalex attempt, so DOIs
+    it has no PDF for skip the per-DOI OpenAlex lookup (negative cache) and
+    the ranker learns from the batch. Skipped when openalex_prefetch is 0, the
+    openalex source is disabled or its circuit is open.
+    Returns: {doi: pdf_url} for the DOIs that resolved
+    """
+    from pdf_download_db import (
+        get_config_value, get_source_rankings, log_download_attempt, flush_download_attempts
+    )
+    from pdf_sources import fetch_openalex_oa_locations, classify_failure, OPENALEX_BATCH_SIZE
+    from pdf_download_scheduler import get_source_breaker
+
+    if len(dois) < 2 or get_config_value('openalex_prefetch', '1') != '1':
+        return {}
+    if not any(s['name'] == OPENALEX_SOURCE for s in get_source_rankings()):
+        return {}
+    breaker = get_source_breaker(OPENALEX_SOURCE)
+    if breaker.is_open():
+        return {}
+
+    start_time = time.time()
+    found, errors = fetch_openalex_oa_locations(dois, UNPAYWALL_EMAIL)
+    elapsed_ms = int((time.time() - start_time) * 1000)
+    for error in errors:
+        breaker.record_failure(error)
+    if len(errors) < (len(dois) + OPENALEX_BATCH_SIZE - 1) // OPENALEX_BATCH_SIZE:
+        breaker.record_success()
+
+    # Each DOI is charged its share of the batch requests
+    per_doi_ms = elapsed_ms // max(len(dois), 1)
+    urls = {}
+    for doi, pdf_url in found.items():
+        if pdf_url:
+            urls[doi] = pdf_url
+            log_download_attempt(project_id, doi, OPENALEX_SOURCE, True,
+                                 response_time_ms=per_doi_ms, pdf_url=pdf_url)
+        else:
+            reason = "OpenAlex: not open access (no PDF location)"
+            log_download_attempt(project_id, doi, OPENALEX_SOURCE, False, reason, classify_failure(reason),
+                                 response_time_ms=per_doi_ms)
+    # Make the failures visible to the negative cache before the per-DOI walk
+    flush_download_attempts()
+
+    print(f"[PDF Smart] OpenAlex batch lookup: {len(urls)} of {len(dois)} DOIs have an OA PDF URL "
+          f"({len(found)} known, {len(errors)} failed request(s), {elapsed_ms} ms)")
+    return urls
 
 
 def process_dois_smart(
@@ -887,11 +1418,19 @@ def process_dois_smart(
     """
     Process multiple DOIs using smart download strategy.
 
+    Open access PDF URLs for the whole list are first looked up in batched
+    OpenAlex requests (prefetch_openalex_urls). DOIs are then downloaded in
+    parallel on a worker pool (download_workers setting), starting with the
+    prefetched URL if there is one; upstream request rates are limited per
+    host by pdf_download_scheduler.
+
     Args:
         doi_list: List of DOIs to download
         project_id: Project ID for tracking
         project_dir: Directory to save PDFs
-        progress_callback: Optional callback(idx, doi, success, message, source)
+        progress_callback: Optional callback(idx, doi, success, message, source).
+            Called from a single thread, once per DOI in completion order;
+            idx + 1 is the number of DOIs processed so far.
 
     Returns: {
         "downloaded": [(doi, filename, message, source), ...],
@@ -899,7 +1438,10 @@ def process_dois_smart(
         "errors": [(doi, error), ...]
     }
     """
-    from pdf_download_db import init_pdf_download_db, get_config_value
+    from pdf_download_db import init_pdf_download_db, get_config_value, save_circuit_breaker_state
+    from pdf_download_scheduler import (
+        run_download_pool, set_default_host_rate, configure_circuit_breakers, DEFAULT_DOWNLOAD_WORKERS
+    )
     
     # Initialize database
     init_pdf_download_db()
@@ -921,7 +1463,18 @@ def process_dois_smart(
         "errors": []
     }
 
-    for idx, doi in enumerate(doi_list):
+    set_default_host_rate(float(get_config_value('rate_limit_delay_seconds', '1')))
+    configure_circuit_breakers(
+        int(get_config_value('circuit_breaker_failures', '5')),
+        float(get_config_value('circuit_breaker_cooldown_seconds', '300')),
+        on_change=save_circuit_breaker_state
+    )
+    max_workers = int(get_config_value('download_workers', str(DEFAULT_DOWNLOAD_WORKERS)))
+
+    # Clean and validate DOIs up front; invalid ones are reported immediately
+    valid_dois = []
+    completed = 0
+    for doi in doi_list:
         doi = doi.strip()
         if not doi:
             continue
@@ -934,37 +1487,42 @@ def process_dois_smart(
             print(f"[PDF Smart] Invalid DOI: {doi}")
             results["errors"].append((doi, "Invalid DOI format"))
             if progress_callback:
-                progress_callback(idx, doi, False, "Invalid DOI format", "")
+                progress_callback(completed, doi, False, "Invalid DOI format", "")
+            completed += 1
             continue
 
-        doi_hash = generate_doi_hash(doi)
-        filename = sanitize_filename(f"{doi_hash}.pdf")
+        valid_dois.append(doi)
 
-        print(f"[PDF Smart] Processing DOI {idx + 1}/{len(doi_list)}: {doi}")
+    prefetched = prefetch_openalex_urls(valid_dois, project_id)
 
-        try:
-            success, message, source = download_pdf_smart(doi, project_id, project_dir, progress_callback)
+    def download_one(doi: str) -> Tuple[bool, str, str]:
+        return download_pdf_smart(doi, project_id, project_dir, prefetched_url=prefetched.get(doi))
 
-            if success:
-                print(f"[PDF Smart] Success via {source}: {message}")
-                results["downloaded"].append((doi, filename, message, source))
-                if progress_callback:
-                    progress_callback(idx, doi, True, message, source)
-            else:
-                print(f"[PDF Smart] Failed: {message}")
-                results["needs_upload"].append((doi, filename, message))
-                if progress_callback:
-                    progress_callback(idx, doi, False, message, "")
+    def on_result(completed_idx: int, doi: str, result, error):
+        idx = completed + completed_idx
+        filename = sanitize_filename(f"{generate_doi_hash(doi)}.pdf")
 
-            # Rate limiting between DOIs
-            rate_limit_delay = int(get_config_value('rate_limit_delay_seconds', '1'))
-            time.sleep(rate_limit_delay)
+        if error is not None:
+            print(f"[PDF Smart] Error processing {doi}: {error}")
+            results["errors"].append((doi, str(error)))
+            if progress_callback:
+                progress_callback(idx, doi, False, f"Error: {str(error)}", "")
+            return
 
-        except Exception as e:
-            print(f"[PDF Smart] Error processing {doi}: {e}")
-            results["errors"].append((doi, str(e)))
+        success, message, source = result
+        print(f"[PDF Smart] Finished DOI {idx + 1}/{len(doi_list)}: {doi}")
+        if success:
+            print(f"[PDF Smart] Success via {source}: {message}")
+            results["downloaded"].append((doi, filename, message, source))
             if progress_callback:
-                progress_callback(idx, doi, False, f"Error: {str(e)}", "")
+                progress_callback(idx, doi, True, message, source)
+        else:
+            print(f"[PDF Smart] Failed: {message}")
+            results["needs_upload"].append((doi, filename, message))
+            if progress_callback:
+                progress_callback(idx, doi, False, message, "")
+
+    run_download_pool(valid_dois, download_one, on_result, max_workers)
 
     print(f"[PDF Smart] Batch complete - Downloaded: {len(results['downloaded'])}, "
           f"Needs upload: {len(results['needs_upload'])}, Errors: {len(results['errors'])}")
@@ -11,8 +11,7 @@ from typing import List, Dict, Tuple, Optional
 from pathlib import Path
 
 from pdf_manager import (
-    download_pdf, validate_doi, generate_doi_hash, sanitize_filename,
-    check_open_access, try_metapub_download, try_habanero_download,
+    download_pdf, validate_doi, generate_doi_hash, sanitize_filename, try_source,
     METAPUB_AVAILABLE, HABANERO_AVAILABLE
 )
 from pdf_download_db import (
@@ -21,18 +20,10 @@ from pdf_download_db import (
     add_to_retry_queue, remove_from_retry_queue, get_config_value
 )
 from pdf_sources import (
-    try_europe_pmc, try_core, try_semantic_scholar, try_scihub,
-    try_publisher_direct, classify_failure, is_temporary_failure,
-    get_retry_delay_seconds, extract_doi_prefix, get_publisher_name,
-    try_biorxiv_medrxiv, try_arxiv_enhanced, try_pmc_enhanced,
-    try_zenodo, try_doaj
+    classify_failure, is_temporary_failure, get_retry_delay_seconds,
+    extract_doi_prefix, get_publisher_name
 )
 
-try:
-    from config import UNPAYWALL_EMAIL
-except ImportError:
-    UNPAYWALL_EMAIL = "research@example.com"
-
 
 def check_library_available(library_name: Optional[str]) -> bool:
     """Check if an optional library is available"""
@@ -53,114 +44,6 @@ def check_library_available(library_name: Optional[str]) -> bool:
     return True
 
 
-def try_source(source_name: str, doi: str, config: Dict) -> Tuple[bool, str, Optional[int]]:
-    """
-    Try a single source to get PDF URL.
-    Returns: (success, pdf_url_or_error, response_time_ms)
-    """
-    start_time = time.time()
-
-    try:
-        if source_name == 'unpaywall':
-            is_oa, result = check_open_access(doi, UNPAYWALL_EMAIL)
-            response_time = int((time.time() - start_time) * 1000)
-            return is_oa, result, response_time
-
-        elif source_name == 'unpywall':
-            try:
-                from unpywall import Unpywall
-                pdf_link = Unpywall.get_pdf_link(doi=doi)
-                response_time = int((time.time() - start_time) * 1000)
-                if pdf_link:
-                    return True, pdf_link, response_time
-                return False, "Unpywall library returned no PDF link", response_time
-            except Exception as e:
-                response_time = int((time.time() - start_time) * 1000)
-                return False, f"Unpywall library error: {str(e)}", response_time
-
-        elif source_name == 'biorxiv_medrxiv':
-            timeout = config.get('timeout', 15)
-            success, result = try_biorxiv_medrxiv(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'europe_pmc':
-            timeout = config.get('timeout', 15)
-            success, result = try_europe_pmc(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'pmc_enhanced':
-            timeout = config.get('timeout', 15)
-            success, result = try_pmc_enhanced(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'arxiv_enhanced':
-            timeout = config.get('timeout', 15)
-            success, result = try_arxiv_enhanced(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'core':
-            timeout = config.get('timeout', 15)
-            api_key = config.get('core_api_key')
-            success, result = try_core(doi, api_key, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'zenodo':
-            timeout = config.get('timeout', 15)
-            success, result = try_zenodo(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'semantic_scholar':
-            timeout = config.get('timeout', 15)
-            success, result = try_semantic_scholar(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'doaj':
-            timeout = config.get('timeout', 15)
-            success, result = try_doaj(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'scihub':
-            timeout = config.get('timeout', 20)
-            success, result = try_scihub(doi, timeout=timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'publisher_direct':
-            timeout = config.get('timeout', 15)
-            success, result = try_publisher_direct(doi, timeout)
-            response_time = int((time.time() - start_time) * 1000)
-            return success, result, response_time
-
-        elif source_name == 'metapub':
-            if METAPUB_AVAILABLE:
-                success, result = try_metapub_download(doi)
-                response_time = int((time.time() - start_time) * 1000)
-                return success, result, response_time
-            return False, "Metapub not available", 0
-
-        elif source_name == 'habanero':
-            if HABANERO_AVAILABLE:
-                success, result = try_habanero_download(doi)
-                response_time = int((time.time() - start_time) * 1000)
-                return success, result, response_time
-            return False, "Habanero not available", 0
-
-        else:
-            return False, f"Unknown source: {source_name}", 0
-
-    except Exception as e:
-        response_time = int((time.time() - start_time) * 1000)
-        return False, f"Exception: {str(e)}", response_time
-
-
 def download_pdf_smart(
     doi: str,
     project_id: int,
@@ -213,7 +96,7 @@ def download_pdf_smart(
         print(f"[PDF Smart] Trying publisher-optimized source: {best_for_publisher}")
         tried_sources.add(best_for_publisher)
 
-        success, result, response_time = try_source(best_for_publisher, doi, {})
+        success, result, response_time = try_source(best_for_publisher, doi)
 
         # Log attempt
         log_download_attempt(
@@ -262,7 +145,7 @@ def download_pdf_smart(
         print(f"[PDF Smart] Trying {source_name} (success rate: {source_info['success_rate']:.1f}%)")
         tried_sources.add(source_name)
 
-        success, result, response_time = try_source(source_name, doi, {})
+        success, result, response_time = try_source(source_name, doi)
 
         # Classify failure
         failure_category = None if success else classify_failure(result)
@@ -314,7 +197,7 @@ def download_pdf_smart(
     # Step 3: Try publisher direct as last resort before giving up
     if 'publisher_direct' not in tried_sources:
         print(f"[PDF Smart] Trying publisher_direct as last resort")
-        success, result, response_time = try_source('publisher_direct', doi, {})
+        success, result, response_time = try_source('publisher_direct', doi)
 
         log_download_attempt(
             project_id=project_id,
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF Download Progress Stream
+Server-Sent Events for the progress of a project's PDF download.
+
+All clients watching the same project share one poller thread. It reads the
+progress row and the newly finished DOIs from harvest.db every
+PDF_PROGRESS_STREAM_POLL_SECONDS and wakes the clients' streams only when
+something changed, so the database sees the same load for one watching admin
+as for fifty.
+
+A stream sends:
+
+    event: progress  counters, status, stale warning and queue position
+    event: doi       one finished DOI; its id is the event id, so a reconnecting
+                     EventSource resumes after it (Last-Event-ID)
+    event: done      the final snapshot (with full_results when completed),
+                     after which the stream ends
+
+and a comment line every PDF_PROGRESS_STREAM_KEEPALIVE_SECONDS so proxies keep
+the connection open and disconnected clients are noticed.
+"""
+
+import json
+import time
+import threading
+from collections import deque
+from typing import Dict, Iterator, Optional, Tuple
+
+from harvest_store import (
+    get_pdf_download_progress, get_pdf_download_events, get_latest_pdf_download_event_id,
+    get_pdf_download_results, get_pdf_download_queue, is_download_stale
+)
+
+try:
+    from config import PDF_PROGRESS_STREAM_POLL_SECONDS, PDF_PROGRESS_STREAM_KEEPALIVE_SECONDS
+except ImportError:
+    PDF_PROGRESS_STREAM_POLL_SECONDS = 1.0
+    PDF_PROGRESS_STREAM_KEEPALIVE_SECONDS = 15
+
+# Finished DOIs kept in memory per project; a client further behind reads the
+# rest from the database
+EVENT_BUFFER_SIZE = 1000
+STALE_THRESHOLD_SECONDS = 300
+
+# Snapshot fields that change on every poll without anything happening
+_VOLATILE_FIELDS = ("eta_seconds", "time_since_update_seconds")
+
+
+class _ProjectChannel:
+    """Latest progress snapshot and recent finished DOIs of one project, kept current by a poller thread."""
+
+    def __init__(self, db_path: str, project_id: int):
+        self.db_path = db_path
+        self.project_id = project_id
+        self.cond = threading.Condition()
+        self.subscribers = 0
+        self.closed = threading.Event()
+        self.version = 0
+        self.snapshot: Optional[Dict] = None
+        self.job_id = None
+        self.events = deque(maxlen=EVENT_BUFFER_SIZE)
+        self.cursor = 0       # Newest event id read
+        self.floor = 0        # Events up to this id are not (or no longer) in the buffer
+        self.mechanisms = None
+
+    def run(self) -> None:
+        while not self.closed.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"[PDF Progress Stream] Error polling project {self.project_id}: {e}")
+            self.closed.wait(PDF_PROGRESS_STREAM_POLL_SECONDS)
+
+    def poll(self) -> None:
+        progress = get_pdf_download_progress(self.db_path, self.project_id)
+        new_events = []
+        job_id = progress.get("job_id") if progress else None
+        if job_id != self.job_id:
+            # First poll: start from the job's newest event. A job started while
+            # clients are watching (force restart) is streamed from its first DOI.
+            first_poll = self.snapshot is None
+            self.job_id = job_id
+            self.cursor = get_latest_pdf_download_event_id(self.db_path, job_id) if job_id and first_poll else 0
+            with self.cond:
+                self.events.clear()
+                self.floor = self.cursor
+        if job_id:
+            while True:
+                page = get_pdf_download_events(self.db_path, job_id, after_id=self.cursor)
+                new_events.extend(page)
+                if page:
+                    self.cursor = page[-1]["id"]
+                if len(page) < 500:
+                    break
+
+        snapshot = self._build_snapshot(progress)
+        changed = self.snapshot is None or _comparable(snapshot) != _comparable(self.snapshot)
+        if not changed and not new_events:
+            return
+        with self.cond:
+            for event in new_events:
+                if len(self.events) == self.events.maxlen:
+                    self.floor = self.events[0]["id"]
+                self.events.append(event)
+            self.snapshot = snapshot
+            self.version += 1
+            self.cond.notify_all()
+
+    def _build_snapshot(self, progress: Optional[Dict]) -> Dict:
+        if not progress:
+            return {"status": "not_started"}
+
+        snapshot = {key: progress.get(key) for key in (
+            "status", "total", "current", "current_doi", "current_source", "downloaded_count",
+            "needs_upload_count", "errors_count", "project_dir", "job_id")}
+        snapshot["active_mechanisms"] = self._active_mechanisms()
+
+        status = progress.get("status")
+        if status == "running":
+            is_stale = is_download_stale(self.db_path, self.project_id, STALE_THRESHOLD_SECONDS)
+            snapshot["is_stale"] = is_stale
+            if is_stale:
+                snapshot["time_since_update_seconds"] = int(time.time() - (progress.get("updated_at") or 0))
+                snapshot["warning"] = "Download appears to be stale (not updated recently). You can force restart it."
+            for job in get_pdf_download_queue(self.db_path):
+                if job["project_id"] == self.project_id:
+                    snapshot.update({key: job[key] for key in ("queue_position", "priority", "eta_seconds")})
+                    snapshot["job_status"] = job["status"]
+                    break
+        elif status == "completed" and progress.get("job_id"):
+            previous = self.snapshot or {}
+            if previous.get("status") == "completed" and previous.get("job_id") == progress["job_id"]:
+                snapshot["full_results"] = previous.get("full_results")
+            else:
+                snapshot["full_results"] = get_pdf_download_results(self.db_path, progress["job_id"])
+        return snapshot
+
+    def _active_mechanisms(self) -> list:
+        # Source configuration barely changes during a download; read it once per channel
+        if self.mechanisms is None:
+            try:
+                from pdf_manager import get_active_download_mechanisms
+                self.mechanisms = [
+                    {"name": m["name"], "description": m.get("description", "")}
+                    for m in get_active_download_mechanisms()
+                ]
+            except Exception as e:
+                print(f"[PDF Progress Stream] Could not get active mechanisms: {e}")
+                self.mechanisms = []
+        return self.mechanisms
+
+
+def _comparable(snapshot: Dict) -> Dict:
+    return {key: value for key, value in snapshot.items() if key not in _VOLATILE_FIELDS}
+
+
+_channels: Dict[Tuple[str, int], _ProjectChannel] = {}
+_channels_lock = threading.Lock()
+
+
+def _subscribe(db_path: str, project_id: int) -> _ProjectChannel:
+    with _channels_lock:
+        channel = _channels.get((db_path, project_id))
+        if channel is None:
+            channel = _ProjectChannel(db_path, project_id)
+            _channels[(db_path, project_id)] = channel
+            threading.Thread(target=channel.run, daemon=True,
+                             name=f"pdf-progress-{project_id}").start()
+        channel.subscribers += 1
+        return channel
+
+
+def _unsubscribe(channel: _ProjectChannel) -> None:
+    with _channels_lock:
+        channel.subscribers -= 1
+        if channel.subscribers == 0:
+            channel.closed.set()
+            del _channels[(channel.db_path, channel.project_id)]
+
+
+def _sse(event: str, data: Dict, event_id: int = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def stream_pdf_download_progress(db_path: str, project_id: int, cursor: int = None) -> Iterator[str]:
+    """
+    Yield Server-Sent Events for a project's PDF download until it finishes.
+
+    Args:
+        cursor: Event id of the last finished DOI the client has seen. DOIs
+            finished after it are sent first; None sends only DOIs finished
+            from now on.
+    """
+    channel = _subscribe(db_path, project_id)
+    try:
+        yield f"retry: {int(PDF_PROGRESS_STREAM_POLL_SECONDS * 3000)}\n\n"
+        seen_version = 0
+        while True:
+            with channel.cond:
+                channel.cond.wait_for(lambda: channel.version != seen_version,
+                                      timeout=PDF_PROGRESS_STREAM_KEEPALIVE_SECONDS)
+                if channel.version == seen_version:
+                    snapshot = None
+                else:
+                    seen_version = channel.version
+                    snapshot, job_id, floor = channel.snapshot, channel.job_id, channel.floor
+                    if cursor is None:
+                        cursor = channel.cursor
+                    buffered = [event for event in channel.events if event["id"] > max(cursor, floor)]
+            if snapshot is None:
+                yield ": keepalive\n\n"
+                continue
+
+            # Catch up on finished DOIs that are not in the buffer
+            while job_id and cursor < floor:
+                page = [event for event in get_pdf_download_events(db_path, job_id, after_id=cursor)
+                        if event["id"] <= floor]
+                for event in page:
+                    yield _sse("doi", event, event["id"])
+                cursor = page[-1]["id"] if page else floor
+            for event in buffered:
+                yield _sse("doi", event, event["id"])
+                cursor = event["id"]
+
+            if snapshot.get("status") != "running":
+                yield _sse("done", snapshot)
+                return
+            yield _sse("progress", snapshot)
+    finally:
+        _unsubscribe(channel)
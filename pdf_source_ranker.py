@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Adaptive PDF Source Ranking
+Orders the sources tried for a DOI by Thompson sampling over per-publisher
+(DOI prefix) success rates and lookup latency.
+
+For every source a success probability is drawn from a Beta distribution
+built from the source's successes and failures for the DOI prefix, with the
+source's global success rate as a prior worth at most PRIOR_WEIGHT
+observations. Sources are tried in decreasing order of
+sampled probability / expected lookup time, which minimizes the expected time
+to the first PDF when sources are tried one after another. Because the
+probability is sampled rather than averaged, sources with few observations for
+a publisher still get tried now and then instead of being ranked out forever.
+
+Per-prefix statistics are kept in the source_prefix_stats table of
+pdf_downloads.db and updated by the download attempt writer.
+
+Usage:
+    python pdf_source_ranker.py --evaluate [--days 90]   # replay history offline
+    python pdf_source_ranker.py --rebuild                # recompute statistics from history
+"""
+
+import argparse
+import random
+from typing import Dict, List, Optional
+
+# Pseudo-observations the global success rate contributes to a prefix's prior
+PRIOR_WEIGHT = 10
+# Pseudo-observations the global average response time contributes to a prefix's mean
+LATENCY_PRIOR_WEIGHT = 3
+# Expected lookup time of a source that has never been timed
+DEFAULT_LOOKUP_MS = 5000.0
+MIN_LOOKUP_MS = 50.0
+
+
+def _expected_lookup_ms(prefix: Dict, global_info: Dict) -> float:
+    """Mean lookup time for the prefix, shrunk towards the source's global average."""
+    global_ms = float(global_info.get("avg_response_time_ms") or 0.0)
+    weight = LATENCY_PRIOR_WEIGHT if global_ms > 0 else 0
+    timed = prefix.get("timed_attempts", 0)
+    if timed + weight == 0:
+        return DEFAULT_LOOKUP_MS
+    mean = (prefix.get("total_time_ms", 0.0) + weight * global_ms) / (timed + weight)
+    return max(mean, MIN_LOOKUP_MS)
+
+
+def sample_source_score(prefix: Dict, global_info: Dict, rng: random.Random) -> float:
+    """
+    Sampled success probability per millisecond of lookup time for one source.
+
+    prefix: {"attempts", "successes", "total_time_ms", "timed_attempts"} for the DOI prefix
+    global_info: {"total_attempts", "success_count", "avg_response_time_ms"} (a
+                 get_source_rankings() entry)
+    """
+    global_attempts = int(global_info.get("total_attempts") or 0)
+    global_rate = (int(global_info.get("success_count") or 0) / global_attempts) if global_attempts else 0.5
+    weight = min(global_attempts, PRIOR_WEIGHT)
+
+    attempts = int(prefix.get("attempts", 0))
+    successes = min(max(int(prefix.get("successes", 0)), 0), attempts)
+    alpha = 1.0 + weight * global_rate + successes
+    beta = 1.0 + weight * (1.0 - global_rate) + (attempts - successes)
+
+    return rng.betavariate(alpha, beta) / _expected_lookup_ms(prefix, global_info)
+
+
+def rank_sources(candidates: List[str], prefix_stats: Dict[str, Dict], global_stats: Dict[str, Dict],
+                 rng: Optional[random.Random] = None) -> List[str]:
+    """
+    Order candidate sources for one DOI by a fresh Thompson sample.
+
+    prefix_stats: per-source statistics for the DOI prefix (get_prefix_source_stats)
+    global_stats: per-source global metrics keyed by name (get_source_rankings)
+    """
+    rng = rng or random
+    scores = {
+        name: sample_source_score(prefix_stats.get(name, {}), global_stats.get(name, {}), rng)
+        for name in candidates
+    }
+    return sorted(candidates, key=lambda name: scores[name], reverse=True)
+
+
+def _load_episodes(db_path: str, days: int) -> List[Dict]:
+    """
+    Group logged attempts into one episode per DOI, in order of the DOI's first attempt.
+    Each episode maps a source to whether it produced a PDF and its lookup time;
+    a later "<source>_download" failure means the source's URL did not yield a PDF.
+    """
+    from pdf_download_db import get_pdf_db_connection, flush_download_attempts
+    from pdf_sources import extract_doi_prefix
+
+    flush_download_attempts(db_path)
+    conn = get_pdf_db_connection(db_path)
+    try:
+        rows = conn.execute("""
+            SELECT doi, source_name, success, response_time_ms
+            FROM download_attempts
+            WHERE timestamp >= datetime('now', ?)
+            ORDER BY id
+        """, (f"-{int(days)} days",)).fetchall()
+    finally:
+        conn.close()
+
+    episodes = {}
+    for doi, source_name, success, response_time_ms in rows:
+        episode = episodes.setdefault(doi, {"doi": doi, "prefix": extract_doi_prefix(doi), "sources": {}})
+        if source_name.endswith("_download"):
+            outcome = episode["sources"].get(source_name[:-len("_download")])
+            if outcome:
+                outcome["found"] = False
+            continue
+        episode["sources"][source_name] = {"found": bool(success), "time_ms": response_time_ms}
+    return list(episodes.values())
+
+
+def _replay(order: List[str], outcomes: Dict[str, Dict], global_stats: Dict[str, Dict]) -> Dict:
+    """Simulate trying sources in order until one yields a PDF."""
+    elapsed = 0.0
+    for tried, name in enumerate(order, start=1):
+        outcome = outcomes[name]
+        time_ms = outcome["time_ms"]
+        if time_ms is None:
+            time_ms = global_stats.get(name, {}).get("avg_response_time_ms") or DEFAULT_LOOKUP_MS
+        elapsed += time_ms
+        if outcome["found"]:
+            return {"found": True, "time_ms": elapsed, "attempts": tried}
+    return {"found": False, "time_ms": elapsed, "attempts": len(order)}
+
+
+def _update_stats(prefix_stats: Dict, global_stats: Dict, outcomes: Dict[str, Dict]) -> None:
+    for name, outcome in outcomes.items():
+        for stats in (prefix_stats.setdefault(name, {}), global_stats.setdefault(name, {})):
+            stats["attempts"] = stats.get("attempts", 0) + 1
+            stats["successes"] = stats.get("successes", 0) + (1 if outcome["found"] else 0)
+            if outcome["time_ms"] is not None:
+                stats["total_time_ms"] = stats.get("total_time_ms", 0.0) + outcome["time_ms"]
+                stats["timed_attempts"] = stats.get("timed_attempts", 0) + 1
+        g = global_stats[name]
+        g["total_attempts"] = g["attempts"]
+        g["success_count"] = g["successes"]
+        g["avg_response_time_ms"] = (g["total_time_ms"] / g["timed_attempts"]) if g.get("timed_attempts") else 0.0
+
+
+def evaluate_ranker(db_path: str, days: int = 90, seed: int = 0) -> Dict[str, Dict]:
+    """
+    Offline evaluation against logged download attempts.
+
+    DOIs are replayed in the order they were first attempted. For each DOI the
+    sources that were actually tried are re-ordered by each policy, using only
+    statistics learned from earlier DOIs, and the policy is charged the logged
+    lookup times until the first source that produced a PDF. Sources that were
+    never tried for a DOI cannot be evaluated, so each policy chooses among the
+    logged sources only.
+
+    Policies:
+        thompson:     rank_sources() with per-prefix statistics
+        success_rate: global success rate, then response time (the previous ordering)
+        logged:       the order the sources were actually tried in
+
+    Returns {policy: {"dois", "with_pdf", "mean_time_to_pdf_ms", "mean_attempts_to_pdf",
+                      "first_choice_hit_rate", "top3_hit_rate"}}
+    """
+    rng = random.Random(seed)
+    episodes = _load_episodes(db_path, days)
+    prefix_stats: Dict[str, Dict[str, Dict]] = {}
+    global_stats: Dict[str, Dict] = {}
+
+    policies = ("thompson", "success_rate", "logged")
+    totals = {p: {"time_ms": 0.0, "attempts": 0, "first": 0, "top3": 0} for p in policies}
+    dois = with_pdf = 0
+
+    for episode in episodes:
+        outcomes = episode["sources"]
+        if not outcomes:
+            continue
+        dois += 1
+        stats_for_prefix = prefix_stats.setdefault(episode["prefix"], {})
+        logged = list(outcomes)
+        orders = {
+            "thompson": rank_sources(logged, stats_for_prefix, global_stats, rng),
+            "success_rate": sorted(logged, key=lambda n: (
+                -(global_stats.get(n, {}).get("success_count", 0) / max(global_stats.get(n, {}).get("total_attempts", 0), 1)),
+                global_stats.get(n, {}).get("avg_response_time_ms", 0.0))),
+            "logged": logged,
+        }
+
+        if any(o["found"] for o in outcomes.values()):
+            with_pdf += 1
+            for policy, order in orders.items():
+                result = _replay(order, outcomes, global_stats)
+                totals[policy]["time_ms"] += result["time_ms"]
+                totals[policy]["attempts"] += result["attempts"]
+                totals[policy]["first"] += 1 if result["attempts"] == 1 else 0
+                totals[policy]["top3"] += 1 if result["attempts"] <= 3 else 0
+
+        _update_stats(stats_for_prefix, global_stats, outcomes)
+
+    report = {}
+    for policy in policies:
+        t = totals[policy]
+        report[policy] = {
+            "dois": dois,
+            "with_pdf": with_pdf,
+            "mean_time_to_pdf_ms": (t["time_ms"] / with_pdf) if with_pdf else 0.0,
+            "mean_attempts_to_pdf": (t["attempts"] / with_pdf) if with_pdf else 0.0,
+            "first_choice_hit_rate": (t["first"] / with_pdf) if with_pdf else 0.0,
+            "top3_hit_rate": (t["top3"] / with_pdf) if with_pdf else 0.0,
+        }
+    return report
+
+
+if __name__ == "__main__":
+    from pdf_download_db import PDF_DB_PATH, init_pdf_download_db, rebuild_prefix_source_stats
+
+    parser = argparse.ArgumentParser(description="Evaluate or rebuild adaptive PDF source ranking")
+    parser.add_argument("--db", default=PDF_DB_PATH, help="Path to pdf_downloads.db")
+    parser.add_argument("--evaluate", action="store_true", help="Replay logged attempts and compare orderings")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute per-prefix statistics from download_attempts")
+    parser.add_argument("--days", type=int, default=90, help="History window for --evaluate (default: 90)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for --evaluate")
+    args = parser.parse_args()
+
+    if not (args.evaluate or args.rebuild):
+        parser.print_help()
+        raise SystemExit(1)
+
+    init_pdf_download_db(args.db)
+
+    if args.rebuild:
+        rows = rebuild_prefix_source_stats(args.db)
+        print(f"Rebuilt {rows} (prefix, source) statistics rows")
+
+    if args.evaluate:
+        report = evaluate_ranker(args.db, args.days, args.seed)
+        first = next(iter(report.values()))
+        print(f"Replayed {first['dois']} DOIs ({first['with_pdf']} with a PDF) from the last {args.days} days\n")
+        print(f"{'policy':<14}{'time to PDF':>14}{'attempts':>10}{'top-1':>8}{'top-3':>8}")
+        for policy, r in report.items():
+            print(f"{policy:<14}{r['mean_time_to_pdf_ms']:>12.0f}ms{r['mean_attempts_to_pdf']:>10.2f}"
+                  f"{r['first_choice_hit_rate']:>8.1%}{r['top3_hit_rate']:>8.1%}")
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF Source Registry
+One adapter per PDF source, run with the settings of its row in the sources
+table of pdf_downloads.db:
+
+    timeout          request timeout in seconds passed to the source
+    max_concurrency  lookups of the source running at once in this process (0 = no limit)
+    enabled          a disabled source is skipped, also by DOIs already in progress
+
+Settings are cached per process and re-read at most every
+PDF_SOURCE_SETTINGS_REFRESH_SECONDS, so a change made through the admin API in
+the backend reaches download workers in other processes within that interval.
+notify_sources_changed() makes the next lookup in this process re-read them.
+Callbacks registered with add_settings_listener() are called with
+(source_name, old_settings, new_settings) for every source whose settings
+changed.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pdf_download_db import PDF_DB_PATH, get_pdf_db_connection
+from pdf_sources import (
+    try_europe_pmc, try_core, try_semantic_scholar, try_scihub,
+    try_publisher_direct, try_biorxiv_medrxiv, try_arxiv_enhanced,
+    try_pmc_enhanced, try_zenodo, try_doaj, try_openalex
+)
+
+try:
+    from config import PDF_SOURCE_SETTINGS_REFRESH_SECONDS
+except ImportError:
+    PDF_SOURCE_SETTINGS_REFRESH_SECONDS = 2.0
+
+try:
+    from config import UNPAYWALL_EMAIL
+except ImportError:
+    UNPAYWALL_EMAIL = "research@example.com"
+
+try:
+    from config import CORE_API_KEY
+except ImportError:
+    CORE_API_KEY = ""
+
+# Timeout of a source without a row (or a timeout) in the sources table
+DEFAULT_SOURCE_TIMEOUT = 15
+
+
+# --- Source adapters: (doi, settings) -> (success, pdf_url or error message) ---
+
+def _unpaywall(doi: str, settings: Dict) -> Tuple[bool, str]:
+    from pdf_manager import check_open_access
+    return check_open_access(doi, UNPAYWALL_EMAIL, timeout=settings["timeout"])
+
+
+def _unpywall(doi: str, settings: Dict) -> Tuple[bool, str]:
+    try:
+        from unpywall import Unpywall
+        pdf_link = Unpywall.get_pdf_link(doi=doi)
+        if pdf_link:
+            return True, pdf_link
+        return False, "Unpywall library returned no PDF link"
+    except Exception as e:
+        return False, f"Unpywall library error: {str(e)}"
+
+
+def _metapub(doi: str, settings: Dict) -> Tuple[bool, str]:
+    from pdf_manager import METAPUB_AVAILABLE, try_metapub_download
+    if not METAPUB_AVAILABLE:
+        return False, "Metapub not available"
+    return try_metapub_download(doi)
+
+
+def _habanero(doi: str, settings: Dict) -> Tuple[bool, str]:
+    from pdf_manager import HABANERO_AVAILABLE, try_habanero_download
+    if not HABANERO_AVAILABLE:
+        return False, "Habanero not available"
+    return try_habanero_download(doi)
+
+
+SOURCE_ADAPTERS: Dict[str, Callable[[str, Dict], Tuple[bool, str]]] = {
+    "unpaywall": _unpaywall,
+    "unpywall": _unpywall,
+    "openalex": lambda doi, s: try_openalex(doi, s["timeout"], UNPAYWALL_EMAIL),
+    "biorxiv_medrxiv": lambda doi, s: try_biorxiv_medrxiv(doi, s["timeout"]),
+    "europe_pmc": lambda doi, s: try_europe_pmc(doi, s["timeout"]),
+    "pmc_enhanced": lambda doi, s: try_pmc_enhanced(doi, s["timeout"]),
+    "arxiv_enhanced": lambda doi, s: try_arxiv_enhanced(doi, s["timeout"]),
+    "core": lambda doi, s: try_core(doi, CORE_API_KEY or None, s["timeout"]),
+    "zenodo": lambda doi, s: try_zenodo(doi, s["timeout"]),
+    "semantic_scholar": lambda doi, s: try_semantic_scholar(doi, s["timeout"]),
+    "doaj": lambda doi, s: try_doaj(doi, s["timeout"]),
+    "publisher_direct": lambda doi, s: try_publisher_direct(doi, s["timeout"]),
+    "scihub": lambda doi, s: try_scihub(doi, timeout=s["timeout"]),
+    "metapub": _metapub,
+    "habanero": _habanero,
+}
+
+
+class SourceRegistry:
+    """Cached per-source settings of one pdf_downloads.db, and per-source lookup slots."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._settings: Dict[str, Dict] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, Optional[Dict], Optional[Dict]], None]] = []
+        self._slots = threading.Condition()
+        self._in_flight: Dict[str, int] = {}
+
+    def _read_settings(self) -> Optional[Dict[str, Dict]]:
+        try:
+            conn = get_pdf_db_connection(self.db_path)
+            try:
+                rows = conn.execute("SELECT name, enabled, timeout, max_concurrency FROM sources").fetchall()
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"[PDF Sources] Error reading source settings: {e}")
+            return None
+        return {
+            name: {
+                "enabled": bool(enabled),
+                "timeout": timeout if timeout and timeout > 0 else DEFAULT_SOURCE_TIMEOUT,
+                "max_concurrency": max(int(max_concurrency or 0), 0),
+            }
+            for name, enabled, timeout, max_concurrency in rows
+        }
+
+    def refresh(self, force: bool = False) -> None:
+        """Re-read the settings if they are older than PDF_SOURCE_SETTINGS_REFRESH_SECONDS."""
+        with self._lock:
+            fresh = (self._loaded_at is not None
+                     and time.monotonic() - self._loaded_at < PDF_SOURCE_SETTINGS_REFRESH_SECONDS)
+            if fresh and not force:
+                return
+            settings = self._read_settings()
+            self._loaded_at = time.monotonic()
+            if settings is None:
+                return  # Keep the last known settings
+            old, self._settings = self._settings, settings
+            listeners = list(self._listeners)
+
+        changed = [name for name in set(old) | set(settings) if old.get(name) != settings.get(name)]
+        if not changed or not old:
+            return
+        for name in sorted(changed):
+            print(f"[PDF Sources] Settings of {name} changed: {old.get(name)} -> {settings.get(name)}")
+            for listener in listeners:
+                try:
+                    listener(name, old.get(name), settings.get(name))
+                except Exception as e:
+                    print(f"[PDF Sources] Settings listener error: {e}")
+        with self._slots:
+            self._slots.notify_all()  # A raised limit lets waiting lookups start
+
+    def invalidate(self) -> None:
+        """Re-read the settings on next use."""
+        with self._lock:
+            self._loaded_at = None
+
+    def get(self, source_name: str) -> Dict:
+        """{"enabled", "timeout", "max_concurrency"} of a source."""
+        self.refresh()
+        with self._lock:
+            settings = self._settings.get(source_name)
+        if settings is None:
+            return {"enabled": True, "timeout": DEFAULT_SOURCE_TIMEOUT, "max_concurrency": 0}
+        return dict(settings)
+
+    def add_listener(self, listener: Callable[[str, Optional[Dict], Optional[Dict]], None]) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    @contextmanager
+    def slot(self, source_name: str):
+        """Hold one of the source's max_concurrency lookup slots."""
+        while True:
+            limit = self.get(source_name)["max_concurrency"]
+            with self._slots:
+                running = self._in_flight.get(source_name, 0)
+                if not limit or running < limit:
+                    self._in_flight[source_name] = running + 1
+                    break
+                # Woken by a finished lookup or a settings change; the timeout
+                # picks up changes made by other processes
+                self._slots.wait(PDF_SOURCE_SETTINGS_REFRESH_SECONDS)
+        try:
+            yield
+        finally:
+            with self._slots:
+                self._in_flight[source_name] -= 1
+                self._slots.notify_all()
+
+
+_registries: Dict[str, SourceRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_source_registry(db_path: str = PDF_DB_PATH) -> SourceRegistry:
+    """Get (or create) the registry of a pdf_downloads.db."""
+    with _registries_lock:
+        registry = _registries.get(db_path)
+        if registry is None:
+            registry = SourceRegistry(db_path)
+            _registries[db_path] = registry
+        return registry
+
+
+def get_source_settings(source_name: str, db_path: str = PDF_DB_PATH) -> Dict:
+    """Current {"enabled", "timeout", "max_concurrency"} of a source."""
+    return get_source_registry(db_path).get(source_name)
+
+
+def add_settings_listener(listener: Callable[[str, Optional[Dict], Optional[Dict]], None],
+                          db_path: str = PDF_DB_PATH) -> None:
+    """Call listener(source_name, old_settings, new_settings) when a source's settings change."""
+    get_source_registry(db_path).add_listener(listener)
+
+
+def notify_sources_changed(db_path: str = PDF_DB_PATH) -> None:
+    """Call after changing the sources table so this process picks the change up right away."""
+    get_source_registry(db_path).invalidate()
+
+
+def lookup_source(source_name: str, doi: str, settings: Optional[Dict] = None,
+                  db_path: str = PDF_DB_PATH) -> Tuple[bool, str, Optional[int]]:
+    """
+    Look up a PDF URL for a DOI from one source.
+    settings default to the source's current settings; the lookup waits for
+    a free max_concurrency slot, which is not counted in the response time.
+    Returns: (success, pdf_url_or_error, response_time_ms)
+    """
+    adapter = SOURCE_ADAPTERS.get(source_name)
+    if adapter is None:
+        return False, f"Unknown source: {source_name}", 0
+
+    registry = get_source_registry(db_path)
+    settings = {**registry.get(source_name), **(settings or {})}
+    if not settings["enabled"]:
+        return False, f"Source {source_name} is disabled", 0
+
+    with registry.slot(source_name):
+        start_time = time.time()
+        try:
+            success, result = adapter(doi, settings)
+        except Exception as e:
+            success, result = False, f"Exception: {str(e)}"
+        return success, result, int((time.time() - start_time) * 1000)
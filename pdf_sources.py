@@ -11,6 +11,8 @@ from typing import Tuple, Optional, Dict, List
 import time
 import random
 
+from pdf_http_client import http_get, http_head
+
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -76,7 +78,7 @@ def try_europe_pmc(doi: str, timeout: int = 15) -> Tuple[bool, str]:
             'resultType': 'core'
         }
 
-        response = requests.get(search_url, params=params, headers=headers, timeout=timeout)
+        response = http_get(search_url, params=params, headers=headers, timeout=timeout)
 
         if not response.ok:
             return False, f"Europe PMC API error: HTTP {response.status_code}"
@@ -157,7 +159,7 @@ def try_core(doi: str, api_key: Optional[str] = None, timeout: int = 15) -> Tupl
             'limit': 1
         }
 
-        response = requests.get(search_url, params=params, headers=headers, timeout=timeout)
+        response = http_get(search_url, params=params, headers=headers, timeout=timeout)
 
         if not response.ok:
             if response.status_code == 401:
@@ -217,7 +219,7 @@ def try_semantic_scholar(doi: str, timeout: int = 15) -> Tuple[bool, str]:
             'fields': 'title,openAccessPdf,isOpenAccess,externalIds'
         }
 
-        response = requests.get(api_url, params=params, headers=headers, timeout=timeout)
+        response = http_get(api_url, params=params, headers=headers, timeout=timeout)
 
         if not response.ok:
             if response.status_code == 404:
@@ -280,7 +282,7 @@ def try_scihub(doi: str, mirror_index: int = 0, timeout: int = 20) -> Tuple[bool
 
         # Request the DOI page
         scihub_url = f"{mirror}/{doi}"
-        response = requests.get(scihub_url, headers=headers, timeout=timeout, allow_redirects=True)
+        response = http_get(scihub_url, headers=headers, timeout=timeout, allow_redirects=True)
 
         if not response.ok:
             # Try next mirror
@@ -350,7 +352,7 @@ def try_biorxiv_medrxiv(doi: str, timeout: int = 15) -> Tuple[bool, str]:
             # (HEAD requests often fail even when PDF exists)
             pdf_url = f"https://www.biorxiv.org/content/{doi}.full.pdf"
             try:
-                response = requests.head(pdf_url, headers=headers, timeout=timeout, allow_redirects=True)
+                response = http_head(pdf_url, headers=headers, timeout=timeout, allow_redirects=True)
                 if response.status_code == 200:
                     return True, pdf_url
             except requests.RequestException:
@@ -359,7 +361,7 @@ def try_biorxiv_medrxiv(doi: str, timeout: int = 15) -> Tuple[bool, str]:
             # Try medRxiv
             pdf_url = f"https://www.medrxiv.org/content/{doi}.full.pdf"
             try:
-                response = requests.head(pdf_url, headers=headers, timeout=timeout, allow_redirects=True)
+                response = http_head(pdf_url, headers=headers, timeout=timeout, allow_redirects=True)
                 if response.status_code == 200:
                     return True, pdf_url
             except requests.RequestException:
@@ -369,7 +371,7 @@ def try_biorxiv_medrxiv(doi: str, timeout: int = 15) -> Tuple[bool, str]:
         # bioRxiv/medRxiv content details API
         api_url = f"https://api.biorxiv.org/details/biorxiv/{doi}"
         try:
-            response = requests.get(api_url, headers=headers, timeout=timeout)
+            response = http_get(api_url, headers=headers, timeout=timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -386,7 +388,7 @@ def try_biorxiv_medrxiv(doi: str, timeout: int = 15) -> Tuple[bool, str]:
         # Try medRxiv API
         api_url = f"https://api.biorxiv.org/details/medrxiv/{doi}"
         try:
-            response = requests.get(api_url, headers=headers, timeout=timeout)
+            response = http_get(api_url, headers=headers, timeout=timeout)
             
             if response.status_code == 200:
                 data = response.json()
@@ -428,7 +430,7 @@ def try_arxiv_enhanced(doi: str, timeout: int = 15) -> Tuple[bool, str]:
         else:
             # Try arXiv API to find by DOI
             api_url = f"http://export.arxiv.org/api/query?search_query=doi:{doi}&max_results=1"
-            response = requests.get(api_url, headers=headers, timeout=timeout)
+            response = http_get(api_url, headers=headers, timeout=timeout)
             
             if response.ok:
                 content = response.text
@@ -469,7 +471,7 @@ def try_pmc_enhanced(doi: str, timeout: int = 15) -> Tuple[bool, str]:
             'email': 'research@example.com'
         }
         
-        response = requests.get(id_converter_url, params=params, headers=headers, timeout=timeout)
+        response = http_get(id_converter_url, params=params, headers=headers, timeout=timeout)
         
         if not response.ok:
             return False, f"PMC ID converter error: HTTP {response.status_code}"
@@ -503,7 +505,7 @@ def try_pmc_enhanced(doi: str, timeout: int = 15) -> Tuple[bool, str]:
 
         for pdf_url in pdf_urls:
             # Quick check if URL is accessible
-            head_response = requests.head(pdf_url, headers=headers, timeout=timeout, allow_redirects=True)
+            head_response = http_head(pdf_url, headers=headers, timeout=timeout, allow_redirects=True)
             if head_response.ok:
                 return True, pdf_url
 
@@ -534,7 +536,7 @@ def try_zenodo(doi: str, timeout: int = 15) -> Tuple[bool, str]:
             'size': 1
         }
 
-        response = requests.get(api_url, params=params, headers=headers, timeout=timeout)
+        response = http_get(api_url, params=params, headers=headers, timeout=timeout)
 
         if response.status_code != 200:
             return False, f"Zenodo API error: HTTP {response.status_code}"
@@ -612,7 +614,7 @@ def try_doaj(doi: str, timeout: int = 15) -> Tuple[bool, str]:
         # Search by DOI
         search_url = f"{api_url}:{clean_doi}"
         
-        response = requests.get(search_url, headers=headers, timeout=timeout)
+        response = http_get(search_url, headers=headers, timeout=timeout)
 
         if not response.ok:
             return False, f"DOAJ API error: HTTP {response.status_code}"
@@ -657,6 +659,143 @@ def try_doaj(doi: str, timeout: int = 15) -> Tuple[bool, str]:
         return False, f"DOAJ error: {str(e)}"
 
 
+OPENALEX_WORKS_URL = "https://api.openalex.org/works"
+# OpenAlex accepts up to 50 values in one OR filter (doi:a|b|c)
+OPENALEX_BATCH_SIZE = 50
+
+
+def _openalex_pdf_url(work: Dict) -> Optional[str]:
+    """PDF URL of an OpenAlex work: best OA location first, then any OA location."""
+    best = work.get('best_oa_location') or {}
+    if best.get('pdf_url'):
+        return best['pdf_url']
+    for location in work.get('oa_locations') or []:
+        if location and location.get('pdf_url'):
+            return location['pdf_url']
+    return None
+
+
+def fetch_openalex_oa_locations(dois: List[str], email: Optional[str] = None,
+                                timeout: int = 30) -> Tuple[Dict[str, Optional[str]], List[str]]:
+    """
+    Look up open access PDF URLs for many DOIs with one OpenAlex request per
+    OPENALEX_BATCH_SIZE DOIs.
+
+    Returns: ({doi: pdf_url or None}, errors) with the DOIs as given. DOIs
+    OpenAlex doesn't know are missing from the dict; known works without an
+    OA PDF map to None. A batch whose request fails is reported in errors and
+    its DOIs are left out.
+    """
+    headers = {'User-Agent': get_random_user_agent()}
+    found = {}
+    errors = []
+
+    # DOIs containing the filter's separators can't be batched
+    batchable = [doi for doi in dois if '|' not in doi and ',' not in doi]
+    for start in range(0, len(batchable), OPENALEX_BATCH_SIZE):
+        batch = batchable[start:start + OPENALEX_BATCH_SIZE]
+        by_lower = {doi.lower(): doi for doi in batch}
+        params = {
+            'filter': 'doi:' + '|'.join(batch),
+            'per-page': OPENALEX_BATCH_SIZE,
+            'select': 'doi,best_oa_location,oa_locations',
+        }
+        if email:
+            params['mailto'] = email  # OpenAlex "polite pool"
+
+        try:
+            response = http_get(OPENALEX_WORKS_URL, params=params, headers=headers, timeout=timeout)
+            if not response.ok:
+                errors.append(f"OpenAlex API error: HTTP {response.status_code}")
+                continue
+            works = response.json().get('results', [])
+        except requests.Timeout:
+            errors.append("OpenAlex timeout")
+            continue
+        except Exception as e:
+            errors.append(f"OpenAlex error: {str(e)}")
+            continue
+
+        for work in works:
+            work_doi = (work.get('doi') or '').lower().replace('https://doi.org/', '')
+            if work_doi in by_lower:
+                found[by_lower[work_doi]] = _openalex_pdf_url(work)
+
+    return found, errors
+
+
+CROSSREF_WORKS_URL = "https://api.crossref.org/works"
+# DOIs per CrossRef request (filter=doi:a,doi:b,...)
+CROSSREF_BATCH_SIZE = 50
+
+
+def fetch_crossref_titles(dois: List[str], email: Optional[str] = None,
+                          timeout: int = 30) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Look up article titles for many DOIs with one CrossRef request per
+    CROSSREF_BATCH_SIZE DOIs.
+
+    Returns: ({doi: title}, errors) with the DOIs as given. DOIs of a
+    successful batch that CrossRef doesn't know (or has no title for) map to
+    ''; a batch whose request fails is reported in errors and left out.
+    """
+    headers = {'User-Agent': get_random_user_agent()}
+    found = {}
+    errors = []
+
+    # DOIs containing the filter's separator can't be batched
+    batchable = [doi for doi in dois if ',' not in doi]
+    for start in range(0, len(batchable), CROSSREF_BATCH_SIZE):
+        batch = batchable[start:start + CROSSREF_BATCH_SIZE]
+        by_lower = {doi.lower(): doi for doi in batch}
+        params = {
+            'filter': ','.join(f'doi:{doi}' for doi in batch),
+            'rows': CROSSREF_BATCH_SIZE,
+            'select': 'DOI,title',
+        }
+        if email:
+            params['mailto'] = email  # CrossRef "polite pool"
+
+        try:
+            response = http_get(CROSSREF_WORKS_URL, params=params, headers=headers, timeout=timeout)
+            if not response.ok:
+                errors.append(f"CrossRef API error: HTTP {response.status_code}")
+                continue
+            items = response.json().get('message', {}).get('items', [])
+        except requests.Timeout:
+            errors.append("CrossRef timeout")
+            continue
+        except Exception as e:
+            errors.append(f"CrossRef error: {str(e)}")
+            continue
+
+        for doi in batch:
+            found[doi] = ''
+        for item in items:
+            item_doi = (item.get('DOI') or '').lower()
+            if item_doi in by_lower and item.get('title'):
+                found[by_lower[item_doi]] = item['title'][0]
+
+    return found, errors
+
+
+def try_openalex(doi: str, timeout: int = 15, email: Optional[str] = None) -> Tuple[bool, str]:
+    """
+    Try to find an open access PDF URL in OpenAlex.
+    Jobs with many DOIs look these up in batches first (see fetch_openalex_oa_locations).
+
+    Returns: (success, pdf_url or error_message)
+    """
+    found, errors = fetch_openalex_oa_locations([doi], email, timeout)
+    if errors:
+        return False, errors[0]
+    if doi not in found:
+        return False, "Not found in OpenAlex"
+    if not found[doi]:
+        return False, "OpenAlex: not open access (no PDF location)"
+    return True, found[doi]
+
+
 def try_publisher_direct(doi: str, timeout: int = 15) -> Tuple[bool, str]:
     """
     Try to construct direct publisher PDF URL based on known patterns.
@@ -769,13 +908,28 @@ def classify_failure(error_message: str, status_code: Optional[int] = None) -> s
     - timeout: Request timed out, retry soon
     - authentication: Requires authentication/API key
     - server_error: Server-side error, retry later
+
+    Only evidence of a problem (HTTP 429 or 5xx, a timeout or a connection
+    error) gives a temporary category. Any other answer, like "Article found
+    but no accessible PDF link" or "No PMCID found for this DOI", means the
+    source works but has no PDF for the DOI, and is not_found.
     """
-    error_lower = error_message.lower()
+    error_lower = (error_message or '').lower()
+
+    # Sources report HTTP errors as "... error: HTTP 503"
+    if status_code is None:
+        match = re.search(r'\bhttp (\d{3})\b', error_lower)
+        if match:
+            status_code = int(match.group(1))
 
     # Rate limiting
     if status_code == 429 or 'rate limit' in error_lower or 'too many requests' in error_lower:
         return 'rate_limit'
 
+    # Server errors
+    if status_code and status_code >= 500:
+        return 'server_error'
+
     # Authentication
     if status_code in [401, 403] or 'auth' in error_lower or 'forbidden' in error_lower or 'api key' in error_lower:
         return 'authentication'
@@ -785,7 +939,8 @@ def classify_failure(error_message: str, status_code: Optional[int] = None) -> s
         return 'not_found'
 
     # Paywall
-    if 'paywall' in error_lower or 'not open access' in error_lower or 'subscription required' in error_lower:
+    if ('paywall' in error_lower or 'not open access' in error_lower or 'no open access' in error_lower
+            or 'subscription required' in error_lower):
         return 'paywall'
 
     # Invalid content
@@ -793,19 +948,15 @@ def classify_failure(error_message: str, status_code: Optional[int] = None) -> s
         return 'invalid_pdf'
 
     # Timeout
-    if 'timeout' in error_lower:
+    if 'timeout' in error_lower or 'timed out' in error_lower:
         return 'timeout'
 
-    # Server errors
-    if status_code and status_code >= 500:
-        return 'server_error'
-
-    # Network errors
-    if 'connection' in error_lower or 'network' in error_lower:
+    # Network errors (requests exceptions: "HTTPSConnectionPool(...): Max retries exceeded ...")
+    if 'connection' in error_lower or 'network' in error_lower or 'name resolution' in error_lower:
         return 'network_error'
 
-    # Default to network error for retryable issues
-    return 'network_error'
+    # Any other answer: the source has no PDF for this DOI
+    return 'not_found'
 
 
 def is_temporary_failure(failure_category: str) -> bool:
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reconcile the pdf_manifest table with the PDF files on disk.
+
+Downloads, uploads and deletes keep the manifest current. Run this after
+PDFs were copied into or removed from project_pdfs/ by hand.
+"""
+
+import os
+import sys
+
+# Import configuration
+try:
+    from config import DB_PATH
+except ImportError:
+    # Fallback to environment variable if config.py doesn't exist
+    DB_PATH = os.environ.get("HARVEST_DB", "harvest.db")
+
+from harvest_store import init_db, get_all_projects, get_project_by_id
+from pdf_manager import reconcile_pdf_manifest
+
+
+def reconcile_projects(project_id=None, dry_run=True):
+    """
+    Reconcile the manifest for one project or all projects.
+
+    Args:
+        project_id: Only reconcile this project (default: all projects)
+        dry_run: If True, only report what would change without writing.
+    """
+    print(f"{'DRY RUN: ' if dry_run else ''}Reconciling PDF manifest in {DB_PATH}")
+
+    if not os.path.exists(DB_PATH):
+        print("Database does not exist.")
+        return False
+
+    # Make sure the pdf_manifest table exists on older databases
+    init_db(DB_PATH)
+
+    if project_id is not None:
+        project = get_project_by_id(DB_PATH, project_id)
+        if not project:
+            print(f"❌ Project {project_id} not found.")
+            return False
+        projects = [project]
+    else:
+        projects = get_all_projects(DB_PATH)
+
+    totals = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    for project in projects:
+        stats = reconcile_pdf_manifest(DB_PATH, project["id"], project.get("doi_list", []), dry_run=dry_run)
+        for key in totals:
+            totals[key] += stats[key]
+        if stats["added"] or stats["updated"] or stats["removed"]:
+            print(f"  Project {project['id']} ({project['name']}): "
+                  f"{stats['added']} added, {stats['updated']} updated, {stats['removed']} removed")
+
+    print(f"\n{len(projects)} project(s): {totals['added']} added, {totals['updated']} updated, "
+          f"{totals['removed']} removed, {totals['unchanged']} unchanged")
+    return True
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reconcile the PDF manifest with files on disk")
+    parser.add_argument("--execute", action="store_true", help="Actually update the manifest (default is dry-run)")
+    parser.add_argument("--project-id", type=int, help="Only reconcile this project")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("HARVEST PDF Manifest Reconcile")
+    print("=" * 70)
+
+    ok = reconcile_projects(project_id=args.project_id, dry_run=not args.execute)
+
+    print("\n" + "=" * 70)
+    if not args.execute:
+        print("This was a DRY RUN. No changes were made.")
+        print("Use --execute flag to apply changes.")
+    print("=" * 70)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+On-demand request profiling for the HARVEST backend.
+
+An admin opts a single request into profiling by sending their admin token
+(from /api/admin/auth) in the X-Harvest-Profile header or the _profile query
+parameter. The request then runs under cProfile and a report is written to
+PROFILES_DIR:
+    <id>.json  - route, timing, SQL statement log and top functions
+    <id>.prof  - raw cProfile stats (open with snakeviz or convert for flame graphs)
+
+Requests without the header/param only pay for one header lookup. cProfile
+can only profile one request at a time per process; a profile request that
+arrives while another is being profiled runs unprofiled, with the
+X-Harvest-Profile-Status: busy response header.
+"""
+
+import os
+import re
+import io
+import json
+import time
+import secrets
+import threading
+import cProfile
+import pstats
+from datetime import datetime
+
+from flask import jsonify, request, g, send_file
+
+from harvest_metrics import start_sql_capture, stop_sql_capture
+
+try:
+    from config import ENABLE_REQUEST_PROFILING, PROFILES_DIR
+except ImportError:
+    ENABLE_REQUEST_PROFILING = True
+    PROFILES_DIR = "profiles"
+
+PROFILE_HEADER = "X-Harvest-Profile"
+PROFILE_QUERY_PARAM = "_profile"
+MAX_PROFILE_REPORTS = 200  # Oldest reports are pruned beyond this
+MAX_SQL_STATEMENTS = 1000  # Statements kept per report
+TOP_FUNCTIONS = 50
+
+_PROFILE_ID_RE = re.compile(r'^\d{8}-\d{6}-[0-9a-f]{8}$')
+
+# Held while a request is being profiled (only one profiler can be active)
+_profile_lock = threading.Lock()
+
+
+def _write_report(profiles_dir: str, state: dict, response) -> str:
+    """Write the JSON and .prof files for a finished profiled request."""
+    os.makedirs(profiles_dir, exist_ok=True)
+    profile_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(4)}"
+
+    profiler = state["profiler"]
+    profiler.dump_stats(os.path.join(profiles_dir, f"{profile_id}.prof"))
+
+    stats_text = io.StringIO()
+    pstats.Stats(profiler, stream=stats_text).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+
+    statements = state["sql"]
+    report = {
+        "id": profile_id,
+        "created_at": datetime.now().isoformat(),
+        "admin_email": state["email"],
+        "method": request.method,
+        "path": request.path,
+        "route": request.url_rule.rule if request.url_rule else None,
+        "query": {k: v for k, v in request.args.items() if k != PROFILE_QUERY_PARAM},
+        "status": response.status_code,
+        "duration_ms": round(state["duration"] * 1000, 2),
+        "sql": {
+            "count": len(statements),
+            "total_ms": round(sum(d for _, _, d in statements) * 1000, 2),
+            "statements": [
+                {"db": db, "sql": " ".join(sql.split()), "duration_ms": round(d * 1000, 3)}
+                for db, sql, d in statements[:MAX_SQL_STATEMENTS]
+            ]
+        },
+        "top_functions": stats_text.getvalue()
+    }
+    with open(os.path.join(profiles_dir, f"{profile_id}.json"), "w") as f:
+        json.dump(report, f, indent=2)
+
+    _prune_reports(profiles_dir)
+    return profile_id
+
+
+def _prune_reports(profiles_dir: str) -> None:
+    """Keep only the newest MAX_PROFILE_REPORTS reports."""
+    ids = sorted(name[:-len(".json")] for name in os.listdir(profiles_dir) if name.endswith(".json"))
+    for profile_id in ids[:-MAX_PROFILE_REPORTS]:
+        for ext in (".json", ".prof"):
+            try:
+                os.remove(os.path.join(profiles_dir, profile_id + ext))
+            except OSError:
+                pass
+
+
+def list_profile_reports(profiles_dir: str = PROFILES_DIR) -> list:
+    """Summaries of stored reports, newest first."""
+    if not os.path.isdir(profiles_dir):
+        return []
+    reports = []
+    for name in sorted(os.listdir(profiles_dir), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(profiles_dir, name)) as f:
+                report = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[Profiling] Skipping unreadable report {name}: {e}")
+            continue
+        reports.append({
+            "id": report["id"],
+            "created_at": report["created_at"],
+            "method": report["method"],
+            "path": report["path"],
+            "route": report["route"],
+            "status": report["status"],
+            "duration_ms": report["duration_ms"],
+            "sql_count": report["sql"]["count"],
+            "sql_ms": report["sql"]["total_ms"]
+        })
+    return reports
+
+
+def init_request_profiling(app, verify_admin_auth_func, verify_token_func,
+                           profiles_dir: str = PROFILES_DIR) -> bool:
+    """
+    Register the profiling hooks and admin report endpoints on the Flask app.
+
+    Args:
+        app: Flask application instance
+        verify_admin_auth_func: Function (payload) -> (is_authenticated, email)
+        verify_token_func: Function (token) -> email or None
+        profiles_dir: Directory where reports are written
+
+    Returns:
+        True if profiling is enabled
+    """
+    if not ENABLE_REQUEST_PROFILING:
+        return False
+
+    @app.before_request
+    def _start_request_profile():
+        token = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_QUERY_PARAM)
+        if not token:
+            return None
+        email = verify_token_func(token)
+        if not email:
+            print(f"[Profiling] Ignoring profile request with invalid admin token for {request.path}")
+            return None
+
+        if not _profile_lock.acquire(blocking=False):
+            print(f"[Profiling] Another request is being profiled; not profiling {request.path}")
+            g._request_profile_busy = True
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another profiler (e.g. a debugger or py-spy) is active in this process
+            _profile_lock.release()
+            print(f"[Profiling] Could not start profiler for {request.path}: {e}")
+            g._request_profile_busy = True
+            return None
+        g._request_profile = {"email": email, "profiler": profiler, "start": time.perf_counter()}
+        start_sql_capture()
+        return None
+
+    def _stop_request_profile():
+        """Stop this request's profiler and release the lock; returns its state or None."""
+        state = g.pop("_request_profile", None)
+        if state is not None:
+            state["profiler"].disable()
+            state["duration"] = time.perf_counter() - state["start"]
+            state["sql"] = stop_sql_capture()
+            _profile_lock.release()
+        return state
+
+    @app.after_request
+    def _finish_request_profile(response):
+        if g.pop("_request_profile_busy", False):
+            response.headers["X-Harvest-Profile-Status"] = "busy"
+            return response
+        state = _stop_request_profile()
+        if state is None:
+            return response
+
+        try:
+            profile_id = _write_report(profiles_dir, state, response)
+            response.headers["X-Harvest-Profile-Id"] = profile_id
+            print(f"[Profiling] {request.method} {request.path} took {state['duration'] * 1000:.1f} ms, "
+                  f"{len(state['sql'])} SQL statements - report {profile_id}")
+        except Exception as e:
+            print(f"[Profiling] Failed to write profile report: {e}")
+        return response
+
+    @app.teardown_request
+    def _abandon_request_profile(exc):
+        # after_request did not run (the request failed); don't keep the lock
+        _stop_request_profile()
+
+    def require_admin():
+        """Accept admin token/email/password in the JSON body, or a token in X-Admin-Token."""
+        payload = request.get_json(force=True, silent=True) or {}
+        if not payload.get("token") and request.headers.get("X-Admin-Token"):
+            payload = {"token": request.headers["X-Admin-Token"]}
+        is_authenticated, email = verify_admin_auth_func(payload)
+        if not is_authenticated:
+            return jsonify({"error": "Invalid admin credentials"}), 403
+        return None
+
+    @app.get("/api/admin/profiles")
+    def list_request_profiles():
+        """
+        List stored request profile reports (admin only).
+        Returns: {"ok": True, "profiles": [{"id": ..., "route": ..., "duration_ms": ..., ...}]}
+        """
+        error_response = require_admin()
+        if error_response:
+            return error_response
+        return jsonify({"ok": True, "profiles": list_profile_reports(profiles_dir)})
+
+    @app.get("/api/admin/profiles/<profile_id>")
+    def get_request_profile(profile_id: str):
+        """
+        Download a request profile report (admin only).
+        Query params:
+            - format: "json" (default, full report) or "prof" (raw cProfile stats)
+        """
+        error_response = require_admin()
+        if error_response:
+            return error_response
+
+        if not _PROFILE_ID_RE.match(profile_id):
+            return jsonify({"error": "Invalid profile id"}), 400
+
+        fmt = request.args.get("format", "json")
+        if fmt not in ("json", "prof"):
+            return jsonify({"error": "format must be 'json' or 'prof'"}), 400
+
+        path = os.path.abspath(os.path.join(profiles_dir, f"{profile_id}.{fmt}"))
+        if not os.path.exists(path):
+            return jsonify({"error": "Profile not found"}), 404
+
+        if fmt == "prof":
+            return send_file(path, mimetype="application/octet-stream",
+                             as_attachment=True, download_name=f"{profile_id}.prof")
+        with open(path) as f:
+            return jsonify(json.load(f))
+
+    return True
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline benchmark for the PDF download pipeline
+Runs process_dois_smart against synthetic DOIs with every HTTP request answered
+by a simulated source farm, so throughput can be compared across commits
+without touching the real APIs.
+
+The farm runs in a separate process (so it does not compete with the download
+threads for the GIL) and emulates Unpaywall, OpenAlex, Europe PMC, CORE,
+Zenodo and the publisher hosts their PDF links point to. Each host has a
+lognormal latency, a fraction of DOIs it knows a PDF for, and rates of 429s,
+5xx errors, HTML pages served instead of PDFs and slow bodies (see
+FARM_PROFILE; override it with --profile). Whether a source knows a DOI is
+decided by the seed, so runs with the same arguments see the same farm.
+
+Requests are routed to the farm by an adapter mounted on the shared
+pdf_http_client sessions, which rewrites https://<host>/<path> to
+http://127.0.0.1:<port>/<host>/<path>. The run uses a scratch directory for
+pdf_downloads.db and the project PDFs.
+
+Reports DOIs/min, outcomes, per-source attempt latency, bytes/s and peak RSS.
+
+Usage:
+    python test_scripts/benchmark_pdf_downloads.py --dois 2000 --workers 8
+    python test_scripts/benchmark_pdf_downloads.py --dois 2000 --json before.json
+    python test_scripts/benchmark_pdf_downloads.py --dois 500 --real-rate-limits
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Add parent directory to path to import pdf_manager
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Sources the farm can answer for; all others are disabled for the run
+SIMULATED_SOURCES = ("unpaywall", "openalex", "europe_pmc", "core", "zenodo")
+
+# Synthetic DOI prefixes (MDPI, PLOS, Frontiers, and a publisher without OA)
+DOI_PREFIXES = ("10.3390", "10.1371", "10.3389", "10.5555")
+
+# Hosts Unpaywall and OpenAlex PDF links point to
+PUBLISHER_HOSTS = ("www.mdpi.com", "journals.plos.org", "www.frontiersin.org")
+
+HOST_DEFAULTS = {
+    "latency_ms": 100.0,       # median response time
+    "sigma": 0.5,              # lognormal shape of the response time
+    "hit_rate": 0.0,           # fraction of DOIs a lookup API has a PDF link for
+    "hit_rate_by_prefix": {},  # per DOI prefix overrides of hit_rate
+    "rate_limited": 0.0,       # fraction of requests answered with 429
+    "server_error": 0.0,       # fraction of requests answered with 503
+    "html": 0.0,               # fraction of PDF URLs serving an HTML page instead
+    "slow_body": 0.0,          # fraction of PDF URLs sending the body at slow_bytes_per_s
+    "slow_bytes_per_s": 100_000,
+    "pdf_kb": 300,             # median PDF size
+}
+
+FARM_PROFILE = {
+    # Lookup APIs
+    "api.unpaywall.org": {"latency_ms": 150, "hit_rate": 0.45, "hit_rate_by_prefix": {"10.5555": 0.05},
+                          "rate_limited": 0.01, "server_error": 0.005},
+    "api.openalex.org": {"latency_ms": 300, "sigma": 0.4, "hit_rate": 0.5, "hit_rate_by_prefix": {"10.5555": 0.05},
+                         "server_error": 0.005},
+    "www.ebi.ac.uk": {"latency_ms": 350, "hit_rate": 0.1, "hit_rate_by_prefix": {"10.1371": 0.8, "10.3389": 0.4},
+                      "server_error": 0.01},
+    "api.core.ac.uk": {"latency_ms": 800, "sigma": 0.9, "hit_rate": 0.25, "rate_limited": 0.05,
+                       "server_error": 0.02},
+    # Zenodo answers lookups under /api and serves files under /records
+    "zenodo.org": {"latency_ms": 400, "hit_rate": 0.08, "hit_rate_by_prefix": {"10.5555": 0.2},
+                   "server_error": 0.01, "slow_body": 0.05},
+    # PDF hosts
+    "europepmc.org": {"latency_ms": 250, "html": 0.02, "slow_body": 0.02, "pdf_kb": 500},
+    "core.ac.uk": {"latency_ms": 400, "html": 0.1, "slow_body": 0.05, "server_error": 0.01},
+    "www.mdpi.com": {"latency_ms": 200, "html": 0.02, "pdf_kb": 800},
+    "journals.plos.org": {"latency_ms": 300, "html": 0.01, "slow_body": 0.02, "pdf_kb": 1200},
+    "www.frontiersin.org": {"latency_ms": 250, "html": 0.15, "rate_limited": 0.02},
+}
+
+PAYWALL_PAGE = b"<!DOCTYPE html><html><body>Please sign in to read this article</body></html>" * 40
+
+FARM_PREFIX = "/__farm"
+
+
+# --- Source farm (runs in its own process) ---
+
+def _make_pdf(size: int) -> bytes:
+    """A one-page PDF with a text layer, padded to about `size` bytes."""
+    head = (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+            b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+            b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]/Contents 4 0 R"
+            b"/Resources<</Font<</F1<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>>>>>>>endobj\n"
+            b"4 0 obj<</Length 51>>stream\nBT /F1 12 Tf 72 720 Td (Benchmark paper) Tj ET\nendstream endobj\n"
+            b"trailer<</Root 1 0 R>>\n")
+    padding = max(size - len(head) - 8, 0)
+    return head + b"%" + b"0" * padding + b"\n%%EOF\n"
+
+
+class _FarmHandler(BaseHTTPRequestHandler):
+    """Answers https://<host>/<path> requests forwarded as /<host>/<path>."""
+    protocol_version = "HTTP/1.1"
+    profile: Dict[str, Dict] = {}
+    seed = 0
+    latency_scale = 1.0
+    stats = {"requests": {}, "statuses": {}, "bytes_sent": 0}
+    stats_lock = threading.Lock()
+    pdf_cache: Dict[int, bytes] = {}
+
+    # Deterministic per (host, key) so a source always knows the same DOIs
+    def _chance(self, host: str, key: str) -> float:
+        digest = hashlib.sha256(f"{self.seed}|{host}|{key}".encode()).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+    def _host_profile(self, host: str) -> Dict:
+        return {**HOST_DEFAULTS, **self.profile.get(host, {})}
+
+    def _knows(self, host: str, doi: str) -> bool:
+        p = self._host_profile(host)
+        rate = p["hit_rate_by_prefix"].get(doi.split("/", 1)[0], p["hit_rate"])
+        return self._chance(host, doi) < rate
+
+    def _token(self, doi: str) -> str:
+        return hashlib.sha1(doi.encode()).hexdigest()[:16]
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "application/json",
+              bytes_per_s: Optional[float] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command == "HEAD":
+            body = b""
+        try:
+            if bytes_per_s:
+                chunk = max(int(bytes_per_s / 20), 1024)
+                for start in range(0, len(body), chunk):
+                    self.wfile.write(body[start:start + chunk])
+                    time.sleep(chunk / bytes_per_s)
+            else:
+                self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client timed out or a hedged lookup lost the race
+            self.close_connection = True
+            return
+        with self.stats_lock:
+            self.stats["statuses"][str(status)] = self.stats["statuses"].get(str(status), 0) + 1
+            self.stats["bytes_sent"] += len(body)
+
+    def _send_json(self, data):
+        self._send(200, json.dumps(data).encode())
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        if self.path.startswith(FARM_PREFIX):
+            with self.stats_lock:
+                body = json.dumps({**self.stats, "peak_rss_mb": _peak_rss_mb()}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        _, host, rest = self.path.split("/", 2)
+        parsed = urlparse("/" + rest)
+        query = parse_qs(parsed.query)
+        p = self._host_profile(host)
+        with self.stats_lock:
+            self.stats["requests"][host] = self.stats["requests"].get(host, 0) + 1
+
+        rng = random.Random()
+        time.sleep(p["latency_ms"] * rng.lognormvariate(0, p["sigma"]) * self.latency_scale / 1000.0)
+        roll = rng.random()
+        if roll < p["rate_limited"]:
+            return self._send(429, b'{"message": "Too Many Requests"}')
+        if roll < p["rate_limited"] + p["server_error"]:
+            return self._send(503, b'{"message": "Service Unavailable"}')
+
+        if host == "api.unpaywall.org" and parsed.path.startswith("/v2/"):
+            doi = parsed.path[len("/v2/"):]
+            if not self._knows(host, doi):
+                return self._send_json({"doi": doi, "is_oa": False, "best_oa_location": None})
+            pdf_host = PUBLISHER_HOSTS[int(self._chance("publisher", doi) * len(PUBLISHER_HOSTS))]
+            url = f"https://{pdf_host}/pdf/{self._token(doi)}.pdf"
+            return self._send_json({"doi": doi, "is_oa": True, "best_oa_location": {"url_for_pdf": url, "url": url}})
+
+        if host == "api.openalex.org" and parsed.path == "/works":
+            results = []
+            for doi in query.get("filter", ["doi:"])[0][len("doi:"):].split("|"):
+                location = None
+                if self._knows(host, doi):
+                    pdf_host = PUBLISHER_HOSTS[int(self._chance("publisher", doi) * len(PUBLISHER_HOSTS))]
+                    location = {"pdf_url": f"https://{pdf_host}/pdf/{self._token(doi)}.pdf"}
+                results.append({"doi": f"https://doi.org/{doi.lower()}", "best_oa_location": location,
+                                "oa_locations": [location] if location else []})
+            return self._send_json({"results": results})
+
+        if host == "www.ebi.ac.uk" and parsed.path.endswith("/search"):
+            doi = query.get("query", ["DOI:"])[0][len("DOI:"):]
+            if not self._knows(host, doi):
+                return self._send_json({"resultList": {"result": []}})
+            pmcid = f"PMC{int(self._token(doi), 16) % 10_000_000}"
+            return self._send_json({"resultList": {"result": [
+                {"doi": doi, "pmcid": pmcid, "isOpenAccess": "Y", "hasPDF": "Y"}]}})
+
+        if host == "api.core.ac.uk" and parsed.path.endswith("/search/works"):
+            doi = query.get("q", ['doi:""'])[0][len('doi:"'):-1]
+            if not self._knows(host, doi):
+                return self._send_json({"results": []})
+            return self._send_json({"results": [
+                {"doi": doi, "downloadUrl": f"https://core.ac.uk/download/{self._token(doi)}.pdf"}]})
+
+        if host == "zenodo.org" and parsed.path == "/api/records":
+            doi = query.get("q", ['doi:""'])[0][len('doi:"'):-1]
+            if not self._knows(host, doi):
+                return self._send_json({"hits": {"hits": []}})
+            link = f"https://zenodo.org/records/{int(self._token(doi), 16) % 10_000_000}/files/paper.pdf"
+            return self._send_json({"hits": {"hits": [{"files": [{"key": "paper.pdf", "links": {"self": link}}]}]}})
+
+        is_pdf_url = (parsed.path.endswith(".pdf") or "pdf=render" in parsed.query)
+        if not is_pdf_url:
+            return self._send(404, b'{"message": "Not Found"}')
+
+        # Same URL, same behaviour: a paywalled link stays paywalled
+        if self._chance(host + "|html", self.path) < p["html"]:
+            return self._send(200, PAYWALL_PAGE, "application/pdf")
+        size_kb = max(int(p["pdf_kb"] * random.Random(self.path).lognormvariate(0, 0.5) / 10) * 10, 10)
+        body = self.pdf_cache.get(size_kb)
+        if body is None:
+            body = self.pdf_cache.setdefault(size_kb, _make_pdf(size_kb * 1024))
+        slow = self._chance(host + "|slow", self.path) < p["slow_body"]
+        self._send(200, body, "application/pdf", p["slow_bytes_per_s"] if slow else None)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve_farm(profile: Dict, seed: int, latency_scale: float, port_queue) -> None:
+    """Process entry point: start the farm and report its port."""
+    _FarmHandler.profile = profile
+    _FarmHandler.seed = seed
+    _FarmHandler.latency_scale = latency_scale
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FarmHandler)
+    server.daemon_threads = True
+    server.request_queue_size = 256
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+# --- Routing ---
+
+class FarmAdapter(HTTPAdapter):
+    """
+    Sends every request to the farm, keeping the original host in the path.
+    Each original host gets its own connection pool, sized like the pool of
+    the adapter it replaces, as it would against the real hosts.
+    """
+
+    def __init__(self, farm_url: str, replaced: HTTPAdapter):
+        super().__init__()
+        self.farm_url = farm_url
+        self._replaced = replaced
+        self._host_adapters: Dict[str, HTTPAdapter] = {}
+        self._lock = threading.Lock()
+
+    def _adapter_for(self, host: str) -> HTTPAdapter:
+        with self._lock:
+            adapter = self._host_adapters.get(host)
+            if adapter is None:
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._replaced._pool_maxsize,
+                                      pool_block=self._replaced._pool_block,
+                                      max_retries=self._replaced.max_retries)
+                self._host_adapters[host] = adapter
+            return adapter
+
+    def send(self, request, **kwargs):
+        parsed = urlparse(request.url)
+        request.url = f"{self.farm_url}/{parsed.hostname}{parsed.path or '/'}"
+        if parsed.query:
+            request.url += f"?{parsed.query}"
+        return self._adapter_for(parsed.hostname).send(request, **kwargs)
+
+    def close(self):
+        for adapter in self._host_adapters.values():
+            adapter.close()
+        super().close()
+
+
+def _route_sessions_to_farm(farm_url: str) -> List:
+    """Mount FarmAdapter on the shared sessions. Returns what to restore afterwards."""
+    from pdf_http_client import get_http_session
+
+    mounted = []
+    for use_proxy in (False, True):
+        session = get_http_session(use_proxy)
+        for prefix in ("https://", "http://"):
+            original = session.adapters[prefix]
+            session.mount(prefix, FarmAdapter(farm_url, original))
+            mounted.append((session, prefix, original))
+    return mounted
+
+
+# --- Benchmark ---
+
+def generate_dois(count: int, seed: int = 0) -> List[str]:
+    """Synthetic DOIs spread over DOI_PREFIXES."""
+    rng = random.Random(seed)
+    return [f"{rng.choice(DOI_PREFIXES)}/bench.{seed}.{i:06d}" for i in range(count)]
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+def _source_latencies(db_path: str) -> Dict[str, Dict]:
+    from pdf_download_db import get_pdf_db_connection, flush_download_attempts
+
+    flush_download_attempts(db_path)
+    conn = get_pdf_db_connection(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT source_name, success, response_time_ms FROM download_attempts"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    grouped: Dict[str, Dict] = {}
+    for source_name, success, response_time_ms in rows:
+        entry = grouped.setdefault(source_name, {"attempts": 0, "successes": 0, "times": []})
+        entry["attempts"] += 1
+        entry["successes"] += 1 if success else 0
+        if response_time_ms is not None:
+            entry["times"].append(float(response_time_ms))
+
+    report = {}
+    for name, entry in sorted(grouped.items()):
+        times = entry.pop("times")
+        report[name] = {
+            **entry,
+            "mean_ms": (sum(times) / len(times)) if times else 0.0,
+            "p50_ms": _percentile(times, 0.5),
+            "p95_ms": _percentile(times, 0.95),
+        }
+    return report
+
+
+def _wait_for_hedged_lookups(timeout: float = 60.0) -> None:
+    """Hedged lookups that lost the race finish (and log their attempt) after the DOI is done."""
+    deadline = time.monotonic() + timeout
+    for thread in threading.enumerate():
+        if thread.name.startswith("pdf-hedge"):
+            thread.join(max(deadline - time.monotonic(), 0.0))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_benchmark(dois: int = 1000, workers: int = 8, seed: int = 0, latency_scale: float = 1.0,
+                  profile: Optional[Dict] = None, real_rate_limits: bool = False,
+                  verbose: bool = False) -> Dict:
+    """
+    Run process_dois_smart on `dois` synthetic DOIs against the source farm.
+
+    Rate limits are off unless real_rate_limits is set, so the run measures the
+    pipeline rather than the token buckets. Returns the report as a dict.
+    """
+    import pdf_download_scheduler
+    from pdf_download_db import init_pdf_download_db, set_config_value, get_pdf_db_connection, PDF_DB_PATH
+    from pdf_manager import process_dois_smart
+    from pdf_inspect import shutdown_inspect_pool
+
+    farm_profile = {host: {**FARM_PROFILE.get(host, {}), **(profile or {}).get(host, {})}
+                    for host in set(FARM_PROFILE) | set(profile or {})}
+    ctx = multiprocessing.get_context("spawn")
+    port_queue = ctx.Queue()
+    farm = ctx.Process(target=_serve_farm, args=(farm_profile, seed, latency_scale, port_queue), daemon=True)
+    farm.start()
+    farm_url = f"http://127.0.0.1:{port_queue.get(timeout=60)}"
+
+    workdir = tempfile.mkdtemp(prefix="pdf_benchmark_")
+    cwd = os.getcwd()
+    mounted = []
+    saved_rate_limits = dict(pdf_download_scheduler.HOST_RATE_LIMITS)
+    try:
+        # pdf_downloads.db is opened relative to the working directory
+        os.chdir(workdir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            init_pdf_download_db()
+        set_config_value("download_workers", str(workers))
+        if not real_rate_limits:
+            set_config_value("rate_limit_delay_seconds", "0")
+            pdf_download_scheduler.HOST_RATE_LIMITS.clear()
+        with pdf_download_scheduler._buckets_lock:
+            pdf_download_scheduler._buckets.clear()
+
+        conn = get_pdf_db_connection()
+        try:
+            placeholders = ",".join("?" * len(SIMULATED_SOURCES))
+            conn.execute(f"UPDATE sources SET enabled = (name IN ({placeholders}))", SIMULATED_SOURCES)
+            conn.commit()
+        finally:
+            conn.close()
+
+        mounted = _route_sessions_to_farm(farm_url)
+        doi_list = generate_dois(dois, seed)
+        project_dir = os.path.join(workdir, "project_pdfs", "project_1")
+
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        start = time.monotonic()
+        with output:
+            results = process_dois_smart(doi_list, 1, project_dir)
+        elapsed = time.monotonic() - start
+        _wait_for_hedged_lookups()
+
+        pdf_bytes = sum(
+            os.path.getsize(os.path.join(project_dir, f)) for f in os.listdir(project_dir) if f.endswith(".pdf")
+        )
+        by_source: Dict[str, int] = {}
+        for _, _, _, source in results["downloaded"]:
+            by_source[source] = by_source.get(source, 0) + 1
+
+        report = {
+            "commit": _git_commit(),
+            "params": {"dois": dois, "workers": workers, "seed": seed, "latency_scale": latency_scale,
+                       "real_rate_limits": real_rate_limits},
+            "elapsed_s": elapsed,
+            "dois_per_min": (dois / elapsed * 60.0) if elapsed > 0 else 0.0,
+            "downloaded": len(results["downloaded"]),
+            "needs_upload": len(results["needs_upload"]),
+            "errors": len(results["errors"]),
+            "downloaded_by_source": dict(sorted(by_source.items())),
+            "pdf_bytes": pdf_bytes,
+            "bytes_per_s": (pdf_bytes / elapsed) if elapsed > 0 else 0.0,
+            "peak_rss_mb": _peak_rss_mb(),
+            "sources": _source_latencies(PDF_DB_PATH),
+        }
+        try:
+            report["farm"] = requests.get(f"{farm_url}{FARM_PREFIX}/stats", timeout=10).json()
+        except Exception as e:
+            report["farm"] = {"error": str(e)}
+        return report
+    finally:
+        for session, prefix, original in reversed(mounted):
+            session.adapters[prefix].close()
+            session.mount(prefix, original)
+        pdf_download_scheduler.HOST_RATE_LIMITS.update(saved_rate_limits)
+        with pdf_download_scheduler._buckets_lock:
+            pdf_download_scheduler._buckets.clear()
+        shutdown_inspect_pool()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+        farm.terminate()
+        farm.join(timeout=10)
+
+
+def print_report(report: Dict) -> None:
+    params = report["params"]
+    print(f"PDF download benchmark @ {report['commit'] or 'unknown commit'}: {params['dois']} DOIs, "
+          f"{params['workers']} workers, seed {params['seed']}, latency x{params['latency_scale']}, "
+          f"rate limits {'on' if params['real_rate_limits'] else 'off'}\n")
+    print(f"  elapsed          {report['elapsed_s']:.1f}s")
+    print(f"  throughput       {report['dois_per_min']:.0f} DOIs/min")
+    print(f"  downloaded       {report['downloaded']}  "
+          + ", ".join(f"{k}: {v}" for k, v in report["downloaded_by_source"].items()))
+    print(f"  needs upload     {report['needs_upload']}")
+    print(f"  errors           {report['errors']}")
+    print(f"  PDF bytes        {report['pdf_bytes'] / 1e6:.1f} MB ({report['bytes_per_s'] / 1e6:.2f} MB/s)")
+    print(f"  peak RSS         {report['peak_rss_mb']:.0f} MB")
+
+    print(f"\n{'source':<22}{'attempts':>10}{'success':>10}{'mean':>10}{'p50':>10}{'p95':>10}")
+    for name, s in report["sources"].items():
+        print(f"{name:<22}{s['attempts']:>10}{s['successes']:>10}{s['mean_ms']:>8.0f}ms"
+              f"{s['p50_ms']:>8.0f}ms{s['p95_ms']:>8.0f}ms")
+
+    farm = report.get("farm", {})
+    if "requests" in farm:
+        print(f"\nFarm: {sum(farm['requests'].values())} requests, statuses {farm['statuses']}, "
+              f"{farm['bytes_sent'] / 1e6:.1f} MB sent")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark process_dois_smart against a simulated source farm")
+    parser.add_argument("--dois", type=int, default=1000, help="Number of synthetic DOIs (default: 1000)")
+    parser.add_argument("--workers", type=int, default=8, help="download_workers setting (default: 8)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the DOIs and the farm's answers")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiply every simulated response time (e.g. 0.1 for a quick run)")
+    parser.add_argument("--profile", help="JSON file with per-host overrides of FARM_PROFILE")
+    parser.add_argument("--real-rate-limits", action="store_true",
+                        help="Keep the per-host token bucket rates instead of disabling them")
+    parser.add_argument("--json", metavar="FILE", help="Also write the report to FILE as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    args = parser.parse_args()
+
+    overrides = None
+    if args.profile:
+        with open(args.profile) as f:
+            overrides = json.load(f)
+
+    result = run_benchmark(args.dois, args.workers, args.seed, args.latency_scale, overrides,
+                           args.real_rate_limits, args.verbose)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
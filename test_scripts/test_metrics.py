@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for backend metrics helpers
+Tests label mapping and SQLite instrumentation
+"""
+
+import sys
+import os
+import tempfile
+
+import pytest
+
+# Add parent directory to path to import harvest_metrics
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import harvest_metrics
+from harvest_metrics import host_label, _sql_operation, track_background_task
+from harvest_store import init_db, create_project, get_project_by_id
+
+
+def test_label_mapping():
+    """Outbound hosts and SQL operations map to bounded label sets"""
+    print("Testing metric label mapping...")
+    assert host_label("https://api.crossref.org/works/10.1234/x") == "api.crossref.org"
+    assert host_label("https://API.OPENALEX.ORG/works") == "api.openalex.org"
+    assert host_label("https://some-publisher.example.com/pdf/1") == "other"
+
+    assert _sql_operation("  select * from projects") == "SELECT"
+    assert _sql_operation("INSERT OR IGNORE INTO x VALUES (1)") == "INSERT"
+    assert _sql_operation("VACUUM") == "OTHER"
+    assert _sql_operation("") == "OTHER"
+
+    # No-op when metrics are disabled, counted otherwise
+    with track_background_task("test_task"):
+        pass
+    print("✓ Label mapping works")
+
+
+def test_store_works_with_connection_factory():
+    """harvest_store behaves the same with the metrics connection factory"""
+    print("Testing harvest_store with metrics connection factory...")
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
+        db_path = tmp.name
+    try:
+        init_db(db_path)
+        project_id = create_project(db_path, "Metrics Project", "", ["10.1234/a"], "test@example.com")
+        assert get_project_by_id(db_path, project_id)["doi_list"] == ["10.1234/a"]
+        print("✓ Store works")
+    finally:
+        os.unlink(db_path)
+
+
+def test_sqlite_queries_are_counted():
+    """Instrumented connections record statement counts per db and operation"""
+    pytest.importorskip("prometheus_client")
+    if not harvest_metrics.METRICS_ENABLED:
+        pytest.skip("metrics disabled")
+    import sqlite3
+
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
+        db_path = tmp.name
+    try:
+        label = os.path.basename(db_path)
+        counter = harvest_metrics.SQLITE_QUERIES
+        conn = sqlite3.connect(db_path, factory=harvest_metrics.InstrumentedConnection)
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.cursor().executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+        conn.execute("SELECT * FROM t").fetchall()
+        conn.close()
+
+        assert counter.labels(label, "CREATE")._value.get() == 1
+        assert counter.labels(label, "INSERT")._value.get() == 1
+        assert counter.labels(label, "SELECT")._value.get() == 1
+        print("✓ SQLite queries counted")
+    finally:
+        os.unlink(db_path)
+
+
+if __name__ == "__main__":
+    test_label_mapping()
+    test_store_works_with_connection_factory()
+    test_sqlite_queries_are_counted()
+    print("\nAll metrics tests passed!")
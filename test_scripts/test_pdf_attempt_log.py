@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for buffered download attempt logging
+Tests that attempts are written in batches and merged into source_performance,
+and the negative cache derived from recent permanent failures
+"""
+
+import sys
+import os
+import tempfile
+import threading
+
+# Add parent directory to path to import pdf_download_db
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_download_db import (
+    init_pdf_download_db, log_download_attempt, flush_download_attempts,
+    get_source_rankings, get_download_statistics, get_negative_cached_sources
+)
+from pdf_sources import classify_failure
+
+
+def test_attempts_are_buffered_and_aggregated():
+    """Attempts from many threads end up in download_attempts and source_performance"""
+    print("Testing buffered attempt logging...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "pdf_downloads.db")
+        assert init_pdf_download_db(db_path)
+
+        def log_attempts(thread_idx):
+            for i in range(50):
+                log_download_attempt(1, f"10.1234/{thread_idx}-{i}", "europe_pmc", i % 5 == 0,
+                                     response_time_ms=200, db_path=db_path)
+
+        threads = [threading.Thread(target=log_attempts, args=(t,)) for t in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert flush_download_attempts(db_path), "Flush should finish"
+
+        stats = get_download_statistics(db_path=db_path)
+        assert stats["total_attempts"] == 200
+        assert stats["successful"] == 40
+
+        source = next(s for s in get_source_rankings(db_path) if s["name"] == "europe_pmc")
+        assert source["total_attempts"] == 200
+        assert source["success_count"] == 40
+        assert source["failure_count"] == 160
+        assert abs(source["success_rate"] - 20.0) < 0.01
+        assert abs(source["avg_response_time_ms"] - 200.0) < 0.01
+
+        # A second batch is merged into the existing aggregates
+        log_download_attempt(1, "10.1234/late", "europe_pmc", True, response_time_ms=400, db_path=db_path)
+        flush_download_attempts(db_path)
+        source = next(s for s in get_source_rankings(db_path) if s["name"] == "europe_pmc")
+        assert source["total_attempts"] == 201
+        assert source["success_count"] == 41
+        assert 200.0 < source["avg_response_time_ms"] < 202.0
+
+    print("✓ Buffered attempt logging works")
+
+
+def test_negative_cache_skips_permanent_failures():
+    """Permanent failures are cached per (DOI, source); temporary ones and later successes are not"""
+    print("Testing negative cache...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "pdf_downloads.db")
+        assert init_pdf_download_db(db_path)
+        doi = "10.1234/neg"
+
+        log_download_attempt(1, doi, "europe_pmc", False, "No results found", "not_found", db_path=db_path)
+        log_download_attempt(1, doi, "core", False, "Timeout", "timeout", db_path=db_path)
+        log_download_attempt(1, doi, "zenodo", True, db_path=db_path)
+        log_download_attempt(1, doi, "zenodo_download", False, "Response is not a PDF", "invalid_pdf",
+                             db_path=db_path)
+        log_download_attempt(1, doi, "doaj", False, "HTTP 404", "not_found", db_path=db_path)
+        log_download_attempt(1, doi, "doaj", True, db_path=db_path)
+        log_download_attempt(1, "10.1234/other", "core", False, "HTTP 404", "not_found", db_path=db_path)
+        flush_download_attempts(db_path)
+
+        cached = get_negative_cached_sources(doi, 14, db_path)
+        assert cached == {"europe_pmc": "not_found", "zenodo": "invalid_pdf"}, cached
+        assert get_negative_cached_sources(doi, 0, db_path) == {}, "TTL 0 disables the cache"
+
+    print("✓ Negative cache works")
+
+
+def test_negative_cache_with_source_messages():
+    """The "no PDF" answers sources actually give are cached; timeouts and server errors are not"""
+    print("Testing negative cache with real source messages...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "pdf_downloads.db")
+        assert init_pdf_download_db(db_path)
+        doi = "10.1234/paywalled"
+        # Failure messages as returned by the source adapters in pdf_sources.py
+        messages = {
+            "europe_pmc": "Europe PMC: Article found but no accessible PDF link",
+            "pmc": "No PMCID found for this DOI",
+            "doaj": "DOAJ: No fulltext link found",
+            "semantic_scholar": "Semantic Scholar: No PDF link available",
+            "openalex": "OpenAlex: not open access (no PDF location)",
+            "core": "CORE timeout",
+            "zenodo": "Zenodo API error: HTTP 503",
+            "arxiv": "arXiv error: HTTPSConnectionPool(host='export.arxiv.org', port=443): Read timed out.",
+        }
+        for source_name, message in messages.items():
+            log_download_attempt(1, doi, source_name, False, message, classify_failure(message), db_path=db_path)
+        flush_download_attempts(db_path)
+
+        cached = get_negative_cached_sources(doi, 14, db_path)
+        assert cached == {"europe_pmc": "not_found", "pmc": "not_found", "doaj": "not_found",
+                          "semantic_scholar": "not_found", "openalex": "paywall"}, cached
+
+    print("✓ Negative cache works with source messages")
+
+
+if __name__ == "__main__":
+    test_attempts_are_buffered_and_aggregated()
+    test_negative_cache_skips_permanent_failures()
+    test_negative_cache_with_source_messages()
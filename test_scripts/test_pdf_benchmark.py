@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the offline PDF download benchmark
+Runs a small benchmark against the simulated source farm and checks the report
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import the benchmark
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_pdf_downloads import run_benchmark, generate_dois
+from pdf_http_client import get_http_session
+
+
+def test_small_benchmark_run():
+    """40 DOIs are downloaded through the farm and the sessions are restored afterwards"""
+    print("Testing benchmark run...")
+    assert generate_dois(5, seed=3) == generate_dois(5, seed=3)
+
+    adapter_before = get_http_session().get_adapter("https://example.org/")
+    cwd = os.getcwd()
+
+    report = run_benchmark(dois=40, workers=4, seed=1, latency_scale=0.05,
+                           profile={"api.openalex.org": {"server_error": 0.0}})
+    print(f"   {report['dois_per_min']:.0f} DOIs/min, {report['downloaded']} downloaded, "
+          f"farm statuses {report['farm'].get('statuses')}")
+
+    assert report["downloaded"] + report["needs_upload"] + report["errors"] == 40
+    assert report["downloaded"] > 0 and report["pdf_bytes"] > 0
+    assert sum(report["downloaded_by_source"].values()) == report["downloaded"]
+    assert report["sources"]["openalex"]["attempts"] == 40, "Every DOI is in the batched lookup"
+    assert report["farm"]["requests"]["api.openalex.org"] == 1
+    assert report["dois_per_min"] > 0 and report["peak_rss_mb"] > 0
+
+    assert get_http_session().get_adapter("https://example.org/") is adapter_before
+    assert os.getcwd() == cwd
+
+    print("✓ Benchmark run works")
+
+
+if __name__ == "__main__":
+    test_small_benchmark_run()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for bulk PDF uploads
+Tests matching uploaded PDFs and ZIP entries to DOIs by manifest CSV and file
+name, validating them in one batch and reporting every file
+"""
+
+import sys
+import os
+import io
+import shutil
+import tempfile
+import zipfile
+
+# Add parent directory to path to import pdf_bulk_ingest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harvest_store import init_db, create_project, get_pdf_manifest
+from pdf_bulk_ingest import ingest_pdf_uploads
+from pdf_manager import generate_doi_hash, get_project_pdf_dir
+
+
+def _pdf(marker):
+    """A one-page PDF; the marker makes its checksum unique."""
+    return (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+            b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+            b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>endobj\n"
+            b"trailer<</Root 1 0 R>>\n%" + marker.encode() + b"0" * 1200 + b"\n%%EOF\n")
+
+
+def test_bulk_ingest():
+    """PDFs and a ZIP with a manifest are attached; the rest is reported per file"""
+    print("Testing bulk PDF ingest...")
+    work_dir = tempfile.mkdtemp()
+    # Project PDFs are stored relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        db_path = os.path.join(work_dir, "harvest.db")
+        init_db(db_path)
+        dois = ["10.1234/a", "10.1234/b", "10.1234/c"]
+        project_id = create_project(db_path, "Bulk Project", "", dois, "test@example.com")
+
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as z:
+            z.writestr("papers/manifest.csv", "filename,doi\npaper-b.pdf,10.1234/b\nother.pdf,10.9999/x\n")
+            z.writestr("papers/paper-b.pdf", _pdf("b"))
+            z.writestr("papers/other.pdf", _pdf("x"))
+            z.writestr("papers/mystery.pdf", _pdf("m"))
+            z.writestr("papers/notes.txt", "not a paper")
+            z.writestr("__MACOSX/papers/._paper-b.pdf", "resource fork")
+        archive.seek(0)
+
+        uploads = [
+            ("10.1234_a.pdf", io.BytesIO(_pdf("a"))),
+            ("papers.zip", archive),
+            ("10.1234_c.pdf", io.BytesIO(b"<html>Please sign in</html>" * 50)),
+            ("copy-of-a.pdf", io.BytesIO(_pdf("a2"))),
+        ]
+        result = ingest_pdf_uploads(db_path, project_id, uploads,
+                                    manifest=b"\xef\xbb\xbfFilename,DOI\ncopy-of-a.pdf,10.1234/A\n")
+        statuses = {entry["filename"]: (entry["status"], entry["doi"]) for entry in result["files"]}
+        print(f"   Report: {statuses}")
+        assert statuses == {
+            "10.1234_a.pdf": ("attached", "10.1234/a"),
+            "paper-b.pdf": ("attached", "10.1234/b"),
+            "other.pdf": ("unknown_doi", "10.9999/x"),
+            "mystery.pdf": ("unmatched", None),
+            "notes.txt": ("not_pdf", None),
+            "10.1234_c.pdf": ("invalid", "10.1234/c"),
+            "copy-of-a.pdf": ("duplicate", "10.1234/a"),
+        }
+        assert result["summary"] == {"attached": 2, "unknown_doi": 1, "unmatched": 1,
+                                     "not_pdf": 1, "invalid": 1, "duplicate": 1}
+
+        project_dir = get_project_pdf_dir(project_id)
+        manifest = {entry["doi"]: entry for entry in get_pdf_manifest(db_path, project_id)}
+        assert set(manifest) == {"10.1234/a", "10.1234/b"}
+        assert manifest["10.1234/b"]["source"] == "bulk_upload"
+        with open(os.path.join(project_dir, f"{generate_doi_hash('10.1234/b')}.pdf"), "rb") as f:
+            assert f.read() == _pdf("b")
+        assert not [name for name in os.listdir(project_dir) if name.startswith(".ingest-")], \
+            "Staging directory is removed"
+
+        # The same file again is a duplicate; a file over the size limit is not staged
+        result = ingest_pdf_uploads(db_path, project_id, [
+            ("10.1234_a.pdf", io.BytesIO(_pdf("a"))),
+            ("10.1234_c.pdf", io.BytesIO(_pdf("c"))),
+        ], max_file_mb=0.001)
+        assert [entry["status"] for entry in result["files"]] == ["too_large", "too_large"]
+        result = ingest_pdf_uploads(db_path, project_id, [("10.1234_a.pdf", io.BytesIO(_pdf("a")))])
+        assert result["files"][0]["status"] == "duplicate"
+
+        # ZIP contents count uncompressed towards the total staged per upload
+        bomb = io.BytesIO()
+        with zipfile.ZipFile(bomb, "w", zipfile.ZIP_DEFLATED) as z:
+            z.writestr("10.1234_b.pdf", _pdf("b2") + b"\0" * 600000)
+            z.writestr("10.1234_c.pdf", _pdf("c") + b"\0" * 600000)
+        assert bomb.tell() < 10000
+        bomb.seek(0)
+        result = ingest_pdf_uploads(db_path, project_id, [("bomb.zip", bomb)], max_total_mb=1)
+        assert [entry["status"] for entry in result["files"]] == ["attached", "skipped"], result["files"]
+        assert "in total" in result["files"][1]["message"]
+
+        assert ingest_pdf_uploads(db_path, 9999, []) is None
+        print("✓ Bulk ingest works")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_bulk_ingest()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for detecting the DOI of uploaded PDFs
+Tests DOI candidates from metadata and first-page text, fuzzy title matching
+against cached CrossRef titles, and attaching bulk uploads without a DOI
+"""
+
+import sys
+import os
+import io
+import shutil
+import tempfile
+
+# Add parent directory to path to import pdf_doi_matcher
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harvest_store import init_db, create_project, cache_crossref_titles, get_pdf_manifest
+from pdf_inspect import inspect_pdfs, FITZ_AVAILABLE
+from pdf_doi_matcher import match_pdfs_to_dois, match_doi_candidates
+from pdf_bulk_ingest import ingest_pdf_uploads
+
+DOIS = ["10.1234/meta", "10.1234/text", "10.5678/Title(2020)", "10.1234/other"]
+TITLES = {
+    "10.1234/meta": "Metadata Only Article",
+    "10.1234/text": "Text Layer Article",
+    "10.5678/Title(2020)": "Flowering time control by FLC in Arabidopsis thaliana",
+    "10.1234/other": "Flowering time control in rice",
+}
+
+
+def _pdf(heading, body="", subject=""):
+    import fitz
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 100), heading, fontsize=18)
+    page.insert_text((72, 160), body, fontsize=10)
+    doc.set_metadata({"subject": subject})
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_detect_pdf_dois():
+    """PDFs are matched by the DOIs they contain, then by title"""
+    print("Testing PDF DOI detection...")
+    project_dois = {doi.lower(): doi for doi in DOIS}
+    assert match_doi_candidates(["10.9999/cited", "10.1234/TEXT.Received"], project_dois) == "10.1234/text"
+    assert match_doi_candidates(["10.1234/textbook"], project_dois) is None
+    if not FITZ_AVAILABLE:
+        print("   PyMuPDF not installed; skipping extraction")
+        return
+
+    work_dir = tempfile.mkdtemp()
+    # Project PDFs are stored relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        db_path = os.path.join(work_dir, "harvest.db")
+        init_db(db_path)
+        project_id = create_project(db_path, "Detect Project", "", DOIS, "test@example.com")
+        # Cached titles, so nothing is fetched from CrossRef
+        assert cache_crossref_titles(db_path, TITLES)
+
+        files = {
+            "meta.pdf": _pdf("Some Heading", "Cites doi:10.1234/other", subject="doi:10.1234/meta"),
+            "text.pdf": _pdf("Another Heading", "Cited: 10.9999/cited; this article https://doi.org/10.1234/text."),
+            "title.pdf": _pdf("Flowering-time control by FLC in Arabidopsis thaliana"),
+            "unknown.pdf": _pdf("Protein folding in yeast", "doi:10.9999/elsewhere"),
+        }
+        paths = []
+        for name, data in files.items():
+            paths.append(os.path.join(work_dir, name))
+            with open(paths[-1], "wb") as f:
+                f.write(data)
+
+        inspections = inspect_pdfs(paths, extract_identifiers=True)
+        assert inspections[1]["doi_candidates"] == ["10.9999/cited", "10.1234/text"], inspections[1]
+        matches = match_pdfs_to_dois(db_path, DOIS, inspections, fetch_titles=False)
+        print(f"   Matches: {matches}")
+        assert matches[0] == {"doi": "10.1234/meta", "matched_by": "pdf_doi"}
+        assert matches[1] == {"doi": "10.1234/text", "matched_by": "pdf_doi"}
+        assert matches[2]["doi"] == "10.5678/Title(2020)" and matches[2]["matched_by"] == "pdf_title"
+        assert matches[3] is None
+
+        # A bulk upload without DOIs attaches the files it can identify
+        result = ingest_pdf_uploads(db_path, project_id,
+                                    [(name, io.BytesIO(data)) for name, data in files.items()])
+        statuses = {entry["filename"]: (entry["status"], entry.get("matched_by")) for entry in result["files"]}
+        assert statuses == {
+            "meta.pdf": ("attached", "pdf_doi"),
+            "text.pdf": ("attached", "pdf_doi"),
+            "title.pdf": ("attached", "pdf_title"),
+            "unknown.pdf": ("unmatched", None),
+        }, statuses
+        sources = {entry["doi"]: entry["source"] for entry in get_pdf_manifest(db_path, project_id)}
+        assert sources == {doi: "bulk_upload" for doi in DOIS[:3]}
+        print("✓ PDF DOI detection works")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_detect_pdf_dois()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the durable PDF download job queue
+Tests job leases, lease expiry, resuming a job from its checkpointed DOIs,
+reading per-DOI events from a cursor, draining the retry queue and fair-share
+scheduling of several projects' jobs
+"""
+
+import sys
+import os
+import time
+import sqlite3
+import tempfile
+import shutil
+
+# Add parent directory to path to import harvest_store
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harvest_store import (
+    init_db, create_project, enqueue_pdf_download_job, claim_pdf_download_job,
+    renew_pdf_download_lease, cancel_pdf_download_jobs, get_active_pdf_download_job,
+    get_pdf_download_job, get_pdf_download_tasks, complete_pdf_download_task,
+    init_pdf_download_progress, update_pdf_download_progress, get_pdf_download_progress,
+    get_pdf_download_events, get_pdf_download_results, get_pdf_manifest,
+    get_pdf_download_queue, _fair_share_etas
+)
+
+
+def _make_db():
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
+        db_path = tmp.name
+    init_db(db_path)
+    return db_path
+
+
+def _expire_lease(db_path, job_id):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE pdf_download_jobs SET lease_expires_at = ? WHERE id = ?", (time.time() - 1, job_id))
+    conn.commit()
+    conn.close()
+
+
+def test_job_leases():
+    """Only one worker holds a job; an expired lease lets another worker take it over"""
+    print("Testing job leases...")
+    db_path = _make_db()
+    try:
+        dois = ["10.1234/a", "10.1234/b"]
+        project_id = create_project(db_path, "Queue Project", "", dois, "test@example.com")
+        job_id = enqueue_pdf_download_job(db_path, project_id, dois, "/tmp/pdfs", "admin@example.com")
+        assert get_active_pdf_download_job(db_path, project_id)["status"] == "queued"
+        assert len(get_pdf_download_tasks(db_path, job_id, status="pending")) == 2
+
+        job = claim_pdf_download_job(db_path, "worker-1", lease_seconds=60)
+        assert job["id"] == job_id and job["lease_owner"] == "worker-1"
+        assert claim_pdf_download_job(db_path, "worker-2", lease_seconds=60) is None
+
+        # worker-1 dies and its lease runs out
+        _expire_lease(db_path, job_id)
+        job = claim_pdf_download_job(db_path, "worker-2", lease_seconds=60)
+        assert job["lease_owner"] == "worker-2" and job["attempts"] == 2
+        assert not renew_pdf_download_lease(db_path, job_id, "worker-1")
+        assert renew_pdf_download_lease(db_path, job_id, "worker-2")
+
+        assert cancel_pdf_download_jobs(db_path, project_id) == 1
+        assert not renew_pdf_download_lease(db_path, job_id, "worker-2")
+        assert get_active_pdf_download_job(db_path, project_id) is None
+
+        # A failed enqueue leaves no half-written job and releases the write lock
+        assert enqueue_pdf_download_job(db_path, project_id, ["10.1234/a", {"not": "a doi"}], "/tmp/pdfs") is None
+        assert get_active_pdf_download_job(db_path, project_id) is None
+        assert enqueue_pdf_download_job(db_path, project_id, dois, "/tmp/pdfs") is not None
+        print("✓ Job leases work")
+    finally:
+        os.unlink(db_path)
+
+
+def test_worker_resumes_from_checkpoint():
+    """A reclaimed job only downloads the DOIs that were not finished before"""
+    print("Testing resume from checkpoint...")
+    import pdf_manager
+    from pdf_download_worker import run_pdf_download_job
+
+    db_path = _make_db()
+    project_dir = tempfile.mkdtemp()
+    attempted = []
+
+    def fake_download(doi, project_id, save_dir, progress_callback=None, prefetched_url=None):
+        attempted.append(doi)
+        if doi.endswith("c"):
+            return False, "All download sources failed", "none"
+        return True, "Downloaded", "unpaywall"
+
+    original = (pdf_manager.download_pdf_smart, pdf_manager.prefetch_openalex_urls)
+    pdf_manager.download_pdf_smart = fake_download
+    pdf_manager.prefetch_openalex_urls = lambda dois, project_id: {}
+    # Keep the pdf_downloads.db created by process_dois_smart out of the repo
+    cwd = os.getcwd()
+    os.chdir(project_dir)
+    try:
+        dois = ["10.1234/a", "10.1234/b", "10.1234/c"]
+        project_id = create_project(db_path, "Resume Project", "", dois, "test@example.com")
+        init_pdf_download_progress(db_path, project_id, len(dois), project_dir)
+        job_id = enqueue_pdf_download_job(db_path, project_id, dois, project_dir)
+
+        # First worker finished one DOI, then died
+        claim_pdf_download_job(db_path, "worker-1", lease_seconds=60)
+        complete_pdf_download_task(db_path, job_id, 0, "downloaded", "a.pdf", "Downloaded", "unpaywall")
+        _expire_lease(db_path, job_id)
+
+        job = claim_pdf_download_job(db_path, "worker-2", lease_seconds=60)
+        assert run_pdf_download_job(db_path, job, "worker-2", lease_seconds=60) == "completed"
+
+        assert sorted(attempted) == ["10.1234/b", "10.1234/c"]
+        assert get_pdf_download_job(db_path, job_id)["status"] == "completed"
+        assert all(t["status"] == "done" for t in get_pdf_download_tasks(db_path, job_id))
+
+        progress = get_pdf_download_progress(db_path, project_id)
+        assert progress["status"] == "completed"
+        assert progress["current"] == 3
+        assert progress["downloaded_count"] == 2
+        assert progress["needs_upload_count"] == 1
+        results = get_pdf_download_results(db_path, job_id)
+        assert [r[0] for r in results["downloaded"]] == ["10.1234/a", "10.1234/b"]
+        print("✓ Worker resumes from checkpoint")
+    finally:
+        os.chdir(cwd)
+        pdf_manager.download_pdf_smart, pdf_manager.prefetch_openalex_urls = original
+        os.unlink(db_path)
+        shutil.rmtree(project_dir, ignore_errors=True)
+
+
+def test_fair_share_between_projects():
+    """A small project queued behind a large one gets its turn after one slice"""
+    print("Testing fair-share scheduling...")
+    import pdf_manager
+    from pdf_download_worker import run_pdf_download_job
+
+    db_path = _make_db()
+    project_dir = tempfile.mkdtemp()
+    attempted = []
+
+    def fake_download(doi, project_id, save_dir, progress_callback=None, prefetched_url=None):
+        attempted.append(doi)
+        return True, "Downloaded", "unpaywall"
+
+    looked_up = []
+
+    def record_store_lookup(db_path, project_id, doi, project_dir):
+        looked_up.append(doi)
+        return original_link(db_path, project_id, doi, project_dir)
+
+    original = (pdf_manager.download_pdf_smart, pdf_manager.prefetch_openalex_urls)
+    original_link = pdf_manager.link_pdf_from_store
+    pdf_manager.download_pdf_smart = fake_download
+    pdf_manager.prefetch_openalex_urls = lambda dois, project_id: {}
+    pdf_manager.link_pdf_from_store = record_store_lookup
+    cwd = os.getcwd()
+    os.chdir(project_dir)
+    try:
+        big = [f"10.1234/big{i}" for i in range(10)]
+        small = ["10.1234/small0", "10.1234/small1", "10.1234/small2"]
+        big_project = create_project(db_path, "Big Project", "", big, "test@example.com")
+        small_project = create_project(db_path, "Small Project", "", small, "test@example.com")
+        for project_id, dois in ((big_project, big), (small_project, small)):
+            init_pdf_download_progress(db_path, project_id, len(dois), project_dir)
+        big_job = enqueue_pdf_download_job(db_path, big_project, big, project_dir)
+        small_job = enqueue_pdf_download_job(db_path, small_project, small, project_dir, priority=2)
+
+        queue = get_pdf_download_queue(db_path)
+        assert [(j["id"], j["queue_position"], j["remaining"]) for j in queue] == [(big_job, 1, 10), (small_job, 2, 3)]
+        assert all(j["eta_seconds"] is None for j in queue), "No throughput measured yet"
+
+        statuses = []
+        while True:
+            job = claim_pdf_download_job(db_path, "worker-1", lease_seconds=60)
+            if job is None:
+                break
+            statuses.append(run_pdf_download_job(db_path, job, "worker-1", lease_seconds=60, slice_size=4))
+
+        print(f"   Download order: {attempted}")
+        assert attempted == big[:4] + small + big[4:]
+        assert statuses == ["queued", "completed", "completed"]
+        assert looked_up == attempted, "The PDF store is checked once per DOI, a slice at a time"
+        assert get_pdf_download_job(db_path, big_job)["virtual_time"] == 10
+        assert get_pdf_download_job(db_path, small_job)["virtual_time"] == 1.5
+
+        # 4 DOIs/s shared 1:3 - the priority 3 job finishes first, then the other gets everything
+        etas = _fair_share_etas({1: 10, 2: 10}, {1: 1, 2: 3}, 4.0)
+        assert abs(etas[2] - 10 / 3) < 1e-6 and abs(etas[1] - 5.0) < 1e-6
+        print("✓ Fair-share scheduling works")
+    finally:
+        os.chdir(cwd)
+        pdf_manager.download_pdf_smart, pdf_manager.prefetch_openalex_urls = original
+        pdf_manager.link_pdf_from_store = original_link
+        os.unlink(db_path)
+        shutil.rmtree(project_dir, ignore_errors=True)
+
+
+def test_event_cursor():
+    """Each finished DOI appends one event and bumps the progress counters"""
+    print("Testing event cursor...")
+    db_path = _make_db()
+    try:
+        dois = ["10.1234/a", "10.1234/b", "10.1234/c"]
+        project_id = create_project(db_path, "Events Project", "", dois, "test@example.com")
+        init_pdf_download_progress(db_path, project_id, len(dois), "/tmp/pdfs")
+        job_id = enqueue_pdf_download_job(db_path, project_id, dois, "/tmp/pdfs")
+        update_pdf_download_progress(db_path, project_id, {"job_id": job_id})
+
+        first = complete_pdf_download_task(db_path, job_id, 0, "downloaded", "a.pdf", "ok", "unpaywall")
+        complete_pdf_download_task(db_path, job_id, 2, "error", "c.pdf", "Timeout", "")
+        # Checkpointing the same DOI twice is ignored
+        assert complete_pdf_download_task(db_path, job_id, 0, "downloaded", "a.pdf", "ok", "unpaywall") is None
+
+        events = get_pdf_download_events(db_path, job_id)
+        assert [e["doi"] for e in events] == ["10.1234/a", "10.1234/c"]
+        later = get_pdf_download_events(db_path, job_id, after_id=first)
+        assert [e["outcome"] for e in later] == ["error"]
+        assert get_pdf_download_events(db_path, job_id, after_id=later[-1]["id"]) == []
+
+        progress = get_pdf_download_progress(db_path, project_id)
+        assert progress["current"] == 2
+        assert progress["downloaded_count"] == 1 and progress["errors_count"] == 1
+        assert progress["current_doi"] == "10.1234/c"
+
+        # The queue ETA's throughput query reads only recent events
+        conn = sqlite3.connect(db_path)
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT COUNT(*), MIN(created_at) FROM pdf_download_events "
+                            "WHERE created_at >= ?", (time.time() - 600,)).fetchall()
+        conn.close()
+        assert any("idx_pdf_download_events_created" in row[-1] for row in plan), plan
+        print("✓ Event cursor works")
+    finally:
+        os.unlink(db_path)
+
+
+def test_retry_queue_drain():
+    """A temporarily failed DOI is retried in the background and its job results updated"""
+    print("Testing retry queue drain...")
+    import pdf_manager
+    from pdf_download_db import add_to_retry_queue, get_retry_queue_ready
+    from pdf_download_worker import drain_retry_queue
+
+    db_path = _make_db()
+    work_dir = tempfile.mkdtemp()
+    # The shared PDF store is created next to the project directory
+    project_dir = os.path.join(work_dir, "project_pdfs", "project_1")
+    os.makedirs(project_dir)
+
+    def fake_download(doi, project_id, save_dir, progress_callback=None, prefetched_url=None):
+        with open(os.path.join(save_dir, f"{pdf_manager.generate_doi_hash(doi)}.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4\n" + b"0" * 2000)
+        return True, "Downloaded", "europe_pmc"
+
+    original = (pdf_manager.download_pdf_smart, pdf_manager.prefetch_openalex_urls)
+    pdf_manager.download_pdf_smart = fake_download
+    pdf_manager.prefetch_openalex_urls = lambda dois, project_id: {}
+    # The retry queue lives in the pdf_downloads.db of the working directory
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        dois = ["10.1234/a", "10.1234/b"]
+        project_id = create_project(db_path, "Retry Project", "", dois, "test@example.com")
+        init_pdf_download_progress(db_path, project_id, len(dois), project_dir)
+        job_id = enqueue_pdf_download_job(db_path, project_id, dois, project_dir)
+        update_pdf_download_progress(db_path, project_id, {"job_id": job_id, "status": "completed"})
+        complete_pdf_download_task(db_path, job_id, 0, "downloaded", "a.pdf", "Downloaded", "unpaywall")
+        complete_pdf_download_task(db_path, job_id, 1, "error", "b.pdf",
+                                   "Temporary failure (timeout), retry scheduled", "")
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE pdf_download_jobs SET status = 'completed' WHERE id = ?", (job_id,))
+        conn.commit()
+        conn.close()
+
+        assert add_to_retry_queue(project_id, "10.1234/b", "timeout", retry_delay_minutes=0)
+        assert drain_retry_queue(db_path) == 1
+        assert get_retry_queue_ready() == []
+
+        progress = get_pdf_download_progress(db_path, project_id)
+        assert progress["downloaded_count"] == 2 and progress["errors_count"] == 0
+        assert get_pdf_download_events(db_path, job_id)[-1]["outcome"] == "downloaded"
+        assert [e["doi"] for e in get_pdf_manifest(db_path, project_id)] == ["10.1234/b"]
+
+        # A DOI that keeps failing is dropped after max_retry_attempts
+        assert add_to_retry_queue(project_id, "10.1234/c", "timeout", 0, max_retry_attempts=2)
+        assert add_to_retry_queue(project_id, "10.1234/c", "timeout", 0, max_retry_attempts=2)
+        assert not add_to_retry_queue(project_id, "10.1234/c", "timeout", 0, max_retry_attempts=2)
+        assert get_retry_queue_ready() == []
+        print("✓ Retry queue drain works")
+    finally:
+        os.chdir(cwd)
+        pdf_manager.download_pdf_smart, pdf_manager.prefetch_openalex_urls = original
+        os.unlink(db_path)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_paywalled_doi_needs_upload():
+    """A DOI no source has a PDF for needs upload at once; one that hit a timeout also gets a retry"""
+    print("Testing paywalled DOI outcome...")
+    import pdf_manager
+    import pdf_download_scheduler
+    from pdf_download_worker import classify_download_result
+
+    # Failure messages as returned by the source adapters in pdf_sources.py
+    answers = {
+        "europe_pmc": "Europe PMC: Article found but no accessible PDF link",
+        "pmc": "No PMCID found for this DOI",
+        "semantic_scholar": "Semantic Scholar: No PDF link available",
+        "doaj": "DOAJ: No fulltext link found",
+        "core": "CORE: Article found but no PDF download link",
+        "unpaywall": "Not open access",
+        "openalex": "OpenAlex: not open access (no PDF location)",
+    }
+    tried = []
+
+    def fake_try_source(source_name, doi, config=None):
+        tried.append(source_name)
+        if doi.endswith("slow") and source_name == "europe_pmc":
+            return False, "Europe PMC timeout", 15000
+        return False, answers.get(source_name, "Not found in Zenodo"), 10
+
+    original = pdf_manager.try_source
+    pdf_manager.try_source = fake_try_source
+    work_dir = tempfile.mkdtemp()
+    # The retry queue lives in the pdf_downloads.db of the working directory
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        success, message, _ = pdf_manager.download_pdf_smart("10.1234/paywalled", 1, work_dir)
+        assert not success and "europe_pmc" in tried
+        assert classify_download_result(success, message) == "needs_upload", message
+        assert pdf_manager.RETRY_SCHEDULED_MESSAGE not in message
+
+        success, message, _ = pdf_manager.download_pdf_smart("10.1234/slow", 1, work_dir)
+        assert pdf_manager.RETRY_SCHEDULED_MESSAGE in message and "timeout" in message, message
+        assert classify_download_result(success, message) == "needs_upload", message
+
+        conn = sqlite3.connect(os.path.join(work_dir, "pdf_downloads.db"))
+        queued = conn.execute("SELECT doi, failure_category FROM retry_queue").fetchall()
+        conn.close()
+        assert queued == [("10.1234/slow", "timeout")], queued
+        print("✓ Paywalled DOIs need upload")
+    finally:
+        os.chdir(cwd)
+        pdf_manager.try_source = original
+        pdf_download_scheduler._breakers.clear()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_job_leases()
+    test_worker_resumes_from_checkpoint()
+    test_fair_share_between_projects()
+    test_event_cursor()
+    test_retry_queue_drain()
+    test_paywalled_doi_needs_upload()
+    print("\nAll PDF download queue tests passed!")
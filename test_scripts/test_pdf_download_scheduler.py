@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the concurrent PDF download scheduler
+Tests token bucket rate limiting, worker pool progress reporting, hedged source lookups
+and per-source circuit breakers
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+
+# Add parent directory to path to import pdf_download_scheduler
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_download_scheduler import TokenBucket, SharedTokenBucket, CircuitBreaker, run_download_pool
+
+
+def test_token_bucket_limits_rate():
+    """A bucket allows its burst immediately, then `rate` requests per second"""
+    print("Testing token bucket...")
+    bucket = TokenBucket(rate=20.0, capacity=2)
+
+    start = time.monotonic()
+    for _ in range(2):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.05, "Burst should not wait"
+
+    for _ in range(4):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    assert elapsed >= 0.18, f"4 extra tokens at 20/s should take ~0.2s, took {elapsed:.3f}s"
+    print("✓ Token bucket limits rate")
+
+
+def test_host_bucket_shared_between_processes():
+    """Buckets kept in pdf_downloads.db limit the combined rate of every process"""
+    print("Testing shared host token bucket...")
+    work_dir = tempfile.mkdtemp()
+    # pdf_downloads.db is opened relative to the working directory
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        # Two instances with their own memory stand in for two worker processes
+        workers = [SharedTokenBucket("api.example.org", rate=20.0, capacity=2) for _ in range(2)]
+        start = time.monotonic()
+        workers[0].acquire()
+        workers[1].acquire()
+        assert time.monotonic() - start < 0.1, "Burst should not wait"
+
+        threads = [threading.Thread(target=lambda b=b: [b.acquire() for _ in range(2)]) for b in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+        assert elapsed >= 0.18, f"4 extra tokens at 20/s in total should take ~0.2s, took {elapsed:.3f}s"
+        assert not workers[0]._warned and not workers[1]._warned
+        print("✓ Host token buckets are shared")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def test_download_pool_runs_in_parallel():
+    """DOIs run concurrently and results are reported once each from the caller thread"""
+    print("Testing download pool...")
+    dois = [f"10.1234/test{i}" for i in range(8)]
+    caller = threading.current_thread()
+    reported = []
+
+    def download(doi):
+        time.sleep(0.1)
+        if doi.endswith("3"):
+            raise RuntimeError("boom")
+        return doi.endswith("0"), "msg", "src"
+
+    def on_result(idx, doi, result, error):
+        assert threading.current_thread() is caller
+        reported.append((idx, doi, result, error))
+
+    start = time.monotonic()
+    run_download_pool(dois, download, on_result, max_workers=8)
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.5, f"8 DOIs on 8 workers should take ~0.1s, took {elapsed:.3f}s"
+    assert sorted(r[1] for r in reported) == sorted(dois)
+    assert [r[0] for r in reported] == list(range(len(dois)))
+    errors = [r for r in reported if r[3] is not None]
+    assert len(errors) == 1 and errors[0][1] == "10.1234/test3"
+    print("✓ Download pool works")
+
+
+def test_hedged_lookup_takes_first_valid_pdf():
+    """Sources are queried concurrently; a fast URL that fails to download falls through to the next"""
+    print("Testing hedged source lookup...")
+    import pdf_manager
+    import pdf_download_db
+
+    delays = {"fast_bad": 0.05, "medium_good": 0.15, "slow": 0.5}
+    logged = []
+
+    def fake_try_source(source_name, doi, config=None):
+        time.sleep(delays[source_name])
+        return True, f"https://{source_name}.example.org/paper.pdf", int(delays[source_name] * 1000)
+
+    def fake_download_pdf(doi, url, save_dir):
+        if "fast_bad" in url:
+            return False, "Downloaded file is not a valid PDF"
+        return True, "Downloaded"
+
+    originals = (pdf_manager.try_source, pdf_manager.download_pdf, pdf_download_db.log_download_attempt)
+    pdf_manager.try_source = fake_try_source
+    pdf_manager.download_pdf = fake_download_pdf
+    pdf_download_db.log_download_attempt = lambda **kw: logged.append(kw["source_name"])
+    try:
+        start = time.monotonic()
+        success, message, source, url = pdf_manager._resolve_hedged(
+            "10.1234/hedge", 1, "/tmp", ["slow", "medium_good", "fast_bad"])
+        elapsed = time.monotonic() - start
+    finally:
+        pdf_manager.try_source, pdf_manager.download_pdf, pdf_download_db.log_download_attempt = originals
+
+    assert success and source == "medium_good"
+    assert url == "https://medium_good.example.org/paper.pdf"
+    assert elapsed < 0.4, f"Should not wait for the slow source, took {elapsed:.3f}s"
+    assert "fast_bad_download" in logged
+    print("✓ Hedged lookup works")
+
+
+def test_circuit_breaker_opens_and_probes():
+    """A breaker opens after N failures, lets one probe through after the cooldown, then closes"""
+    print("Testing circuit breaker...")
+    changes = []
+    breaker = CircuitBreaker("core", failure_threshold=3, cooldown_seconds=0.1,
+                             on_change=lambda state: changes.append(state["state"]))
+
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure("HTTP 503")
+    assert not breaker.is_open()
+    breaker.record_failure("HTTP 503")
+    assert breaker.is_open()
+    assert not breaker.allow_request(), "Open breaker should reject requests during cooldown"
+
+    time.sleep(0.15)
+    assert not breaker.is_open()
+    assert breaker.allow_request(), "One probe is allowed after the cooldown"
+    assert not breaker.allow_request(), "Only one probe at a time"
+    breaker.record_failure("Timeout")
+    assert breaker.is_open(), "A failed probe reopens the breaker"
+
+    time.sleep(0.15)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.snapshot()["state"] == "closed"
+    assert breaker.allow_request() and breaker.allow_request()
+
+    assert changes == ["open", "half_open", "open", "half_open", "closed"], changes
+    print("✓ Circuit breaker works")
+
+
+def test_breaker_counts_only_source_problems():
+    """Sources answering "no PDF" stay closed; timeouts and HTTP 5xx open the circuit"""
+    print("Testing circuit breaker with real source messages...")
+    import pdf_manager
+    import pdf_download_db
+    import pdf_download_scheduler
+
+    # Failure messages as returned by the source adapters in pdf_sources.py
+    healthy_answers = {
+        "europe_pmc": "Europe PMC: Article found but no accessible PDF link",
+        "pmc": "No PMCID found for this DOI",
+        "semantic_scholar": "Semantic Scholar: No PDF link available",
+        "doaj": "DOAJ: No fulltext link found",
+        "core": "CORE: Article found but no PDF download link",
+    }
+    problems = ["Europe PMC timeout", "Europe PMC API error: HTTP 503", "Europe PMC API error: HTTP 429",
+                "Europe PMC error: HTTPSConnectionPool(host='www.ebi.ac.uk', port=443): Max retries exceeded",
+                "Europe PMC timeout"]
+    answers = {}
+    logged = []
+
+    originals = (pdf_manager.try_source, pdf_download_db.log_download_attempt)
+    pdf_manager.try_source = lambda source_name, doi, config=None: (False, answers[source_name], 10)
+    pdf_download_db.log_download_attempt = lambda **kw: logged.append(kw["failure_category"])
+    cwd = os.getcwd()
+    tmpdir = tempfile.mkdtemp()
+    # Source settings are read from pdf_downloads.db in the working directory
+    os.chdir(tmpdir)
+    try:
+        for source_name, message in healthy_answers.items():
+            answers[source_name] = message
+            for i in range(10):
+                categories = []
+                pdf_manager._attempt_source(source_name, f"10.1234/paywalled{i}", 1, categories)
+                assert categories == ["not_found"], (message, categories)
+            assert not pdf_download_scheduler.get_source_breaker(source_name).is_open(), message
+
+        pdf_download_scheduler._breakers.pop("europe_pmc", None)
+        for i, message in enumerate(problems):
+            answers["europe_pmc"] = message
+            assert not pdf_download_scheduler.get_source_breaker("europe_pmc").is_open()
+            pdf_manager._attempt_source("europe_pmc", f"10.1234/down{i}", 1)
+        assert pdf_download_scheduler.get_source_breaker("europe_pmc").is_open()
+        assert logged[-5:] == ["timeout", "server_error", "rate_limit", "network_error", "timeout"], logged[-5:]
+    finally:
+        os.chdir(cwd)
+        pdf_manager.try_source, pdf_download_db.log_download_attempt = originals
+        for source_name in healthy_answers:
+            pdf_download_scheduler._breakers.pop(source_name, None)
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    print("✓ Circuit breaker ignores healthy answers")
+
+
+if __name__ == "__main__":
+    test_token_bucket_limits_rate()
+    test_host_bucket_shared_between_processes()
+    test_download_pool_runs_in_parallel()
+    test_hedged_lookup_takes_first_valid_pdf()
+    test_circuit_breaker_opens_and_probes()
+    test_breaker_counts_only_source_problems()
+    print("\nAll scheduler tests passed!")
@@ -41,9 +41,11 @@ class TestPDFDownloadStaleDetection(unittest.TestCase):
                 total INTEGER NOT NULL,
                 current INTEGER DEFAULT 0,
                 current_doi TEXT DEFAULT '',
-                downloaded TEXT DEFAULT '[]',
-                needs_upload TEXT DEFAULT '[]',
-                errors TEXT DEFAULT '[]',
+                current_source TEXT,
+                job_id INTEGER,
+                downloaded_count INTEGER NOT NULL DEFAULT 0,
+                needs_upload_count INTEGER NOT NULL DEFAULT 0,
+                errors_count INTEGER NOT NULL DEFAULT 0,
                 project_dir TEXT,
                 start_time REAL,
                 end_time REAL,
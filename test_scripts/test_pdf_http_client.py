@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the shared PDF HTTP client
+Tests keep-alive connection reuse, retries and resumable PDF downloads
+against a local HTTP server
+"""
+
+import sys
+import os
+import re
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Add parent directory to path to import pdf_http_client
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_download_scheduler import set_default_host_rate
+from pdf_http_client import get_http_session, http_get
+from pdf_manager import _download_to_path, PARTIAL_SUFFIX
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    client_ports = []
+    failures_left = 0
+
+    def do_GET(self):
+        _Handler.client_ports.append(self.client_address[1])
+        if self.path == "/flaky" and _Handler.failures_left > 0:
+            _Handler.failures_left -= 1
+            status, body = 503, b"busy"
+        else:
+            status, body = 200, b"ok"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _PDFHandler(BaseHTTPRequestHandler):
+    """Serves one PDF with byte ranges, cutting the first response off halfway."""
+    protocol_version = "HTTP/1.1"
+    body = (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+            b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+            b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>endobj\n"
+            b"trailer<</Root 1 0 R>>\n%" + b"0" * 100000 + b"\n%%EOF\n")
+    ranges = []
+    cut_next = True
+
+    def do_GET(self):
+        match = re.match(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        start = int(match.group(1)) if match else 0
+        _PDFHandler.ranges.append(start)
+        body = _PDFHandler.body
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body) - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        self.end_headers()
+        if _PDFHandler.cut_next:
+            _PDFHandler.cut_next = False
+            self.wfile.write(body[start:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body[start:])
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server(handler=None):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler or _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_connections_are_reused():
+    """Sequential requests to one host share a single keep-alive connection"""
+    print("Testing connection reuse...")
+    set_default_host_rate(0)  # No throttling for the local test server
+    server = _start_server()
+    try:
+        _Handler.client_ports = []
+        base = f"http://127.0.0.1:{server.server_port}"
+        for _ in range(3):
+            assert http_get(f"{base}/ok", timeout=5).text == "ok"
+        assert len(_Handler.client_ports) == 3
+        assert len(set(_Handler.client_ports)) == 1, "Expected one reused connection"
+        assert get_http_session() is get_http_session()
+        print("✓ Connections are reused")
+    finally:
+        server.shutdown()
+
+
+def test_retries_server_errors():
+    """503 responses are retried by the session's adapter"""
+    print("Testing retries...")
+    set_default_host_rate(0)
+    server = _start_server()
+    try:
+        _Handler.client_ports = []
+        _Handler.failures_left = 1
+        response = http_get(f"http://127.0.0.1:{server.server_port}/flaky", timeout=5)
+        assert response.status_code == 200
+        assert len(_Handler.client_ports) == 2
+        print("✓ Server errors are retried")
+    finally:
+        server.shutdown()
+
+
+def test_interrupted_download_is_resumed():
+    """A download cut off mid-stream resumes with a Range request and only then appears"""
+    print("Testing resumable downloads...")
+    set_default_host_rate(0)
+    server = _start_server(_PDFHandler)
+    try:
+        _PDFHandler.ranges = []
+        _PDFHandler.cut_next = True
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "paper.pdf")
+            success, message = _download_to_path(f"http://127.0.0.1:{server.server_port}/paper.pdf", filepath, {})
+            assert success, message
+            with open(filepath, "rb") as f:
+                assert f.read() == _PDFHandler.body
+            # The second request resumes from the last complete chunk written
+            assert len(_PDFHandler.ranges) == 2 and _PDFHandler.ranges[0] == 0, _PDFHandler.ranges
+            assert 0 < _PDFHandler.ranges[1] <= len(_PDFHandler.body) // 2
+            assert sorted(os.listdir(tmpdir)) == ["paper.pdf"], "Partial files should be gone"
+            assert not os.path.exists(filepath + PARTIAL_SUFFIX)
+        print("✓ Interrupted downloads are resumed")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_connections_are_reused()
+    test_retries_server_errors()
+    test_interrupted_download_is_resumed()
+    print("\nAll HTTP client tests passed!")
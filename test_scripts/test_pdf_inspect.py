@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for PDF validation and metadata extraction
+Tests the inspection process pool, the metadata written to the PDF manifest,
+and rejecting HTML pages served as PDFs while streaming
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Add parent directory to path to import pdf_inspect
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harvest_store import init_db, create_project, get_pdf_manifest
+from pdf_download_scheduler import set_default_host_rate
+from pdf_inspect import inspect_pdf, FITZ_AVAILABLE
+from pdf_manager import (
+    generate_doi_hash, record_project_pdf, get_project_pdf_dir, _download_to_path, PARTIAL_SUFFIX
+)
+
+# One page with "Hello PDF" in Helvetica and an Info title, padded past MIN_PDF_SIZE
+VALID_PDF = (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+             b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+             b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]/Contents 4 0 R"
+             b"/Resources<</Font<</F1<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>>>>>>>endobj\n"
+             b"4 0 obj<</Length 44>>stream\nBT /F1 12 Tf 72 720 Td (Hello PDF) Tj ET\nendstream endobj\n"
+             b"5 0 obj<</Title(Test Paper)>>endobj\n"
+             b"trailer<</Root 1 0 R/Info 5 0 R>>\n%" + b"0" * 1200 + b"\n%%EOF\n")
+
+PAYWALL_PAGE = b"<!DOCTYPE html><html><body>Please sign in to read this article</body></html>" * 40
+
+
+def test_inspect_and_manifest_metadata():
+    """Page count, title and text layer are extracted in the pool and stored in the manifest"""
+    print("Testing PDF inspection...")
+    tmpdir = tempfile.mkdtemp()
+    try:
+        good = os.path.join(tmpdir, "good.pdf")
+        html = os.path.join(tmpdir, "html.pdf")
+        with open(good, "wb") as f:
+            f.write(VALID_PDF)
+        with open(html, "wb") as f:
+            f.write(PAYWALL_PAGE)
+
+        info = inspect_pdf(good)
+        assert info["error"] is None and len(info["sha256"]) == 64, info
+        assert inspect_pdf(html)["error"] == "no %PDF header"
+
+        if FITZ_AVAILABLE:
+            assert info["pages"] == 1 and info["title"] == "Test Paper" and info["has_text"] is True, info
+
+            db_path = os.path.join(tmpdir, "harvest.db")
+            init_db(db_path)
+            doi = "10.1234/inspect"
+            project_id = create_project(db_path, "Inspect", "", [doi], "test@example.com")
+            project_dir = get_project_pdf_dir(project_id, os.path.join(tmpdir, "project_pdfs"))
+            os.makedirs(project_dir)
+            path = os.path.join(project_dir, f"{generate_doi_hash(doi)}.pdf")
+            shutil.copy(good, path)
+            assert record_project_pdf(db_path, project_id, doi, path, source="unpaywall")
+
+            entry = get_pdf_manifest(db_path, project_id)[0]
+            assert entry["pages"] == 1 and entry["title"] == "Test Paper" and entry["has_text"] is True, entry
+            assert entry["sha256"] == info["sha256"]
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print("✓ PDF inspection works")
+
+
+class _PaywallHandler(BaseHTTPRequestHandler):
+    """Serves an HTML sign-in page with a PDF content type, as some publishers do."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(PAYWALL_PAGE)))
+        self.end_headers()
+        self.wfile.write(PAYWALL_PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_html_served_as_pdf_is_rejected():
+    """A download without the %PDF header fails as 'not a PDF' and leaves no file behind"""
+    print("Testing streaming header check...")
+    set_default_host_rate(0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _PaywallHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "paper.pdf")
+            success, message = _download_to_path(f"http://127.0.0.1:{server.server_port}/paper.pdf", filepath, {})
+            print(f"   {message}")
+            assert not success and "not a PDF" in message
+            assert os.listdir(tmpdir) == [], "Nothing should be left on disk"
+            assert not os.path.exists(filepath + PARTIAL_SUFFIX)
+    finally:
+        server.shutdown()
+
+    print("✓ HTML served as PDF is rejected")
+
+
+if __name__ == "__main__":
+    test_inspect_and_manifest_metadata()
+    test_html_served_as_pdf_is_rejected()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the per-project PDF manifest
+Tests manifest upserts/deletes and reconciling the manifest with files on disk
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+
+# Add parent directory to path to import harvest_store
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harvest_store import (
+    init_db, create_project, delete_project, generate_doi_hash,
+    upsert_pdf_manifest_entry, delete_pdf_manifest_entries,
+    get_pdf_manifest, get_project_pdf_dois, get_project_summaries, get_pdf_blob_for_doi
+)
+
+
+def _make_db():
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
+        db_path = tmp.name
+    init_db(db_path)
+    return db_path
+
+
+def test_manifest_upsert_and_delete():
+    """Manifest entries can be added, updated, queried and removed"""
+    print("Testing PDF manifest upsert/delete...")
+    db_path = _make_db()
+    try:
+        doi_list = ["10.1234/a", "10.1234/b"]
+        project_id = create_project(db_path, "Manifest Project", "", doi_list, "test@example.com")
+        doi_hash = generate_doi_hash(doi_list[0])
+
+        assert upsert_pdf_manifest_entry(db_path, project_id, doi_hash, f"{doi_hash}.pdf",
+                                         size=1000, mtime=1.0, doi=doi_list[0], source="unpaywall")
+        # Reconcile-style update without a source keeps the original source
+        assert upsert_pdf_manifest_entry(db_path, project_id, doi_hash, f"{doi_hash}.pdf",
+                                         size=2000, mtime=2.0, sha256="abc", pages=3)
+
+        entries = get_pdf_manifest(db_path, project_id)
+        assert len(entries) == 1
+        assert entries[0]["doi"] == doi_list[0]
+        assert entries[0]["size"] == 2000
+        assert entries[0]["pages"] == 3
+        assert entries[0]["source"] == "unpaywall"
+
+        assert get_project_pdf_dois(db_path, project_id) == {doi_list[0]}
+        assert get_pdf_manifest(db_path, project_id, doi=doi_list[1]) == []
+        assert get_project_summaries(db_path, ["pdf_count"])[0]["pdf_count"] == 1
+
+        assert delete_pdf_manifest_entries(db_path, project_id, [doi_hash]) == 1
+        assert get_pdf_manifest(db_path, project_id) == []
+
+        # Deleting a project drops its manifest
+        upsert_pdf_manifest_entry(db_path, project_id, doi_hash, f"{doi_hash}.pdf", size=1, mtime=1.0)
+        assert delete_project(db_path, project_id)
+        assert get_pdf_manifest(db_path, project_id) == []
+        print("✓ Manifest upsert/delete works")
+    finally:
+        os.unlink(db_path)
+
+
+def test_reconcile_pdf_manifest():
+    """Reconcile picks up out-of-band file additions and removals"""
+    print("Testing PDF manifest reconcile...")
+    from pdf_manager import reconcile_pdf_manifest
+
+    db_path = _make_db()
+    work_dir = tempfile.mkdtemp()
+    # Reconciling adopts files into the shared PDF store next to the project directory
+    project_dir = os.path.join(work_dir, "project_1")
+    os.makedirs(project_dir)
+    try:
+        doi_list = ["10.1234/a", "10.1234/b"]
+        project_id = create_project(db_path, "Reconcile Project", "", doi_list, "test@example.com")
+
+        for doi in doi_list:
+            with open(os.path.join(project_dir, f"{generate_doi_hash(doi)}.pdf"), "wb") as f:
+                f.write(b"%PDF-1.4\n" + b"0" * 2000)
+        with open(os.path.join(project_dir, "orphan.pdf"), "wb") as f:
+            f.write(b"%PDF-1.4\n")
+
+        stats = reconcile_pdf_manifest(db_path, project_id, doi_list, project_dir=project_dir, dry_run=True)
+        assert stats["added"] == 3
+        assert get_pdf_manifest(db_path, project_id) == []
+
+        stats = reconcile_pdf_manifest(db_path, project_id, doi_list, project_dir=project_dir)
+        assert stats["added"] == 3
+        assert get_project_pdf_dois(db_path, project_id) == set(doi_list)
+        assert all(e["sha256"] for e in get_pdf_manifest(db_path, project_id))
+        # Only files named after a project DOI are adopted into the shared store
+        assert get_pdf_blob_for_doi(db_path, "orphan") is None
+        assert os.stat(os.path.join(project_dir, "orphan.pdf")).st_nlink == 1
+
+        os.remove(os.path.join(project_dir, f"{generate_doi_hash(doi_list[0])}.pdf"))
+        stats = reconcile_pdf_manifest(db_path, project_id, doi_list, project_dir=project_dir)
+        assert stats == {"added": 0, "updated": 0, "removed": 1, "unchanged": 2}
+        assert get_project_pdf_dois(db_path, project_id) == {doi_list[1]}
+        print("✓ Reconcile works")
+    finally:
+        os.unlink(db_path)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_manifest_upsert_and_delete()
+    test_reconcile_pdf_manifest()
+    print("\nAll PDF manifest tests passed!")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the batched OpenAlex open access lookup
+Tests that DOIs are looked up 50 per request against a local stand-in for
+the OpenAlex works API
+"""
+
+import sys
+import os
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Add parent directory to path to import pdf_sources
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_sources
+from pdf_download_scheduler import set_default_host_rate
+from pdf_sources import fetch_openalex_oa_locations, try_openalex, OPENALEX_BATCH_SIZE
+
+
+class _WorksHandler(BaseHTTPRequestHandler):
+    """Answers filter=doi:a|b|c like OpenAlex: even DOIs are OA, multiples of 7 are unknown."""
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        dois = query["filter"][0][len("doi:"):].split("|")
+        _WorksHandler.requests_seen.append(len(dois))
+
+        results = []
+        for doi in dois:
+            n = int(doi.rsplit("-", 1)[1])
+            if n % 7 == 0:
+                continue
+            work = {"doi": f"https://doi.org/{doi.lower()}", "best_oa_location": None, "oa_locations": []}
+            if n % 2 == 0:
+                work["best_oa_location"] = {"pdf_url": f"https://example.org/{n}.pdf"}
+            results.append(work)
+
+        body = json.dumps({"results": results}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_batched_openalex_lookup():
+    """120 DOIs take 3 requests; OA, closed and unknown works are told apart"""
+    print("Testing batched OpenAlex lookup...")
+    set_default_host_rate(0)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _WorksHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    original_url = pdf_sources.OPENALEX_WORKS_URL
+    pdf_sources.OPENALEX_WORKS_URL = f"http://127.0.0.1:{server.server_port}/works"
+    try:
+        _WorksHandler.requests_seen = []
+        dois = [f"10.1234/ABC-{n}" for n in range(1, 121)]
+        found, errors = fetch_openalex_oa_locations(dois, "test@example.com")
+
+        assert errors == []
+        assert _WorksHandler.requests_seen == [OPENALEX_BATCH_SIZE, OPENALEX_BATCH_SIZE, 20]
+        assert found["10.1234/ABC-2"] == "https://example.org/2.pdf", "Keys should keep the DOI as given"
+        assert found["10.1234/ABC-3"] is None, "Known closed work"
+        assert "10.1234/ABC-14" not in found, "Unknown work"
+        assert len([u for u in found.values() if u]) == len([n for n in range(1, 121) if n % 2 == 0 and n % 7])
+
+        assert try_openalex("10.1234/ABC-4") == (True, "https://example.org/4.pdf")
+        assert try_openalex("10.1234/ABC-7") == (False, "Not found in OpenAlex")
+        assert not try_openalex("10.1234/ABC-5")[0]
+    finally:
+        pdf_sources.OPENALEX_WORKS_URL = original_url
+        server.shutdown()
+
+    print("✓ Batched OpenAlex lookup works")
+
+
+if __name__ == "__main__":
+    test_batched_openalex_lookup()
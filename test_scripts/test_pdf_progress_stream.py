@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the PDF download progress stream (Server-Sent Events)
+Tests that watchers of a project share one poller, receive finished DOIs and
+counters as they happen, catch up from a cursor, and get a final event
+"""
+
+import sys
+import os
+import json
+import tempfile
+import shutil
+
+# Add parent directory to path to import pdf_progress_stream
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harvest_store import (
+    init_db, create_project, enqueue_pdf_download_job, init_pdf_download_progress,
+    update_pdf_download_progress, complete_pdf_download_task
+)
+import pdf_progress_stream
+from pdf_progress_stream import stream_pdf_download_progress
+
+
+def _parse(message):
+    """Split one SSE message into (event, id, data)."""
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    return fields.get("event"), fields.get("id"), json.loads(fields["data"])
+
+
+def _next_event(stream):
+    """Next event of a stream, skipping the retry hint and keep-alives."""
+    while True:
+        message = next(stream)
+        if message.startswith("event:"):
+            return _parse(message)
+
+
+def test_progress_stream():
+    """Two watchers share one poller and both see each finished DOI"""
+    print("Testing PDF download progress stream...")
+    work_dir = tempfile.mkdtemp()
+    db_path = os.path.join(work_dir, "harvest.db")
+    original = (pdf_progress_stream.PDF_PROGRESS_STREAM_POLL_SECONDS,
+                pdf_progress_stream.PDF_PROGRESS_STREAM_KEEPALIVE_SECONDS)
+    pdf_progress_stream.PDF_PROGRESS_STREAM_POLL_SECONDS = 0.05
+    pdf_progress_stream.PDF_PROGRESS_STREAM_KEEPALIVE_SECONDS = 2
+    # Source list lookups create pdf_downloads.db in the working directory
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        init_db(db_path)
+        dois = ["10.1234/a", "10.1234/b"]
+        project_id = create_project(db_path, "Stream Project", "", dois, "test@example.com")
+        init_pdf_download_progress(db_path, project_id, len(dois), work_dir)
+        job_id = enqueue_pdf_download_job(db_path, project_id, dois, work_dir)
+        update_pdf_download_progress(db_path, project_id, {"job_id": job_id})
+
+        first = stream_pdf_download_progress(db_path, project_id)
+        event, _, data = _next_event(first)
+        assert event == "progress" and data["status"] == "running" and data["current"] == 0
+        assert data["queue_position"] == 1 and data["is_stale"] is False
+
+        event_id = complete_pdf_download_task(db_path, job_id, 0, "downloaded", "a.pdf", "Downloaded", "unpaywall")
+        event, sse_id, data = _next_event(first)
+        assert event == "doi" and sse_id == str(event_id) and data["doi"] == "10.1234/a"
+        event, _, data = _next_event(first)
+        assert event == "progress" and data["current"] == 1 and data["downloaded_count"] == 1
+
+        # A reconnecting client resumes from its cursor, on the same poller
+        second = stream_pdf_download_progress(db_path, project_id, cursor=0)
+        event, _, data = _next_event(second)
+        assert event == "doi" and data["doi"] == "10.1234/a"
+        assert _next_event(second)[0] == "progress"
+        assert len(pdf_progress_stream._channels) == 1
+
+        complete_pdf_download_task(db_path, job_id, 1, "needs_upload", "b.pdf", "Not open access", "")
+        update_pdf_download_progress(db_path, project_id, {"status": "completed"})
+        for stream in (first, second):
+            event, _, data = _next_event(stream)
+            assert event == "doi" and data["outcome"] == "needs_upload"
+            event, _, data = _next_event(stream)
+            assert event == "done" and data["status"] == "completed"
+            assert [r[0] for r in data["full_results"]["needs_upload"]] == ["10.1234/b"]
+            assert list(stream) == []
+
+        assert pdf_progress_stream._channels == {}, "The poller stops with its last watcher"
+        print("✓ Progress stream works")
+    finally:
+        os.chdir(cwd)
+        (pdf_progress_stream.PDF_PROGRESS_STREAM_POLL_SECONDS,
+         pdf_progress_stream.PDF_PROGRESS_STREAM_KEEPALIVE_SECONDS) = original
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_progress_stream()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for adaptive PDF source ranking
+Tests the Thompson-sampling order, per-prefix statistics kept by the attempt
+writer, and the offline replay evaluation
+"""
+
+import sys
+import os
+import random
+import tempfile
+
+# Add parent directory to path to import pdf_source_ranker
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_download_db import (
+    init_pdf_download_db, log_download_attempt, flush_download_attempts,
+    get_prefix_source_stats, rebuild_prefix_source_stats
+)
+from pdf_source_ranker import rank_sources, evaluate_ranker
+
+
+def test_ranking_prefers_fast_reliable_source():
+    """A source that works for the publisher and answers quickly is usually tried first"""
+    print("Testing Thompson-sampling order...")
+    rng = random.Random(1)
+    prefix_stats = {
+        "europe_pmc": {"attempts": 40, "successes": 36, "total_time_ms": 40 * 300.0, "timed_attempts": 40},
+        "core": {"attempts": 40, "successes": 4, "total_time_ms": 40 * 3000.0, "timed_attempts": 40},
+    }
+    global_stats = {
+        "core": {"total_attempts": 1000, "success_count": 600, "avg_response_time_ms": 800.0},
+        "europe_pmc": {"total_attempts": 1000, "success_count": 300, "avg_response_time_ms": 400.0},
+    }
+
+    firsts = [rank_sources(["core", "europe_pmc", "zenodo"], prefix_stats, global_stats, rng)[0]
+              for _ in range(200)]
+    assert firsts.count("europe_pmc") > 150, firsts.count("europe_pmc")
+
+    # Without publisher history the global success rate decides, but not always
+    firsts = [rank_sources(["core", "europe_pmc"], {}, global_stats, rng)[0] for _ in range(200)]
+    assert 0 < firsts.count("europe_pmc") < 200, firsts.count("europe_pmc")
+
+    print("✓ Thompson-sampling order works")
+
+
+def test_prefix_stats_and_offline_evaluation():
+    """The writer keeps per-prefix statistics and the replay favors the learned order"""
+    print("Testing per-prefix statistics and offline evaluation...")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.join(tmpdir, "pdf_downloads.db")
+        assert init_pdf_download_db(db_path)
+
+        # History: core was always tried first for 10.1111 and never worked there,
+        # zenodo always did; a zenodo URL that was not a PDF takes its success back
+        for i in range(30):
+            doi = f"10.1111/paper-{i}"
+            log_download_attempt(1, doi, "core", False, "No results found", "not_found",
+                                 response_time_ms=2000, db_path=db_path)
+            log_download_attempt(1, doi, "zenodo", True, response_time_ms=500, db_path=db_path)
+        log_download_attempt(1, "10.1111/paper-0", "zenodo_download", False, "Response is not a PDF",
+                             "invalid_pdf", db_path=db_path)
+        flush_download_attempts(db_path)
+
+        stats = get_prefix_source_stats("10.1111", db_path)
+        assert stats["zenodo"]["attempts"] == 30 and stats["zenodo"]["successes"] == 29, stats
+        assert stats["core"]["successes"] == 0
+        assert abs(stats["zenodo"]["total_time_ms"] / stats["zenodo"]["timed_attempts"] - 500.0) < 0.01
+        assert get_prefix_source_stats("10.9999", db_path) == {}
+
+        assert rebuild_prefix_source_stats(db_path) == 2
+        assert get_prefix_source_stats("10.1111", db_path) == stats, "Rebuild should match the live totals"
+
+        report = evaluate_ranker(db_path, days=30)
+        print(f"   {report}")
+        assert report["thompson"]["with_pdf"] == 29
+        assert report["logged"]["mean_attempts_to_pdf"] == 2.0
+        assert report["thompson"]["mean_attempts_to_pdf"] < 1.5
+        assert report["thompson"]["mean_time_to_pdf_ms"] < report["logged"]["mean_time_to_pdf_ms"]
+
+    print("✓ Per-prefix statistics and offline evaluation work")
+
+
+if __name__ == "__main__":
+    test_ranking_prefers_fast_reliable_source()
+    test_prefix_stats_and_offline_evaluation()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the PDF source registry
+Tests that lookups run with the timeout, enabled state and concurrency limit
+stored in the sources table, and that changes are picked up at runtime
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add parent directory to path to import pdf_source_registry
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_download_db import init_pdf_download_db, get_pdf_db_connection
+import pdf_source_registry
+from pdf_source_registry import (
+    SOURCE_ADAPTERS, lookup_source, get_source_settings,
+    add_settings_listener, notify_sources_changed
+)
+
+
+def _update_source(db_path, name, **columns):
+    conn = get_pdf_db_connection(db_path)
+    assignments = ", ".join(f"{column} = ?" for column in columns)
+    conn.execute(f"UPDATE sources SET {assignments} WHERE name = ?", (*columns.values(), name))
+    conn.commit()
+    conn.close()
+
+
+def test_settings_changes_take_effect():
+    """A changed timeout or enabled state reaches the next lookup and the listeners"""
+    print("Testing source settings changes...")
+    original_adapter = SOURCE_ADAPTERS["zenodo"]
+    timeouts = []
+    SOURCE_ADAPTERS["zenodo"] = lambda doi, settings: (timeouts.append(settings["timeout"]) or True, "https://x/a.pdf")
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "pdf_downloads.db")
+            assert init_pdf_download_db(db_path)
+            changes = []
+            add_settings_listener(lambda name, old, new: changes.append((name, old, new)), db_path=db_path)
+
+            default_timeout = get_source_settings("zenodo", db_path)["timeout"]
+            success, url, _ = lookup_source("zenodo", "10.1234/a", db_path=db_path)
+            assert success and url == "https://x/a.pdf"
+            assert timeouts == [default_timeout]
+
+            _update_source(db_path, "zenodo", timeout=3)
+            notify_sources_changed(db_path)
+            lookup_source("zenodo", "10.1234/b", db_path=db_path)
+            assert timeouts[-1] == 3
+            assert changes and changes[-1][0] == "zenodo" and changes[-1][2]["timeout"] == 3
+
+            _update_source(db_path, "zenodo", enabled=0)
+            notify_sources_changed(db_path)
+            success, message, _ = lookup_source("zenodo", "10.1234/c", db_path=db_path)
+            assert not success and "disabled" in message
+            assert len(timeouts) == 2, "A disabled source is not called"
+
+            assert lookup_source("nosuchsource", "10.1234/d", db_path=db_path)[1] == "Unknown source: nosuchsource"
+    finally:
+        SOURCE_ADAPTERS["zenodo"] = original_adapter
+    print("✓ Settings changes take effect")
+
+
+def test_max_concurrency_limits_lookups():
+    """No more than max_concurrency lookups of a source run at once"""
+    print("Testing per-source concurrency limit...")
+    original_adapter = SOURCE_ADAPTERS["doaj"]
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_adapter(doi, settings):
+        with lock:
+            running.append(doi)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(doi)
+        return False, "No PDF"
+
+    SOURCE_ADAPTERS["doaj"] = slow_adapter
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "pdf_downloads.db")
+            assert init_pdf_download_db(db_path)
+            _update_source(db_path, "doaj", max_concurrency=2)
+            notify_sources_changed(db_path)
+
+            threads = [threading.Thread(target=lookup_source, args=("doaj", f"10.1234/{i}"),
+                                        kwargs={"db_path": db_path}) for i in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            print(f"   Peak concurrent lookups: {max(peak)}")
+            assert len(peak) == 8
+            assert max(peak) == 2
+            assert pdf_source_registry.get_source_registry(db_path)._in_flight["doaj"] == 0
+    finally:
+        SOURCE_ADAPTERS["doaj"] = original_adapter
+    print("✓ Concurrency limit works")
+
+
+if __name__ == "__main__":
+    test_settings_changes_take_effect()
+    test_max_concurrency_limits_lookups()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for the content-addressed PDF store shared across projects
+Tests hardlinking stored PDFs into projects, refcounts and dropping references
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+
+# Add parent directory to path to import harvest_store
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harvest_store import (
+    init_db, create_project, delete_project, get_pdf_blob_for_doi,
+    get_pdf_manifest, delete_pdf_manifest_entries
+)
+from pdf_manager import (
+    generate_doi_hash, record_project_pdf, link_pdf_from_store, modify_project_pdf,
+    get_project_pdf_dir, get_pdf_store_dir, get_pdf_store_path
+)
+from pdf_inspect import FITZ_AVAILABLE
+
+PDF_BYTES = b"%PDF-1.4\n" + b"0" * 2000 + b"\n%%EOF\n"
+
+
+def test_pdf_shared_between_projects():
+    """A PDF downloaded for one project is linked into another without downloading"""
+    print("Testing shared PDF store...")
+    tmpdir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmpdir, "harvest.db")
+        base_dir = os.path.join(tmpdir, "project_pdfs")
+        init_db(db_path)
+        doi = "10.1234/shared"
+        doi_hash = generate_doi_hash(doi)
+        p1 = create_project(db_path, "One", "", [doi], "test@example.com")
+        p2 = create_project(db_path, "Two", "", [doi], "test@example.com")
+        dir1 = get_project_pdf_dir(p1, base_dir)
+        dir2 = get_project_pdf_dir(p2, base_dir)
+
+        # Project 1 downloads the PDF
+        os.makedirs(dir1)
+        path1 = os.path.join(dir1, f"{doi_hash}.pdf")
+        with open(path1, "wb") as f:
+            f.write(PDF_BYTES)
+        assert record_project_pdf(db_path, p1, doi, path1, source="unpaywall")
+
+        blob = get_pdf_blob_for_doi(db_path, doi_hash)
+        assert blob is not None and blob["refcount"] == 1
+        store_path = get_pdf_store_path(get_pdf_store_dir(dir1), blob["sha256"])
+        assert os.path.samefile(path1, store_path), "Project file should be a link to the blob"
+
+        # Project 2 gets it from the store
+        path2 = link_pdf_from_store(db_path, p2, doi, dir2)
+        assert path2 and os.path.samefile(path2, store_path)
+        assert get_pdf_manifest(db_path, p2)[0]["source"] == "pdf_store"
+        assert get_pdf_blob_for_doi(db_path, doi_hash)["refcount"] == 2
+
+        # Removing the PDF from project 1 only drops its reference
+        os.remove(path1)
+        assert delete_pdf_manifest_entries(db_path, p1, [doi_hash]) == 1
+        assert get_pdf_blob_for_doi(db_path, doi_hash)["refcount"] == 1
+        assert os.path.exists(store_path) and os.path.exists(path2)
+
+        # Deleting project 2 drops the last reference; the blob stays for reuse
+        assert delete_project(db_path, p2)
+        assert get_pdf_blob_for_doi(db_path, doi_hash)["refcount"] == 0
+        assert link_pdf_from_store(db_path, p1, doi, dir1) == path1
+        assert get_pdf_blob_for_doi(db_path, doi_hash)["refcount"] == 1
+
+        # An unknown DOI is not in the store
+        assert link_pdf_from_store(db_path, p1, "10.1234/missing", dir1) is None
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print("✓ Shared PDF store works")
+
+
+def test_identical_upload_is_deduplicated():
+    """Recording a file whose content is already stored links it to the existing blob"""
+    print("Testing PDF store deduplication...")
+    tmpdir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmpdir, "harvest.db")
+        init_db(db_path)
+        p1 = create_project(db_path, "One", "", ["10.1234/a", "10.1234/b"], "test@example.com")
+        project_dir = get_project_pdf_dir(p1, os.path.join(tmpdir, "project_pdfs"))
+        os.makedirs(project_dir)
+
+        paths = []
+        for doi in ["10.1234/a", "10.1234/b"]:
+            path = os.path.join(project_dir, f"{generate_doi_hash(doi)}.pdf")
+            with open(path, "wb") as f:
+                f.write(PDF_BYTES)
+            assert record_project_pdf(db_path, p1, doi, path, source="manual_upload")
+            paths.append(path)
+
+        assert os.path.samefile(paths[0], paths[1]), "Identical files should share one blob"
+        assert get_pdf_blob_for_doi(db_path, generate_doi_hash("10.1234/b"))["refcount"] == 2
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print("✓ PDF store deduplication works")
+
+
+def test_highlighting_keeps_other_projects_copy():
+    """Highlighting a shared PDF in one project leaves the blob and other projects' links unchanged"""
+    print("Testing in-place edits of shared PDFs...")
+    if not FITZ_AVAILABLE:
+        print("   PyMuPDF not installed; skipping")
+        return
+    import fitz
+    import hashlib
+    from pdf_annotator import add_highlights_to_pdf
+
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 100), "A shared paper", fontsize=12)
+    pdf_bytes = doc.tobytes()
+    doc.close()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmpdir, "harvest.db")
+        base_dir = os.path.join(tmpdir, "project_pdfs")
+        init_db(db_path)
+        doi = "10.1234/highlight"
+        p1 = create_project(db_path, "A", "", [doi], "test@example.com")
+        p2 = create_project(db_path, "B", "", [doi], "test@example.com")
+        dir1 = get_project_pdf_dir(p1, base_dir)
+        os.makedirs(dir1)
+        path1 = os.path.join(dir1, f"{generate_doi_hash(doi)}.pdf")
+        with open(path1, "wb") as f:
+            f.write(pdf_bytes)
+        assert record_project_pdf(db_path, p1, doi, path1)
+        path2 = link_pdf_from_store(db_path, p2, doi, get_project_pdf_dir(p2, base_dir))
+        sha256 = get_pdf_blob_for_doi(db_path, generate_doi_hash(doi))["sha256"]
+        store_path = get_pdf_store_path(get_pdf_store_dir(dir1), sha256)
+
+        highlights = [{"page": 0, "rects": [[72, 85, 200, 105]], "color": "#FFFF00"}]
+        success, _ = modify_project_pdf(db_path, p1, path1, lambda path: add_highlights_to_pdf(path, highlights))
+        assert success
+
+        for path in (path2, store_path):
+            with open(path, "rb") as f:
+                assert f.read() == pdf_bytes, f"{path} must not change"
+        with open(store_path, "rb") as f:
+            assert hashlib.sha256(f.read()).hexdigest() == sha256
+        assert not os.path.samefile(path1, store_path)
+
+        entry = get_pdf_manifest(db_path, p1)[0]
+        assert entry["sha256"] != sha256 and entry["size"] == os.path.getsize(path1)
+        blob = get_pdf_blob_for_doi(db_path, generate_doi_hash(doi))
+        assert blob["sha256"] == sha256 and blob["refcount"] == 1, "Only project B still uses the blob"
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+    print("✓ In-place edits keep shared copies intact")
+
+
+if __name__ == "__main__":
+    test_pdf_shared_between_projects()
+    test_identical_upload_is_deduplicated()
+    test_highlighting_keeps_other_projects_copy()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for lightweight project summaries
+Tests that get_project_summaries and get_projects_overview return counts
+without full DOI lists
+"""
+
+import sys
+import os
+import tempfile
+import time
+import sqlite3
+
+# Add parent directory to path to import harvest_store
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from harvest_store import (
+    init_db, create_project, create_batches, update_doi_status,
+    get_project_summaries, PROJECT_SUMMARY_FIELDS,
+    init_pdf_download_progress, get_projects_overview
+)
+
+
+def _make_db():
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
+        db_path = tmp.name
+    init_db(db_path)
+    return db_path
+
+
+def test_summary_counts():
+    """doi_count and status_counts are computed without returning doi_list"""
+    print("Testing project summary counts...")
+    db_path = _make_db()
+    try:
+        doi_list = [f"10.1234/test{i}" for i in range(5)]
+        project_id = create_project(db_path, "Summary Project", "Desc", doi_list, "test@example.com")
+        create_project(db_path, "Empty Project", "", [], "test@example.com")
+
+        create_batches(db_path, project_id, batch_size=5)
+        update_doi_status(db_path, project_id, doi_list[0], "in_progress", "annotator@example.com")
+        update_doi_status(db_path, project_id, doi_list[1], "completed", "annotator@example.com")
+        update_doi_status(db_path, project_id, doi_list[2], "completed", "annotator@example.com")
+
+        summaries = {s["id"]: s for s in get_project_summaries(db_path)}
+        assert len(summaries) == 2
+
+        summary = summaries[project_id]
+        assert "doi_list" not in summary
+        assert summary["name"] == "Summary Project"
+        assert summary["doi_count"] == 5
+        assert summary["status_counts"] == {"unstarted": 2, "in_progress": 1, "completed": 2}
+
+        empty = next(s for s in summaries.values() if s["id"] != project_id)
+        assert empty["doi_count"] == 0
+        assert empty["status_counts"] == {"unstarted": 0, "in_progress": 0, "completed": 0}
+        print("✓ Summary counts are correct")
+    finally:
+        os.unlink(db_path)
+
+
+def test_summary_field_selection():
+    """Only requested fields are returned, id is always included"""
+    print("Testing project summary field selection...")
+    db_path = _make_db()
+    try:
+        create_project(db_path, "Fields Project", "Desc", ["10.1234/a", "10.1234/b"], "test@example.com")
+
+        summaries = get_project_summaries(db_path, ["name", "doi_count"])
+        assert summaries == [{"id": summaries[0]["id"], "name": "Fields Project", "doi_count": 2}]
+
+        summaries = get_project_summaries(db_path, ["name"])
+        assert set(summaries[0].keys()) == {"id", "name"}
+
+        summaries = get_project_summaries(db_path)
+        assert set(summaries[0].keys()) == set(PROJECT_SUMMARY_FIELDS)
+        print("✓ Field selection works")
+    finally:
+        os.unlink(db_path)
+
+
+def test_projects_overview():
+    """Overview combines download progress, staleness and batch counts"""
+    print("Testing projects overview...")
+    db_path = _make_db()
+    try:
+        doi_list = [f"10.1234/test{i}" for i in range(4)]
+        running_id = create_project(db_path, "Running", "", doi_list, "test@example.com")
+        idle_id = create_project(db_path, "Idle", "", doi_list[:2], "test@example.com")
+
+        create_batches(db_path, running_id, batch_size=2)
+        update_doi_status(db_path, running_id, doi_list[0], "completed", "annotator@example.com")
+        init_pdf_download_progress(db_path, running_id, len(doi_list), "project_pdfs/project_1")
+
+        # Make the running download look stale
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE pdf_download_progress SET updated_at = ? WHERE project_id = ?",
+                     (time.time() - 600, running_id))
+        conn.commit()
+        conn.close()
+
+        overview = {p["id"]: p for p in get_projects_overview(db_path)}
+
+        running = overview[running_id]
+        assert running["doi_count"] == 4
+        assert running["batch_count"] == 2
+        assert running["status_counts"]["completed"] == 1
+        assert running["download"]["status"] == "running"
+        assert running["download"]["is_stale"] is True
+        assert running["download"]["downloaded_count"] == 0
+
+        idle = overview[idle_id]
+        assert idle["download"] is None
+        assert idle["batch_count"] == 0
+        assert idle["status_counts"]["unstarted"] == 2
+        print("✓ Projects overview is correct")
+    finally:
+        os.unlink(db_path)
+
+
+if __name__ == "__main__":
+    test_summary_counts()
+    test_summary_field_selection()
+    test_projects_overview()
+    print("\nAll project summary tests passed!")
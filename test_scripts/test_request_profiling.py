@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test script for on-demand request profiling
+Tests that only admin-token requests are profiled and reports can be listed/downloaded
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+import sqlite3
+
+# Add parent directory to path to import request_profiling
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+
+import harvest_metrics
+from harvest_metrics import SQLITE_CONNECTION_FACTORY
+import request_profiling
+from request_profiling import init_request_profiling, PROFILE_HEADER
+
+
+def _make_app(profiles_dir, db_path, connection_types=None):
+    app = Flask(__name__)
+
+    def verify_token(token):
+        return "admin@example.com" if token == "good-token" else None
+
+    def verify_admin_auth(payload):
+        email = verify_token(payload.get("token", ""))
+        return bool(email), email
+
+    init_request_profiling(app, verify_admin_auth, verify_token, profiles_dir=profiles_dir)
+
+    @app.get("/work")
+    def work():
+        conn = sqlite3.connect(db_path, factory=SQLITE_CONNECTION_FACTORY)
+        if connection_types is not None:
+            connection_types.append(type(conn))
+        conn.execute("SELECT 1").fetchall()
+        conn.close()
+        return jsonify({"ok": True})
+
+    return app
+
+
+def test_profiling_opt_in_and_reports():
+    """Requests are profiled only with a valid admin token"""
+    print("Testing request profiling...")
+    profiles_dir = tempfile.mkdtemp()
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
+        db_path = tmp.name
+    try:
+        client = _make_app(profiles_dir, db_path).test_client()
+
+        # Switch off: no report
+        r = client.get("/work")
+        assert r.status_code == 200
+        assert "X-Harvest-Profile-Id" not in r.headers
+        r = client.get("/work", headers={PROFILE_HEADER: "bad-token"})
+        assert "X-Harvest-Profile-Id" not in r.headers
+        assert os.listdir(profiles_dir) == []
+
+        # Header and query param both work
+        r = client.get("/work", headers={PROFILE_HEADER: "good-token"})
+        profile_id = r.headers["X-Harvest-Profile-Id"]
+        r = client.get("/work?_profile=good-token")
+        assert "X-Harvest-Profile-Id" in r.headers
+
+        # Listing and download require admin auth
+        assert client.get("/api/admin/profiles").status_code == 403
+        listing = client.get("/api/admin/profiles", headers={"X-Admin-Token": "good-token"}).json
+        assert len(listing["profiles"]) == 2
+
+        report = client.get(f"/api/admin/profiles/{profile_id}", json={"token": "good-token"}).json
+        assert report["route"] == "/work"
+        assert report["admin_email"] == "admin@example.com"
+        assert report["sql"]["count"] == 1
+        assert report["sql"]["statements"][0]["sql"] == "SELECT 1"
+
+        r = client.get(f"/api/admin/profiles/{profile_id}?format=prof", headers={"X-Admin-Token": "good-token"})
+        assert r.status_code == 200
+        r = client.get("/api/admin/profiles/not-an-id", headers={"X-Admin-Token": "good-token"})
+        assert r.status_code == 400
+
+        # While another request is being profiled, the request runs unprofiled
+        with request_profiling._profile_lock:
+            r = client.get("/work", headers={PROFILE_HEADER: "good-token"})
+            assert r.status_code == 200
+            assert "X-Harvest-Profile-Id" not in r.headers
+            assert r.headers["X-Harvest-Profile-Status"] == "busy"
+        r = client.get("/work", headers={PROFILE_HEADER: "good-token"})
+        assert "X-Harvest-Profile-Id" in r.headers
+        assert not request_profiling._profile_lock.locked()
+        print("✓ Request profiling works")
+    finally:
+        shutil.rmtree(profiles_dir, ignore_errors=True)
+        os.unlink(db_path)
+
+
+def test_unprofiled_requests_use_plain_connections():
+    """Without metrics, only profiled requests get instrumented SQLite connections"""
+    print("Testing SQLite connections of unprofiled requests...")
+    profiles_dir = tempfile.mkdtemp()
+    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as tmp:
+        db_path = tmp.name
+    metrics_enabled = harvest_metrics.METRICS_ENABLED
+    harvest_metrics.METRICS_ENABLED = False
+    try:
+        connection_types = []
+        client = _make_app(profiles_dir, db_path, connection_types).test_client()
+        client.get("/work")
+        r = client.get("/work", headers={PROFILE_HEADER: "good-token"})
+        client.get("/work")
+        assert connection_types == [sqlite3.Connection, harvest_metrics.InstrumentedConnection,
+                                    sqlite3.Connection], connection_types
+
+        report = client.get(f"/api/admin/profiles/{r.headers['X-Harvest-Profile-Id']}",
+                            headers={"X-Admin-Token": "good-token"}).json
+        assert report["sql"]["count"] == 1
+        print("✓ Unprofiled requests use plain connections")
+    finally:
+        harvest_metrics.METRICS_ENABLED = metrics_enabled
+        shutil.rmtree(profiles_dir, ignore_errors=True)
+        os.unlink(db_path)
+
+
+if __name__ == "__main__":
+    test_profiling_opt_in_and_reports()
+    test_unprofiled_requests_use_plain_connections()
+    print("\nAll request profiling tests passed!")
@@ -36,6 +36,16 @@ from harvest_be import app
 #             logger.info(f"[PDF Download] Cleaned up {deleted} old progress entries")
 #     except Exception as e:
 #         logger.warning(f"Cleanup failed: {e}")
+#
+# Metrics with multiple workers: export PROMETHEUS_MULTIPROC_DIR=/path/to/empty/dir
+# before starting gunicorn, and add to gunicorn.conf.py:
+# def child_exit(server, worker):
+#     from harvest_metrics import mark_process_dead
+#     mark_process_dead(worker.pid)
+
+# PDF downloads are queued in the database and run by a separate worker process;
+# run it next to gunicorn (e.g. as its own systemd service):
+#     python pdf_download_worker.py
 
 # The 'app' variable is what Gunicorn will use
 # Gunicorn expects a WSGI application object named 'application' or specified via command line